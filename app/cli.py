@@ -87,6 +87,8 @@ def _print_help() -> None:
     print("  agent-toolbox logs tail [--n N]   Tail last N lines of run log (env FREE_AGENTS_LOG_PATH)")
     print("  agent-toolbox logs show <run_id>  Show log lines for a run")
     print("  agent-toolbox deploy --replit <agent_id>   Prepare Replit config + open import URL (same as free-agents)")
+    print("  agent-toolbox retention [--dry-run] [--archive-dir DIR] [--batch-size N]")
+    print("                              Archive and delete expired events/run steps (RETENTION_DAYS[_BY_AGENT])")
     print()
 
 
@@ -130,6 +132,26 @@ def _logs_show(run_id: str) -> None:
                 print(line)
 
 
+def _run_retention(args: list[str]) -> None:
+    """Apply the retention policy once and print the report as JSON."""
+    from .storage import retention
+
+    dry_run = "--dry-run" in args
+    archive_dir = None
+    batch_size = retention.DEFAULT_BATCH_SIZE
+    for j, a in enumerate(args):
+        if a == "--archive-dir" and j + 1 < len(args):
+            archive_dir = args[j + 1]
+        elif a == "--batch-size" and j + 1 < len(args):
+            try:
+                batch_size = max(1, int(args[j + 1]))
+            except ValueError:
+                print("Usage: agent-toolbox retention [--dry-run] [--archive-dir DIR] [--batch-size N]")
+                sys.exit(1)
+    report = retention.run(archive_dir=archive_dir, batch_size=batch_size, dry_run=dry_run)
+    print(json.dumps(report, indent=2, sort_keys=True))
+
+
 def _run_bootstrap(venv_dir: str = ".venv") -> None:
     _ensure_supported_python()
 
@@ -267,6 +289,9 @@ def main() -> None:
             target = sys.argv[2] if len(sys.argv) > 2 else ".venv"
             _run_bootstrap(target)
             sys.exit(0)
+        if subcommand == "retention":
+            _run_retention([a.strip() for a in sys.argv[2:]])
+            sys.exit(0)
         if subcommand == "deploy":
             from .cli_replit_deploy import run_deploy_replit
 
@@ -1,7 +1,8 @@
 import os
+import threading
 from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from pydantic import BaseModel
@@ -69,6 +70,63 @@ class Settings(BaseModel):
     summary_batch_size: int = 12
     summary_max_chars: int = 1_500
 
+    # Pooled provider HTTP clients. HTTP/2 via `h2` (httpx[http2]); HTTP/1.1 keep-alive if it is missing.
+    provider_http2: bool = True
+    provider_max_connections: int = 100
+    provider_max_keepalive_connections: int = 20
+    provider_keepalive_expiry_seconds: float = 30.0
+
+    # Pooled clients for the http_request tool (HTTP/2 as for providers); per-host in-flight cap.
+    http_tool_http2: bool = True
+    http_tool_max_connections: int = 100
+    http_tool_max_connections_per_domain: int = 8
+
+    # Tool result cache (app.runtime.tools.result_cache): byte-bounded LRU; TOOL_CACHE_DIR adds a disk tier.
+    tool_cache_enabled: bool = True
+    tool_cache_max_bytes: int = 64 * 1024 * 1024
+    tool_cache_dir: str = ""
+    tool_cache_disk_max_bytes: int = 512 * 1024 * 1024
+
+    # GitHub client: pooled connections; commits, trees and blobs cached on disk by SHA (empty dir disables).
+    github_max_connections: int = 20
+    github_cache_dir: str = "./data/github_cache"
+    github_cache_max_bytes: int = 1024 * 1024 * 1024
+
+    # LLM response cache (presets opt in via `response_cache`); persist adds the DB tier.
+    response_cache_max_entries: int = 1024
+    response_cache_default_ttl_seconds: int = 3600
+    response_cache_persist: bool = False
+    # Single-flight identical concurrent /invoke requests (one provider call, shared result).
+    invoke_coalescing: bool = True
+    # POST /agents/{id}/invoke:batch limits
+    batch_max_items: int = 500
+    batch_concurrency: int = 8
+    # Postgres connection pool (psycopg_pool); SQLite reuses one connection per thread.
+    db_pool_min_size: int = 1
+    db_pool_max_size: int = 10
+    db_pool_timeout_seconds: float = 10.0
+    # Threads used by async routers for store calls (app.storage.executor).
+    db_executor_max_workers: int = 8
+    # GET /runs/{id}/events re-reads a run at least this often when no LISTEN/NOTIFY
+    # connection is up (SQLite, or writes from another process).
+    run_events_poll_seconds: float = 2.0
+    # Retention for events / run_steps (app.storage.retention; `agent-toolbox retention`).
+    # 0 keeps rows forever; RETENTION_DAYS_BY_AGENT overrides per agent ("summarizer=30,triage=365").
+    retention_days: int = 0
+    retention_days_by_agent: Dict[str, int] = {}
+    retention_archive_dir: str = "./data/archive"
+    # app.registry_cache: how often a worker checks the DB registry version for writes by other workers.
+    registry_cache_check_seconds: float = 1.0
+    # app.runtime.scheduler: background runs (wait=false, replay, repo-to-agent, evals) share one
+    # bounded worker pool per process; 0 disables the per-agent / per-tenant caps.
+    run_workers: int = 8
+    run_max_per_agent: int = 0
+    run_max_per_tenant: int = 0
+    run_queue_poll_seconds: float = 1.0
+    # A claimed run whose heartbeat is older than this is requeued, or failed after RUN_MAX_ATTEMPTS.
+    run_stale_seconds: float = 60.0
+    run_max_attempts: int = 2
+
 
 @lru_cache(maxsize=1)
 def _base_settings() -> Settings:
@@ -110,57 +168,189 @@ def _base_settings() -> Settings:
         memory_recent_k=8,
         summary_batch_size=12,
         summary_max_chars=1_500,
+        provider_http2=True,
+        provider_max_connections=100,
+        provider_max_keepalive_connections=20,
+        provider_keepalive_expiry_seconds=30.0,
+        http_tool_http2=True,
+        http_tool_max_connections=100,
+        http_tool_max_connections_per_domain=8,
+        tool_cache_enabled=True,
+        tool_cache_max_bytes=64 * 1024 * 1024,
+        tool_cache_dir="",
+        tool_cache_disk_max_bytes=512 * 1024 * 1024,
+        github_max_connections=20,
+        github_cache_dir="./data/github_cache",
+        github_cache_max_bytes=1024 * 1024 * 1024,
+        response_cache_max_entries=1024,
+        response_cache_default_ttl_seconds=3600,
+        response_cache_persist=False,
+        invoke_coalescing=True,
+        batch_max_items=500,
+        batch_concurrency=8,
+        db_pool_min_size=1,
+        db_pool_max_size=10,
+        db_pool_timeout_seconds=10.0,
+        db_executor_max_workers=8,
+        run_events_poll_seconds=2.0,
+        retention_days=0,
+        retention_days_by_agent={},
+        retention_archive_dir="./data/archive",
+        registry_cache_check_seconds=1.0,
+        run_workers=8,
+        run_max_per_agent=0,
+        run_max_per_tenant=0,
+        run_queue_poll_seconds=1.0,
+        run_stale_seconds=60.0,
+        run_max_attempts=2,
     )
 
 
+class _EnvReader:
+    """os.getenv wrapper that records which variables a Settings build depended on."""
+
+    def __init__(self) -> None:
+        self.seen: Dict[str, Optional[str]] = {}
+
+    def __call__(self, name: str, default: Any = None) -> Any:
+        value = os.environ.get(name)
+        self.seen.setdefault(name, value)
+        return default if value is None else value
+
+
+# (env names read, their values at build time, settings, version)
+_snapshot: Optional[Tuple[Tuple[str, ...], Tuple[Optional[str], ...], Settings, int]] = None
+_snapshot_lock = threading.Lock()
+_settings_version = 0
+
+
 def get_settings() -> Settings:
     """
-    Return Settings built from the *current* environment.
+    Return Settings for the *current* environment.
 
-    Tests mutate os.environ at runtime via the `env_vars` helper, so we must
-    read directly from the environment on each call instead of caching.
+    Tests mutate os.environ at runtime via the `env_vars` helper, so the
+    snapshot is keyed by the values of the env vars it was built from: a
+    cached Settings is returned while none of them changed, and a fresh one is
+    built otherwise. Checking ~30 env lookups is much cheaper than rebuilding
+    and validating the pydantic model on every call. Treat the returned object
+    as read-only; it is shared between callers.
     """
+    snap = _snapshot
+    if snap is not None:
+        names, values, settings, _ = snap
+        environ = os.environ
+        if all(environ.get(n) == v for n, v in zip(names, values)):
+            return settings
+    return reload_settings()
+
+
+def reload_settings() -> Settings:
+    """Rebuild the Settings snapshot from the environment unconditionally."""
+    global _snapshot, _settings_version
+    with _snapshot_lock:
+        reader = _EnvReader()
+        settings = _build_settings(reader)
+        _settings_version += 1
+        _snapshot = (tuple(reader.seen), tuple(reader.seen.values()), settings, _settings_version)
+    return settings
+
+
+def settings_version() -> int:
+    """Monotonic counter bumped every time the Settings snapshot is rebuilt."""
+    return _settings_version
+
+
+def _build_settings(getenv: Any = os.getenv) -> Settings:
+    """Build Settings from the environment (see get_settings for caching)."""
 
     base = _base_settings()
-    auth_token = os.getenv("AUTH_TOKEN") or None
-    clerk_jwks_url = os.getenv("CLERK_JWKS_URL") or None
-    clerk_jwt_key = os.getenv("CLERK_JWT_KEY") or None
-    _raw_issuer = (os.getenv("CLERK_ISSUER") or "").strip()
+    auth_token = getenv("AUTH_TOKEN") or None
+    clerk_jwks_url = getenv("CLERK_JWKS_URL") or None
+    clerk_jwt_key = getenv("CLERK_JWT_KEY") or None
+    _raw_issuer = (getenv("CLERK_ISSUER") or "").strip()
     # JWT iss is usually https://xxx.clerk.accounts.dev (no trailing slash).
     clerk_issuer = _raw_issuer.rstrip("/") or None
-    clerk_audience = (os.getenv("CLERK_AUDIENCE") or "").strip() or None
-    clerk_authorized_parties_raw = os.getenv("CLERK_AUTHORIZED_PARTIES") or ""
+    clerk_audience = (getenv("CLERK_AUDIENCE") or "").strip() or None
+    clerk_authorized_parties_raw = getenv("CLERK_AUTHORIZED_PARTIES") or ""
     clerk_authorized_parties = [
         part.strip() for part in clerk_authorized_parties_raw.split(",") if part.strip()
     ]
-    clerk_secret_key = os.getenv("CLERK_SECRET_KEY") or None
-    clerk_api_url = os.getenv("CLERK_API_URL") or base.clerk_api_url
-    github_client_id = (os.getenv("GITHUB_CLIENT_ID") or "").strip() or None
-    github_client_secret = (os.getenv("GITHUB_CLIENT_SECRET") or "").strip() or None
+    clerk_secret_key = getenv("CLERK_SECRET_KEY") or None
+    clerk_api_url = getenv("CLERK_API_URL") or base.clerk_api_url
+    github_client_id = (getenv("GITHUB_CLIENT_ID") or "").strip() or None
+    github_client_secret = (getenv("GITHUB_CLIENT_SECRET") or "").strip() or None
     # GitHub matches redirect_uri byte-for-byte; trailing slash mismatch breaks OAuth.
-    _raw_redirect = (os.getenv("GITHUB_OAUTH_REDIRECT_URI") or "").strip()
+    _raw_redirect = (getenv("GITHUB_OAUTH_REDIRECT_URI") or "").strip()
     github_oauth_redirect_uri = _raw_redirect.rstrip("/") or None
-    _gh_return_raw = os.getenv("GITHUB_OAUTH_ALLOWED_RETURN_ORIGINS", "")
+    _gh_return_raw = getenv("GITHUB_OAUTH_ALLOWED_RETURN_ORIGINS", "")
     github_oauth_allowed_return_origins = [
         x.strip() for x in _gh_return_raw.split(",") if x.strip()
     ]
-    provider_name = (os.getenv("PROVIDER") or base.provider_name).lower()
-    agent_preset = os.getenv("AGENT_PRESET") or base.agent_preset
-
-    db_path = os.getenv("DB_PATH") or os.getenv("SESSION_DB_PATH") or base.db_path
-    session_db_path = os.getenv("SESSION_DB_PATH") or db_path
-    cors_origins = os.getenv("CORS_ORIGINS") or base.cors_origins
-    max_steps = int(os.getenv("AGENT_MAX_STEPS", base.max_steps))
-    max_wall_time_seconds = int(os.getenv("AGENT_MAX_WALL_TIME_SECONDS", base.max_wall_time_seconds))
-    tools_enabled = os.getenv("AGENT_TOOLS_ENABLED", str(base.tools_enabled)).strip().lower() in ("true", "1", "yes")
-    max_tool_calls = int(os.getenv("AGENT_MAX_TOOL_CALLS", base.max_tool_calls))
-    http_timeout_seconds = int(os.getenv("AGENT_HTTP_TIMEOUT_SECONDS", base.http_timeout_seconds))
-    http_max_response_chars = int(os.getenv("AGENT_HTTP_MAX_RESPONSE_CHARS", base.http_max_response_chars))
-    max_tool_prompt_chars = int(os.getenv("AGENT_MAX_TOOL_PROMPT_CHARS", base.max_tool_prompt_chars))
-    memory_recent_k = int(os.getenv("AGENT_MEMORY_RECENT_K", base.memory_recent_k))
-    summary_batch_size = int(os.getenv("AGENT_SUMMARY_BATCH_SIZE", base.summary_batch_size))
-    summary_max_chars = int(os.getenv("AGENT_SUMMARY_MAX_CHARS", base.summary_max_chars))
-    http_allowed_raw = os.getenv("AGENT_HTTP_ALLOWED_DOMAINS", "")
+    provider_name = (getenv("PROVIDER") or base.provider_name).lower()
+    agent_preset = getenv("AGENT_PRESET") or base.agent_preset
+
+    db_path = getenv("DB_PATH") or getenv("SESSION_DB_PATH") or base.db_path
+    session_db_path = getenv("SESSION_DB_PATH") or db_path
+    cors_origins = getenv("CORS_ORIGINS") or base.cors_origins
+    max_steps = int(getenv("AGENT_MAX_STEPS", base.max_steps))
+    max_wall_time_seconds = int(getenv("AGENT_MAX_WALL_TIME_SECONDS", base.max_wall_time_seconds))
+    tools_enabled = getenv("AGENT_TOOLS_ENABLED", str(base.tools_enabled)).strip().lower() in ("true", "1", "yes")
+    max_tool_calls = int(getenv("AGENT_MAX_TOOL_CALLS", base.max_tool_calls))
+    http_timeout_seconds = int(getenv("AGENT_HTTP_TIMEOUT_SECONDS", base.http_timeout_seconds))
+    http_max_response_chars = int(getenv("AGENT_HTTP_MAX_RESPONSE_CHARS", base.http_max_response_chars))
+    max_tool_prompt_chars = int(getenv("AGENT_MAX_TOOL_PROMPT_CHARS", base.max_tool_prompt_chars))
+    memory_recent_k = int(getenv("AGENT_MEMORY_RECENT_K", base.memory_recent_k))
+    summary_batch_size = int(getenv("AGENT_SUMMARY_BATCH_SIZE", base.summary_batch_size))
+    summary_max_chars = int(getenv("AGENT_SUMMARY_MAX_CHARS", base.summary_max_chars))
+    provider_http2 = getenv("PROVIDER_HTTP2", str(base.provider_http2)).strip().lower() in ("true", "1", "yes")
+    provider_max_connections = int(getenv("PROVIDER_MAX_CONNECTIONS", base.provider_max_connections))
+    provider_max_keepalive_connections = int(
+        getenv("PROVIDER_MAX_KEEPALIVE_CONNECTIONS", base.provider_max_keepalive_connections)
+    )
+    provider_keepalive_expiry_seconds = float(
+        getenv("PROVIDER_KEEPALIVE_EXPIRY_SECONDS", base.provider_keepalive_expiry_seconds)
+    )
+    http_tool_http2 = getenv("HTTP_TOOL_HTTP2", str(base.http_tool_http2)).strip().lower() in ("true", "1", "yes")
+    http_tool_max_connections = int(getenv("HTTP_TOOL_MAX_CONNECTIONS", base.http_tool_max_connections))
+    http_tool_max_connections_per_domain = int(
+        getenv("HTTP_TOOL_MAX_CONNECTIONS_PER_DOMAIN", base.http_tool_max_connections_per_domain)
+    )
+    tool_cache_enabled = getenv("TOOL_CACHE_ENABLED", str(base.tool_cache_enabled)).strip().lower() in ("true", "1", "yes")
+    tool_cache_max_bytes = int(getenv("TOOL_CACHE_MAX_BYTES", base.tool_cache_max_bytes))
+    tool_cache_dir = getenv("TOOL_CACHE_DIR", base.tool_cache_dir).strip()
+    tool_cache_disk_max_bytes = int(getenv("TOOL_CACHE_DISK_MAX_BYTES", base.tool_cache_disk_max_bytes))
+    github_max_connections = int(getenv("GITHUB_MAX_CONNECTIONS", base.github_max_connections))
+    github_cache_dir = getenv("GITHUB_CACHE_DIR", base.github_cache_dir).strip()
+    github_cache_max_bytes = int(getenv("GITHUB_CACHE_MAX_BYTES", base.github_cache_max_bytes))
+    response_cache_max_entries = int(getenv("RESPONSE_CACHE_MAX_ENTRIES", base.response_cache_max_entries))
+    response_cache_default_ttl_seconds = int(
+        getenv("RESPONSE_CACHE_DEFAULT_TTL_SECONDS", base.response_cache_default_ttl_seconds)
+    )
+    response_cache_persist = getenv("RESPONSE_CACHE_PERSIST", str(base.response_cache_persist)).strip().lower() in ("true", "1", "yes")
+    invoke_coalescing = getenv("INVOKE_COALESCING", str(base.invoke_coalescing)).strip().lower() in ("true", "1", "yes")
+    batch_max_items = int(getenv("BATCH_MAX_ITEMS", base.batch_max_items))
+    batch_concurrency = int(getenv("BATCH_CONCURRENCY", base.batch_concurrency))
+    db_pool_min_size = int(getenv("DB_POOL_MIN_SIZE", base.db_pool_min_size))
+    db_pool_max_size = int(getenv("DB_POOL_MAX_SIZE", base.db_pool_max_size))
+    db_pool_timeout_seconds = float(getenv("DB_POOL_TIMEOUT_SECONDS", base.db_pool_timeout_seconds))
+    db_executor_max_workers = int(getenv("DB_EXECUTOR_MAX_WORKERS", base.db_executor_max_workers))
+    run_events_poll_seconds = float(getenv("RUN_EVENTS_POLL_SECONDS", base.run_events_poll_seconds))
+    retention_days = int(getenv("RETENTION_DAYS", base.retention_days))
+    retention_by_agent_raw = getenv("RETENTION_DAYS_BY_AGENT", "")
+    retention_days_by_agent = dict(base.retention_days_by_agent)
+    for item in retention_by_agent_raw.split(","):
+        agent_id, sep, days = item.partition("=")
+        if sep and agent_id.strip() and days.strip():
+            retention_days_by_agent[agent_id.strip()] = int(days.strip())
+    retention_archive_dir = getenv("RETENTION_ARCHIVE_DIR", base.retention_archive_dir)
+    registry_cache_check_seconds = float(getenv("REGISTRY_CACHE_CHECK_SECONDS", base.registry_cache_check_seconds))
+    run_workers = int(getenv("RUN_WORKERS", base.run_workers))
+    run_max_per_agent = int(getenv("RUN_MAX_PER_AGENT", base.run_max_per_agent))
+    run_max_per_tenant = int(getenv("RUN_MAX_PER_TENANT", base.run_max_per_tenant))
+    run_queue_poll_seconds = float(getenv("RUN_QUEUE_POLL_SECONDS", base.run_queue_poll_seconds))
+    run_stale_seconds = float(getenv("RUN_STALE_SECONDS", base.run_stale_seconds))
+    run_max_attempts = int(getenv("RUN_MAX_ATTEMPTS", base.run_max_attempts))
+    http_allowed_raw = getenv("AGENT_HTTP_ALLOWED_DOMAINS", "")
     http_allowed_domains_default = [d.strip() for d in http_allowed_raw.split(",") if d.strip()] if http_allowed_raw else base.http_allowed_domains_default
 
     return Settings(
@@ -194,4 +384,39 @@ def get_settings() -> Settings:
         memory_recent_k=memory_recent_k,
         summary_batch_size=summary_batch_size,
         summary_max_chars=summary_max_chars,
+        provider_http2=provider_http2,
+        provider_max_connections=provider_max_connections,
+        provider_max_keepalive_connections=provider_max_keepalive_connections,
+        provider_keepalive_expiry_seconds=provider_keepalive_expiry_seconds,
+        http_tool_http2=http_tool_http2,
+        http_tool_max_connections=http_tool_max_connections,
+        http_tool_max_connections_per_domain=http_tool_max_connections_per_domain,
+        tool_cache_enabled=tool_cache_enabled,
+        tool_cache_max_bytes=tool_cache_max_bytes,
+        tool_cache_dir=tool_cache_dir,
+        tool_cache_disk_max_bytes=tool_cache_disk_max_bytes,
+        github_max_connections=github_max_connections,
+        github_cache_dir=github_cache_dir,
+        github_cache_max_bytes=github_cache_max_bytes,
+        response_cache_max_entries=response_cache_max_entries,
+        response_cache_default_ttl_seconds=response_cache_default_ttl_seconds,
+        response_cache_persist=response_cache_persist,
+        invoke_coalescing=invoke_coalescing,
+        batch_max_items=batch_max_items,
+        batch_concurrency=batch_concurrency,
+        db_pool_min_size=db_pool_min_size,
+        db_pool_max_size=db_pool_max_size,
+        db_pool_timeout_seconds=db_pool_timeout_seconds,
+        db_executor_max_workers=db_executor_max_workers,
+        run_events_poll_seconds=run_events_poll_seconds,
+        retention_days=retention_days,
+        retention_days_by_agent=retention_days_by_agent,
+        retention_archive_dir=retention_archive_dir,
+        registry_cache_check_seconds=registry_cache_check_seconds,
+        run_workers=run_workers,
+        run_max_per_agent=run_max_per_agent,
+        run_max_per_tenant=run_max_per_tenant,
+        run_queue_poll_seconds=run_queue_poll_seconds,
+        run_stale_seconds=run_stale_seconds,
+        run_max_attempts=run_max_attempts,
     )
@@ -7,7 +7,7 @@ import jwt
 from jwt import PyJWKClient
 
 from .config import get_settings
-from .providers import BaseProvider, build_provider
+from .providers import BaseProvider, get_shared_provider
 
 
 def get_provider() -> BaseProvider:
@@ -16,9 +16,10 @@ def get_provider() -> BaseProvider:
 
     Tests rely on this function name to override the provider with a
     RecordingProvider/RaisingProvider via FastAPI's dependency_overrides.
+    The instance is shared across requests (see get_shared_provider).
     """
 
-    return build_provider()
+    return get_shared_provider()
 
 
 def _get_bearer_token(request: Request) -> Optional[str]:
@@ -187,6 +188,23 @@ def require_clerk_user_id(request: Request) -> str:
     return str(user_id)
 
 
+def get_tenant_id(request: Request) -> str:
+    """
+    Tenant a background run is accounted to (RUN_MAX_PER_TENANT): the Clerk user id
+    when the request carries a valid session token, otherwise the client address.
+    """
+    settings = get_settings()
+    token = _get_bearer_token(request) or _get_session_cookie(request)
+    if token and (settings.clerk_jwt_key or settings.clerk_jwks_url):
+        try:
+            user_id = _verify_clerk_token(token).get("sub")
+        except Exception:
+            user_id = None
+        if user_id:
+            return f"user:{user_id}"
+    return f"client:{request.client.host if request.client else 'unknown'}"
+
+
 def enforce_auth(request: Request) -> None:
     """
     Auth guard used by mutating endpoints.
@@ -1,25 +1,36 @@
 from __future__ import annotations
 
+import asyncio
+import copy
 import json
 import logging
 import hashlib
 import time
 import uuid
-from typing import Any, Dict, List, Tuple
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Tuple
 from urllib.parse import urlparse
 
 from fastapi import Request
-from jsonschema import Draft7Validator
 
 from .config import get_settings
 from .models import InvokeContext, MemoryPolicy
-from .preset_loader import Preset, PresetLoadError, get_active_preset
-from .providers import BaseProvider, ProviderResult
+from .preset_loader import Preset, PresetLoadError, get_active_preset, input_validator_for, output_validator_for
+from .prompt_builder import build_primitive_prompt
+from . import response_cache
+from .providers import BaseProvider, ProviderResult, acomplete_json, astream_json
 from .storage import session_store
+from .storage.executor import run_db
 from .utils.redaction import cap_text, redact_secrets
+from .utils.json_stream import IncrementalJSONObjectParser
+from .utils.single_flight import SingleFlight
+from .utils.validators import validator_errors
 
 logger = logging.getLogger("agent-gateway")
 
+# In-flight /invoke provider calls, keyed like the response cache (see process_invoke_for_preset).
+_invoke_flights = SingleFlight()
+
 
 class ErrorEnvelope(Exception):
     """
@@ -48,6 +59,8 @@ def build_success_envelope(
     latency_ms: float,
     session_id: str | None = None,
     memory_used_count: int | None = None,
+    cache_status: str | None = None,
+    coalesced: bool = False,
 ) -> Dict[str, Any]:
     meta: Dict[str, Any] = {
         "request_id": request_id,
@@ -59,6 +72,10 @@ def build_success_envelope(
         meta["session_id"] = session_id
     if memory_used_count is not None:
         meta["memory_used_count"] = memory_used_count
+    if cache_status is not None:
+        meta["cache_status"] = cache_status
+    if coalesced:
+        meta["coalesced"] = True
     return {"output": output, "meta": meta}
 
 
@@ -87,17 +104,23 @@ def build_error_envelope(
     return status_code, body
 
 
-def _validate_with_schema(instance: Any, schema: Dict[str, Any]) -> List[Dict[str, Any]]:
-    validator = Draft7Validator(schema)
-    errors: List[Dict[str, Any]] = []
-    for err in validator.iter_errors(instance):
-        errors.append(
-            {
-                "path": list(err.path),
-                "message": err.message,
-            }
-        )
-    return errors
+def _coerce_provider_result(result: Any) -> ProviderResult:
+    if isinstance(result, ProviderResult):
+        return result
+
+    # Allow providers to return raw JSON dicts for convenience.
+    if isinstance(result, dict):
+        return ProviderResult(parsed_json=result, raw_text=json.dumps(result))
+
+    raise RuntimeError("Provider returned unsupported result type")
+
+
+def _call_provider_callable(provider: Any, prompt: str, schema: Dict[str, Any]) -> ProviderResult:
+    # type: ignore[call-arg]
+    raw = provider(prompt=prompt, schema=schema)  # type: ignore[misc]
+    if isinstance(raw, dict):
+        return ProviderResult(parsed_json=raw, raw_text=json.dumps(raw))
+    return ProviderResult(parsed_json={}, raw_text=json.dumps(raw))
 
 
 def _call_provider(provider: BaseProvider, prompt: str, schema: Dict[str, Any]) -> ProviderResult:
@@ -109,21 +132,59 @@ def _call_provider(provider: BaseProvider, prompt: str, schema: Dict[str, Any])
     """
     # If the override is a simple callable without `complete_json`, call it directly.
     if not hasattr(provider, "complete_json") or not callable(getattr(provider, "complete_json", None)):
-        # type: ignore[call-arg]
-        raw = provider(prompt=prompt, schema=schema)  # type: ignore[misc]
-        if isinstance(raw, dict):
-            return ProviderResult(parsed_json=raw, raw_text=json.dumps(raw))
-        return ProviderResult(parsed_json={}, raw_text=json.dumps(raw))
+        return _call_provider_callable(provider, prompt, schema)
 
-    result = provider.complete_json(prompt, schema=schema)
-    if isinstance(result, ProviderResult):
-        return result
+    return _coerce_provider_result(provider.complete_json(prompt, schema=schema))
 
-    # Allow providers to return raw JSON dicts for convenience.
-    if isinstance(result, dict):
-        return ProviderResult(parsed_json=result, raw_text=json.dumps(result))
 
-    raise RuntimeError("Provider returned unsupported result type")
+async def _acall_provider(provider: BaseProvider, prompt: str, schema: Dict[str, Any]) -> ProviderResult:
+    """
+    Async counterpart of _call_provider used by the invoke routes.
+
+    Native async providers are awaited directly; sync-only providers run in a
+    worker thread (see app.providers.acomplete_json) so the event loop is never
+    blocked on an LLM round trip.
+    """
+    if not callable(getattr(provider, "complete_json", None)) and not callable(
+        getattr(provider, "acomplete_json", None)
+    ):
+        return _call_provider_callable(provider, prompt, schema)
+
+    return _coerce_provider_result(await acomplete_json(provider, prompt, schema=schema))
+
+
+def memory_window(policy: MemoryPolicy) -> Dict[str, Any]:
+    """
+    session_store.get_session_memory() bounds that load every stored event
+    _merge_and_truncate_memory(policy) can keep, and nothing older.
+    """
+    recent_k = max(0, int(getattr(get_settings(), "memory_recent_k", 8)))
+    max_msgs = max(0, policy.max_messages)
+    include_tools = bool(getattr(policy, "memory_include_tool_results", False))
+    tool_mode = getattr(policy, "memory_tool_result_mode", "summary") or "summary"
+    if include_tools and tool_mode == "exclude":
+        include_tools = False
+    return {
+        "limit": max(max_msgs, recent_k) if max_msgs > 0 else None,
+        # Summarized tool events change content length, so the raw char bound only applies otherwise.
+        "max_chars": policy.max_chars if not include_tools or tool_mode == "full" else 0,
+        "keep_recent": recent_k,
+        "exclude_event_types": () if include_tools else ("tool_call", "tool_result"),
+    }
+
+
+def _stored_memory_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "role": e.get("role", "user"),
+            "content": e.get("content", ""),
+            "event_type": e.get("event_type"),
+            "run_id": e.get("run_id"),
+            "step_index": e.get("step_index"),
+            "tool_name": e.get("tool_name"),
+        }
+        for e in events
+    ]
 
 
 def _merge_and_truncate_memory(
@@ -234,18 +295,6 @@ def _merge_and_truncate_memory(
     return combined
 
 
-def _memory_segment_text(events: List[Dict[str, Any]]) -> str:
-    """Format events as a memory segment for the prompt."""
-    if not events:
-        return ""
-    lines = ["# Memory (recent context):"]
-    for e in events:
-        role = e.get("role", "user")
-        content = (e.get("content") or "").strip()
-        lines.append(f"{role}: {content}")
-    return "\n".join(lines) + "\n\n"
-
-
 def _fallback_invoke_idempotency_base(
     *,
     session_id: str,
@@ -323,6 +372,9 @@ def write_back_session_events(
         logger.warning("append_events failed for session_id=%s: %s", session_id, exc)
 
 
+_build_primitive_prompt = build_primitive_prompt
+
+
 def run_primitive(
     preset: Preset,
     provider: BaseProvider,
@@ -331,32 +383,24 @@ def run_primitive(
     knowledge: List[Dict[str, Any]] | None = None,
     running_summary: str | None = None,
 ) -> ProviderResult:
-    """
-    Dispatch to the primitive-specific behavior.
-
-    Builds prompt: preset instructions, memory segment (memory_events, already merged/truncated),
-    knowledge (if any), input JSON, then instruction to respond with JSON only.
-    """
-    pretty_input = json.dumps(input_payload, indent=2, sort_keys=True)
-    parts = [preset.prompt.strip(), "", f"# Primitive: {preset.primitive}"]
-
-    if running_summary:
-        rs = (running_summary or "").strip()
-        if rs:
-            parts.append("# Memory (summary):\n" + rs + "\n\n")
-
-    if memory_events:
-        seg = _memory_segment_text(memory_events)
-        parts.append(seg)
-    if knowledge:
-        k_lines = ["# Knowledge:", json.dumps(knowledge, indent=2)]
-        parts.append("\n".join(k_lines) + "\n\n")
-    parts.append(f"# Input JSON:\n{pretty_input}\n\n")
-    parts.append("Respond ONLY with a single JSON object that matches the provided output_schema.")
-    prompt = "\n".join(parts)
+    """Dispatch to the primitive-specific behavior (see _build_primitive_prompt)."""
+    prompt = _build_primitive_prompt(preset, input_payload, memory_events, knowledge, running_summary)
     return _call_provider(provider, prompt=prompt, schema=preset.output_schema)
 
 
+async def arun_primitive(
+    preset: Preset,
+    provider: BaseProvider,
+    input_payload: Any,
+    memory_events: List[Dict[str, Any]] | None = None,
+    knowledge: List[Dict[str, Any]] | None = None,
+    running_summary: str | None = None,
+) -> ProviderResult:
+    """Async run_primitive: awaits the provider call."""
+    prompt = _build_primitive_prompt(preset, input_payload, memory_events, knowledge, running_summary)
+    return await _acall_provider(provider, prompt=prompt, schema=preset.output_schema)
+
+
 def _postprocess_output_for_contract(preset: Preset, input_payload: Any, output: Dict[str, Any]) -> Dict[str, Any]:
     """
     Apply small, contract-driven post-processing steps.
@@ -414,6 +458,235 @@ async def process_invoke_request(
     return await process_invoke_for_preset(request=request, provider=provider, preset=preset)
 
 
+async def process_stream_request(
+    *,
+    request: Request,
+    provider: BaseProvider,
+) -> Dict[str, Any]:
+    """Streaming counterpart of process_invoke_request (active preset)."""
+    try:
+        preset = get_active_preset()
+    except PresetLoadError as exc:
+        status_code, body = build_error_envelope(
+            request_id=new_request_id(),
+            preset=None,
+            status_code=500,
+            code="INTERNAL_ERROR",
+            message=str(exc),
+            details=None,
+        )
+        return {"status_code": status_code, "body": body}
+
+    return await process_stream_for_preset(request=request, provider=provider, preset=preset)
+
+
+async def _read_invoke_payload(request: Request) -> Dict[str, Any]:
+    """Parse the JSON request body, handling malformed JSON explicitly."""
+    try:
+        body_bytes = await request.body()
+    except Exception:
+        # If we cannot even read the body, treat as malformed.
+        raise ErrorEnvelope(
+            status_code=400,
+            code="MALFORMED_REQUEST",
+            message="Failed to read request body",
+        )
+
+    raw_text = body_bytes.decode("utf-8") if isinstance(body_bytes, (bytes, bytearray)) else str(body_bytes)
+
+    try:
+        return json.loads(raw_text)
+    except json.JSONDecodeError as exc:
+        raise ErrorEnvelope(
+            status_code=400,
+            code="MALFORMED_REQUEST",
+            message="Request body must be valid JSON",
+            details={"message": str(exc)},
+        ) from exc
+
+
+@dataclass
+class _PreparedInvoke:
+    """Validated input plus the fully built prompt for one invocation."""
+
+    input_payload: Any
+    prompt: str
+    session_id: str | None
+    memory_used_count: int
+
+
+async def _prepare_invoke(preset: Preset, payload: Any) -> _PreparedInvoke:
+    """Resolve context/memory, validate input against preset.input_schema and build the prompt."""
+    if not isinstance(payload, dict) or "input" not in payload:
+        raise ErrorEnvelope(
+            status_code=422,
+            code="INPUT_VALIDATION_ERROR",
+            message="Request body must have top-level 'input' object",
+            details=[{"path": [], "message": "Missing 'input' field"}],
+        )
+
+    input_payload = payload["input"]
+
+    # Optional context: accept context={} without error.
+    context: InvokeContext | None = None
+    raw_context = payload.get("context")
+    if raw_context is not None:
+        if isinstance(raw_context, dict):
+            context = InvokeContext(
+                session_id=raw_context.get("session_id"),
+                memory=raw_context.get("memory") if isinstance(raw_context.get("memory"), list) else None,
+                knowledge=raw_context.get("knowledge") if isinstance(raw_context.get("knowledge"), list) else None,
+            )
+        # else leave context None (invalid shape ignored for backward compat)
+
+    # Resolve stored events and merge with context.memory; apply policy.
+    merged_events: List[Dict[str, Any]] = []
+    memory_used_count = 0
+    session_id_used: str | None = None
+    running_summary: str | None = None
+    if context and (context.session_id or context.memory):
+        stored: List[Dict[str, Any]] = []
+        policy = getattr(preset, "memory_policy", None) or MemoryPolicy(mode="last_n", max_messages=10, max_chars=8000)
+        if context.session_id:
+            session_id_used = context.session_id
+            session = await session_store.aget_session_memory(context.session_id, **memory_window(policy))
+            if session is not None:
+                stored = _stored_memory_events(session["events"])
+                running_summary = str(session.get("running_summary") or "") or None
+            else:
+                logger.warning(
+                    "context.session_id=%s but session not found; using stored_events=[]",
+                    context.session_id,
+                )
+        context_memory = context.memory if isinstance(context.memory, list) else []
+        merged_events = _merge_and_truncate_memory(stored, context_memory, policy)
+        memory_used_count = len(merged_events)
+    knowledge_list = context.knowledge if context and isinstance(context.knowledge, list) else None
+
+    # Validate input against preset.input_schema
+    input_errors = validator_errors(input_validator_for(preset), input_payload)
+    if input_errors:
+        raise ErrorEnvelope(
+            status_code=422,
+            code="INPUT_VALIDATION_ERROR",
+            message="Input failed validation against preset input_schema",
+            details=input_errors,
+        )
+
+    prompt = _build_primitive_prompt(
+        preset,
+        input_payload,
+        memory_events=merged_events if merged_events else None,
+        knowledge=knowledge_list,
+        running_summary=running_summary,
+    )
+    return _PreparedInvoke(
+        input_payload=input_payload,
+        prompt=prompt,
+        session_id=session_id_used,
+        memory_used_count=memory_used_count,
+    )
+
+
+async def _write_back_and_summarize(
+    *,
+    preset: Preset,
+    provider: BaseProvider,
+    prepared: _PreparedInvoke,
+    request_id: str,
+    output: Dict[str, Any],
+    raw_text: str,
+) -> None:
+    """If session_id and supports_memory: append user + assistant events. On failure log only."""
+    session_id = prepared.session_id
+    if not session_id or not getattr(preset, "supports_memory", False):
+        return
+    await run_db(
+        write_back_session_events,
+        session_id=session_id,
+        preset=preset,
+        request_id=request_id,
+        input_payload=prepared.input_payload,
+        output=output,
+        raw_text=raw_text,
+    )
+    # Optionally refresh the running summary using new events.
+    try:
+        from app.memory.summarizer import amaybe_update_running_summary
+
+        events_full = await session_store.aget_session_events(session_id)
+        await amaybe_update_running_summary(
+            provider=provider,
+            preset=preset,
+            session_id=session_id,
+            events=events_full,
+        )
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.warning("running_summary update failed for session_id=%s: %s", session_id, exc)
+
+
+def _invoke_success(
+    output: Dict[str, Any],
+    *,
+    request_id: str,
+    preset: Preset,
+    start: float,
+    prepared: _PreparedInvoke,
+    cache_status: str | None = None,
+    coalesced: bool = False,
+) -> Dict[str, Any]:
+    latency_ms = (time.monotonic() - start) * 1000.0
+    status_code = 200
+    envelope = build_success_envelope(
+        output,
+        request_id=request_id,
+        preset=preset,
+        latency_ms=latency_ms,
+        session_id=prepared.session_id,
+        memory_used_count=prepared.memory_used_count if prepared.session_id is not None else None,
+        cache_status=cache_status,
+        coalesced=coalesced,
+    )
+    _log_invoke(
+        request_id=request_id,
+        preset=preset,
+        provider_name=get_settings().provider_name,
+        status_code=status_code,
+        latency_ms=latency_ms,
+    )
+    return {"status_code": status_code, "body": envelope}
+
+
+def _invoke_failure(exc: ErrorEnvelope, *, request_id: str, preset: Preset, start: float) -> Dict[str, Any]:
+    latency_ms = (time.monotonic() - start) * 1000.0
+    status_code, body = build_error_envelope(
+        request_id=request_id,
+        preset=preset,
+        status_code=exc.status_code,
+        code=exc.code,
+        message=exc.message,
+        details=exc.details,
+    )
+    _log_invoke(
+        request_id=request_id,
+        preset=preset,
+        provider_name=get_settings().provider_name,
+        status_code=status_code,
+        latency_ms=latency_ms,
+    )
+    return {"status_code": status_code, "body": body}
+
+
+def _provider_failure(exc: Exception) -> ErrorEnvelope:
+    # Provider-level unexpected failures surface as INTERNAL_ERROR.
+    return ErrorEnvelope(
+        status_code=500,
+        code="INTERNAL_ERROR",
+        message="Provider failure",
+        details={"message": str(exc)},
+    )
+
+
 async def process_invoke_for_preset(
     *,
     request: Request,
@@ -425,209 +698,245 @@ async def process_invoke_for_preset(
     """
     request_id = new_request_id()
     start = time.monotonic()
-    settings = get_settings()
-
     try:
         # 1) Parse JSON body, handling malformed JSON explicitly.
-        try:
-            body_bytes = await request.body()
-        except Exception:
-            # If we cannot even read the body, treat as malformed.
-            raise ErrorEnvelope(
-                status_code=400,
-                code="MALFORMED_REQUEST",
-                message="Failed to read request body",
-            )
-
-        raw_text = body_bytes.decode("utf-8") if isinstance(body_bytes, (bytes, bytearray)) else str(body_bytes)
+        payload = await _read_invoke_payload(request)
+    except ErrorEnvelope as exc:
+        return _invoke_failure(exc, request_id=request_id, preset=preset, start=start)
+    return await _invoke_payload(payload, provider=provider, preset=preset, request_id=request_id, start=start)
 
-        try:
-            payload = json.loads(raw_text)
-        except json.JSONDecodeError as exc:
-            raise ErrorEnvelope(
-                status_code=400,
-                code="MALFORMED_REQUEST",
-                message="Request body must be valid JSON",
-                details={"message": str(exc)},
-            ) from exc
-
-        if not isinstance(payload, dict) or "input" not in payload:
-            raise ErrorEnvelope(
-                status_code=422,
-                code="INPUT_VALIDATION_ERROR",
-                message="Request body must have top-level 'input' object",
-                details=[{"path": [], "message": "Missing 'input' field"}],
-            )
 
-        input_payload = payload["input"]
-
-        # Optional context: accept context={} without error.
-        context: InvokeContext | None = None
-        raw_context = payload.get("context")
-        if raw_context is not None:
-            if isinstance(raw_context, dict):
-                context = InvokeContext(
-                    session_id=raw_context.get("session_id"),
-                    memory=raw_context.get("memory") if isinstance(raw_context.get("memory"), list) else None,
-                    knowledge=raw_context.get("knowledge") if isinstance(raw_context.get("knowledge"), list) else None,
-                )
-            # else leave context None (invalid shape ignored for backward compat)
-
-        # Resolve stored events and merge with context.memory; apply policy.
-        merged_events: List[Dict[str, Any]] = []
-        memory_used_count = 0
-        session_id_used: str | None = None
-        running_summary: str | None = None
-        if context and (context.session_id or context.memory):
-            stored: List[Dict[str, Any]] = []
-            if context.session_id:
-                session_id_used = context.session_id
-                session = session_store.get_session(context.session_id)
-                if session and session.get("events"):
-                    stored = [
-                        {
-                            "role": e.get("role", "user"),
-                            "content": e.get("content", ""),
-                            "event_type": e.get("event_type"),
-                            "run_id": e.get("run_id"),
-                            "step_index": e.get("step_index"),
-                            "tool_name": e.get("tool_name"),
-                        }
-                        for e in session["events"]
-                    ]
-                    running_summary = str(session.get("running_summary") or "") or None
-                elif session is None:
-                    logger.warning(
-                        "context.session_id=%s but session not found; using stored_events=[]",
-                        context.session_id,
-                    )
-            context_memory = context.memory if isinstance(context.memory, list) else []
-            policy = getattr(preset, "memory_policy", None) or MemoryPolicy(mode="last_n", max_messages=10, max_chars=8000)
-            merged_events = _merge_and_truncate_memory(stored, context_memory, policy)
-            memory_used_count = len(merged_events)
-        knowledge_list = context.knowledge if context and isinstance(context.knowledge, list) else None
-
-        # 3) Validate input against preset.input_schema
-        input_errors = _validate_with_schema(input_payload, preset.input_schema)
-        if input_errors:
-            raise ErrorEnvelope(
-                status_code=422,
-                code="INPUT_VALIDATION_ERROR",
-                message="Input failed validation against preset input_schema",
-                details=input_errors,
-            )
+async def process_invoke_payload(
+    payload: Any,
+    *,
+    provider: BaseProvider,
+    preset: Preset,
+) -> Dict[str, Any]:
+    """Same as process_invoke_for_preset for an already-parsed body ({"input": ..., "context": ...})."""
+    return await _invoke_payload(
+        payload, provider=provider, preset=preset, request_id=new_request_id(), start=time.monotonic()
+    )
 
-        # 4) Engine/Router: run primitive via provider.
-        try:
-            result = run_primitive(
-                preset,
-                provider,
-                input_payload,
-                memory_events=merged_events if merged_events else None,
-                knowledge=knowledge_list,
-                running_summary=running_summary,
-            )
-        except Exception as exc:
-            # Provider-level unexpected failures surface as INTERNAL_ERROR.
-            raise ErrorEnvelope(
-                status_code=500,
-                code="INTERNAL_ERROR",
-                message="Provider failure",
-                details={"message": str(exc)},
-            ) from exc
-
-        # 5) Output validation & repair.
-        output = _attempt_output_with_repair(preset, provider, input_payload, result)
-
-        # 6) If session_id and supports_memory: append user + assistant events. On failure log only, still 200.
-        if session_id_used and getattr(preset, "supports_memory", False):
-            write_back_session_events(
-                session_id=session_id_used,
-                preset=preset,
-                request_id=request_id,
-                input_payload=input_payload,
-                output=output,
-                raw_text=result.raw_text,
-            )
-            # Optionally refresh the running summary using new events.
-            try:
-                from app.memory.summarizer import maybe_update_running_summary
 
-                events_full = session_store.get_session_events(session_id_used)
-                maybe_update_running_summary(
-                    provider=provider,
-                    preset=preset,
-                    session_id=session_id_used,
-                    events=events_full,
-                )
-            except Exception as exc:  # pragma: no cover - defensive
-                logger.warning("running_summary update failed for session_id=%s: %s", session_id_used, exc)
+async def _invoke_payload(
+    payload: Any,
+    *,
+    provider: BaseProvider,
+    preset: Preset,
+    request_id: str,
+    start: float,
+) -> Dict[str, Any]:
+    settings = get_settings()
 
-        latency_ms = (time.monotonic() - start) * 1000.0
-        status_code = 200
-        envelope = build_success_envelope(
-            output,
-            request_id=request_id,
+    try:
+        # 2-3) Resolve context/memory, validate input, build prompt.
+        prepared = await _prepare_invoke(preset, payload)
+        input_payload = prepared.input_payload
+        prompt = prepared.prompt
+
+        # 4) Engine/Router: run primitive via provider (or serve from the response cache).
+        cache_ttl = response_cache.ttl_for(preset)
+        cache_key = response_cache.make_key(provider, preset, prompt, preset.output_schema) if cache_ttl else None
+        cached = await response_cache.alookup(cache_key) if cache_key else None
+        cache_status: str | None = None
+        coalesced = False
+
+        async def _generate() -> Tuple[ProviderResult, Dict[str, Any]]:
+            try:
+                result = await _acall_provider(provider, prompt=prompt, schema=preset.output_schema)
+            except Exception as exc:
+                raise _provider_failure(exc) from exc
+
+            # 5) Output validation & repair.
+            output = await _aattempt_output_with_repair(preset, provider, input_payload, result)
+            if cache_key and cache_ttl:
+                await response_cache.astore(cache_key, preset, output, json.dumps(output), cache_ttl)
+            return result, output
+
+        if cached is not None:
+            # Cached entries already validated against this exact output_schema.
+            result = cached
+            output = _postprocess_output_for_contract(preset, input_payload=input_payload, output=cached.parsed_json)
+            cache_status = response_cache.CACHE_HIT
+        elif settings.invoke_coalescing and prepared.session_id is None:
+            # Identical concurrent requests (same preset version and prompt) share one provider call.
+            # Session-bound requests are excluded: each one writes back its own events.
+            flight_key = cache_key or response_cache.make_key(provider, preset, prompt, preset.output_schema)
+            (result, output), coalesced = await _invoke_flights.do(flight_key, _generate)
+            if coalesced:
+                output = copy.deepcopy(output)
+        else:
+            result, output = await _generate()
+        if cached is None and cache_key:
+            cache_status = response_cache.CACHE_MISS
+
+        # 6) Session write-back (best-effort; failures are logged, still 200).
+        await _write_back_and_summarize(
             preset=preset,
-            latency_ms=latency_ms,
-            session_id=session_id_used,
-            memory_used_count=memory_used_count if session_id_used is not None else None,
+            provider=provider,
+            prepared=prepared,
+            request_id=request_id,
+            output=output,
+            raw_text=result.raw_text,
         )
-
-        _log_invoke(
+        return _invoke_success(
+            output,
             request_id=request_id,
             preset=preset,
-            provider_name=settings.provider_name,
-            status_code=status_code,
-            latency_ms=latency_ms,
+            start=start,
+            prepared=prepared,
+            cache_status=cache_status,
+            coalesced=coalesced,
         )
-        return {"status_code": status_code, "body": envelope}
 
     except ErrorEnvelope as exc:
-        latency_ms = (time.monotonic() - start) * 1000.0
-        status_code, body = build_error_envelope(
-            request_id=request_id,
-            preset=preset,
-            status_code=exc.status_code,
-            code=exc.code,
-            message=exc.message,
-            details=exc.details,
-        )
-        _log_invoke(
-            request_id=request_id,
-            preset=preset,
-            provider_name=get_settings().provider_name,
-            status_code=status_code,
-            latency_ms=latency_ms,
-        )
-        return {"status_code": status_code, "body": body}
+        return _invoke_failure(exc, request_id=request_id, preset=preset, start=start)
 
 
-def _attempt_output_with_repair(
+async def process_invoke_batch(
+    items: List[Any],
+    *,
+    provider: BaseProvider,
     preset: Preset,
+    concurrency: int,
+) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Run process_invoke_payload for each item with at most `concurrency` in flight.
+
+    Yields (index, {"status_code", "body"}) as items finish (completion order);
+    every item gets its own envelope and request_id, including repair and errors.
+    """
+    queue: "asyncio.Queue[Tuple[int, Dict[str, Any]]]" = asyncio.Queue()
+    indexes = iter(range(len(items)))
+
+    async def _worker() -> None:
+        for index in indexes:
+            try:
+                result = await process_invoke_payload(items[index], provider=provider, preset=preset)
+            except Exception as exc:  # pragma: no cover - defensive; pipeline returns envelopes
+                status_code, body = build_error_envelope(
+                    request_id=new_request_id(),
+                    preset=preset,
+                    status_code=500,
+                    code="INTERNAL_ERROR",
+                    message="Batch item failed",
+                    details={"message": str(exc)},
+                )
+                result = {"status_code": status_code, "body": body}
+            await queue.put((index, result))
+
+    workers = [asyncio.create_task(_worker()) for _ in range(max(1, min(concurrency, len(items))))]
+    try:
+        for _ in range(len(items)):
+            yield await queue.get()
+    finally:
+        for worker in workers:
+            worker.cancel()
+
+
+def _sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _parse_streamed_json(raw_text: str) -> Dict[str, Any]:
+    """Parse the accumulated stream like a non-streamed completion ({} when not a JSON object)."""
+    text = raw_text.strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        if text.startswith("json"):
+            text = text[4:]
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+async def _astream_provider(provider: BaseProvider, prompt: str, schema: Dict[str, Any]) -> AsyncIterator[str]:
+    """Stream raw completion text; plain-callable test doubles yield their whole result once."""
+    if not callable(getattr(provider, "complete_json", None)) and not callable(
+        getattr(provider, "acomplete_json", None)
+    ):
+        yield _call_provider_callable(provider, prompt, schema).raw_text
+        return
+    async for chunk in astream_json(provider, prompt, schema=schema):
+        yield chunk
+
+
+async def process_stream_for_preset(
+    *,
+    request: Request,
     provider: BaseProvider,
-    input_payload: Any,
-    initial_result: ProviderResult,
+    preset: Preset,
 ) -> Dict[str, Any]:
-    """Validate provider output, performing at most one repair attempt."""
-    # First attempt.
-    errors = _validate_with_schema(initial_result.parsed_json, preset.output_schema)
-    if not errors:
-        return _postprocess_output_for_contract(preset, input_payload=input_payload, output=initial_result.parsed_json)
+    """
+    Streaming invocation pipeline (SSE).
+
+    Request parsing and input validation happen up front so those failures keep
+    their HTTP status: the result is {"status_code", "body"} in that case, or
+    {"stream": <async iterator of SSE frames>} otherwise.
+
+    Events: `start` (request_id/agent/version), one `field` per top-level
+    output member as soon as its value is complete, then `final` with the
+    standard success envelope (after output_schema validation and at most one
+    repair) or `error` with the standard error envelope.
+    """
+    request_id = new_request_id()
+    start = time.monotonic()
+    try:
+        payload = await _read_invoke_payload(request)
+        prepared = await _prepare_invoke(preset, payload)
+    except ErrorEnvelope as exc:
+        return _invoke_failure(exc, request_id=request_id, preset=preset, start=start)
+
+    async def _events() -> AsyncIterator[str]:
+        yield _sse_event("start", {"request_id": request_id, "agent": preset.id, "version": preset.version})
+        parser = IncrementalJSONObjectParser()
+        chunks: List[str] = []
+        try:
+            try:
+                async for delta in _astream_provider(provider, prepared.prompt, preset.output_schema):
+                    chunks.append(delta)
+                    for key, value in parser.feed(delta):
+                        yield _sse_event("field", {"path": [key], "value": value})
+            except Exception as exc:
+                raise _provider_failure(exc) from exc
+
+            raw_text = "".join(chunks)
+            result = ProviderResult(parsed_json=_parse_streamed_json(raw_text), raw_text=raw_text)
+            output = await _aattempt_output_with_repair(preset, provider, prepared.input_payload, result)
+            await _write_back_and_summarize(
+                preset=preset,
+                provider=provider,
+                prepared=prepared,
+                request_id=request_id,
+                output=output,
+                raw_text=raw_text,
+            )
+            final = _invoke_success(output, request_id=request_id, preset=preset, start=start, prepared=prepared)
+            yield _sse_event("final", final["body"])
+        except ErrorEnvelope as exc:
+            failure = _invoke_failure(exc, request_id=request_id, preset=preset, start=start)
+            yield _sse_event("error", failure["body"])
+
+    return {"stream": _events()}
+
 
-    # Build concise repair prompt.
+def _repair_prompt(preset: Preset, errors: List[Dict[str, Any]], raw_text: str) -> str:
+    """Build concise repair prompt."""
     error_summary = "; ".join(err["message"] for err in errors)
-    repair_prompt = (
+    return (
         "The previous JSON output did not validate against the required output_schema.\n"
         f"Validation errors: {error_summary}\n\n"
         "Previous raw output:\n"
-        f"{initial_result.raw_text}\n\n"
+        f"{raw_text}\n\n"
         "Please respond again with ONLY a valid JSON object that matches the following output_schema:\n"
         f"{json.dumps(preset.output_schema, indent=2, sort_keys=True)}"
     )
 
-    repair_result = _call_provider(provider, prompt=repair_prompt, schema=preset.output_schema)
-    repair_errors = _validate_with_schema(repair_result.parsed_json, preset.output_schema)
+
+def _finish_repair(preset: Preset, input_payload: Any, repair_result: ProviderResult) -> Dict[str, Any]:
+    repair_errors = validator_errors(output_validator_for(preset), repair_result.parsed_json)
     if not repair_errors:
         return _postprocess_output_for_contract(preset, input_payload=input_payload, output=repair_result.parsed_json)
 
@@ -640,6 +949,45 @@ def _attempt_output_with_repair(
     )
 
 
+def _attempt_output_with_repair(
+    preset: Preset,
+    provider: BaseProvider,
+    input_payload: Any,
+    initial_result: ProviderResult,
+) -> Dict[str, Any]:
+    """Validate provider output, performing at most one repair attempt."""
+    # First attempt.
+    errors = validator_errors(output_validator_for(preset), initial_result.parsed_json)
+    if not errors:
+        return _postprocess_output_for_contract(preset, input_payload=input_payload, output=initial_result.parsed_json)
+
+    repair_prompt = _repair_prompt(preset, errors, initial_result.raw_text)
+    try:
+        repair_result = _call_provider(provider, prompt=repair_prompt, schema=preset.output_schema)
+    except Exception as exc:
+        raise _provider_failure(exc) from exc
+    return _finish_repair(preset, input_payload, repair_result)
+
+
+async def _aattempt_output_with_repair(
+    preset: Preset,
+    provider: BaseProvider,
+    input_payload: Any,
+    initial_result: ProviderResult,
+) -> Dict[str, Any]:
+    """Async _attempt_output_with_repair: the repair call is awaited."""
+    errors = validator_errors(output_validator_for(preset), initial_result.parsed_json)
+    if not errors:
+        return _postprocess_output_for_contract(preset, input_payload=input_payload, output=initial_result.parsed_json)
+
+    repair_prompt = _repair_prompt(preset, errors, initial_result.raw_text)
+    try:
+        repair_result = await _acall_provider(provider, prompt=repair_prompt, schema=preset.output_schema)
+    except Exception as exc:
+        raise _provider_failure(exc) from exc
+    return _finish_repair(preset, input_payload, repair_result)
+
+
 def _log_invoke(
     *,
     request_id: str,
@@ -8,7 +8,9 @@ from __future__ import annotations
 
 from typing import Any, Dict
 
-from jsonschema import Draft7Validator, SchemaError
+from jsonschema import SchemaError
+
+from app.utils.validators import check_schema
 
 
 def score_case(
@@ -123,13 +125,11 @@ def _match_schema_valid(expected: Any, actual: Any, options: Dict[str, Any]) ->
         return {"status": "error", "score": 0.0, "message": "Schema must be a JSON object"}
 
     try:
-        Draft7Validator.check_schema(schema)
+        validator = check_schema(schema)
     except SchemaError as e:
         return {"status": "error", "score": 0.0, "message": f"Invalid schema: {e}"}
 
-    validator = Draft7Validator(schema)
-    errors = list(validator.iter_errors(actual))
-    if not errors:
+    if validator.is_valid(actual):
         return {"status": "passed", "score": 1.0, "message": "Valid against schema"}
-    first = errors[0]
+    first = next(validator.iter_errors(actual))
     return {"status": "failed", "score": 0.0, "message": first.message}
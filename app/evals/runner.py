@@ -10,7 +10,7 @@ from __future__ import annotations
 from typing import Any, Dict, List, Optional
 
 from app.config import get_settings
-from app.registry_adapter import spec_to_preset
+from app.registry_cache import get_registry_preset
 from app.runtime.runner import run_runner
 from app.runtime.tools.registry import DefaultToolRegistry
 from app.storage import eval_store
@@ -54,12 +54,11 @@ def run_eval_suite(
     agent_id = suite["agent_id"]
     agent_version = agent_version_override if agent_version_override is not None else suite.get("agent_version")
 
-    spec = registry_store.get_agent(agent_id, version=agent_version)
-    if spec is None:
+    preset = get_registry_preset(agent_id, version=agent_version)
+    if preset is None:
         raise registry_store.AgentNotFound(f"Agent not found: {agent_id}")
 
-    preset = spec_to_preset(spec)
-    resolved_version = spec.get("version", "latest")
+    resolved_version = preset.version
 
     tools_enabled = get_settings().tools_enabled
     tool_registry = DefaultToolRegistry() if tools_enabled else None
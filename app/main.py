@@ -5,19 +5,25 @@ from contextlib import asynccontextmanager
 from typing import Any, Dict
 
 from fastapi import Depends, FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .rate_limit import RateRule, SimpleRateLimiter
 
 from .config import get_settings
-from .storage.db import get_db_info
+from .storage.db import close_pools, get_db_info, get_pool_stats
+from .storage.executor import shutdown_db_executor
+from .storage.migrations import ensure_schema
+from .storage.retention import ensure_partitions
+from .storage.run_events import close_run_events, get_run_event_bus
 from .dependencies import AuthError, get_provider
 from .engine import (
     build_error_envelope,
     new_request_id,
     process_invoke_request,
+    process_stream_request,
 )
 from .preset_loader import PRESETS_DIR, PresetLoadError, get_active_preset
+from .providers import aclose_provider_clients
 from .examples import get_example
 from .routers import agents as agents_router
 from .routers import catalog as catalog_router
@@ -26,10 +32,11 @@ from .routers import github as github_router
 from .routers import repo_to_agent as repo_to_agent_router
 from .routers import runs as runs_router
 from .routers import sessions as sessions_router
-from .storage import eval_store
+from .runtime.scheduler import get_run_scheduler, start_run_scheduler, stop_run_scheduler
+from .runtime.tools.github_client import close_github_client
+from .runtime.tools.http_tool import close_http_tool_clients
+from .runtime.tools.result_cache import tool_result_cache_stats
 from .storage import registry_store
-from .storage import run_store
-from .storage import session_store
 
 
 logger = logging.getLogger("agent-gateway")
@@ -44,12 +51,18 @@ async def lifespan(app: FastAPI):
         db_info.dialect,
         "DATABASE_URL set" if db_info.database_url else "DATABASE_URL not set",
     )
-    session_store.init_db()
-    registry_store.init_registry_db()
-    run_store.init_run_db()
-    eval_store.init_eval_db()
+    ensure_schema()
+    ensure_partitions()
     registry_store.seed_from_presets(PRESETS_DIR)
+    start_run_scheduler()
     yield
+    stop_run_scheduler()
+    await aclose_provider_clients()
+    close_http_tool_clients()
+    close_github_client()
+    close_run_events()
+    shutdown_db_executor()
+    close_pools()
 
 
 app = FastAPI(title="Standardized Agent Runtime", version="0.1.0", lifespan=lifespan)
@@ -76,9 +89,12 @@ rate_limiter = SimpleRateLimiter(
     rules={
         "register": RateRule(key="register", limit=30, window_seconds=60),
         "invoke": RateRule(key="invoke", limit=120, window_seconds=60),
+        # Items per minute, charged per item by POST /agents/{id}/invoke:batch (see agents router).
+        "invoke_batch": RateRule(key="invoke_batch", limit=600, window_seconds=60),
         "archive": RateRule(key="archive", limit=60, window_seconds=60),
     }
 )
+app.state.rate_limiter = rate_limiter
 
 
 @app.middleware("http")
@@ -170,6 +186,38 @@ async def health() -> JSONResponse:
     return JSONResponse(status_code=200, content=payload)
 
 
+@app.get("/metrics")
+async def metrics(request: Request) -> JSONResponse:
+    """
+    Operational stats (DB pool, run event bus, run scheduler, tool result cache).
+
+    Unlike /health this exposes infrastructure details (worker ids, pool internals),
+    so it requires the same auth as the mutating endpoints.
+    """
+    try:
+        from .dependencies import enforce_auth
+
+        enforce_auth(request)
+    except AuthError as exc:
+        status_code, body = build_error_envelope(
+            request_id=new_request_id(),
+            preset=None,
+            status_code=401,
+            code="UNAUTHORIZED",
+            message=str(exc),
+            details=None,
+        )
+        return JSONResponse(status_code=status_code, content=body)
+
+    payload = {
+        "db_pool": get_pool_stats(),
+        "run_events": get_run_event_bus().stats(),
+        "run_scheduler": get_run_scheduler().stats(),
+        "tool_cache": tool_result_cache_stats(),
+    }
+    return JSONResponse(status_code=200, content=payload)
+
+
 @app.get("/schema")
 async def schema() -> JSONResponse:
     """
@@ -251,24 +299,25 @@ async def invoke(
 
 
 @app.post("/stream")
-async def stream(request: Request) -> JSONResponse:
+async def stream(
+    request: Request,
+    provider=Depends(get_provider),
+) -> Response:
     """
-    Streaming interface (not implemented yet).
+    Streaming invocation (SSE): partial output fields as they complete, then the final envelope.
     """
-    request_id = new_request_id()
-    try:
-        preset = get_active_preset()
-    except PresetLoadError:
-        preset = None
-
     # Enforce auth for mutating endpoints if configured. Catch only AuthError.
     try:
         from .dependencies import enforce_auth
 
         enforce_auth(request)
     except AuthError as exc:
+        try:
+            preset = get_active_preset()
+        except PresetLoadError:
+            preset = None
         status_code, body = build_error_envelope(
-            request_id=request_id,
+            request_id=new_request_id(),
             preset=preset,
             status_code=401,
             code="UNAUTHORIZED",
@@ -277,15 +326,14 @@ async def stream(request: Request) -> JSONResponse:
         )
         return JSONResponse(status_code=status_code, content=body)
 
-    status_code, body = build_error_envelope(
-        request_id=request_id,
-        preset=preset,
-        status_code=501,
-        code="NOT_IMPLEMENTED",
-        message="Streaming endpoint is not implemented",
-        details=None,
-    )
-    return JSONResponse(status_code=status_code, content=body)
+    result = await process_stream_request(request=request, provider=provider)
+    if "stream" in result:
+        return StreamingResponse(
+            result["stream"],
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    return JSONResponse(status_code=result["status_code"], content=result["body"])
 
 
 def get_app() -> FastAPI:
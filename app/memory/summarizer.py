@@ -1,7 +1,8 @@
 """
 Session running_summary maintenance (Agent Runtime Part 4).
 
-maybe_update_running_summary() is called after successful invoke/run write-back.
+maybe_update_running_summary() is called after successful invoke/run write-back;
+amaybe_update_running_summary() is the awaitable variant used by async routes.
 It is conservative: best-effort only, never raises, and respects memory policy
 and max_chars. It summarizes older events while keeping recent context fresh.
 """
@@ -10,14 +11,16 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import Any, Dict, List
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
 import time
 
 from app.config import get_settings
 from app.models import MemoryPolicy
 from app.preset_loader import Preset
-from app.providers import BaseProvider, ProviderResult
+from app.providers import BaseProvider, ProviderResult, acomplete_json
 from app.storage import session_store
+from app.storage.executor import run_db
 from app.utils.redaction import cap_text, redact_secrets
 
 logger = logging.getLogger("agent-gateway")
@@ -58,22 +61,39 @@ def _summarizer_prompt(existing_summary: str, events_slice: List[Dict[str, Any]]
     return "\n".join(lines)
 
 
-def maybe_update_running_summary(
+_SUMMARY_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "required": ["summary"],
+    "properties": {"summary": {"type": "string"}},
+    "additionalProperties": True,
+}
+
+
+@dataclass
+class _SummaryPlan:
+    """What to summarize: computed before the provider call so sync and async paths share it."""
+
+    prompt: str
+    running_summary: str
+    end_index: int
+    max_chars: int
+
+
+def _plan_summary_update(
     *,
-    provider: BaseProvider,
     preset: Preset,
     session_id: str,
     events: List[Dict[str, Any]],
-) -> None:
+) -> Optional[_SummaryPlan]:
     """
-    Best-effort running summary update.
+    Decide whether a summary update is due.
 
     Triggered when:
     - new events since last summary >= summary_batch_size, OR
     - approximate total chars in memory exceeds 70% of max_chars.
     """
     if not events:
-        return
+        return None
 
     settings = get_settings()
     policy = _coerce_policy(preset)
@@ -84,13 +104,13 @@ def maybe_update_running_summary(
         summary_state = session_store.get_session_summary(session_id)
     except Exception as exc:  # pragma: no cover - defensive
         logger.warning("get_session_summary failed for session_id=%s: %s", session_id, exc)
-        return
+        return None
 
     running_summary = summary_state.get("running_summary") or ""
     summarized_count = int(summary_state.get("summary_message_count") or 0)
     total_events = len(events)
     if total_events <= summarized_count:
-        return
+        return None
 
     new_events_count = total_events - summarized_count
 
@@ -103,80 +123,114 @@ def maybe_update_running_summary(
     trigger_chars = total_chars >= char_threshold if char_threshold > 0 else False
 
     if new_events_count < cfg_batch and not trigger_chars:
-        return
+        return None
 
     # Summarize older events, excluding the most recent K (from config).
     recent_k = max(0, int(getattr(settings, "memory_recent_k", 8)))
     start_index = summarized_count
     end_index = max(start_index, total_events - recent_k)
     if end_index <= start_index:
-        return
+        return None
     slice_events = events[start_index:end_index]
     if not slice_events:
-        return
+        return None
 
-    # Build safe prompt and call provider over only previously-unsummarized events.
+    # Build safe prompt over only previously-unsummarized events.
     prompt = _summarizer_prompt(
         existing_summary=cap_text(running_summary, cfg_max_chars),
         events_slice=slice_events,
     )
+    return _SummaryPlan(
+        prompt=prompt,
+        running_summary=running_summary,
+        end_index=end_index,
+        max_chars=cfg_max_chars,
+    )
 
+
+def _apply_summary_result(plan: _SummaryPlan, session_id: str, result: Any) -> None:
+    """Compose the new running summary from the provider result and persist it."""
+    if isinstance(result, ProviderResult):
+        parsed = result.parsed_json
+    else:
+        parsed = result  # type: ignore[assignment]
+    if not isinstance(parsed, dict):
+        logger.warning("running_summary summarizer returned non-dict; skipping update")
+        return
+    new_text = str(parsed.get("summary") or "").strip()
+    if not new_text:
+        return
+    running_summary = plan.running_summary
+    cfg_max_chars = plan.max_chars
+    # Compose new running summary, prefixed with a small header for debugging.
+    combined_body = running_summary.strip()
+    if combined_body:
+        combined_body = combined_body + "\n" + new_text
+    else:
+        combined_body = new_text
+
+    # Header: when the summary was updated and how many events it covers.
+    now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    header = f"(Summary updated: {now}; covers first {plan.end_index} events)"
+    combined = header + "\n" + combined_body if combined_body else header
+
+    # Hard cap: if over limit, keep last lines until within cfg_max_chars.
+    if len(combined) > cfg_max_chars:
+        lines = combined.splitlines()
+        kept: List[str] = []
+        total = 0
+        for line in reversed(lines):
+            length = len(line) + 1  # account for newline
+            if total + length <= cfg_max_chars:
+                kept.append(line)
+                total += length
+            else:
+                break
+        if kept:
+            combined = "\n".join(reversed(kept))
+        else:
+            combined = cap_text(combined, cfg_max_chars)
     try:
-        result = provider.complete_json(
-            prompt,
-            schema={
-                "type": "object",
-                "required": ["summary"],
-                "properties": {"summary": {"type": "string"}},
-                "additionalProperties": True,
-            },
+        session_store.update_session_summary(
+            session_id=session_id,
+            new_summary=combined,
+            summarized_count=plan.end_index,
         )
-        if isinstance(result, ProviderResult):
-            parsed = result.parsed_json
-        else:
-            parsed = result  # type: ignore[assignment]
-        if not isinstance(parsed, dict):
-            logger.warning("running_summary summarizer returned non-dict; skipping update")
-            return
-        new_text = str(parsed.get("summary") or "").strip()
-        if not new_text:
-            return
-        # Compose new running summary, prefixed with a small header for debugging.
-        combined_body = running_summary.strip()
-        if combined_body:
-            combined_body = combined_body + "\n" + new_text
-        else:
-            combined_body = new_text
-
-        # Header: when the summary was updated and how many events it covers.
-        now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-        header = f"(Summary updated: {now}; covers first {end_index} events)"
-        combined = header + "\n" + combined_body if combined_body else header
-
-        # Hard cap: if over limit, keep last lines until within cfg_max_chars.
-        if len(combined) > cfg_max_chars:
-            lines = combined.splitlines()
-            kept: List[str] = []
-            total = 0
-            for line in reversed(lines):
-                length = len(line) + 1  # account for newline
-                if total + length <= cfg_max_chars:
-                    kept.append(line)
-                    total += length
-                else:
-                    break
-            if kept:
-                combined = "\n".join(reversed(kept))
-            else:
-                combined = cap_text(combined, cfg_max_chars)
-        try:
-            session_store.update_session_summary(
-                session_id=session_id,
-                new_summary=combined,
-                summarized_count=end_index,
-            )
-        except Exception as exc:  # pragma: no cover - defensive
-            logger.warning("update_session_summary failed for session_id=%s: %s", session_id, exc)
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.warning("update_session_summary failed for session_id=%s: %s", session_id, exc)
+
+
+def maybe_update_running_summary(
+    *,
+    provider: BaseProvider,
+    preset: Preset,
+    session_id: str,
+    events: List[Dict[str, Any]],
+) -> None:
+    """Best-effort running summary update (sync; used by the thread-based runner)."""
+    plan = _plan_summary_update(preset=preset, session_id=session_id, events=events)
+    if plan is None:
+        return
+    try:
+        result = provider.complete_json(plan.prompt, schema=_SUMMARY_SCHEMA)
+        _apply_summary_result(plan, session_id, result)
     except Exception as exc:  # pragma: no cover - defensive
         logger.warning("running_summary summarizer failed for session_id=%s: %s", session_id, exc)
 
+
+async def amaybe_update_running_summary(
+    *,
+    provider: BaseProvider,
+    preset: Preset,
+    session_id: str,
+    events: List[Dict[str, Any]],
+) -> None:
+    """Async variant of maybe_update_running_summary; store calls run on the DB executor."""
+    plan = await run_db(_plan_summary_update, preset=preset, session_id=session_id, events=events)
+    if plan is None:
+        return
+    try:
+        result = await acomplete_json(provider, plan.prompt, schema=_SUMMARY_SCHEMA)
+        await run_db(_apply_summary_result, plan, session_id, result)
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.warning("running_summary summarizer failed for session_id=%s: %s", session_id, exc)
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import logging
+import os
+import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 logger = logging.getLogger("agent-gateway")
 
@@ -12,6 +14,7 @@ from jsonschema import Draft7Validator, SchemaError
 
 from .config import get_settings
 from .models import MemoryPolicy
+from .utils.validators import check_schema, get_validator
 
 # Preset YAML files live in the app.presets package (app/presets/*.yaml).
 PRESETS_DIR = Path(__file__).parent / "presets"
@@ -32,6 +35,22 @@ def _coerce_memory_policy(raw: Any) -> MemoryPolicy:
     return MemoryPolicy(mode="last_n", max_messages=10, max_chars=8000)
 
 
+def _coerce_response_cache(raw: Any) -> Optional[Dict[str, Any]]:
+    """Coerce `response_cache` (bool or {enabled, ttl_seconds}) to a dict; None when absent/invalid."""
+    if raw is None:
+        return None
+    if isinstance(raw, bool):
+        return {"enabled": raw, "ttl_seconds": None}
+    if isinstance(raw, dict):
+        ttl = raw.get("ttl_seconds")
+        try:
+            ttl = int(ttl) if ttl is not None else None
+        except (TypeError, ValueError):
+            ttl = None
+        return {"enabled": bool(raw.get("enabled", True)), "ttl_seconds": ttl}
+    return None
+
+
 @dataclass
 class Preset:
     id: str
@@ -50,14 +69,54 @@ class Preset:
     # Part 5: resolved tool-specific policies and global execution limits
     tool_policies: Optional[Dict[str, Dict[str, Any]]] = None
     resolved_execution_limits: Optional[Dict[str, Any]] = None
+    # Opt-in LLM response cache: {"enabled": bool, "ttl_seconds": int | None} (see app.response_cache)
+    response_cache: Optional[Dict[str, Any]] = None
 
 
 class PresetLoadError(RuntimeError):
     """Raised when the active preset cannot be loaded or validated."""
 
 
+@dataclass(frozen=True)
+class CompiledPreset:
+    """
+    A parsed preset plus the artifacts that are expensive to rebuild per request.
+
+    Held in an in-process cache keyed by preset id and invalidated when the
+    backing YAML file changes (see get_compiled_preset).
+    """
+
+    preset: Preset
+    input_validator: Draft7Validator
+    output_validator: Draft7Validator
+    prompt_header: str
+    # (st_mtime_ns, st_size, st_ino) of the YAML file this entry was built from.
+    source_key: Tuple[int, int, int]
+
+
+_compiled_presets: Dict[str, CompiledPreset] = {}
+_compiled_presets_lock = threading.Lock()
+
+
+def render_prompt_header(preset: Preset) -> str:
+    """Static prompt prefix shared by every call for a preset: instructions + primitive marker."""
+    return f"{preset.prompt.strip()}\n\n# Primitive: {preset.primitive}"
+
+
+def _preset_path(preset_id: str) -> Path:
+    return PRESETS_DIR / f"{preset_id}.yaml"
+
+
+def _source_key(preset_path: Path) -> Tuple[int, int, int]:
+    try:
+        st = os.stat(preset_path)
+    except FileNotFoundError:
+        raise PresetLoadError(f"Preset file not found: {preset_path}") from None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
 def _read_preset_yaml(preset_id: str) -> Dict[str, Any]:
-    preset_path = PRESETS_DIR / f"{preset_id}.yaml"
+    preset_path = _preset_path(preset_id)
     if not preset_path.exists():
         raise PresetLoadError(f"Preset file not found: {preset_path}")
 
@@ -70,8 +129,8 @@ def _read_preset_yaml(preset_id: str) -> Dict[str, Any]:
     return data
 
 
-def load_preset(preset_id: str) -> Preset:
-    """Load and validate a preset by id."""
+def _parse_preset(preset_id: str) -> Preset:
+    """Read, validate and build a Preset from its YAML file (uncached)."""
     raw = _read_preset_yaml(preset_id)
 
     try:
@@ -82,8 +141,8 @@ def load_preset(preset_id: str) -> Preset:
 
     # Validate that schemas are valid Draft-07 JSON Schemas.
     try:
-        Draft7Validator.check_schema(input_schema)
-        Draft7Validator.check_schema(output_schema)
+        check_schema(input_schema)
+        check_schema(output_schema)
     except SchemaError as exc:
         raise PresetLoadError(f"Invalid JSON schema in preset '{preset_id}': {exc}") from exc
 
@@ -113,11 +172,82 @@ def load_preset(preset_id: str) -> Preset:
             memory_policy=memory_policy,
             allowed_tools=allowed_tools,
             http_allowed_domains=http_allowed_domains,
+            response_cache=_coerce_response_cache(raw.get("response_cache")),
         )
     except KeyError as exc:  # pragma: no cover - defensive
         raise PresetLoadError(f"Preset missing required field: {exc.args[0]}") from exc
 
 
+def get_compiled_preset(preset_id: str) -> CompiledPreset:
+    """
+    Return the compiled preset for preset_id, re-reading the YAML only when the file changed.
+
+    A single stat() per call decides freshness; parsing, schema checks and
+    validator construction happen once per file version.
+    """
+    preset_path = _preset_path(preset_id)
+    try:
+        key = _source_key(preset_path)
+    except PresetLoadError:
+        with _compiled_presets_lock:
+            _compiled_presets.pop(preset_id, None)
+        raise
+
+    cached = _compiled_presets.get(preset_id)
+    if cached is not None and cached.source_key == key:
+        return cached
+
+    with _compiled_presets_lock:
+        cached = _compiled_presets.get(preset_id)
+        if cached is not None and cached.source_key == key:
+            return cached
+        preset = _parse_preset(preset_id)
+        compiled = CompiledPreset(
+            preset=preset,
+            input_validator=check_schema(preset.input_schema),
+            output_validator=check_schema(preset.output_schema),
+            prompt_header=render_prompt_header(preset),
+            source_key=key,
+        )
+        _compiled_presets[preset_id] = compiled
+        return compiled
+
+
+def clear_preset_cache() -> None:
+    """Drop all compiled presets (next access re-reads YAML from disk)."""
+    with _compiled_presets_lock:
+        _compiled_presets.clear()
+
+
+def prompt_header_for(preset: Preset) -> str:
+    """Return the pre-rendered prompt header when preset is a cached file preset, else render it."""
+    cached = _compiled_presets.get(preset.id)
+    if cached is not None and cached.preset is preset:
+        return cached.prompt_header
+    return render_prompt_header(preset)
+
+
+def input_validator_for(preset: Preset) -> Draft7Validator:
+    """Return the compiled input_schema validator of a cached file preset, else the shared one."""
+    cached = _compiled_presets.get(preset.id)
+    if cached is not None and cached.preset is preset:
+        return cached.input_validator
+    return get_validator(preset.input_schema)
+
+
+def output_validator_for(preset: Preset) -> Draft7Validator:
+    """Return the compiled output_schema validator of a cached file preset, else the shared one."""
+    cached = _compiled_presets.get(preset.id)
+    if cached is not None and cached.preset is preset:
+        return cached.output_validator
+    return get_validator(preset.output_schema)
+
+
+def load_preset(preset_id: str) -> Preset:
+    """Load and validate a preset by id (served from the compiled-preset cache)."""
+    return get_compiled_preset(preset_id).preset
+
+
 def get_active_preset() -> Preset:
     """Resolve the currently active preset based on the environment."""
     settings = get_settings()
@@ -0,0 +1,155 @@
+"""
+Prompt assembly for /invoke and multi-step runs.
+
+Static segments are rendered once and reused: the preset header comes from the
+compiled preset cache (prompt_header_for), the tool description block is
+cached per allowed-tools tuple, and a run's input JSON is serialized once.
+RunPromptBuilder keeps the static prefix of a run and appends each new
+conversation turn as it happens, so step N only renders turn N instead of
+re-serializing every earlier turn.
+"""
+
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .preset_loader import Preset, prompt_header_for
+from .utils.redaction import cap_text
+
+FIRST_ACTION_INSTRUCTION = (
+    "Respond ONLY with a single JSON object. It must be exactly one of:\n"
+    '- {"type": "final", "output": <your result>}\n'
+    '- {"type": "tool_call", "tool_name": "<name>", "args": <object>}\n'
+    "No other text or markdown."
+)
+NEXT_ACTION_INSTRUCTION = "Respond with next JSON action (final or tool_call).\n\n"
+
+
+def serialize_input(input_payload: Any) -> str:
+    """Canonical pretty JSON of the input as it appears in prompts."""
+    return json.dumps(input_payload, indent=2, sort_keys=True)
+
+
+def render_memory_segment(events: List[Dict[str, Any]]) -> str:
+    """Format events as a memory segment for the prompt."""
+    if not events:
+        return ""
+    lines = ["# Memory (recent context):"]
+    for e in events:
+        role = e.get("role", "user")
+        content = (e.get("content") or "").strip()
+        lines.append(f"{role}: {content}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _summary_segment(running_summary: Optional[str]) -> Optional[str]:
+    rs = (running_summary or "").strip()
+    return "# Memory (summary):\n" + rs + "\n\n" if rs else None
+
+
+@lru_cache(maxsize=256)
+def render_tools_block(allowed_tools: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Tool description + action contract parts for an allowed-tools tuple (cached)."""
+    tool_lines: List[str] = []
+    if "http_request" in allowed_tools:
+        tool_lines.append(
+            "- http_request: args { method?, url (required), headers?, query?, json?, data? }. "
+            "method one of GET,POST,PUT,PATCH,DELETE. Do not pass Authorization or Cookie."
+        )
+    if "github_repo_read" in allowed_tools:
+        tool_lines.append(
+            "- github_repo_read: args { owner, repo (required), ref?, path?, mode (overview|tree|file|sample), max_entries?, max_file_chars? }. "
+            "Read-only repo inspection."
+        )
+    for name in allowed_tools:
+        if name not in ("http_request", "github_repo_read") and name:
+            tool_lines.append(f"- {name}: (see tool schema)")
+    tools_list = ", ".join(f'"{t}"' for t in allowed_tools)
+    return (
+        "# Available tools (use only when necessary; respect allowed domains):\n",
+        "\n".join(tool_lines) + "\n\n",
+        f"Respond with JSON: either {{\"type\": \"final\", \"output\": <result>}} or "
+        f"{{\"type\": \"tool_call\", \"tool_name\": <one of {tools_list}>, \"args\": {{...}}}}.\n"
+        "To make several independent tool calls at once (they run concurrently), respond with "
+        "{\"type\": \"tool_calls\", \"tool_calls\": [{\"tool_name\": ..., \"args\": {...}}, ...]}.\n"
+        "Return final when you have enough information.\n\n",
+    )
+
+
+def build_primitive_prompt(
+    preset: Preset,
+    input_payload: Any,
+    memory_events: List[Dict[str, Any]] | None = None,
+    knowledge: List[Dict[str, Any]] | None = None,
+    running_summary: str | None = None,
+) -> str:
+    """
+    Single-shot /invoke prompt: preset header, memory summary/segment, knowledge
+    (if any), input JSON, then instruction to respond with JSON only.
+    """
+    parts = [prompt_header_for(preset)]
+    summary = _summary_segment(running_summary)
+    if summary:
+        parts.append(summary)
+    if memory_events:
+        parts.append(render_memory_segment(memory_events))
+    if knowledge:
+        k_lines = ["# Knowledge:", json.dumps(knowledge, indent=2)]
+        parts.append("\n".join(k_lines) + "\n\n")
+    parts.append(f"# Input JSON:\n{serialize_input(input_payload)}\n\n")
+    parts.append("Respond ONLY with a single JSON object that matches the provided output_schema.")
+    return "\n".join(parts)
+
+
+class RunPromptBuilder:
+    """Incremental prompt for one run: static prefix rendered once, turns appended."""
+
+    def __init__(
+        self,
+        preset: Preset,
+        merged_events: List[Dict[str, Any]],
+        input_payload: Any,
+        *,
+        allowed_tools: Optional[Sequence[str]] = None,
+        max_tool_prompt_chars: int = 8000,
+        running_summary: Optional[str] = None,
+    ) -> None:
+        parts = [prompt_header_for(preset)]
+        summary = _summary_segment(running_summary)
+        if summary:
+            parts.append(summary)
+        if merged_events:
+            parts.append(render_memory_segment(merged_events))
+        parts.append(f"# Input JSON:\n{serialize_input(input_payload)}\n\n")
+        if allowed_tools:
+            parts.extend(render_tools_block(tuple(allowed_tools)))
+        self._prefix = "\n".join(parts)
+        self._turns: List[str] = []
+        self._max_tool_prompt_chars = max_tool_prompt_chars
+
+    @property
+    def turn_count(self) -> int:
+        return len(self._turns)
+
+    def add_turn(self, action: Dict[str, Any], tool_name: str = "", tool_result: Any = None) -> None:
+        """Render one assistant action (and its tool result) and append it."""
+        results = [(tool_name, tool_result)] if tool_result is not None else []
+        self.add_tool_calls_turn(action, results)
+
+    def add_tool_calls_turn(self, action: Dict[str, Any], results: Sequence[Tuple[str, Any]]) -> None:
+        """Render one assistant action and the (tool_name, result) of each of its calls, in order."""
+        parts = ["Assistant: " + json.dumps(action, sort_keys=True) + "\n"]
+        for tool_name, tool_result in results:
+            tool_result_str = json.dumps(tool_result, sort_keys=True)
+            if self._max_tool_prompt_chars > 0 and len(tool_result_str) > self._max_tool_prompt_chars:
+                tool_result_str = cap_text(tool_result_str, self._max_tool_prompt_chars)
+            parts.append("Tool (" + (tool_name or "") + "): " + tool_result_str + "\n\n")
+        parts.append(NEXT_ACTION_INSTRUCTION)
+        self._turns.append("\n".join(parts))
+
+    def build(self) -> str:
+        if not self._turns:
+            return self._prefix + "\n" + FIRST_ACTION_INSTRUCTION
+        return self._prefix + "\n" + "\n".join(self._turns)
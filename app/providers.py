@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
+import threading
 from dataclasses import dataclass
-from typing import Any, Dict, Mapping, Optional
+from typing import Any, AsyncIterator, Dict, Mapping, Optional, Tuple
+
+import httpx
 
 from .config import get_settings
 from .preset_loader import Preset
@@ -20,13 +25,22 @@ class BaseProvider:
     """
     Abstract provider interface.
 
-    For simplicity and testability we make `complete_json` synchronous; FastAPI
-    will execute it in a thread pool when called from async routes if needed.
+    For simplicity and testability `complete_json` is synchronous. Async callers
+    use `acomplete_json`, which by default runs `complete_json` in a worker
+    thread; see AsyncBaseProvider for providers with a native async path.
     """
 
     def complete_json(self, prompt: str, *, schema: Mapping[str, Any]) -> ProviderResult:  # pragma: no cover - interface only
         raise NotImplementedError
 
+    async def acomplete_json(self, prompt: str, *, schema: Mapping[str, Any]) -> ProviderResult:
+        return await asyncio.to_thread(self.complete_json, prompt, schema=schema)
+
+    async def astream_json(self, prompt: str, *, schema: Mapping[str, Any]) -> AsyncIterator[str]:
+        """Yield raw completion text as it arrives. Default: a single chunk with the full completion."""
+        result = await self.acomplete_json(prompt, schema=schema)
+        yield result.raw_text
+
 
 class StubProvider(BaseProvider):
     """
@@ -95,28 +109,177 @@ def _generate_from_schema(schema: Mapping[str, Any]) -> Any:
     return None
 
 
-class OpenAIProvider(BaseProvider):
+class AsyncBaseProvider(BaseProvider):
     """
-    Placeholder OpenAI provider.
+    Provider with a native async path.
 
-    The test-suite only exercises the stub provider; OpenAI integration is
-    included to satisfy the contract but intentionally lightweight.
+    `acomplete_json` is awaited from async routes so an in-flight LLM call never
+    blocks the event loop; `complete_json` stays available for the thread-based
+    runner.
+    """
+
+    async def acomplete_json(self, prompt: str, *, schema: Mapping[str, Any]) -> ProviderResult:  # pragma: no cover - interface only
+        raise NotImplementedError
+
+
+async def acomplete_json(provider: Any, prompt: str, *, schema: Mapping[str, Any]) -> Any:
     """
+    Await a provider call regardless of whether the provider is natively async.
+
+    Sync-only providers (anything exposing just `complete_json`) are run in a
+    worker thread so the event loop stays free while they block.
+    """
+    native = getattr(provider, "acomplete_json", None)
+    if callable(native):
+        return await native(prompt, schema=schema)
+    return await asyncio.to_thread(provider.complete_json, prompt, schema=schema)
+
+
+async def astream_json(provider: Any, prompt: str, *, schema: Mapping[str, Any]) -> AsyncIterator[str]:
+    """Stream raw completion text from any provider; non-streaming ones yield one chunk."""
+    native = getattr(provider, "astream_json", None)
+    if callable(native):
+        async for chunk in native(prompt, schema=schema):
+            yield chunk
+        return
+    result = await acomplete_json(provider, prompt, schema=schema)
+    yield result.raw_text if isinstance(result, ProviderResult) else json.dumps(result)
+
+
+# --- Pooled HTTP clients shared by all chat-completions providers -------------------------
+
+_sync_client: Optional[httpx.Client] = None
+# One async client per event loop, with the task that closes it when that loop ends.
+_async_clients: Dict[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, "asyncio.Task[None]"]] = {}
+_clients_lock = threading.Lock()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+def _client_kwargs() -> Dict[str, Any]:
+    settings = get_settings()
+    return {
+        "limits": httpx.Limits(
+            max_connections=settings.provider_max_connections,
+            max_keepalive_connections=settings.provider_max_keepalive_connections,
+            keepalive_expiry=settings.provider_keepalive_expiry_seconds,
+        ),
+        # `h2` comes with httpx[http2]; if it cannot be imported, fall back to HTTP/1.1 keep-alive.
+        "http2": bool(settings.provider_http2 and _http2_available()),
+    }
+
+
+def get_provider_http_client() -> httpx.Client:
+    """Process-wide pooled sync client (used by the thread-based runner)."""
+    global _sync_client
+    client = _sync_client
+    if client is None or client.is_closed:
+        with _clients_lock:
+            client = _sync_client
+            if client is None or client.is_closed:
+                client = httpx.Client(**_client_kwargs())
+                _sync_client = client
+    return client
+
+
+def get_provider_async_client() -> httpx.AsyncClient:
+    """
+    Pooled async client for the running event loop.
+
+    Connections are bound to the event loop that opened them, so each loop gets
+    its own client (e.g. asyncio.run per run, per-test event loops). It is closed
+    when the loop cancels its remaining tasks on the way out (asyncio.run does),
+    so clients of finished loops do not keep their connection pools open.
+    """
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(loop)
+    if entry is None or entry[0].is_closed:
+        with _clients_lock:
+            entry = _async_clients.get(loop)
+            if entry is None or entry[0].is_closed:
+                # Loops closed without cancelling their tasks cannot close their client any more.
+                for stale in [other for other in _async_clients if other.is_closed()]:
+                    del _async_clients[stale]
+                client = httpx.AsyncClient(**_client_kwargs())
+                entry = (client, loop.create_task(_aclose_on_loop_exit(loop, client)))
+                _async_clients[loop] = entry
+    return entry[0]
+
+
+async def _aclose_on_loop_exit(loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient) -> None:
+    try:
+        await loop.create_future()
+    finally:
+        with _clients_lock:
+            if _async_clients.get(loop, (None,))[0] is client:
+                del _async_clients[loop]
+        await client.aclose()
+
+
+async def aclose_provider_clients() -> None:
+    """Close pooled provider clients (app shutdown)."""
+    global _sync_client
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        sync_client = _sync_client
+        _sync_client = None
+        entry = _async_clients.pop(loop, None)
+    if sync_client is not None:
+        sync_client.close()
+    if entry is not None:
+        client, closer = entry
+        closer.cancel()
+        await client.aclose()
+
+
+def _parse_chat_completion(data: Any) -> ProviderResult:
+    raw_text = data["choices"][0]["message"]["content"]
+    try:
+        parsed = json.loads(raw_text)
+    except json.JSONDecodeError:
+        parsed = {}
+    return ProviderResult(parsed_json=parsed, raw_text=raw_text)
+
+
+def _parse_stream_line(line: str) -> Tuple[bool, str]:
+    """Parse one SSE line of a streamed chat completion into (done, content delta)."""
+    if not line.startswith("data:"):
+        return False, ""
+    data = line[5:].strip()
+    if data == "[DONE]":
+        return True, ""
+    try:
+        chunk = json.loads(data)
+        return False, chunk["choices"][0]["delta"].get("content") or ""
+    except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+        return False, ""
+
+
+class ChatCompletionsProvider(AsyncBaseProvider):
+    """Shared implementation for OpenAI-compatible /chat/completions endpoints."""
+
+    api_url: str = ""
+    default_model: str = ""
+    timeout: float = 30
 
     def __init__(self, api_key: str, model: Optional[str] = None) -> None:
         self.api_key = api_key
-        # Default model chosen conservatively; callers may override via env
-        self.model = model or "gpt-4o-mini"
-
-    def complete_json(self, prompt: str, *, schema: Mapping[str, Any]) -> ProviderResult:  # pragma: no cover - network
-        import httpx
+        self.model = model or self.default_model
 
-        headers = {
+    def _headers(self) -> Dict[str, str]:
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
 
-        body = {
+    def _body(self, prompt: str, schema: Mapping[str, Any]) -> Dict[str, Any]:
+        return {
             "model": self.model,
             "messages": [
                 {
@@ -131,75 +294,94 @@ class OpenAIProvider(BaseProvider):
             "response_format": {"type": "json_schema", "json_schema": {"name": "agent_output", "schema": schema}},
         }
 
-        resp = httpx.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers=headers,
-            json=body,
-            timeout=30,
+    def complete_json(self, prompt: str, *, schema: Mapping[str, Any]) -> ProviderResult:  # pragma: no cover - network
+        resp = get_provider_http_client().post(
+            self.api_url,
+            headers=self._headers(),
+            json=self._body(prompt, schema),
+            timeout=self.timeout,
         )
         resp.raise_for_status()
-        data = resp.json()
-        raw_text = data["choices"][0]["message"]["content"]
+        return _parse_chat_completion(resp.json())
+
+    async def acomplete_json(self, prompt: str, *, schema: Mapping[str, Any]) -> ProviderResult:  # pragma: no cover - network
+        resp = await get_provider_async_client().post(
+            self.api_url,
+            headers=self._headers(),
+            json=self._body(prompt, schema),
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        return _parse_chat_completion(resp.json())
+
+    async def astream_json(self, prompt: str, *, schema: Mapping[str, Any]) -> AsyncIterator[str]:  # pragma: no cover - network
+        body = self._body(prompt, schema)
+        body["stream"] = True
+        async with get_provider_async_client().stream(
+            "POST",
+            self.api_url,
+            headers=self._headers(),
+            json=body,
+            timeout=self.timeout,
+        ) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                done, delta = _parse_stream_line(line)
+                if done:
+                    break
+                if delta:
+                    yield delta
+
+
+class OpenAIProvider(ChatCompletionsProvider):
+    """
+    OpenAI provider.
 
-        try:
-            parsed = json.loads(raw_text)
-        except json.JSONDecodeError:
-            parsed = {}
+    The test-suite only exercises the stub provider; OpenAI integration is
+    included to satisfy the contract but intentionally lightweight.
+    """
 
-        return ProviderResult(parsed_json=parsed, raw_text=raw_text)
+    api_url = "https://api.openai.com/v1/chat/completions"
+    # Default model chosen conservatively; callers may override via env
+    default_model = "gpt-4o-mini"
+    timeout = 30
 
 
 OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
 
 
-class OpenRouterProvider(BaseProvider):
+class OpenRouterProvider(ChatCompletionsProvider):
     """
     OpenRouter provider: one API key, many models (OpenAI, Claude, Gemini, etc.).
     """
 
-    def __init__(self, api_key: str, model: Optional[str] = None) -> None:
-        self.api_key = api_key
-        self.model = model or "openai/gpt-4o-mini"
+    api_url = OPENROUTER_API_URL
+    default_model = "openai/gpt-4o-mini"
+    timeout = 60
 
-    def complete_json(self, prompt: str, *, schema: Mapping[str, Any]) -> ProviderResult:  # pragma: no cover - network
-        import httpx
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-
-        body = {
-            "model": self.model,
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "You are a JSON-only API. Respond with strictly valid JSON that matches the provided JSON Schema.",
-                },
-                {
-                    "role": "user",
-                    "content": prompt,
-                },
-            ],
-            "response_format": {"type": "json_schema", "json_schema": {"name": "agent_output", "schema": schema}},
-        }
+def _provider_key() -> Tuple[str, str, str]:
+    """
+    (provider_name, model, key fingerprint) for the current configuration.
 
-        resp = httpx.post(
-            OPENROUTER_API_URL,
-            headers=headers,
-            json=body,
-            timeout=60,
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        raw_text = data["choices"][0]["message"]["content"]
+    Missing API keys fall back to the stub provider, matching build_provider.
+    The API key itself is never kept in the key, only a short digest.
+    """
+    settings = get_settings()
+    if settings.provider_name == "openrouter":
+        api_key = _get_env("OPENROUTER_API_KEY")
+        if api_key:
+            model = _get_env("OPENROUTER_MODEL") or OpenRouterProvider.default_model
+            return ("openrouter", model, _key_fingerprint(api_key))
+    elif settings.provider_name == "openai":
+        api_key = _get_env("OPENAI_API_KEY")
+        if api_key:
+            return ("openai", OpenAIProvider.default_model, _key_fingerprint(api_key))
+    return ("stub", "", "")
 
-        try:
-            parsed = json.loads(raw_text)
-        except json.JSONDecodeError:
-            parsed = {}
 
-        return ProviderResult(parsed_json=parsed, raw_text=raw_text)
+def _key_fingerprint(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
 
 
 def build_provider() -> BaseProvider:
@@ -209,7 +391,7 @@ def build_provider() -> BaseProvider:
         api_key = _get_env("OPENROUTER_API_KEY")
         if not api_key:
             return StubProvider()
-        model = _get_env("OPENROUTER_MODEL") or "openai/gpt-4o-mini"
+        model = _get_env("OPENROUTER_MODEL") or OpenRouterProvider.default_model
         return OpenRouterProvider(api_key=api_key, model=model)
     if settings.provider_name == "openai":
         api_key = _get_env("OPENAI_API_KEY")
@@ -220,6 +402,35 @@ def build_provider() -> BaseProvider:
     return StubProvider()
 
 
+_shared_providers: Dict[Tuple[str, str, str], BaseProvider] = {}
+_shared_providers_lock = threading.Lock()
+
+
+def get_shared_provider() -> BaseProvider:
+    """
+    Return the process-wide provider for the current configuration.
+
+    Providers are built once per (provider_name, model, key fingerprint) and
+    reused across requests; a config change (e.g. a rotated key) yields a new
+    key and therefore a fresh instance.
+    """
+    key = _provider_key()
+    provider = _shared_providers.get(key)
+    if provider is None:
+        with _shared_providers_lock:
+            provider = _shared_providers.get(key)
+            if provider is None:
+                provider = build_provider()
+                _shared_providers[key] = provider
+    return provider
+
+
+def clear_provider_registry() -> None:
+    """Drop shared provider instances (tests / explicit config reload)."""
+    with _shared_providers_lock:
+        _shared_providers.clear()
+
+
 def _get_env(name: str) -> Optional[str]:
     import os
 
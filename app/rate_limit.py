@@ -19,7 +19,8 @@ class SimpleRateLimiter:
         self._state: Dict[Tuple[str, str], Tuple[int, float]] = {}
         self._lock = asyncio.Lock()
 
-    async def allow(self, rule_key: str, client_id: str) -> bool:
+    async def allow(self, rule_key: str, client_id: str, cost: int = 1) -> bool:
+        """Take cost units from client_id's budget; refuse (taking nothing) when fewer remain."""
         rule = self._rules[rule_key]
         now = time.monotonic()
         key = (rule_key, client_id)
@@ -28,8 +29,8 @@ class SimpleRateLimiter:
             if now >= reset_at:
                 remaining = rule.limit
                 reset_at = now + rule.window_seconds
-            if remaining <= 0:
-                self._state[key] = (0, reset_at)
+            if remaining < cost:
+                self._state[key] = (remaining, reset_at)
                 return False
-            self._state[key] = (remaining - 1, reset_at)
+            self._state[key] = (remaining - cost, reset_at)
             return True
@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import Any, Dict
 
 from .models import MemoryPolicy
-from .preset_loader import Preset, _coerce_memory_policy
+from .preset_loader import Preset, _coerce_memory_policy, _coerce_response_cache
 
 
 def spec_to_preset(spec: Dict[str, Any]) -> Preset:
@@ -47,4 +47,5 @@ def spec_to_preset(spec: Dict[str, Any]) -> Preset:
         http_allowed_domains=http_allowed_domains,
         tool_policies=tool_policies,
         resolved_execution_limits=resolved_execution_limits,
+        response_cache=_coerce_response_cache(spec.get("response_cache")),
     )
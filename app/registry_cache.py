@@ -0,0 +1,143 @@
+"""
+Read-through cache of registry agents as Presets.
+
+The invoke, stream, batch, run, replay and eval paths resolve registry agents
+with get_registry_preset(agent_id, version) instead of registry_store.get_agent
+followed by spec_to_preset, so a warm lookup costs no DB round trip and no JSON
+decode. Entries are keyed by (agent_id, version); version None ("latest") is an
+entry of its own, stored next to the exact version it resolved to.
+
+Invalidation:
+- registry writes in this process clear the cache through
+  registry_store.add_registry_listener (the _touch_registry_version hook);
+- writes by other workers bump registry_state.version in the database, which
+  each worker compares at most every REGISTRY_CACHE_CHECK_SECONDS;
+- switching databases (tests) clears it.
+
+A lookup that started before a clear never stores its (possibly stale) result.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import get_settings
+from app.preset_loader import Preset
+from app.registry_adapter import spec_to_preset
+from app.storage import registry_store
+from app.storage.db import get_db_info
+from app.storage.executor import run_db
+from app.storage.migrations import _schema_key
+
+_MAX_ENTRIES = 512
+
+_Key = Tuple[str, Optional[str]]
+
+
+class RegistryPresetCache:
+    """Thread-safe LRU of Presets built from registry specs, valid for one registry version."""
+
+    def __init__(self, max_entries: int = _MAX_ENTRIES) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[_Key, Preset]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._db_key: Optional[Tuple[Any, ...]] = None
+        self._db_version: Optional[int] = None
+        self._checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def revalidation_due(self) -> bool:
+        """True when the registry version should be re-read (interval elapsed or database changed)."""
+        if _schema_key(get_db_info()) != self._db_key:
+            return True
+        return time.monotonic() - self._checked_at >= get_settings().registry_cache_check_seconds
+
+    def revalidate(self) -> None:
+        """Clear the cache if the database or its registry version changed (blocking DB read)."""
+        db_key = _schema_key(get_db_info())
+        version = registry_store.get_registry_state_version()
+        with self._lock:
+            if db_key != self._db_key or version != self._db_version:
+                self._entries.clear()
+                self._generation += 1
+                self._db_key = db_key
+                self._db_version = version
+            self._checked_at = time.monotonic()
+
+    def lookup(self, key: _Key, *, count_miss: bool = True) -> Optional[Preset]:
+        with self._lock:
+            preset = self._entries.get(key)
+            if preset is None:
+                if count_miss:
+                    self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return preset
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def store(self, generation: int, entries: Dict[_Key, Preset]) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            for key, preset in entries.items():
+                self._entries[key] = preset
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "registry_version": self._db_version,
+            }
+
+
+_cache = RegistryPresetCache()
+registry_store.add_registry_listener(_cache.clear)
+
+
+def get_registry_cache() -> RegistryPresetCache:
+    return _cache
+
+
+def get_registry_preset(agent_id: str, version: Optional[str] = None) -> Optional[Preset]:
+    """Preset for a registry agent (latest when version is None), or None if it does not exist."""
+    if _cache.revalidation_due():
+        _cache.revalidate()
+    key: _Key = (agent_id, version or None)
+    preset = _cache.lookup(key)
+    if preset is not None:
+        return preset
+    generation = _cache.generation
+    spec = registry_store.get_agent(agent_id, version=version)
+    if spec is None:
+        return None
+    preset = spec_to_preset(spec)
+    _cache.store(generation, {key: preset, (agent_id, preset.version): preset})
+    return preset
+
+
+async def aget_registry_preset(agent_id: str, version: Optional[str] = None) -> Optional[Preset]:
+    """Async get_registry_preset: cache hits are served on the event loop, misses on the DB executor."""
+    if not _cache.revalidation_due():
+        preset = _cache.lookup((agent_id, version or None), count_miss=False)
+        if preset is not None:
+            return preset
+    return await run_db(get_registry_preset, agent_id, version)
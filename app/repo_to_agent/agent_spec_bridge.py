@@ -11,9 +11,10 @@ from __future__ import annotations
 import re
 from typing import Any, Dict
 
-from jsonschema import Draft7Validator, SchemaError
+from jsonschema import SchemaError
 
 from app.storage.registry_store import AgentSpecInvalid
+from app.utils.validators import check_schema
 
 # Align with registry_store constraints (no catalog dependency).
 _ID_RE = re.compile(r"^[a-z0-9][a-z0-9_-]{1,62}$")
@@ -44,7 +45,7 @@ def _validate_schema_structure(schema: Any, *, field_name: str) -> Dict[str, Any
     if depth > _MAX_SCHEMA_DEPTH:
         raise AgentSpecInvalid(f"{field_name} is too deep")
     try:
-        Draft7Validator.check_schema(schema)
+        check_schema(schema)
     except SchemaError as exc:
         raise AgentSpecInvalid(
             f"{field_name} is not a valid Draft7 JSON schema",
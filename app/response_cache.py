@@ -0,0 +1,186 @@
+"""
+Deterministic LLM response cache.
+
+Presets opt in with `response_cache: {enabled: true, ttl_seconds: N}` in their
+YAML (or registry spec). Entries are keyed on provider, model, preset id and
+version, and hashes of the prompt and output schema, so any change to the
+prompt (input, memory, knowledge, tool results) is a miss. Only outputs that
+validated against the schema are stored.
+
+Tier 1 is an in-process LRU; tier 2 is the optional response_cache table
+(RESPONSE_CACHE_PERSIST=true) shared across workers. Async callers use
+alookup/astore: memory hits are served on the event loop, the DB tier runs on
+the DB executor.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from app.config import get_settings
+from app.preset_loader import Preset
+from app.providers import ProviderResult
+from app.storage.executor import run_db
+from app.utils.validators import schema_hash
+
+logger = logging.getLogger("agent-gateway")
+
+CACHE_HIT = "hit"
+CACHE_MISS = "miss"
+
+
+def ttl_for(preset: Preset) -> Optional[int]:
+    """TTL in seconds when the preset opted into response caching, else None."""
+    cfg = getattr(preset, "response_cache", None)
+    if not isinstance(cfg, dict) or not cfg.get("enabled"):
+        return None
+    ttl = cfg.get("ttl_seconds")
+    if ttl is None:
+        ttl = get_settings().response_cache_default_ttl_seconds
+    ttl = int(ttl)
+    return ttl if ttl > 0 else None
+
+
+def _provider_identity(provider: Any) -> Tuple[str, str]:
+    name = f"{get_settings().provider_name}:{type(provider).__qualname__}"
+    return name, str(getattr(provider, "model", "") or "")
+
+
+def make_key(provider: Any, preset: Preset, prompt: str, schema: Mapping[str, Any]) -> str:
+    provider_name, model = _provider_identity(provider)
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    parts = [provider_name, model, preset.id, preset.version, prompt_hash, schema_hash(schema)]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Thread-safe LRU of serialized provider results with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max(1, int(max_entries))
+        # key -> (expires_at, result_json, raw_text)
+        self._entries: "OrderedDict[str, Tuple[float, str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, now: Optional[float] = None) -> Optional[ProviderResult]:
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Fresh object per hit: callers post-process the output in place.
+        return ProviderResult(parsed_json=json.loads(entry[1]), raw_text=entry[2])
+
+    def put(self, key: str, result: Dict[str, Any], raw_text: str, expires_at: float) -> None:
+        payload = json.dumps(result, sort_keys=True, default=str)
+        with self._lock:
+            self._entries[key] = (expires_at, payload, raw_text)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_cache = ResponseCache()
+
+
+def lookup(key: str) -> Optional[ProviderResult]:
+    """Return a cached result (memory, then DB when persistence is enabled) or None."""
+    hit = _cache.get(key)
+    if hit is not None or not get_settings().response_cache_persist:
+        return hit
+    return _lookup_persisted(key)
+
+
+async def alookup(key: str) -> Optional[ProviderResult]:
+    """Async lookup: memory on the event loop, the DB tier on the DB executor."""
+    hit = _cache.get(key)
+    if hit is not None or not get_settings().response_cache_persist:
+        return hit
+    return await run_db(_lookup_persisted, key)
+
+
+def _lookup_persisted(key: str) -> Optional[ProviderResult]:
+    try:
+        from app.storage import response_cache_store
+
+        entry = response_cache_store.get_entry(key)
+    except Exception as exc:
+        logger.warning("response_cache lookup failed: %s", exc)
+        return None
+    if entry is None or not isinstance(entry.get("result"), dict):
+        return None
+    _cache.put(key, entry["result"], entry["raw_text"], entry["expires_at"])
+    return ProviderResult(parsed_json=entry["result"], raw_text=entry["raw_text"])
+
+
+def store(key: str, preset: Preset, result: Dict[str, Any], raw_text: str, ttl_seconds: int) -> None:
+    """Store a validated result; persistence failures are logged, never raised."""
+    settings = get_settings()
+    _cache.max_entries = max(1, int(settings.response_cache_max_entries))
+    expires_at = time.time() + ttl_seconds
+    _cache.put(key, result, raw_text, expires_at)
+    if settings.response_cache_persist:
+        _store_persisted(key, preset, result, raw_text, expires_at)
+
+
+async def astore(key: str, preset: Preset, result: Dict[str, Any], raw_text: str, ttl_seconds: int) -> None:
+    """Async store: the memory tier is updated inline, the DB write runs on the DB executor."""
+    settings = get_settings()
+    _cache.max_entries = max(1, int(settings.response_cache_max_entries))
+    expires_at = time.time() + ttl_seconds
+    _cache.put(key, result, raw_text, expires_at)
+    if settings.response_cache_persist:
+        await run_db(_store_persisted, key, preset, result, raw_text, expires_at)
+
+
+def _store_persisted(key: str, preset: Preset, result: Dict[str, Any], raw_text: str, expires_at: float) -> None:
+    try:
+        from app.storage import response_cache_store
+
+        response_cache_store.put_entry(
+            key,
+            agent_id=preset.id,
+            agent_version=preset.version,
+            result=result,
+            raw_text=raw_text,
+            expires_at=expires_at,
+        )
+    except Exception as exc:
+        logger.warning("response_cache store failed: %s", exc)
+
+
+def response_cache_stats() -> Dict[str, int]:
+    return _cache.stats()
+
+
+def clear_response_cache() -> None:
+    """Drop in-memory entries (the DB tier expires by TTL)."""
+    _cache.clear()
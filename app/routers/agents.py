@@ -8,21 +8,28 @@ Uses build_error_envelope and request_id pattern as sessions.
 from __future__ import annotations
 
 import logging
-import threading
+import time
 from typing import Any, Dict, List, Optional
 
 import json
 import yaml
-from fastapi import APIRouter, Depends, Request
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 from app.config import get_settings
-from app.dependencies import AuthError, get_provider, require_clerk_user_id
+from app.dependencies import AuthError, get_provider, get_tenant_id, require_clerk_user_id
 from app.examples import get_example
-from app.engine import build_error_envelope, new_request_id, process_invoke_for_preset
+from app.engine import (
+    build_error_envelope,
+    new_request_id,
+    process_invoke_batch,
+    process_invoke_for_preset,
+    process_stream_for_preset,
+)
 from app.preset_loader import PresetLoadError, get_active_preset
-from app.registry_adapter import spec_to_preset
-from app.runtime.runner import run_runner
+from app.registry_cache import aget_registry_preset
+from app.runtime.runner import arun_runner
+from app.runtime.scheduler import aenqueue_run
 from app.runtime.tools.registry import DefaultToolRegistry
 from app.storage import registry_store
 from app.storage import run_store
@@ -119,7 +126,7 @@ async def register_agent_preview(request: Request) -> JSONResponse:
         return oerr
 
     try:
-        preview = registry_store.preview_register_agent(spec_obj, owner_user_id=owner_user_id)
+        preview = await registry_store.apreview_register_agent(spec_obj, owner_user_id=owner_user_id)
     except registry_store.AgentSpecInvalid as exc:
         return _agents_error(400, "AGENT_SPEC_INVALID", str(exc), details=getattr(exc, "details", None))
     except Exception as exc:
@@ -159,7 +166,7 @@ async def register_agent(request: Request, dry_run: Optional[str] = None) -> JSO
 
     if _parse_bool(dry_run):
         try:
-            preview = registry_store.preview_register_agent(spec_obj, owner_user_id=owner_user_id)
+            preview = await registry_store.apreview_register_agent(spec_obj, owner_user_id=owner_user_id)
         except registry_store.AgentSpecInvalid as exc:
             return _agents_error(400, "AGENT_SPEC_INVALID", str(exc), details=getattr(exc, "details", None))
         except Exception as exc:
@@ -168,7 +175,7 @@ async def register_agent(request: Request, dry_run: Optional[str] = None) -> JSO
         return JSONResponse(status_code=200, content={"ok": True, "dry_run": True, **preview})
 
     try:
-        agent_id, version = registry_store.register_agent(spec_obj, owner_user_id=owner_user_id)
+        agent_id, version = await registry_store.aregister_agent(spec_obj, owner_user_id=owner_user_id)
     except registry_store.AgentNotOwner as exc:
         return _agents_error(403, "FORBIDDEN", str(exc))
     except registry_store.AgentSpecInvalid as exc:
@@ -203,7 +210,7 @@ async def get_my_agents(request: Request, include_archived: Optional[str] = None
     include_archived_bool = _parse_bool(include_archived)
     if include_archived_bool is None:
         include_archived_bool = False
-    agents = registry_store.list_agents_by_owner(
+    agents = await registry_store.alist_agents_by_owner(
         owner_user_id,
         include_archived=include_archived_bool,
     )
@@ -217,10 +224,13 @@ async def get_agents(
     supports_memory: Optional[str] = None,
     latest_only: Optional[str] = None,
     include_archived: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
 ) -> JSONResponse:
     """
-    List agents from the registry with optional filters.
-    Returns 200 with { "agents": [ ... ] }.
+    List agents from the registry with optional filters, ordered by id.
+    Returns 200 with { "agents": [ ... ], "next_cursor": ... }. With limit, pass
+    next_cursor back as cursor (same filters) for the next page; null on the last page.
     """
     supports_memory_bool = _parse_bool(supports_memory)
     latest_only_bool = _parse_bool(latest_only)
@@ -230,14 +240,19 @@ async def get_agents(
     if include_archived_bool is None:
         include_archived_bool = False
 
-    agents = registry_store.list_agents(
-        q=q,
-        primitive=primitive,
-        supports_memory=supports_memory_bool,
-        latest_only=latest_only_bool,
-        include_archived=include_archived_bool,
-    )
-    return JSONResponse(status_code=200, content={"agents": agents})
+    try:
+        page = await registry_store.alist_agents_page(
+            q=q,
+            primitive=primitive,
+            supports_memory=supports_memory_bool,
+            latest_only=latest_only_bool,
+            include_archived=include_archived_bool,
+            limit=limit,
+            cursor=cursor,
+        )
+    except registry_store.InvalidCursor as exc:
+        return _agents_error(400, "INVALID_CURSOR", str(exc))
+    return JSONResponse(status_code=200, content={"agents": page["agents"], "next_cursor": page["next_cursor"]})
 
 
 @router.post("/{agent_id}/archive")
@@ -254,7 +269,7 @@ async def archive_agent(request: Request, agent_id: str, version: Optional[str]
             return _agents_error(401, "UNAUTHORIZED", str(exc))
 
     try:
-        agent_id_out, version_out = registry_store.archive_agent(
+        agent_id_out, version_out = await registry_store.aarchive_agent(
             agent_id,
             version=version,
             owner_user_id=owner_user_id,
@@ -292,7 +307,7 @@ async def unarchive_agent(request: Request, agent_id: str, version: Optional[str
             return _agents_error(401, "UNAUTHORIZED", str(exc))
 
     try:
-        agent_id_out, version_out = registry_store.unarchive_agent(
+        agent_id_out, version_out = await registry_store.aunarchive_agent(
             agent_id,
             version=version,
             owner_user_id=owner_user_id,
@@ -345,7 +360,7 @@ async def get_agents_id(agent_id: str, version: Optional[str] = None) -> JSONRes
     """
     Get one agent by id. Returns 200 with full details or 404 with AGENT_NOT_FOUND envelope.
     """
-    spec = registry_store.get_agent(agent_id, version=version)
+    spec = await registry_store.aget_agent(agent_id, version=version)
     if spec is None:
         return _agents_error(404, "AGENT_NOT_FOUND", f"Agent not found: {agent_id}")
 
@@ -384,7 +399,7 @@ async def get_agents_schema(agent_id: str, version: Optional[str] = None) -> JSO
     """
     Return schema for agent id + optional version.
     """
-    schema = registry_store.get_agent_schema(agent_id, version=version)
+    schema = await registry_store.aget_agent_schema(agent_id, version=version)
     if schema is None:
         return _agents_error(404, "AGENT_NOT_FOUND", f"Agent not found: {agent_id}")
     return JSONResponse(status_code=200, content=schema)
@@ -426,71 +441,66 @@ async def create_agent_run(
     elif not isinstance(wait, bool):
         wait = True
 
-    spec = registry_store.get_agent(agent_id, version=agent_version)
-    if spec is None:
+    preset = await aget_registry_preset(agent_id, version=agent_version)
+    if preset is None:
         return _agents_error(404, "AGENT_NOT_FOUND", f"Agent not found: {agent_id}")
 
-    preset = spec_to_preset(spec)
-    resolved_version = spec.get("version", "latest")
-    run = run_store.create_run(agent_id, resolved_version, session_id, input_payload)
-    run_id = run["id"]
+    resolved_version = preset.version
     request_id = new_request_id()
+    if not wait:
+        # Queued in the runs table; app.runtime.scheduler executes it on its bounded worker pool.
+        run = await aenqueue_run(
+            agent_id,
+            resolved_version,
+            session_id,
+            input_payload,
+            job_kind="agent_run",
+            job={"request_id": request_id},
+            tenant_id=get_tenant_id(request),
+            context={"provider": provider},
+        )
+        return JSONResponse(status_code=200, content={"run_id": run["id"], "status": "queued"})
+
+    run = await run_store.acreate_run(agent_id, resolved_version, session_id, input_payload)
+    run_id = run["id"]
 
     tools_enabled = get_settings().tools_enabled
     tool_registry = DefaultToolRegistry() if tools_enabled else None
     limits = getattr(preset, "resolved_execution_limits", None) or {}
 
-    if wait:
-        run_runner(
-            preset=preset,
-            provider=provider,
-            input_payload=input_payload,
-            run_id=run_id,
-            session_id=session_id,
-            request_id=request_id,
-            tool_registry=tool_registry,
-            max_steps=limits.get("max_steps"),
-            max_wall_time_seconds=limits.get("max_wall_time_seconds"),
-        )
-        run = run_store.get_run(run_id)
-        if run is None:
-            return _agents_error(500, "INTERNAL_ERROR", "Run not found after execution")
-        meta: Dict[str, Any] = {"step_count": run.get("step_count", 0)}
-        if session_id is not None:
-            meta["session_id"] = session_id
-        steps = run_store.list_run_steps(run_id)
-        tool_calls_used = sum(1 for s in steps if s.get("step_type") == "tool_call")
-        meta["tool_calls_used"] = tool_calls_used
-        meta["max_tool_calls"] = (
-            limits.get("max_tool_calls") if limits.get("max_tool_calls") is not None else get_settings().max_tool_calls
-        )
-        return JSONResponse(
-            status_code=200,
-            content={
-                "run_id": run_id,
-                "status": run["status"],
-                "output": run.get("output_json"),
-                "error": run.get("error"),
-                "meta": meta,
-            },
-        )
-
-    def run_in_background() -> None:
-        run_runner(
-            preset=preset,
-            provider=provider,
-            input_payload=input_payload,
-            run_id=run_id,
-            session_id=session_id,
-            request_id=request_id,
-            tool_registry=tool_registry,
-            max_steps=limits.get("max_steps"),
-            max_wall_time_seconds=limits.get("max_wall_time_seconds"),
-        )
-
-    thread = threading.Thread(target=run_in_background)
-    thread.start()
-    return JSONResponse(status_code=200, content={"run_id": run_id, "status": "queued"})
+    await arun_runner(
+        preset=preset,
+        provider=provider,
+        input_payload=input_payload,
+        run_id=run_id,
+        session_id=session_id,
+        request_id=request_id,
+        tool_registry=tool_registry,
+        max_steps=limits.get("max_steps"),
+        max_wall_time_seconds=limits.get("max_wall_time_seconds"),
+    )
+    run = await run_store.aget_run(run_id)
+    if run is None:
+        return _agents_error(500, "INTERNAL_ERROR", "Run not found after execution")
+    meta: Dict[str, Any] = {"step_count": run.get("step_count", 0)}
+    if session_id is not None:
+        meta["session_id"] = session_id
+    steps = await run_store.alist_run_steps(run_id)
+    tool_calls_used = sum(1 for s in steps if s.get("step_type") == "tool_call")
+    meta["tool_calls_used"] = tool_calls_used
+    meta["max_tool_calls"] = (
+        limits.get("max_tool_calls") if limits.get("max_tool_calls") is not None else get_settings().max_tool_calls
+    )
+    return JSONResponse(
+        status_code=200,
+        content={
+            "run_id": run_id,
+            "status": run["status"],
+            "output": run.get("output_json"),
+            "error": run.get("error"),
+            "meta": meta,
+        },
+    )
 
 
 @router.post("/{agent_id}/invoke")
@@ -503,19 +513,107 @@ async def invoke_agent(
     """
     Invoke a registry agent by id (and optional version).
     """
-    spec = registry_store.get_agent(agent_id, version=version)
-    if spec is None:
+    preset = await aget_registry_preset(agent_id, version=version)
+    if preset is None:
         return _agents_error(404, "AGENT_NOT_FOUND", f"Agent not found: {agent_id}")
 
-    preset = spec_to_preset(spec)
     result = await process_invoke_for_preset(request=request, provider=provider, preset=preset)
     return JSONResponse(status_code=result["status_code"], content=result["body"])
 
 
+@router.post("/{agent_id}/invoke:batch")
+async def invoke_agent_batch(
+    agent_id: str,
+    request: Request,
+    version: Optional[str] = None,
+    stream: Optional[str] = None,
+    provider=Depends(get_provider),
+) -> Response:
+    """
+    Invoke a registry agent for many inputs in one request.
+
+    Body: {"items": [{"input": {...}, "context": {...}}, ...]} (at most BATCH_MAX_ITEMS).
+    Each item is charged to the client's invoke_batch rate budget (items per minute).
+    Each item runs the same pipeline as /invoke (validation, repair, memory) with
+    at most BATCH_CONCURRENCY in flight. Default response: {"results": [...], "meta": {...}}
+    in input order. With ?stream=ndjson (or Accept: application/x-ndjson) each result is
+    written as one JSON line as soon as it finishes: {"index", "status_code", "body"}.
+    """
+    preset = await aget_registry_preset(agent_id, version=version)
+    if preset is None:
+        return _agents_error(404, "AGENT_NOT_FOUND", f"Agent not found: {agent_id}")
+
+    try:
+        payload = await request.json()
+    except Exception:
+        return _agents_error(400, "MALFORMED_REQUEST", "Request body must be valid JSON")
+    items = payload.get("items") if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        return _agents_error(
+            422,
+            "INPUT_VALIDATION_ERROR",
+            "Request body must have a non-empty 'items' array",
+            details=[{"path": ["items"], "message": "Missing or empty 'items' array"}],
+        )
+    settings = get_settings()
+    if len(items) > settings.batch_max_items:
+        return _agents_error(
+            422,
+            "INPUT_VALIDATION_ERROR",
+            f"Too many items (max {settings.batch_max_items})",
+            details=[{"path": ["items"], "message": f"At most {settings.batch_max_items} items per batch"}],
+        )
+    # Every item is a provider invocation, so the batch budget is charged per item.
+    limiter = getattr(request.app.state, "rate_limiter", None)
+    client_host = request.client.host if request.client else "unknown"
+    if limiter is not None and not await limiter.allow("invoke_batch", client_host, cost=len(items)):
+        return _agents_error(429, "RATE_LIMITED", "Too many requests. Please retry shortly.")
+
+    results = process_invoke_batch(
+        items, provider=provider, preset=preset, concurrency=settings.batch_concurrency
+    )
+
+    wants_ndjson = (stream or "").lower() == "ndjson" or "application/x-ndjson" in request.headers.get("accept", "")
+    if wants_ndjson:
+
+        async def ndjson_lines():
+            async for index, result in results:
+                yield json.dumps({"index": index, **result}, default=str) + "\n"
+
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+    request_id = new_request_id()
+    start = time.monotonic()
+    ordered: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    async for index, result in results:
+        ordered[index] = {"index": index, **result}
+    succeeded = sum(1 for r in ordered if r and r["status_code"] == 200)
+    return JSONResponse(
+        status_code=200,
+        content={
+            "results": ordered,
+            "meta": {
+                "request_id": request_id,
+                "agent": preset.id,
+                "version": preset.version,
+                "count": len(items),
+                "succeeded": succeeded,
+                "failed": len(items) - succeeded,
+                "latency_ms": (time.monotonic() - start) * 1000.0,
+            },
+        },
+    )
+
+
 @router.post("/{agent_id}/stream")
-async def stream_agent(agent_id: str, request: Request) -> JSONResponse:
+async def stream_agent(
+    agent_id: str,
+    request: Request,
+    version: Optional[str] = None,
+    provider=Depends(get_provider),
+) -> Response:
     """
-    Streaming interface (not implemented yet).
+    Streaming invocation of a registry agent (SSE); see process_stream_for_preset for the event format.
     """
     try:
         from app.dependencies import enforce_auth
@@ -524,4 +622,15 @@ async def stream_agent(agent_id: str, request: Request) -> JSONResponse:
     except AuthError as exc:
         return _agents_error(401, "UNAUTHORIZED", str(exc))
 
-    return _agents_error(501, "NOT_IMPLEMENTED", "Streaming endpoint is not implemented")
+    preset = await aget_registry_preset(agent_id, version=version)
+    if preset is None:
+        return _agents_error(404, "AGENT_NOT_FOUND", f"Agent not found: {agent_id}")
+
+    result = await process_stream_for_preset(request=request, provider=provider, preset=preset)
+    if "stream" in result:
+        return StreamingResponse(
+            result["stream"],
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    return JSONResponse(status_code=result["status_code"], content=result["body"])
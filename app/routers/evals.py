@@ -4,17 +4,18 @@ Evals API (Part 6): create suites, run evals, get results.
 
 from __future__ import annotations
 
+import asyncio
 import logging
-import threading
 from typing import Any, Dict, List
 
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import JSONResponse
 
-from app.dependencies import get_provider
+from app.dependencies import get_provider, get_tenant_id
 from app.engine import build_error_envelope, new_request_id
 from app.evals.runner import EvalSuiteNotFound, run_eval_suite
 from app.preset_loader import PresetLoadError, get_active_preset
+from app.runtime.scheduler import get_run_scheduler
 from app.storage import eval_store
 from app.storage import registry_store
 
@@ -89,13 +90,13 @@ async def create_eval_suite(agent_id: str, request: Request) -> JSONResponse:
         if err:
             return _evals_error(400, "VALIDATION_ERROR", err)
 
-    if registry_store.get_agent(agent_id) is None:
+    if await registry_store.aget_agent(agent_id) is None:
         return _evals_error(404, "AGENT_NOT_FOUND", f"Agent not found: {agent_id}")
 
     description = body.get("description") if isinstance(body.get("description"), str) else None
     agent_version = body.get("agent_version") if isinstance(body.get("agent_version"), str) else None
 
-    suite = eval_store.create_eval_suite(
+    suite = await eval_store.acreate_eval_suite(
         agent_id,
         name.strip(),
         cases,
@@ -118,7 +119,7 @@ async def create_eval_suite(agent_id: str, request: Request) -> JSONResponse:
 @router.get("/agents/{agent_id}/evals")
 async def list_eval_suites(agent_id: str) -> JSONResponse:
     """List eval suites for an agent."""
-    suites = eval_store.list_eval_suites(agent_id=agent_id)
+    suites = await eval_store.alist_eval_suites(agent_id=agent_id)
     out: List[Dict[str, Any]] = []
     for s in suites:
         out.append({
@@ -135,7 +136,7 @@ async def list_eval_suites(agent_id: str) -> JSONResponse:
 @router.get("/evals/{eval_suite_id}")
 async def get_eval_suite(eval_suite_id: str) -> JSONResponse:
     """Return eval suite metadata and cases."""
-    suite = eval_store.get_eval_suite(eval_suite_id)
+    suite = await eval_store.aget_eval_suite(eval_suite_id)
     if suite is None:
         return _evals_error(404, "EVAL_SUITE_NOT_FOUND", f"Eval suite not found: {eval_suite_id}")
     return JSONResponse(status_code=200, content={
@@ -160,9 +161,9 @@ async def run_eval(
     Run an eval suite.
     Body: wait (bool, default true), agent_version_override?.
     If wait=true: run synchronously, return eval_run_id and summary.
-    If wait=false: start background thread, return eval_run_id and status.
+    If wait=false: run on the run scheduler's worker pool, return eval_run_id and status.
     """
-    suite = eval_store.get_eval_suite(eval_suite_id)
+    suite = await eval_store.aget_eval_suite(eval_suite_id)
     if suite is None:
         return _evals_error(404, "EVAL_SUITE_NOT_FOUND", f"Eval suite not found: {eval_suite_id}")
 
@@ -181,7 +182,9 @@ async def run_eval(
 
     if wait:
         try:
-            result = run_eval_suite(
+            # run_runner drives each case on its own event loop, so the suite runs in a worker thread.
+            result = await asyncio.to_thread(
+                run_eval_suite,
                 eval_suite_id,
                 provider,
                 agent_version_override=agent_version_override,
@@ -201,13 +204,13 @@ async def run_eval(
         })
 
     agent_version = agent_version_override or suite.get("agent_version")
-    eval_run = eval_store.create_eval_run(
+    eval_run = await eval_store.acreate_eval_run(
         eval_suite_id,
         suite["agent_id"],
         agent_version=agent_version,
     )
     eval_run_id = eval_run["id"]
-    eval_store.set_eval_run_status(eval_run_id, "running")
+    await eval_store.aset_eval_run_status(eval_run_id, "running")
 
     def run_in_background() -> None:
         try:
@@ -225,7 +228,7 @@ async def run_eval(
                 error=str(e)[:1000],
             )
 
-    threading.Thread(target=run_in_background).start()
+    get_run_scheduler().submit(run_in_background, agent_id=suite["agent_id"], tenant_id=get_tenant_id(request))
     return JSONResponse(status_code=200, content={
         "eval_run_id": eval_run_id,
         "status": "running",
@@ -235,7 +238,7 @@ async def run_eval(
 @router.get("/eval-runs/{eval_run_id}")
 async def get_eval_run(eval_run_id: str) -> JSONResponse:
     """Return eval run summary and status."""
-    run = eval_store.get_eval_run(eval_run_id)
+    run = await eval_store.aget_eval_run(eval_run_id)
     if run is None:
         return _evals_error(404, "EVAL_RUN_NOT_FOUND", f"Eval run not found: {eval_run_id}")
     return JSONResponse(status_code=200, content={
@@ -254,8 +257,8 @@ async def get_eval_run(eval_run_id: str) -> JSONResponse:
 @router.get("/eval-runs/{eval_run_id}/results")
 async def get_eval_run_results(eval_run_id: str) -> JSONResponse:
     """Return all case results for an eval run."""
-    run = eval_store.get_eval_run(eval_run_id)
+    run = await eval_store.aget_eval_run(eval_run_id)
     if run is None:
         return _evals_error(404, "EVAL_RUN_NOT_FOUND", f"Eval run not found: {eval_run_id}")
-    results = eval_store.list_eval_case_results(eval_run_id)
+    results = await eval_store.alist_eval_case_results(eval_run_id)
     return JSONResponse(status_code=200, content={"results": results})
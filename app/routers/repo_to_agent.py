@@ -1,24 +1,24 @@
 """
 Repo-to-agent async job API.
 
-POST /repo-to-agent creates a run and executes the repo-to-agent workflow in a
-background thread. Clients poll GET /runs/{run_id} and GET /runs/{run_id}/result.
+POST /repo-to-agent queues a run that the run scheduler (app.runtime.scheduler)
+executes on its worker pool. Clients poll GET /runs/{run_id} and GET /runs/{run_id}/result.
 """
 
 from __future__ import annotations
 
 import logging
-import threading
 from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
 
 from app.config import get_settings
-from app.dependencies import AuthError, enforce_auth, require_clerk_user_id
+from app.dependencies import AuthError, enforce_auth, get_tenant_id, require_clerk_user_id
 from app.engine import new_request_id
 from app.repo_to_agent.app_flow import run_repo_to_agent
 from app.routers.github import _fetch_clerk_github_access_token
+from app.runtime.scheduler import aenqueue_run, register_job_kind
 from app.storage import run_store
 
 logger = logging.getLogger("agent-gateway")
@@ -35,6 +35,32 @@ def _agents_error(status_code: int, code: str, message: str, details: list | Non
     )
 
 
+def _execute_repo_to_agent(run: Dict[str, Any], context: Dict[str, Any]) -> None:
+    """Job kind "repo_to_agent" (app.runtime.scheduler)."""
+    run_id = run["id"]
+    body = run.get("input_json") or {}
+    job = run.get("job_json") or {}
+    lease = run_store.run_lease(run)
+    try:
+        repo_input: Dict[str, Any] = {
+            k: v for k, v in body.items() if k in ("owner", "repo", "ref", "url") and v is not None
+        }
+        result = run_repo_to_agent(
+            repo_input,
+            execution_backend=job.get("execution_backend") or "openai",
+            github_token=context.get("github_token"),
+        )
+        run_store.set_run_status(run_id, "succeeded", output_json=result.model_dump(), lease=lease)
+    except run_store.RunLeaseLost:
+        raise
+    except Exception as e:
+        logger.exception("repo-to-agent run %s failed", run_id)
+        run_store.set_run_status(run_id, "failed", error=str(e), lease=lease)
+
+
+register_job_kind("repo_to_agent", _execute_repo_to_agent)
+
+
 @router.post("/")
 async def create_repo_to_agent_run(request: Request) -> JSONResponse:
     """
@@ -95,30 +121,16 @@ async def create_repo_to_agent_run(request: Request) -> JSONResponse:
             f"execution_backend must be 'openai' or 'internal', got {execution_backend!r}",
         )
 
-    run_store.init_run_db()
-    run = run_store.create_run(
-        agent_id="repo_to_agent",
-        agent_version="1.0",
-        session_id=None,
-        input_json=body,
+    run = await aenqueue_run(
+        "repo_to_agent",
+        "1.0",
+        None,
+        body,
+        job_kind="repo_to_agent",
+        job={"execution_backend": execution_backend},
+        tenant_id=get_tenant_id(request),
+        # Never persisted: a run claimed after a restart falls back to GITHUB_TOKEN.
+        context={"github_token": github_token_for_run},
     )
     run_id = run["id"]
-
-    def run_in_background() -> None:
-        try:
-            repo_input: Dict[str, Any] = {
-                k: v for k, v in body.items() if k in ("owner", "repo", "ref", "url") and v is not None
-            }
-            result = run_repo_to_agent(
-                repo_input,
-                execution_backend=execution_backend,
-                github_token=github_token_for_run,
-            )
-            run_store.set_run_status(run_id, "succeeded", output_json=result.model_dump())
-        except Exception as e:
-            logger.exception("repo-to-agent run %s failed", run_id)
-            run_store.set_run_status(run_id, "failed", error=str(e))
-
-    thread = threading.Thread(target=run_in_background)
-    thread.start()
     return JSONResponse(status_code=200, content={"run_id": run_id, "status": "queued"})
@@ -7,21 +7,23 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-import threading
 from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, Depends, Query, Request
 from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.config import get_settings
-from app.dependencies import get_provider
+from app.dependencies import get_provider, get_tenant_id
 from app.engine import new_request_id
 from app.providers import BaseProvider
-from app.registry_adapter import spec_to_preset
-from app.runtime.runner import run_runner
+from app.registry_cache import aget_registry_preset
+from app.runtime.runner import arun_runner
+from app.runtime.scheduler import aenqueue_run
 from app.runtime.tools.registry import DefaultToolRegistry
-from app.storage import registry_store
 from app.storage import run_store
+from app.storage.db import connect
+from app.storage.executor import run_db
+from app.storage.run_events import get_run_event_bus
 from app.utils.redaction import cap_text, redact_secrets
 
 logger = logging.getLogger("agent-gateway")
@@ -32,8 +34,6 @@ router = APIRouter(prefix="/runs", tags=["runs"])
 VERBOSE_JSON_MAX_CHARS = 10000
 # SSE summary max length for step payload when verbose=false
 SSE_SUMMARY_MAX_CHARS = 500
-# Poll interval for SSE (seconds)
-SSE_POLL_INTERVAL = 0.35
 
 
 def _run_not_found() -> JSONResponse:
@@ -49,7 +49,7 @@ def _run_not_found() -> JSONResponse:
 @router.get("/{run_id}")
 async def get_run(run_id: str) -> JSONResponse:
     """Return run status, step_count, timestamps, and error if any."""
-    run = run_store.get_run(run_id)
+    run = await run_store.aget_run(run_id)
     if run is None:
         return _run_not_found()
     payload: Dict[str, Any] = {
@@ -71,7 +71,7 @@ async def get_run(run_id: str) -> JSONResponse:
 @router.get("/{run_id}/result")
 async def get_run_result(run_id: str) -> JSONResponse:
     """If succeeded: 200 with output. If running/queued: 202 with status. If failed: 400 with error."""
-    run = run_store.get_run(run_id)
+    run = await run_store.aget_run(run_id)
     if run is None:
         return _run_not_found()
     status = run["status"]
@@ -173,41 +173,61 @@ def _step_event_payload(step: Dict[str, Any], run_id: str, verbose: bool) -> Dic
     return base
 
 
+def _read_run_progress(run_id: str, after_step_index: Optional[int]) -> Any:
+    """Run row and steps after after_step_index, read in one executor hop."""
+    with connect():
+        run = run_store.get_run(run_id)
+        if run is None:
+            return None, []
+        return run, run_store.list_run_steps(run_id, after_step_index=after_step_index)
+
+
 async def _sse_generator(
     run_id: str,
     verbose: bool,
     heartbeat_seconds: float,
 ) -> Any:
-    """Async generator yielding SSE lines: run_started, step events, run_finished; heartbeat comments."""
-    run = run_store.get_run(run_id)
+    """
+    Async generator yielding SSE lines: run_started, step events, run_finished; heartbeat comments.
+
+    The run is re-read when the run event bus reports a write (or after its
+    fallback poll interval), not on a fixed short timer.
+    """
+    run = await run_store.aget_run(run_id)
     if run is None:
         yield f"event: error\ndata: {json.dumps({'error': 'RUN_NOT_FOUND', 'run_id': run_id})}\n\n"
         return
     yield f"event: run\ndata: {json.dumps({'event': 'run_started', 'run_id': run_id, 'status': run.get('status')})}\n\n"
+    loop = asyncio.get_running_loop()
     last_step_index: Optional[int] = None
-    last_heartbeat = asyncio.get_event_loop().time()
+    last_heartbeat = loop.time()
     terminal = ("succeeded", "failed")
-    while True:
-        run = run_store.get_run(run_id)
-        if run is None:
-            break
-        status = run.get("status")
-        steps = run_store.list_run_steps(run_id, after_step_index=last_step_index)
-        for step in steps:
-            idx = step.get("step_index")
-            if idx is not None:
-                last_step_index = max(last_step_index or 0, idx)
-            payload = _step_event_payload(step, run_id, verbose)
-            yield f"event: step\ndata: {json.dumps(payload)}\n\n"
-        if status in terminal:
-            yield f"event: run\ndata: {json.dumps({'event': 'run_finished', 'run_id': run_id, 'status': status, 'error': run.get('error')})}\n\n"
-            break
-        # Heartbeat
-        now = asyncio.get_event_loop().time()
-        if heartbeat_seconds > 0 and (now - last_heartbeat) >= heartbeat_seconds:
-            yield ": heartbeat\n\n"
-            last_heartbeat = now
-        await asyncio.sleep(SSE_POLL_INTERVAL)
+    bus = get_run_event_bus()
+    # Subscribe before the first read so a write between the read and the wait is not missed.
+    async with bus.subscribe(run_id) as subscription:
+        while True:
+            run, steps = await run_db(_read_run_progress, run_id, last_step_index)
+            if run is None:
+                break
+            status = run.get("status")
+            for step in steps:
+                idx = step.get("step_index")
+                if idx is not None:
+                    last_step_index = max(last_step_index or 0, idx)
+                payload = _step_event_payload(step, run_id, verbose)
+                yield f"event: step\ndata: {json.dumps(payload)}\n\n"
+            if status in terminal:
+                yield f"event: run\ndata: {json.dumps({'event': 'run_finished', 'run_id': run_id, 'status': status, 'error': run.get('error')})}\n\n"
+                break
+            # Wait for a write, the fallback poll, or the next heartbeat, whichever comes first.
+            timeout = bus.poll_interval()
+            if heartbeat_seconds > 0:
+                timeout = min(timeout, last_heartbeat + heartbeat_seconds - loop.time())
+            await subscription.wait(timeout)
+            now = loop.time()
+            if heartbeat_seconds > 0 and (now - last_heartbeat) >= heartbeat_seconds:
+                yield ": heartbeat\n\n"
+                last_heartbeat = now
 
 
 @router.get("/{run_id}/events")
@@ -216,8 +236,8 @@ async def get_run_events(
     verbose: Optional[bool] = Query(False, alias="verbose"),
     heartbeat_seconds: Optional[float] = Query(10, alias="heartbeat_seconds"),
 ) -> StreamingResponse:
-    """Server-Sent Events stream: run_started, step events, run_finished. Poll-based; use heartbeat_seconds to keep connection alive."""
-    run = run_store.get_run(run_id)
+    """Server-Sent Events stream: run_started, step events, run_finished. Pushed on run writes; use heartbeat_seconds to keep connection alive."""
+    run = await run_store.aget_run(run_id)
     if run is None:
         return _run_not_found()
     return StreamingResponse(
@@ -242,7 +262,7 @@ async def replay_run(
     Body: wait (default true), session_id_override?, write_back (default false).
     Returns new run_id, status, output/error.
     """
-    original = run_store.get_run(run_id)
+    original = await run_store.aget_run(run_id)
     if original is None:
         return _run_not_found()
     try:
@@ -280,8 +300,8 @@ async def replay_run(
     if write_back:
         session_id = session_id_override if session_id_override is not None else original.get("session_id")
 
-    spec = registry_store.get_agent(agent_id, version=agent_version)
-    if spec is None:
+    preset = await aget_registry_preset(agent_id, version=agent_version)
+    if preset is None:
         return JSONResponse(
             status_code=404,
             content={
@@ -289,9 +309,23 @@ async def replay_run(
                 "meta": {"request_id": new_request_id()},
             },
         )
-    preset = spec_to_preset(spec)
-    resolved_version = spec.get("version", "latest")
-    run = run_store.create_run(
+    resolved_version = preset.version
+    request_id = new_request_id()
+    if not wait:
+        run = await aenqueue_run(
+            agent_id,
+            resolved_version,
+            session_id,
+            input_json,
+            job_kind="agent_run",
+            job={"request_id": request_id},
+            tenant_id=get_tenant_id(request),
+            parent_run_id=run_id,
+            context={"provider": provider},
+        )
+        return JSONResponse(status_code=200, content={"run_id": run["id"], "status": "queued", "parent_run_id": run_id})
+
+    run = await run_store.acreate_run(
         agent_id,
         resolved_version,
         session_id,
@@ -299,66 +333,48 @@ async def replay_run(
         parent_run_id=run_id,
     )
     new_run_id = run["id"]
-    request_id = new_request_id()
     tools_enabled = get_settings().tools_enabled
     tool_registry = DefaultToolRegistry() if tools_enabled else None
     limits = getattr(preset, "resolved_execution_limits", None) or {}
 
-    if wait:
-        run_runner(
-            preset=preset,
-            provider=provider,
-            input_payload=input_json,
-            run_id=new_run_id,
-            session_id=session_id,
-            request_id=request_id,
-            tool_registry=tool_registry,
-            max_steps=limits.get("max_steps"),
-            max_wall_time_seconds=limits.get("max_wall_time_seconds"),
-        )
-        run = run_store.get_run(new_run_id)
-        if run is None:
-            return JSONResponse(
-                status_code=500,
-                content={
-                    "error": {"code": "INTERNAL_ERROR", "message": "Run not found after execution"},
-                    "meta": {"request_id": request_id},
-                },
-            )
-        meta: Dict[str, Any] = {"step_count": run.get("step_count", 0), "parent_run_id": run_id}
-        if session_id is not None:
-            meta["session_id"] = session_id
-        steps = run_store.list_run_steps(new_run_id)
-        meta["tool_calls_used"] = sum(1 for s in steps if s.get("step_type") == "tool_call")
-        meta["max_tool_calls"] = (
-            limits.get("max_tool_calls") if limits.get("max_tool_calls") is not None else get_settings().max_tool_calls
-        )
+    await arun_runner(
+        preset=preset,
+        provider=provider,
+        input_payload=input_json,
+        run_id=new_run_id,
+        session_id=session_id,
+        request_id=request_id,
+        tool_registry=tool_registry,
+        max_steps=limits.get("max_steps"),
+        max_wall_time_seconds=limits.get("max_wall_time_seconds"),
+    )
+    run = await run_store.aget_run(new_run_id)
+    if run is None:
         return JSONResponse(
-            status_code=200,
+            status_code=500,
             content={
-                "run_id": new_run_id,
-                "status": run["status"],
-                "output": run.get("output_json"),
-                "error": run.get("error"),
-                "meta": meta,
+                "error": {"code": "INTERNAL_ERROR", "message": "Run not found after execution"},
+                "meta": {"request_id": request_id},
             },
         )
-
-    def run_in_background() -> None:
-        run_runner(
-            preset=preset,
-            provider=provider,
-            input_payload=input_json,
-            run_id=new_run_id,
-            session_id=session_id,
-            request_id=request_id,
-            tool_registry=tool_registry,
-            max_steps=limits.get("max_steps"),
-            max_wall_time_seconds=limits.get("max_wall_time_seconds"),
-        )
-
-    threading.Thread(target=run_in_background).start()
-    return JSONResponse(status_code=200, content={"run_id": new_run_id, "status": "queued", "parent_run_id": run_id})
+    meta: Dict[str, Any] = {"step_count": run.get("step_count", 0), "parent_run_id": run_id}
+    if session_id is not None:
+        meta["session_id"] = session_id
+    steps = await run_store.alist_run_steps(new_run_id)
+    meta["tool_calls_used"] = sum(1 for s in steps if s.get("step_type") == "tool_call")
+    meta["max_tool_calls"] = (
+        limits.get("max_tool_calls") if limits.get("max_tool_calls") is not None else get_settings().max_tool_calls
+    )
+    return JSONResponse(
+        status_code=200,
+        content={
+            "run_id": new_run_id,
+            "status": run["status"],
+            "output": run.get("output_json"),
+            "error": run.get("error"),
+            "meta": meta,
+        },
+    )
 
 
 @router.get("/{run_id}/steps")
@@ -367,9 +383,9 @@ async def get_run_steps(
     verbose: Optional[bool] = Query(False, alias="verbose"),
 ) -> JSONResponse:
     """Return list of steps; with verbose=true include full action_json/tool_result_json (redacted/capped)."""
-    run = run_store.get_run(run_id)
+    run = await run_store.aget_run(run_id)
     if run is None:
         return _run_not_found()
-    steps = run_store.list_run_steps(run_id)
+    steps = await run_store.alist_run_steps(run_id)
     payload = [_redact_and_cap_step(s, verbose=bool(verbose)) for s in steps]
     return JSONResponse(status_code=200, content={"steps": payload})
@@ -46,7 +46,7 @@ async def post_sessions(request: Request) -> JSONResponse:
         preset = get_active_preset()
     except PresetLoadError as exc:
         return _session_error(500, "INTERNAL_ERROR", str(exc))
-    session_id = session_store.create_session(preset.id)
+    session_id = await session_store.acreate_session(preset.id)
     return JSONResponse(status_code=201, content={"session_id": session_id})
 
 
@@ -88,10 +88,10 @@ async def post_sessions_events(session_id: str, request: Request) -> JSONRespons
                 )
             enriched_events.append(merged)
         events = enriched_events
-    session = session_store.get_session(session_id)
+    session = await session_store.aget_session(session_id)
     if session is None:
         return _session_error(404, "NOT_FOUND", f"Session not found: {session_id}")
-    result = session_store.append_events_detailed(session_id, events)
+    result = await session_store.aappend_events_detailed(session_id, events)
     return JSONResponse(
         status_code=200,
         content={
@@ -111,7 +111,7 @@ async def get_sessions_id(session_id: str) -> JSONResponse:
     { session_id, agent_id, created_at, events, running_summary, summary_updated_at, summary_message_count }
     or 404.
     """
-    session = session_store.get_session(session_id)
+    session = await session_store.aget_session(session_id)
     if session is None:
         return _session_error(404, "NOT_FOUND", f"Session not found: {session_id}")
     return JSONResponse(status_code=200, content=session)
@@ -123,7 +123,7 @@ async def get_sessions_summary(session_id: str) -> JSONResponse:
     Get only the running_summary for a session.
     Returns 200 with { session_id, running_summary, summary_updated_at, summary_message_count } or 404.
     """
-    session = session_store.get_session(session_id)
+    session = await session_store.aget_session(session_id)
     if session is None:
         return _session_error(404, "NOT_FOUND", f"Session not found: {session_id}")
     return JSONResponse(
@@ -1,5 +1,5 @@
 """Agent runtime: runner loop and execution."""
 
-from .runner import run_runner
+from .runner import arun_runner, run_runner
 
-__all__ = ["run_runner"]
+__all__ = ["arun_runner", "run_runner"]
@@ -2,25 +2,42 @@
 Agent runtime runner: multi-step loop with run/step persistence.
 
 When tool_registry is provided, tool_call actions are executed and results
-fed back into the model until final or limits reached.
+fed back into the model until final or limits reached. A tool_calls action
+carries several independent calls, which are executed concurrently.
+
+run_runner blocks its thread; arun_runner is the same loop as a coroutine.
 """
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
+import math
 import time
-from typing import Any, Dict, List, Optional, Protocol
+from typing import Any, Callable, Dict, List, Optional, Protocol, Tuple
+
+from jsonschema import Draft7Validator
 
+from app import response_cache
 from app.config import get_settings
-from app.engine import _call_provider, _merge_and_truncate_memory, _memory_segment_text, write_back_session_events
+from app.engine import (
+    _acall_provider,
+    _call_provider,
+    _merge_and_truncate_memory,
+    _stored_memory_events,
+    memory_window,
+    write_back_session_events,
+)
 from app.models import MemoryPolicy
 from app.preset_loader import Preset
+from app.prompt_builder import RunPromptBuilder
 from app.providers import BaseProvider
 from app.storage import run_store
 from app.storage import session_store
-from app.utils.redaction import cap_text, redact_secrets
+from app.storage.executor import run_db
+from app.utils.redaction import redact_secrets
 from app.utils.run_logger import log_run_finish, log_run_start, log_step
+from app.utils.validators import validator_errors
 
 logger = logging.getLogger("agent-gateway")
 
@@ -46,19 +63,118 @@ ACTION_SCHEMA: Dict[str, Any] = {
             },
             "additionalProperties": True,
         },
+        # Independent calls the runner executes concurrently; each one counts towards max_tool_calls.
+        {
+            "type": "object",
+            "required": ["type", "tool_calls"],
+            "properties": {
+                "type": {"const": "tool_calls"},
+                "tool_calls": {
+                    "type": "array",
+                    "minItems": 1,
+                    "items": {
+                        "type": "object",
+                        "required": ["tool_name", "args"],
+                        "properties": {"tool_name": {"type": "string"}, "args": {}},
+                        "additionalProperties": True,
+                    },
+                },
+            },
+            "additionalProperties": True,
+        },
     ]
 }
+# Compiled once; ACTION_SCHEMA never changes.
+_ACTION_VALIDATOR = Draft7Validator(ACTION_SCHEMA)
 
 TOOLS_DISABLED_MESSAGE = "Tool calls are not enabled yet for this deployment."
 
 
 class ToolRegistry(Protocol):
-    """Interface for tool execution. execute() raises ToolExecutionError on policy/execution failure."""
+    """
+    Interface for tool execution. execute() raises ToolExecutionError on policy/execution failure.
+
+    Registries may also define `async aexecute(tool_name, args, run_context)`; arun_runner
+    awaits it when present and otherwise runs execute() in a worker thread.
+    """
 
     def execute(self, tool_name: str, args: Dict[str, Any], run_context: Any) -> Dict[str, Any]:
         ...
 
 
+class _LoopIO:
+    """
+    How the run loop waits. run_runner drives the loop on a private event loop in
+    its worker thread and calls the sync store and provider APIs inline; arun_runner
+    drives it on the caller's event loop and awaits the async variants instead.
+    Tool calls always run concurrently (async tools, or sync tools in threads).
+    """
+
+    def __init__(self, *, native_async: bool) -> None:
+        self.native_async = native_async
+
+    async def db(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if self.native_async:
+            return await run_db(fn, *args, **kwargs)
+        return fn(*args, **kwargs)
+
+    async def cache_lookup(self, key: str) -> Any:
+        if self.native_async:
+            return await response_cache.alookup(key)
+        return response_cache.lookup(key)
+
+    async def cache_store(self, key: str, preset: Preset, result: Dict[str, Any], raw_text: str, ttl: int) -> None:
+        if self.native_async:
+            await response_cache.astore(key, preset, result, raw_text, ttl)
+        else:
+            response_cache.store(key, preset, result, raw_text, ttl)
+
+    async def complete(self, provider: BaseProvider, prompt: str) -> Any:
+        if self.native_async:
+            return await _acall_provider(provider, prompt=prompt, schema=ACTION_SCHEMA)
+        return _call_provider(provider, prompt=prompt, schema=ACTION_SCHEMA)
+
+    async def execute_tool(
+        self, tool_registry: ToolRegistry, tool_name: str, args: Dict[str, Any], run_context: Any
+    ) -> Tuple[Dict[str, Any], int]:
+        """Execute one tool call; returns (result, latency_ms)."""
+        tool_start = time.monotonic()
+        native = getattr(tool_registry, "aexecute", None)
+        if self.native_async and callable(native):
+            result = await native(tool_name, args, run_context)
+        else:
+            result = await asyncio.to_thread(tool_registry.execute, tool_name, args, run_context)
+        return result, int((time.monotonic() - tool_start) * 1000)
+
+    async def update_summary(self, provider: BaseProvider, preset: Preset, session_id: str) -> None:
+        from app.memory.summarizer import amaybe_update_running_summary, maybe_update_running_summary
+
+        if self.native_async:
+            events = await session_store.aget_session_events(session_id)
+            await amaybe_update_running_summary(provider=provider, preset=preset, session_id=session_id, events=events)
+        else:
+            events = session_store.get_session_events(session_id)
+            maybe_update_running_summary(provider=provider, preset=preset, session_id=session_id, events=events)
+
+
+def _tool_calls_of(action: Dict[str, Any]) -> List[Tuple[Dict[str, Any], str, Dict[str, Any]]]:
+    """(action, tool_name, args) per call of a tool_call / tool_calls action."""
+    if action.get("type") == "tool_call":
+        entries: List[Any] = [action]
+    else:
+        entries = action.get("tool_calls") if isinstance(action.get("tool_calls"), list) else []
+    calls: List[Tuple[Dict[str, Any], str, Dict[str, Any]]] = []
+    for entry in entries:
+        entry = entry if isinstance(entry, dict) else {}
+        tool_name = entry.get("tool_name") if isinstance(entry.get("tool_name"), str) else ""
+        tool_args = entry.get("args") if isinstance(entry.get("args"), dict) else {}
+        if action.get("type") == "tool_calls":
+            # Each call of a batch is stored and rendered like a single tool_call action.
+            entry = {"type": "tool_call", "tool_name": tool_name, "args": tool_args}
+        calls.append((entry, tool_name, tool_args))
+    return calls
+
+
 def _build_prompt(
     preset: Preset,
     merged_events: List[Dict[str, Any]],
@@ -69,63 +185,37 @@ def _build_prompt(
     max_tool_prompt_chars: int = 8000,
     running_summary: Optional[str] = None,
 ) -> str:
-    """Build full prompt with optional tool description and conversation history."""
-    pretty_input = json.dumps(input_payload, indent=2, sort_keys=True)
-    parts = [
-        preset.prompt.strip(),
-        "",
-        f"# Primitive: {preset.primitive}",
-    ]
-    if running_summary:
-        rs = running_summary.strip()
-        if rs:
-            parts.append("# Memory (summary):\n" + rs + "\n\n")
-    if merged_events:
-        parts.append(_memory_segment_text(merged_events))
-    parts.append(f"# Input JSON:\n{pretty_input}\n\n")
+    """Build full prompt with optional tool description and conversation history (non-incremental)."""
+    builder = _prompt_builder(
+        preset, merged_events, input_payload, tool_registry, run_context,
+        max_tool_prompt_chars=max_tool_prompt_chars, running_summary=running_summary,
+    )
+    for turn in conversation_turns:
+        builder.add_turn(turn["action"], turn.get("tool_name", ""), turn.get("tool_result"))
+    return builder.build()
 
-    if tool_registry is not None and run_context is not None and run_context.allowed_tools:
-        tool_lines: List[str] = []
-        allowed = run_context.allowed_tools
-        if "http_request" in allowed:
-            tool_lines.append(
-                "- http_request: args { method?, url (required), headers?, query?, json?, data? }. "
-                "method one of GET,POST,PUT,PATCH,DELETE. Do not pass Authorization or Cookie."
-            )
-        if "github_repo_read" in allowed:
-            tool_lines.append(
-                "- github_repo_read: args { owner, repo (required), ref?, path?, mode (overview|tree|file|sample), max_entries?, max_file_chars? }. "
-                "Read-only repo inspection."
-            )
-        for name in allowed:
-            if name not in ("http_request", "github_repo_read") and name:
-                tool_lines.append(f"- {name}: (see tool schema)")
-        parts.append("# Available tools (use only when necessary; respect allowed domains):\n")
-        parts.append("\n".join(tool_lines) + "\n\n")
-        tools_list = ", ".join(f'"{t}"' for t in allowed)
-        parts.append(
-            f"Respond with JSON: either {{\"type\": \"final\", \"output\": <result>}} or "
-            f"{{\"type\": \"tool_call\", \"tool_name\": <one of {tools_list}>, \"args\": {{...}}}}.\n"
-            "Return final when you have enough information.\n\n"
-        )
 
-    for turn in conversation_turns:
-        parts.append("Assistant: " + json.dumps(turn["action"], sort_keys=True) + "\n")
-        if turn.get("tool_result") is not None:
-            tool_result_str = json.dumps(turn["tool_result"], sort_keys=True)
-            if max_tool_prompt_chars > 0 and len(tool_result_str) > max_tool_prompt_chars:
-                tool_result_str = cap_text(tool_result_str, max_tool_prompt_chars)
-            parts.append("Tool (" + turn.get("tool_name", "") + "): " + tool_result_str + "\n\n")
-        parts.append("Respond with next JSON action (final or tool_call).\n\n")
-
-    if not conversation_turns:
-        parts.append(
-            "Respond ONLY with a single JSON object. It must be exactly one of:\n"
-            '- {"type": "final", "output": <your result>}\n'
-            '- {"type": "tool_call", "tool_name": "<name>", "args": <object>}\n'
-            "No other text or markdown."
-        )
-    return "\n".join(parts)
+def _prompt_builder(
+    preset: Preset,
+    merged_events: List[Dict[str, Any]],
+    input_payload: Dict[str, Any],
+    tool_registry: Optional[ToolRegistry],
+    run_context: Optional[Any],
+    *,
+    max_tool_prompt_chars: int,
+    running_summary: Optional[str],
+) -> RunPromptBuilder:
+    allowed_tools = None
+    if tool_registry is not None and run_context is not None and run_context.allowed_tools:
+        allowed_tools = run_context.allowed_tools
+    return RunPromptBuilder(
+        preset,
+        merged_events,
+        input_payload,
+        allowed_tools=allowed_tools,
+        max_tool_prompt_chars=max_tool_prompt_chars,
+        running_summary=running_summary,
+    )
 
 
 def run_runner(
@@ -139,12 +229,93 @@ def run_runner(
     tool_registry: Optional[ToolRegistry] = None,
     max_steps: Optional[int] = None,
     max_wall_time_seconds: Optional[int] = None,
+    lease: Optional[run_store.RunLease] = None,
 ) -> None:
     """
     Execute the agent run: set status running, run loop (final or tool_call),
     persist steps, and optionally write back to session on success.
     When tool_registry is set, tool calls are executed and results fed back until final or limits.
+
+    Blocks the calling thread (run scheduler workers, evals); async code awaits arun_runner.
+    Queue workers pass their lease (run_store.run_lease()); the run then stops as soon as
+    a write finds it requeued to another worker.
+    """
+    asyncio.run(
+        _run(
+            _LoopIO(native_async=False),
+            run_store.RunStepJournal(run_id, lease=lease),
+            preset=preset,
+            provider=provider,
+            input_payload=input_payload,
+            run_id=run_id,
+            session_id=session_id,
+            request_id=request_id,
+            tool_registry=tool_registry,
+            max_steps=max_steps,
+            max_wall_time_seconds=max_wall_time_seconds,
+        )
+    )
+
+
+async def arun_runner(
+    *,
+    preset: Preset,
+    provider: BaseProvider,
+    input_payload: Dict[str, Any],
+    run_id: str,
+    session_id: Optional[str] = None,
+    request_id: Optional[str] = None,
+    tool_registry: Optional[ToolRegistry] = None,
+    max_steps: Optional[int] = None,
+    max_wall_time_seconds: Optional[int] = None,
+    lease: Optional[run_store.RunLease] = None,
+) -> None:
+    """
+    Async run_runner: waits on the provider, tools and the stores without holding a
+    thread (async providers and tools are awaited, store calls go to the DB executor).
     """
+    await _run(
+        _LoopIO(native_async=True),
+        # Flushed explicitly at every step boundary, never inline on the event loop.
+        run_store.RunStepJournal(run_id, flush_interval_seconds=math.inf, lease=lease),
+        preset=preset,
+        provider=provider,
+        input_payload=input_payload,
+        run_id=run_id,
+        session_id=session_id,
+        request_id=request_id,
+        tool_registry=tool_registry,
+        max_steps=max_steps,
+        max_wall_time_seconds=max_wall_time_seconds,
+    )
+
+
+async def _run(io: _LoopIO, journal: run_store.RunStepJournal, **kwargs: Any) -> None:
+    try:
+        await _run_loop(io, journal, **kwargs)
+    except run_store.RunLeaseLost:
+        # Requeued after a missed heartbeat and claimed by another worker, which owns it now.
+        logger.warning("run_id=%s was requeued to another worker; stopping", journal.run_id)
+    finally:
+        # Steps buffered before an unexpected error are still persisted.
+        if not journal.lease_lost:
+            await io.db(journal.flush)
+
+
+async def _run_loop(
+    io: _LoopIO,
+    journal: run_store.RunStepJournal,
+    *,
+    preset: Preset,
+    provider: BaseProvider,
+    input_payload: Dict[str, Any],
+    run_id: str,
+    session_id: Optional[str],
+    request_id: Optional[str],
+    tool_registry: Optional[ToolRegistry],
+    max_steps: Optional[int],
+    max_wall_time_seconds: Optional[int],
+) -> None:
     from app.runtime.tools.registry import build_run_context
     from app.runtime.tools.http_tool import ToolExecutionError
 
@@ -156,7 +327,7 @@ def run_runner(
     if tool_registry is not None:
         run_context = build_run_context(run_id=run_id, preset=preset)
 
-    run_store.set_run_status(run_id, "running")
+    await io.db(journal.set_status, "running")
     try:
         log_run_start(run_id, preset.id, getattr(preset, "version", "unknown"))
     except Exception:
@@ -167,68 +338,65 @@ def run_runner(
     merged_events: List[Dict[str, Any]] = []
     running_summary: Optional[str] = None
     if session_id:
-        session = session_store.get_session(session_id)
+        policy = getattr(preset, "memory_policy", None) or MemoryPolicy(mode="last_n", max_messages=10, max_chars=8000)
+        session = await io.db(session_store.get_session_memory, session_id, **memory_window(policy))
         stored: List[Dict[str, Any]] = []
-        if session and session.get("events"):
-            stored = [
-                {
-                    "role": e.get("role", "user"),
-                    "content": e.get("content", ""),
-                    "event_type": e.get("event_type"),
-                    "run_id": e.get("run_id"),
-                    "step_index": e.get("step_index"),
-                    "tool_name": e.get("tool_name"),
-                }
-                for e in session["events"]
-            ]
+        if session is not None:
+            stored = _stored_memory_events(session["events"])
             running_summary = str(session.get("running_summary") or "") or None
-        policy = getattr(preset, "memory_policy", None) or MemoryPolicy(mode="last_n", max_messages=10, max_chars=8000)
         merged_events = _merge_and_truncate_memory(stored, None, policy)
 
-    conversation_turns: List[Dict[str, Any]] = []
-    max_tool_prompt_chars = get_settings().max_tool_prompt_chars
-    prompt = _build_prompt(
+    # Static prefix (header, memory, input, tools) is rendered once; each tool turn is appended.
+    prompt_builder = _prompt_builder(
         preset,
         merged_events,
         input_payload,
-        conversation_turns,
         tool_registry,
         run_context,
-        max_tool_prompt_chars=max_tool_prompt_chars,
+        max_tool_prompt_chars=get_settings().max_tool_prompt_chars,
         running_summary=running_summary,
     )
+    prompt = prompt_builder.build()
 
     final_output: Optional[Dict[str, Any]] = None
     raw_text_for_session: Optional[str] = None
     succeeded = False
+    cache_ttl = response_cache.ttl_for(preset)
 
     for step_index in range(1, max_steps + 1):
         if time.monotonic() - start_wall > max_wall_time_seconds:
             err_code = "timeout"
-            run_store.append_run_step(
-                run_id, step_index, "error", {},
+            journal.append_step(
+                step_index, "error", {},
                 error="max_wall_time_exceeded",
                 error_code=err_code,
             )
-            run_store.set_run_status(run_id, "failed", error=f"{err_code}: max_wall_time_exceeded")
+            await io.db(journal.set_status, "failed", error=f"{err_code}: max_wall_time_exceeded")
             try:
                 log_run_finish(run_id, "failed", error="max_wall_time_exceeded")
             except Exception:
                 pass
             return
 
+        # Step boundary: persist buffered steps before waiting on the provider.
+        await io.db(journal.flush)
         model_start = time.monotonic()
         try:
-            result = _call_provider(provider, prompt=prompt, schema=ACTION_SCHEMA)
+            cache_key = response_cache.make_key(provider, preset, prompt, ACTION_SCHEMA) if cache_ttl else None
+            result = await io.cache_lookup(cache_key) if cache_key else None
+            if result is None:
+                result = await io.complete(provider, prompt)
+                if cache_key and cache_ttl and not validator_errors(_ACTION_VALIDATOR, result.parsed_json):
+                    await io.cache_store(cache_key, preset, result.parsed_json, result.raw_text, cache_ttl)
         except Exception as exc:
             err_code = "provider_failure"
             safe_msg = str(exc)[:500]
-            run_store.append_run_step(
-                run_id, step_index, "error", {},
+            journal.append_step(
+                step_index, "error", {},
                 error=safe_msg,
                 error_code=err_code,
             )
-            run_store.set_run_status(run_id, "failed", error=f"{err_code}: {safe_msg}")
+            await io.db(journal.set_status, "failed", error=f"{err_code}: {safe_msg}")
             try:
                 log_run_finish(run_id, "failed", error=safe_msg)
             except Exception:
@@ -240,12 +408,12 @@ def run_runner(
         parsed = result.parsed_json
         if not isinstance(parsed, dict):
             err_code = "invalid_action_format"
-            run_store.append_run_step(
-                run_id, step_index, "error", {},
+            journal.append_step(
+                step_index, "error", {},
                 error="invalid_action_format",
                 error_code=err_code,
             )
-            run_store.set_run_status(run_id, "failed", error=f"{err_code}: invalid_action_format")
+            await io.db(journal.set_status, "failed", error=f"{err_code}: invalid_action_format")
             try:
                 log_run_finish(run_id, "failed", error="invalid_action_format")
             except Exception:
@@ -253,34 +421,34 @@ def run_runner(
             return
 
         action_type = parsed.get("type")
-        run_store.append_run_step(
-            run_id, step_index, "llm_action", parsed,
+        journal.append_step(
+            step_index, "llm_action", parsed,
             latency_ms=model_latency_ms,
         )
         try:
             log_step(run_id, step_index, "llm_action", action_type or "llm_action", latency_ms=model_latency_ms)
         except Exception:
             pass
-        run_store.increment_run_step_count(run_id)
+        journal.count_step()
 
         if action_type == "final":
             output_val = parsed.get("output")
             if output_val is None:
                 err_code = "missing_output"
-                run_store.append_run_step(
-                    run_id, step_index + 1, "error", parsed,
+                journal.append_step(
+                    step_index + 1, "error", parsed,
                     error="missing_output",
                     error_code=err_code,
                 )
-                run_store.set_run_status(run_id, "failed", error=f"{err_code}: missing_output")
+                await io.db(journal.set_status, "failed", error=f"{err_code}: missing_output")
                 try:
                     log_run_finish(run_id, "failed", error="missing_output")
                 except Exception:
                     pass
                 return
             final_output = output_val if isinstance(output_val, dict) else {"result": output_val}
-            run_store.append_run_step(run_id, step_index + 1, "final", parsed)
-            run_store.set_run_status(run_id, "succeeded", output_json=final_output)
+            journal.append_step(step_index + 1, "final", parsed)
+            await io.db(journal.set_status, "succeeded", output_json=final_output)
             try:
                 log_run_finish(run_id, "succeeded")
             except Exception:
@@ -288,89 +456,100 @@ def run_runner(
             succeeded = True
             break
 
-        if action_type == "tool_call":
-            tool_name = parsed.get("tool_name") or ""
-            tool_args = parsed.get("args")
-            if not isinstance(tool_args, dict):
-                tool_args = {}
-            # Store redacted args
-            run_store.append_run_step(
-                run_id, step_index + 1, "tool_call", parsed,
-                tool_name=tool_name, tool_args_json=redact_secrets(tool_args)
-            )
+        if action_type in ("tool_call", "tool_calls"):
+            calls = _tool_calls_of(parsed)
+            for call_action, tool_name, tool_args in calls:
+                # Store redacted args
+                journal.append_step(
+                    step_index + 1, "tool_call", call_action,
+                    tool_name=tool_name, tool_args_json=redact_secrets(tool_args)
+                )
             if tool_registry is None:
                 err_code = "tools_disabled"
-                run_store.append_run_step(
-                    run_id, step_index + 2, "error", {},
+                journal.append_step(
+                    step_index + 2, "error", {},
                     error=TOOLS_DISABLED_MESSAGE,
                     error_code=err_code,
                 )
-                run_store.set_run_status(run_id, "failed", error=f"{err_code}: {TOOLS_DISABLED_MESSAGE}")
+                await io.db(journal.set_status, "failed", error=f"{err_code}: {TOOLS_DISABLED_MESSAGE}")
                 try:
                     log_run_finish(run_id, "failed", error=TOOLS_DISABLED_MESSAGE)
                 except Exception:
                     pass
                 return
-            try:
-                tool_start = time.monotonic()
-                tool_result = tool_registry.execute(tool_name, tool_args, run_context)
-                tool_latency_ms = int((time.monotonic() - tool_start) * 1000)
-            except ToolExecutionError as e:
+            await io.db(journal.flush)
+            # The registry checks the budget per call; concurrent calls would all see the
+            # same tool_calls_used, so a batch is checked against the budget as a whole.
+            if not calls or (len(calls) > 1 and run_context.tool_calls_used + len(calls) > run_context.max_tool_calls):
+                outcomes: List[Any] = [
+                    ToolExecutionError("max_tool_calls_exceeded" if calls else "tool_calls must not be empty")
+                ]
+            else:
+                outcomes = await asyncio.gather(
+                    *(io.execute_tool(tool_registry, tool_name, tool_args, run_context) for _, tool_name, tool_args in calls),
+                    return_exceptions=True,
+                )
+            results_for_prompt: List[Tuple[str, Any]] = []
+            for (call_action, tool_name, tool_args), outcome in zip(calls, outcomes):
+                if isinstance(outcome, BaseException):
+                    continue
+                tool_result, tool_latency_ms = outcome
+                run_context.tool_calls_used += 1
+                journal.append_step(
+                    step_index + 2, "tool_result", call_action,
+                    tool_name=tool_name, tool_result_json=tool_result,
+                    tool_latency_ms=tool_latency_ms,
+                    latency_ms=tool_latency_ms,
+                )
+                try:
+                    if tool_name == "http_request":
+                        tr_summary = str(tool_result.get("status_code", "")) + " " + (str(tool_result.get("text", ""))[:200] or "")
+                    else:
+                        # Non-HTTP tools: safe summary without assuming status_code/text
+                        tr_summary = str(tool_result)[:200] if tool_result else ""
+                    log_step(run_id, step_index + 2, "tool_result", tr_summary, latency_ms=tool_latency_ms)
+                except Exception:
+                    pass
+                # Normalize for model: status_code, content_type, body (capped), truncated, url
+                from app.runtime.tools.http_tool import normalize_http_result_for_model
+                if tool_name == "http_request":
+                    tool_result_for_prompt = normalize_http_result_for_model(
+                        tool_result, url=tool_args.get("url") if isinstance(tool_args.get("url"), str) else None
+                    )
+                else:
+                    tool_result_for_prompt = tool_result
+                results_for_prompt.append((tool_name, tool_result_for_prompt))
+            failure = next((o for o in outcomes if isinstance(o, BaseException)), None)
+            if failure is not None:
+                if not isinstance(failure, ToolExecutionError):
+                    raise failure
                 err_code = "tool_execution_failed"
-                err_msg = getattr(e, "message", str(e))[:500]
-                run_store.append_run_step(
-                    run_id, step_index + 2, "error", {},
+                err_msg = getattr(failure, "message", str(failure))[:500]
+                journal.append_step(
+                    step_index + 2, "error", {},
                     error=err_msg,
                     error_code=err_code,
                 )
-                run_store.set_run_status(run_id, "failed", error=f"{err_code}: {err_msg}")
+                await io.db(journal.set_status, "failed", error=f"{err_code}: {err_msg}")
                 try:
                     log_run_finish(run_id, "failed", error=err_msg)
                 except Exception:
                     pass
                 return
-            run_context.tool_calls_used += 1
-            run_store.append_run_step(
-                run_id, step_index + 2, "tool_result", parsed,
-                tool_name=tool_name, tool_result_json=tool_result,
-                tool_latency_ms=tool_latency_ms,
-                latency_ms=tool_latency_ms,
-            )
-            try:
-                if tool_name == "http_request":
-                    tr_summary = str(tool_result.get("status_code", "")) + " " + (str(tool_result.get("text", ""))[:200] or "")
-                else:
-                    # Non-HTTP tools: safe summary without assuming status_code/text
-                    tr_summary = str(tool_result)[:200] if tool_result else ""
-                log_step(run_id, step_index + 2, "tool_result", tr_summary, latency_ms=tool_latency_ms)
-            except Exception:
-                pass
-            # Normalize for model: status_code, content_type, body (capped), truncated, url
-            from app.runtime.tools.http_tool import normalize_http_result_for_model
-            if tool_name == "http_request":
-                tool_result_for_prompt = normalize_http_result_for_model(
-                    tool_result, url=tool_args.get("url") if isinstance(tool_args.get("url"), str) else None
-                )
+            if action_type == "tool_call":
+                prompt_builder.add_turn(parsed, results_for_prompt[0][0], results_for_prompt[0][1])
             else:
-                tool_result_for_prompt = tool_result
-            conversation_turns.append({
-                "action": parsed,
-                "tool_name": tool_name,
-                "tool_result": tool_result_for_prompt,
-            })
-            prompt = _build_prompt(
-                preset, merged_events, input_payload, conversation_turns,
-                tool_registry, run_context, max_tool_prompt_chars=max_tool_prompt_chars,
-            )
+                prompt_builder.add_tool_calls_turn(parsed, results_for_prompt)
+            prompt = prompt_builder.build()
             continue
 
         err_code = "unknown_action_type"
-        run_store.append_run_step(
-            run_id, step_index + 1, "error", parsed,
+        journal.append_step(
+            step_index + 1, "error", parsed,
             error="unknown_action_type",
             error_code=err_code,
         )
-        run_store.set_run_status(run_id, "failed", error=f"{err_code}: unknown_action_type")
+        await io.db(journal.set_status, "failed", error=f"{err_code}: unknown_action_type")
         try:
             log_run_finish(run_id, "failed", error="unknown_action_type")
         except Exception:
@@ -379,12 +558,12 @@ def run_runner(
 
     if not succeeded:
         err_code = "max_steps_exceeded"
-        run_store.append_run_step(
-            run_id, max_steps + 1, "error", {},
+        journal.append_step(
+            max_steps + 1, "error", {},
             error="limit reached",
             error_code=err_code,
         )
-        run_store.set_run_status(run_id, "failed", error=f"{err_code}: limit reached")
+        await io.db(journal.set_status, "failed", error=f"{err_code}: limit reached")
         try:
             log_run_finish(run_id, "failed", error="max_steps_exceeded")
         except Exception:
@@ -392,7 +571,8 @@ def run_runner(
         return
 
     if succeeded and session_id and getattr(preset, "supports_memory", False) and final_output is not None:
-        write_back_session_events(
+        await io.db(
+            write_back_session_events,
             session_id=session_id,
             preset=preset,
             request_id=request_id,
@@ -402,14 +582,6 @@ def run_runner(
         )
         # Best-effort running summary update; failures must not break the run.
         try:
-            from app.memory.summarizer import maybe_update_running_summary
-
-            events = session_store.get_session_events(session_id)
-            maybe_update_running_summary(
-                provider=provider,
-                preset=preset,
-                session_id=session_id,
-                events=events,
-            )
+            await io.update_summary(provider, preset, session_id)
         except Exception:
             logger.warning("running_summary update failed for session_id=%s", session_id)
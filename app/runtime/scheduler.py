@@ -0,0 +1,402 @@
+"""
+Run scheduler: durable run queue and bounded worker pool for background runs.
+
+Async requests (POST /agents/{id}/runs with wait=false, POST /runs/{id}/replay
+with wait=false, POST /repo-to-agent) create their run with a job_kind: the run
+row is the queue entry (runs.status = 'queued'). One dispatcher thread per
+process claims queued runs into a pool of RUN_WORKERS threads, so a burst of
+requests waits in the database instead of starting one OS thread per run.
+
+- Claiming: oldest first; FOR UPDATE SKIP LOCKED on Postgres, so several gateway
+  processes share the queue; a conditional UPDATE on SQLite.
+- Concurrency: RUN_MAX_PER_AGENT and RUN_MAX_PER_TENANT cap the runs in flight
+  per agent and per tenant in this process; runs over a cap stay queued.
+- Crash recovery: the dispatcher heartbeats the runs it executes. Runs left
+  'running' without a heartbeat for RUN_STALE_SECONDS are requeued from scratch,
+  or failed once they were claimed RUN_MAX_ATTEMPTS times.
+- Restarts: queued runs survive in the database. What cannot be persisted (the
+  request's provider, a user's GitHub token) is kept in memory for the run; a
+  run claimed after a restart or by another process uses the defaults.
+
+Eval runs live in eval_runs, not runs: they are submitted to the same pool with
+submit(), which is bounded but in memory only.
+
+The dispatcher starts with the app lifespan, or on the first enqueue (scripts,
+TestClient without `with`). It only touches databases this process has
+migrated, so it never creates one on its own.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.config import get_settings
+from app.dependencies import get_provider
+from app.engine import new_request_id
+from app.registry_cache import get_registry_preset
+from app.runtime.runner import run_runner
+from app.runtime.tools.registry import DefaultToolRegistry
+from app.storage import run_store
+from app.storage.executor import async_variant
+from app.storage.migrations import is_schema_applied
+
+logger = logging.getLogger("agent-gateway")
+
+# handler(run, context): executes a claimed run and sets its terminal status.
+JobHandler = Callable[[Dict[str, Any], Dict[str, Any]], None]
+
+# In-memory context of runs that another process claimed is dropped after this long.
+_CONTEXT_TTL_SECONDS = 3600.0
+
+_handlers: Dict[str, JobHandler] = {}
+
+
+def register_job_kind(kind: str, handler: JobHandler) -> None:
+    """Make runs with job_kind=kind claimable by this process."""
+    _handlers[kind] = handler
+
+
+@dataclass
+class _LocalJob:
+    key: str
+    agent_id: str
+    tenant_id: Optional[str]
+    fn: Callable[[], None]
+
+
+class RunScheduler:
+    def __init__(self) -> None:
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._workers = 0
+        # key -> (agent_id, tenant_id, durable)
+        self._active: Dict[str, Tuple[str, Optional[str], bool]] = {}
+        self._local: Deque[_LocalJob] = deque()
+        self._contexts: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._last_heartbeat = 0.0
+        self._last_recovery = 0.0
+        self.claimed = 0
+        self.completed = 0
+        self.recovered = 0
+
+    # -- lifecycle --------------------------------------------------------------
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._workers = max(1, get_settings().run_workers)
+            self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="run-worker")
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="run-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop claiming; runs in flight finish on their threads, queued runs stay in the database."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            executor, self._executor = self._executor, None
+        self._stop.set()
+        self._wake.set()
+        if thread is not None:
+            thread.join(timeout=5.0)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    # -- producers --------------------------------------------------------------
+
+    def enqueue_run(
+        self,
+        agent_id: str,
+        agent_version: str,
+        session_id: Optional[str],
+        input_json: Dict[str, Any],
+        *,
+        job_kind: str,
+        job: Optional[Dict[str, Any]] = None,
+        tenant_id: Optional[str] = None,
+        parent_run_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Create a queued run for job_kind and wake the dispatcher. Returns the run dict."""
+        run_id = str(uuid.uuid4())
+        if context:
+            # Registered before the row exists: the dispatcher may claim it right after the insert.
+            with self._lock:
+                self._contexts[run_id] = (time.monotonic(), context)
+        try:
+            run = run_store.create_run(
+                agent_id,
+                agent_version,
+                session_id,
+                input_json,
+                parent_run_id=parent_run_id,
+                run_id=run_id,
+                job_kind=job_kind,
+                job_json=job or {},
+                tenant_id=tenant_id,
+            )
+        except Exception:
+            with self._lock:
+                self._contexts.pop(run_id, None)
+            raise
+        self.start()
+        self._wake.set()
+        return run
+
+    def submit(self, fn: Callable[[], None], *, agent_id: str, tenant_id: Optional[str] = None) -> None:
+        """Run fn on the worker pool under the same caps (in memory: lost on restart)."""
+        with self._lock:
+            self._local.append(_LocalJob(f"local:{uuid.uuid4()}", agent_id, tenant_id, fn))
+        self.start()
+        self._wake.set()
+
+    # -- dispatcher -------------------------------------------------------------
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(timeout=max(0.05, get_settings().run_queue_poll_seconds))
+            # Cleared before the tick so a wake during it triggers another one.
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self._tick()
+            except Exception as exc:
+                # Exception type only: psycopg errors can include the conninfo.
+                logger.warning("run scheduler tick failed (%s)", type(exc).__name__)
+
+    def _tick(self) -> None:
+        settings = get_settings()
+        self._start_local_jobs(settings)
+        if not is_schema_applied():
+            return
+        now = time.monotonic()
+        stale_seconds = max(1.0, settings.run_stale_seconds)
+        if now - self._last_heartbeat >= stale_seconds / 3:
+            self._last_heartbeat = now
+            with self._lock:
+                durable = [key for key, (_, _, is_durable) in self._active.items() if is_durable]
+            run_store.heartbeat_runs(self.worker_id, durable)
+        if now - self._last_recovery >= stale_seconds / 2:
+            self._last_recovery = now
+            self._recover(settings, stale_seconds)
+            self._prune_contexts(now)
+        self._claim(settings)
+
+    def _caps_allow(self, settings: Any, pending: Counter, agent_id: str, tenant_id: Optional[str]) -> bool:
+        with self._lock:
+            if len(self._active) + pending["*"] >= self._workers:
+                return False
+            counts = Counter()
+            for active_agent, active_tenant, _ in self._active.values():
+                counts[("agent", active_agent)] += 1
+                if active_tenant is not None:
+                    counts[("tenant", active_tenant)] += 1
+        counts.update(pending)
+        if settings.run_max_per_agent > 0 and counts[("agent", agent_id)] >= settings.run_max_per_agent:
+            return False
+        if (
+            tenant_id is not None
+            and settings.run_max_per_tenant > 0
+            and counts[("tenant", tenant_id)] >= settings.run_max_per_tenant
+        ):
+            return False
+        pending["*"] += 1
+        pending[("agent", agent_id)] += 1
+        if tenant_id is not None:
+            pending[("tenant", tenant_id)] += 1
+        return True
+
+    def _start_local_jobs(self, settings: Any) -> None:
+        pending: Counter = Counter()
+        with self._lock:
+            jobs = list(self._local)
+        started: List[_LocalJob] = []
+        for job in jobs:
+            if self._caps_allow(settings, pending, job.agent_id, job.tenant_id):
+                started.append(job)
+        if not started:
+            return
+        with self._lock:
+            for job in started:
+                self._local.remove(job)
+        for job in started:
+            self._dispatch(job.key, job.agent_id, job.tenant_id, False, job.fn)
+
+    def _claim(self, settings: Any) -> None:
+        with self._lock:
+            free = self._workers - len(self._active)
+        kinds = sorted(_handlers)
+        if free <= 0 or not kinds:
+            return
+        pending: Counter = Counter()
+        runs = run_store.claim_queued_runs(
+            self.worker_id,
+            kinds,
+            free,
+            lambda row: self._caps_allow(settings, pending, row["agent_id"], row.get("tenant_id")),
+        )
+        for run in runs:
+            self.claimed += 1
+            self._dispatch(run["id"], run["agent_id"], run.get("tenant_id"), True, self._job(run))
+
+    def _job(self, run: Dict[str, Any]) -> Callable[[], None]:
+        def execute() -> None:
+            with self._lock:
+                _, context = self._contexts.pop(run["id"], (0.0, {}))
+            handler = _handlers[run["job_kind"]]
+            try:
+                handler(run, context)
+            except run_store.RunLeaseLost:
+                logger.warning("background run %s was requeued to another worker; stopped", run["id"])
+            except Exception as exc:
+                logger.exception("background run %s failed", run["id"])
+                try:
+                    run_store.set_run_status(
+                        run["id"], "failed", error=str(exc)[:1000], lease=run_store.run_lease(run)
+                    )
+                except run_store.RunLeaseLost:
+                    pass
+
+        return execute
+
+    def _dispatch(self, key: str, agent_id: str, tenant_id: Optional[str], durable: bool, fn: Callable[[], None]) -> None:
+        with self._lock:
+            executor = self._executor
+            self._active[key] = (agent_id, tenant_id, durable)
+        if executor is None:
+            # Stopped between claim and dispatch; a durable run is recovered once its heartbeat is stale.
+            with self._lock:
+                self._active.pop(key, None)
+            return
+        future = executor.submit(self._execute, key, fn)
+        # Also called when stop() cancels a job that has not started.
+        future.add_done_callback(lambda _: self._finished(key))
+
+    @staticmethod
+    def _execute(key: str, fn: Callable[[], None]) -> None:
+        try:
+            fn()
+        except Exception:
+            logger.exception("background job %s failed", key)
+
+    def _finished(self, key: str) -> None:
+        with self._lock:
+            self._active.pop(key, None)
+            self.completed += 1
+        self._wake.set()
+
+    def _recover(self, settings: Any, stale_seconds: float) -> None:
+        stale_before = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - stale_seconds))
+        result = run_store.recover_stale_runs(stale_before, max(1, settings.run_max_attempts))
+        count = len(result["requeued"]) + len(result["failed"])
+        if count:
+            self.recovered += count
+            logger.warning(
+                "run scheduler recovered stale runs: requeued=%d failed=%d",
+                len(result["requeued"]),
+                len(result["failed"]),
+            )
+
+    def _prune_contexts(self, now: float) -> None:
+        with self._lock:
+            expired = [run_id for run_id, (at, _) in self._contexts.items() if now - at > _CONTEXT_TTL_SECONDS]
+            for run_id in expired:
+                del self._contexts[run_id]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "worker_id": self.worker_id,
+                "workers": self._workers,
+                "active": len(self._active),
+                "local_queued": len(self._local),
+                "claimed": self.claimed,
+                "completed": self.completed,
+                "recovered": self.recovered,
+                "running": self._thread is not None and self._thread.is_alive(),
+            }
+
+
+def _execute_agent_run(run: Dict[str, Any], context: Dict[str, Any]) -> None:
+    """Job kind "agent_run": POST /agents/{id}/runs and POST /runs/{id}/replay with wait=false."""
+    preset = get_registry_preset(run["agent_id"], version=run["agent_version"])
+    if preset is None:
+        run_store.set_run_status(
+            run["id"], "failed", error=f"Agent not found: {run['agent_id']}", lease=run_store.run_lease(run)
+        )
+        return
+    job = run.get("job_json") or {}
+    limits = getattr(preset, "resolved_execution_limits", None) or {}
+    run_runner(
+        preset=preset,
+        provider=context.get("provider") or get_provider(),
+        input_payload=run.get("input_json"),
+        run_id=run["id"],
+        session_id=run.get("session_id"),
+        request_id=job.get("request_id") or new_request_id(),
+        tool_registry=DefaultToolRegistry() if get_settings().tools_enabled else None,
+        max_steps=limits.get("max_steps"),
+        max_wall_time_seconds=limits.get("max_wall_time_seconds"),
+        lease=run_store.run_lease(run),
+    )
+
+
+register_job_kind("agent_run", _execute_agent_run)
+
+_scheduler = RunScheduler()
+
+
+def get_run_scheduler() -> RunScheduler:
+    return _scheduler
+
+
+def enqueue_run(
+    agent_id: str,
+    agent_version: str,
+    session_id: Optional[str],
+    input_json: Dict[str, Any],
+    *,
+    job_kind: str,
+    job: Optional[Dict[str, Any]] = None,
+    tenant_id: Optional[str] = None,
+    parent_run_id: Optional[str] = None,
+    context: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Queue a background run (see RunScheduler.enqueue_run)."""
+    return _scheduler.enqueue_run(
+        agent_id,
+        agent_version,
+        session_id,
+        input_json,
+        job_kind=job_kind,
+        job=job,
+        tenant_id=tenant_id,
+        parent_run_id=parent_run_id,
+        context=context,
+    )
+
+
+def start_run_scheduler() -> None:
+    _scheduler.start()
+
+
+def stop_run_scheduler() -> None:
+    _scheduler.stop()
+
+
+aenqueue_run = async_variant(enqueue_run)
@@ -1,21 +1,49 @@
 """
 GitHub read-only client: repo metadata, tree listing, file contents.
 Token from optional GITHUB_TOKEN env; never logged or exposed.
+
+All calls share one pooled httpx.Client. Refs are resolved to a commit SHA
+(DefaultGithubClient pins each ref once, and is kept for a whole run); trees
+and files are then read through the Git data API, walking trees from the
+commit's root tree. Commits, trees and blobs are immutable, so they are stored
+content-addressed by SHA under GITHUB_CACHE_DIR and served from disk across
+runs and workers. The mutable lookups (repo metadata, ref -> SHA) are
+revalidated with If-None-Match; GitHub does not count 304 answers against the
+rate limit. Cached objects are only reached through a ref resolved with the
+caller's token, so private content is not served to callers without access.
 """
 
 from __future__ import annotations
 
-import base64
+import hashlib
+import json
 import logging
-from typing import Any, Dict, List, Optional
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import httpx
 
+from app.config import get_settings
+
+from .result_cache import prune_directory
+
 logger = logging.getLogger("agent-gateway")
 
 API_BASE = "https://api.github.com"
 DEFAULT_TIMEOUT = 15.0
 ACCEPT = "application/vnd.github.v3+json"
+ACCEPT_SHA = "application/vnd.github.sha"
+ACCEPT_RAW = "application/vnd.github.raw"
+
+_SHA_RE = re.compile(r"[0-9a-f]{40}|[0-9a-f]{64}")
+_MAX_ETAGS = 2048
+_MAX_MEMORY_OBJECTS = 4096
+_PRUNE_EVERY = 256
+
 
 class GithubClientError(Exception):
     """GitHub API error with a safe user-facing message. No token or sensitive data."""
@@ -86,6 +114,153 @@ def _check_response(resp: httpx.Response, context: str) -> None:
     raise GithubClientError(f"{context}: request failed (HTTP {resp.status_code})")
 
 
+_client: Optional[httpx.Client] = None
+_lock = threading.Lock()
+# (url, accept, token fingerprint) -> (etag, body) for revalidated lookups.
+_etags: "OrderedDict[Tuple[str, str, str], Tuple[str, bytes]]" = OrderedDict()
+# "trees/<sha>" / "commits/<sha>" -> body; blobs only go to disk.
+_objects: "OrderedDict[str, bytes]" = OrderedDict()
+_disk_writes = 0
+
+
+def get_github_http_client() -> httpx.Client:
+    """Process-wide pooled client for the GitHub API (timeouts are set per request)."""
+    global _client
+    client = _client
+    if client is None or client.is_closed:
+        with _lock:
+            client = _client
+            if client is None or client.is_closed:
+                limit = get_settings().github_max_connections
+                client = httpx.Client(
+                    timeout=DEFAULT_TIMEOUT,
+                    limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+                )
+                _client = client
+    return client
+
+
+def close_github_client() -> None:
+    """Close the pooled client (app shutdown)."""
+    global _client
+    with _lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
+
+
+def _token_fingerprint(token_override: Optional[str]) -> str:
+    token = _effective_token(token_override)
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:16] if token else ""
+
+
+def _get(
+    url: str,
+    context: str,
+    *,
+    token: Optional[str],
+    timeout: float,
+    accept: str = ACCEPT,
+    revalidate: bool = False,
+) -> bytes:
+    """GET url and return the body; with revalidate, a 304 to If-None-Match serves the previous body."""
+    headers = _headers(token)
+    headers["Accept"] = accept
+    key = (url, accept, _token_fingerprint(token))
+    cached = None
+    if revalidate:
+        with _lock:
+            cached = _etags.get(key)
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+    resp = get_github_http_client().get(url, headers=headers, timeout=timeout)
+    if resp.status_code == 304 and cached is not None:
+        with _lock:
+            if key in _etags:
+                _etags.move_to_end(key)
+        return cached[1]
+    _check_response(resp, context)
+    etag = resp.headers.get("etag")
+    if revalidate and etag:
+        with _lock:
+            _etags[key] = (etag, resp.content)
+            _etags.move_to_end(key)
+            while len(_etags) > _MAX_ETAGS:
+                _etags.popitem(last=False)
+    return resp.content
+
+
+def _get_json(url: str, context: str, *, token: Optional[str], timeout: float, revalidate: bool = False) -> Any:
+    body = _get(url, context, token=token, timeout=timeout, revalidate=revalidate)
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise GithubClientError(f"{context}: invalid response")
+
+
+def _object_path(kind: str, sha: str) -> Optional[Path]:
+    cache_dir = get_settings().github_cache_dir
+    if not cache_dir:
+        return None
+    return Path(cache_dir) / kind / sha[:2] / sha
+
+
+def _read_object(kind: str, sha: str) -> Optional[bytes]:
+    path = _object_path(kind, sha)
+    if path is None:
+        return None
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+    except OSError as exc:
+        logger.warning("github cache read failed: %s", exc)
+        return None
+
+
+def _write_object(kind: str, sha: str, data: bytes) -> None:
+    global _disk_writes
+    path = _object_path(kind, sha)
+    if path is None:
+        return
+    tmp = path.with_name(f"{sha}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except OSError as exc:
+        logger.warning("github cache write failed: %s", exc)
+        return
+    with _lock:
+        _disk_writes += 1
+        prune = _disk_writes % _PRUNE_EVERY == 0
+    if prune:
+        settings = get_settings()
+        prune_directory(Path(settings.github_cache_dir), settings.github_cache_max_bytes)
+
+
+def _immutable(kind: str, sha: str, fetch: Callable[[], bytes]) -> bytes:
+    """Git object body by SHA: memory (trees, commits), then disk, then fetch() and store."""
+    if not _SHA_RE.fullmatch(sha):
+        return fetch()
+    key = f"{kind}/{sha}"
+    with _lock:
+        data = _objects.get(key)
+        if data is not None:
+            _objects.move_to_end(key)
+            return data
+    data = _read_object(kind, sha)
+    if data is None:
+        data = fetch()
+        _write_object(kind, sha, data)
+    if kind != "blobs":
+        with _lock:
+            _objects[key] = data
+            while len(_objects) > _MAX_MEMORY_OBJECTS:
+                _objects.popitem(last=False)
+    return data
+
+
 def get_repo(
     owner: str,
     repo: str,
@@ -98,15 +273,19 @@ def get_repo(
     Returns dict with keys such as default_branch, private, name, full_name.
     """
     url = f"{API_BASE}/repos/{owner}/{repo}"
-    with httpx.Client(timeout=timeout) as client:
-        resp = client.get(url, headers=_headers(token))
-    _check_response(resp, "get_repo")
-    data = resp.json()
+    data = _get_json(url, "get_repo", token=token, timeout=timeout, revalidate=True)
     if not isinstance(data, dict):
         raise GithubClientError("Invalid repository response")
     return data
 
 
+def _default_branch_of(data: Dict[str, Any]) -> str:
+    branch = data.get("default_branch")
+    if not isinstance(branch, str) or not branch.strip():
+        raise GithubClientError("Repository has no default branch")
+    return branch.strip()
+
+
 def get_default_branch(
     owner: str,
     repo: str,
@@ -115,141 +294,192 @@ def get_default_branch(
     token: Optional[str] = None,
 ) -> str:
     """Return the default branch name for the repository."""
-    data = get_repo(owner, repo, timeout=timeout, token=token)
-    branch = data.get("default_branch")
-    if not isinstance(branch, str) or not branch.strip():
-        raise GithubClientError("Repository has no default branch")
-    return branch.strip()
+    return _default_branch_of(get_repo(owner, repo, timeout=timeout, token=token))
 
 
-def get_tree(
+def get_commit_sha(
     owner: str,
     repo: str,
     ref: str,
-    path: Optional[str] = None,
     timeout: float = DEFAULT_TIMEOUT,
     *,
     token: Optional[str] = None,
-) -> List[Dict[str, Any]]:
-    """
-    List contents at a path (or repo root). Read-only.
-    Returns list of dicts with path, type (file/dir), size (for files).
-    """
-    if path is None:
-        path = ""
-    path = path.strip().strip("/")
-
-    if not path:
-        # Root: use Git Trees API
-        commit_url = f"{API_BASE}/repos/{owner}/{repo}/commits/{ref}"
-        with httpx.Client(timeout=timeout) as client:
-            resp = client.get(commit_url, headers=_headers(token))
-        _check_response(resp, "get_tree")
-        commit_data = resp.json()
-        if not isinstance(commit_data, dict):
-            raise GithubClientError("Invalid commit response")
-        commit_obj = commit_data.get("commit")
-        tree_obj = commit_obj.get("tree") if isinstance(commit_obj, dict) else None
-        tree_sha = tree_obj.get("sha") if isinstance(tree_obj, dict) else None
-        if not isinstance(tree_sha, str):
-            raise GithubClientError("Could not resolve tree for ref")
-        tree_url = f"{API_BASE}/repos/{owner}/{repo}/git/trees/{tree_sha}"
-        with httpx.Client(timeout=timeout) as client:
-            resp = client.get(tree_url, headers=_headers(token))
-        _check_response(resp, "get_tree")
-        tree_data = resp.json()
-        if not isinstance(tree_data, dict):
-            raise GithubClientError("Invalid tree response")
-        raw_tree = tree_data.get("tree")
+) -> str:
+    """Resolve a branch, tag or commit to its full commit SHA. Read-only."""
+    url = f"{API_BASE}/repos/{owner}/{repo}/commits/{ref}"
+    body = _get(url, "get_commit_sha", token=token, timeout=timeout, accept=ACCEPT_SHA, revalidate=True)
+    sha = body.decode("utf-8", errors="replace").strip()
+    if not _SHA_RE.fullmatch(sha):
+        raise GithubClientError("Could not resolve commit for ref")
+    return sha
+
+
+def _tree_items(owner: str, repo: str, tree_sha: str, *, token: Optional[str], timeout: float) -> List[Dict[str, Any]]:
+    def fetch() -> bytes:
+        data = _get_json(f"{API_BASE}/repos/{owner}/{repo}/git/trees/{tree_sha}", "get_tree", token=token, timeout=timeout)
+        raw_tree = data.get("tree") if isinstance(data, dict) else None
         if not isinstance(raw_tree, list):
-            return []
-        return [
-            {
-                "path": item.get("path", ""),
-                "type": "dir" if (item.get("type") == "tree") else "file",
-                "size": item.get("size") if item.get("type") == "blob" else None,
-            }
+            raise GithubClientError("Invalid tree response")
+        items = [
+            {"path": item.get("path", ""), "type": item.get("type"), "sha": item.get("sha"), "size": item.get("size")}
             for item in raw_tree
             if isinstance(item, dict) and item.get("path")
         ]
+        return json.dumps(items).encode("utf-8")
+
+    return json.loads(_immutable("trees", tree_sha, fetch))
+
+
+def _root_tree_sha(owner: str, repo: str, commit_sha: str, *, token: Optional[str], timeout: float) -> str:
+    def fetch() -> bytes:
+        data = _get_json(f"{API_BASE}/repos/{owner}/{repo}/git/commits/{commit_sha}", "get_tree", token=token, timeout=timeout)
+        tree_obj = data.get("tree") if isinstance(data, dict) else None
+        tree_sha = tree_obj.get("sha") if isinstance(tree_obj, dict) else None
+        if not isinstance(tree_sha, str):
+            raise GithubClientError("Could not resolve tree for ref")
+        return tree_sha.encode("utf-8")
+
+    return _immutable("commits", commit_sha, fetch).decode("utf-8")
+
+
+def _entry_at(
+    owner: str, repo: str, commit_sha: str, path: str, *, token: Optional[str], timeout: float
+) -> Dict[str, Any]:
+    """Tree entry for path at the commit (the root tree for an empty path), walking cached trees."""
+    entry: Dict[str, Any] = {"type": "tree", "sha": _root_tree_sha(owner, repo, commit_sha, token=token, timeout=timeout)}
+    for part in [p for p in path.split("/") if p]:
+        if entry.get("type") != "tree":
+            raise GithubClientError("Repository or resource not found")
+        items = _tree_items(owner, repo, entry["sha"], token=token, timeout=timeout)
+        found = next((item for item in items if item["path"] == part), None)
+        if found is None:
+            raise GithubClientError("Repository or resource not found")
+        entry = found
+    return entry
+
 
-    # Non-root: use Contents API (directory listing)
-    contents_url = f"{API_BASE}/repos/{owner}/{repo}/contents/{path}"
-    with httpx.Client(timeout=timeout) as client:
-        resp = client.get(contents_url, headers=_headers(token), params={"ref": ref})
-    _check_response(resp, "get_tree")
-    contents = resp.json()
-    if isinstance(contents, dict):
-        # Single file returned instead of directory
+def tree_at_commit(
+    owner: str,
+    repo: str,
+    commit_sha: str,
+    path: Optional[str] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    *,
+    token: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """get_tree for a resolved commit SHA."""
+    path = (path or "").strip().strip("/")
+    entry = _entry_at(owner, repo, commit_sha, path, token=token, timeout=timeout)
+    if entry.get("type") != "tree":
         raise GithubClientError("Path is a file, not a directory")
-    if not isinstance(contents, list):
-        return []
+    prefix = f"{path}/" if path else ""
     return [
         {
-            "path": item.get("path", item.get("name", "")),
-            "type": "dir" if (item.get("type") == "dir") else "file",
-            "size": item.get("size") if isinstance(item.get("size"), int) else None,
+            "path": prefix + item["path"],
+            "type": "dir" if item.get("type") == "tree" else "file",
+            "size": item.get("size") if item.get("type") == "blob" and isinstance(item.get("size"), int) else None,
         }
-        for item in contents
-        if isinstance(item, dict)
+        for item in _tree_items(owner, repo, entry["sha"], token=token, timeout=timeout)
     ]
 
 
-def get_file(
+def file_at_commit(
     owner: str,
     repo: str,
+    commit_sha: str,
     path: str,
-    ref: Optional[str] = None,
     timeout: float = DEFAULT_TIMEOUT,
     *,
     token: Optional[str] = None,
 ) -> tuple[str, str]:
-    """
-    Fetch raw file content and encoding. Read-only.
-    Returns (content_str, encoding). Decodes base64 from Contents API.
-    """
+    """get_file for a resolved commit SHA; the content is read through the blob cache."""
     if not path or not path.strip():
         raise GithubClientError("File path is required")
     path = path.strip().strip("/")
     if not path:
         raise GithubClientError("Invalid file path")
-    if ref is None or not ref.strip():
-        ref = get_default_branch(owner, repo, timeout=timeout, token=token)
-    url = f"{API_BASE}/repos/{owner}/{repo}/contents/{path}"
-    with httpx.Client(timeout=timeout) as client:
-        resp = client.get(url, headers=_headers(token), params={"ref": ref})
-    _check_response(resp, "get_file")
-    data = resp.json()
-    if not isinstance(data, dict):
-        raise GithubClientError("Invalid file response")
-    if data.get("type") == "dir":
+    entry = _entry_at(owner, repo, commit_sha, path, token=token, timeout=timeout)
+    if entry.get("type") == "tree":
         raise GithubClientError("Path is a directory, not a file")
-    raw = data.get("content")
+    blob_sha = entry.get("sha")
+    if entry.get("type") != "blob" or not isinstance(blob_sha, str):
+        raise GithubClientError("File content not found")
+    url = f"{API_BASE}/repos/{owner}/{repo}/git/blobs/{blob_sha}"
+    raw = _immutable("blobs", blob_sha, lambda: _get(url, "get_file", token=token, timeout=timeout, accept=ACCEPT_RAW))
     if not raw:
         raise GithubClientError("File content not found")
-    encoding = "utf-8"
-    if isinstance(data.get("encoding"), str) and data["encoding"].lower() == "base64":
-        try:
-            content = base64.b64decode(raw).decode("utf-8", errors="replace")
-        except Exception:
-            raise GithubClientError("Could not decode file content")
-    else:
-        content = raw if isinstance(raw, str) else ""
-    return content, encoding
+    return raw.decode("utf-8", errors="replace"), "utf-8"
+
+
+def get_tree(
+    owner: str,
+    repo: str,
+    ref: str,
+    path: Optional[str] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    *,
+    token: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    List contents at a path (or repo root). Read-only.
+    Returns list of dicts with path, type (file/dir), size (for files).
+    """
+    commit_sha = get_commit_sha(owner, repo, ref, timeout=timeout, token=token)
+    return tree_at_commit(owner, repo, commit_sha, path, timeout=timeout, token=token)
+
+
+def get_file(
+    owner: str,
+    repo: str,
+    path: str,
+    ref: Optional[str] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    *,
+    token: Optional[str] = None,
+) -> tuple[str, str]:
+    """
+    Fetch raw file content and encoding. Read-only.
+    Returns (content_str, encoding).
+    """
+    if ref is None or not ref.strip():
+        ref = get_default_branch(owner, repo, timeout=timeout, token=token)
+    commit_sha = get_commit_sha(owner, repo, ref, timeout=timeout, token=token)
+    return file_at_commit(owner, repo, commit_sha, path, timeout=timeout, token=token)
 
 
 class DefaultGithubClient:
-    """Default client that calls module-level functions. Implements GithubClientLike."""
+    """
+    Default client that calls module-level functions. Implements GithubClientLike.
+    One instance serves a whole run: repo metadata is fetched once per repo and
+    each ref is pinned to the commit SHA it resolved to first.
+    """
 
     def __init__(self, timeout: float = DEFAULT_TIMEOUT, token: Optional[str] = None):
         self.timeout = timeout
         self._token = token
+        self._repos: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._pins: Dict[Tuple[str, str, str], str] = {}
 
     def get_repo(self, owner: str, repo: str) -> Dict[str, Any]:
-        return get_repo(owner, repo, timeout=self.timeout, token=self._token)
+        key = (owner.lower(), repo.lower())
+        data = self._repos.get(key)
+        if data is None:
+            data = get_repo(owner, repo, timeout=self.timeout, token=self._token)
+            self._repos[key] = data
+        return data
 
     def get_default_branch(self, owner: str, repo: str) -> str:
-        return get_default_branch(owner, repo, timeout=self.timeout, token=self._token)
+        return _default_branch_of(self.get_repo(owner, repo))
+
+    def get_commit_sha(self, owner: str, repo: str, ref: str) -> str:
+        key = (owner.lower(), repo.lower(), ref)
+        sha = self._pins.get(key)
+        if sha is None:
+            resolved = get_commit_sha(owner, repo, ref, timeout=self.timeout, token=self._token)
+            # First resolution wins when concurrent tool calls race on the same ref.
+            sha = self._pins.setdefault(key, resolved)
+            self._pins.setdefault((key[0], key[1], sha), sha)
+        return sha
 
     def get_tree(
         self,
@@ -258,7 +488,8 @@ class DefaultGithubClient:
         ref: str,
         path: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
-        return get_tree(owner, repo, ref, path=path, timeout=self.timeout, token=self._token)
+        sha = self.get_commit_sha(owner, repo, ref)
+        return tree_at_commit(owner, repo, sha, path, timeout=self.timeout, token=self._token)
 
     def get_file(
         self,
@@ -267,4 +498,7 @@ class DefaultGithubClient:
         path: str,
         ref: Optional[str] = None,
     ) -> tuple[str, str]:
-        return get_file(owner, repo, path, ref=ref, timeout=self.timeout, token=self._token)
+        if ref is None or not ref.strip():
+            ref = self.get_default_branch(owner, repo)
+        sha = self.get_commit_sha(owner, repo, ref)
+        return file_at_commit(owner, repo, sha, path, timeout=self.timeout, token=self._token)
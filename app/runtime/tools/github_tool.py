@@ -11,6 +11,7 @@ from typing import Any, Dict, List, Optional, Protocol
 from app.utils.redaction import cap_text, redact_secrets
 
 from .http_tool import ToolExecutionError
+from .result_cache import ToolResultCache, make_key
 
 # Deterministic order for important-file detection (top-level and common paths).
 IMPORTANT_FILE_CANDIDATES = [
@@ -208,10 +209,15 @@ def execute_github_repo_read(
     args: Dict[str, Any],
     policy: GithubRepoReadPolicy,
     client: GithubClientLike,
+    *,
+    result_cache: Optional[ToolResultCache] = None,
 ) -> Dict[str, Any]:
     """
     Execute github_repo_read: validate args, enforce policy, call client, return structured JSON.
     Raises ToolExecutionError on validation or client errors (safe messages only).
+
+    With result_cache and a client that has get_commit_sha, the ref is resolved to
+    a commit SHA and results are cached by (owner, repo, sha, mode, path, caps).
     """
     from app.runtime.tools.github_client import GithubClientError
 
@@ -245,6 +251,54 @@ def execute_github_repo_read(
     repo_out = _repo_payload(repo_data)
     default_ref = ref or client.get_default_branch(owner, repo)
 
+    cache_key = None
+    if result_cache is not None and hasattr(client, "get_commit_sha"):
+        try:
+            sha = client.get_commit_sha(owner, repo, default_ref)
+        except GithubClientError as e:
+            raise ToolExecutionError(e.message) from e
+        cache_key = make_key(
+            "github_repo_read",
+            owner.lower(),
+            repo.lower(),
+            sha,
+            mode,
+            path,
+            effective_max_entries,
+            effective_max_file_chars,
+            policy.max_sample_files,
+            policy.include_hidden_files,
+        )
+        cached = result_cache.lookup(cache_key)
+        if cached is not None:
+            # Repo metadata (visibility, default branch) is not pinned to the commit.
+            cached["repo"] = redact_secrets(repo_out)
+            return cached
+        # Read exactly the commit the key names, even if the branch moves meanwhile.
+        default_ref = sha
+
+    result = _read_mode(
+        client, policy, owner, repo, mode, path, default_ref, repo_out, effective_max_entries, effective_max_file_chars
+    )
+    if cache_key is not None:
+        result_cache.store(cache_key, result)
+    return result
+
+
+def _read_mode(
+    client: GithubClientLike,
+    policy: GithubRepoReadPolicy,
+    owner: str,
+    repo: str,
+    mode: str,
+    path: str,
+    default_ref: str,
+    repo_out: Dict[str, Any],
+    effective_max_entries: int,
+    effective_max_file_chars: int,
+) -> Dict[str, Any]:
+    from app.runtime.tools.github_client import GithubClientError
+
     if mode == "overview":
         try:
             tree = client.get_tree(owner, repo, default_ref, path=None)
@@ -6,16 +6,28 @@ HTTP tool: safe, allowlisted, budgeted outbound requests.
 - Domain allowlist (exact or suffix match).
 - Strips Authorization/Cookie. Applies timeout and response cap.
 - Returns redacted/capped result; raises ToolExecutionError on policy/network errors.
+
+Requests go through process-wide pooled clients (one per timeout policy; HTTP/2
+via the h2 package from httpx[http2]), so connections and TLS sessions are
+reused across calls and runs. At most HTTP_TOOL_MAX_CONNECTIONS_PER_DOMAIN
+requests per host are in flight. The body is streamed and decoded incrementally
+with the response charset; reading stops as soon as max_response_chars is
+exceeded, so a large response is never downloaded in full.
 """
 
 from __future__ import annotations
 
+import codecs
 import logging
+import threading
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 
 import httpx
 
+from app.config import get_settings
+from app.providers import _http2_available
 from app.utils.redaction import redact_secrets
 
 logger = logging.getLogger("agent-gateway")
@@ -75,11 +87,9 @@ def _validate_args(args: Any) -> Dict[str, Any]:
     }
 
 
-def _url_allowed(url: str, policy: HttpPolicy) -> None:
-    """Require https (or localhost if allowed). Require domain in allowlist. Raises ToolExecutionError."""
+def _url_allowed(url: str, policy: HttpPolicy) -> str:
+    """Require https (or localhost if allowed). Require domain in allowlist. Returns the hostname; raises ToolExecutionError."""
     try:
-        from urllib.parse import urlparse
-
         parsed = urlparse(url)
     except Exception as e:
         raise ToolExecutionError("invalid url") from e
@@ -91,7 +101,7 @@ def _url_allowed(url: str, policy: HttpPolicy) -> None:
     if hostname in ("localhost", "127.0.0.1", "::1"):
         if not policy.allow_localhost:
             raise ToolExecutionError("localhost is not allowed")
-        return
+        return hostname
     if scheme != "https":
         raise ToolExecutionError("url must use https")
 
@@ -102,10 +112,10 @@ def _url_allowed(url: str, policy: HttpPolicy) -> None:
         d = d.lower().strip()
         if d.startswith("."):
             if hostname == d[1:] or hostname.endswith(d):
-                return
+                return hostname
         else:
             if hostname == d:
-                return
+                return hostname
     raise ToolExecutionError(f"domain not allowed: {hostname}")
 
 
@@ -121,6 +131,79 @@ def _sanitize_headers(headers: Dict[str, Any]) -> Dict[str, str]:
     return out
 
 
+_clients: Dict[float, httpx.Client] = {}
+_domain_slots: Dict[str, threading.BoundedSemaphore] = {}
+_clients_lock = threading.Lock()
+
+
+def get_http_tool_client(timeout_seconds: float) -> httpx.Client:
+    """Process-wide pooled client for one timeout policy."""
+    key = float(timeout_seconds)
+    client = _clients.get(key)
+    if client is None or client.is_closed:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None or client.is_closed:
+                settings = get_settings()
+                client = httpx.Client(
+                    timeout=key,
+                    limits=httpx.Limits(
+                        max_connections=settings.http_tool_max_connections,
+                        max_keepalive_connections=settings.http_tool_max_connections,
+                    ),
+                    # `h2` comes with httpx[http2]; if it cannot be imported, fall back to HTTP/1.1 keep-alive.
+                    http2=bool(settings.http_tool_http2 and _http2_available()),
+                )
+                _clients[key] = client
+    return client
+
+
+def _domain_slot(hostname: str) -> threading.BoundedSemaphore:
+    with _clients_lock:
+        slot = _domain_slots.get(hostname)
+        if slot is None:
+            slot = threading.BoundedSemaphore(max(1, get_settings().http_tool_max_connections_per_domain))
+            _domain_slots[hostname] = slot
+        return slot
+
+
+def close_http_tool_clients() -> None:
+    """Close the pooled clients (app shutdown)."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+def _read_capped(resp: httpx.Response, max_chars: int) -> Tuple[str, bool]:
+    """Decode the streamed body with the response charset (default UTF-8), reading no more than needed for max_chars."""
+    try:
+        decoder = codecs.getincrementaldecoder(resp.charset_encoding or "utf-8")(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    # No supported charset needs more than 4 bytes per character.
+    byte_cap = (max_chars + 1) * 4
+    parts: List[str] = []
+    chars = 0
+    read = 0
+    complete = True
+    for chunk in resp.iter_bytes():
+        read += len(chunk)
+        text = decoder.decode(chunk)
+        parts.append(text)
+        chars += len(text)
+        if chars > max_chars or read >= byte_cap:
+            complete = False
+            break
+    if complete:
+        parts.append(decoder.decode(b"", final=True))
+    text = "".join(parts)
+    if len(text) > max_chars or not complete:
+        return text[:max_chars] + "...[truncated]", True
+    return text, False
+
+
 def execute_http_request(args: Dict[str, Any], policy: HttpPolicy) -> Dict[str, Any]:
     """
     Execute one HTTP request. Validates args, enforces policy, returns redacted/capped result.
@@ -129,7 +212,7 @@ def execute_http_request(args: Dict[str, Any], policy: HttpPolicy) -> Dict[str,
     On non-2xx still returns this structure; on network/timeout/policy error raises ToolExecutionError.
     """
     normalized = _validate_args(args)
-    _url_allowed(normalized["url"], policy)
+    hostname = _url_allowed(normalized["url"], policy)
 
     method = normalized["method"]
     url = normalized["url"]
@@ -147,23 +230,20 @@ def execute_http_request(args: Dict[str, Any], policy: HttpPolicy) -> Dict[str,
         elif data_body is not None:
             request_kw["content"] = data_body.encode("utf-8") if isinstance(data_body, str) else data_body
 
+    slot = _domain_slot(hostname)
+    if not slot.acquire(timeout=policy.timeout_seconds):
+        raise ToolExecutionError(f"too many concurrent requests to {hostname}")
     try:
-        with httpx.Client(timeout=policy.timeout_seconds) as client:
-            resp = client.request(**request_kw)
+        client = get_http_tool_client(policy.timeout_seconds)
+        with client.stream(**request_kw) as resp:
+            # Cap response body while streaming; the rest is never read.
+            text, truncated = _read_capped(resp, policy.max_response_chars)
     except httpx.TimeoutException as e:
         raise ToolExecutionError("http request timed out") from e
     except httpx.RequestError as e:
         raise ToolExecutionError("http request failed") from e
-
-    # Cap response body
-    try:
-        text = resp.text
-    except Exception:
-        text = ""
-    truncated = False
-    if len(text) > policy.max_response_chars:
-        text = text[: policy.max_response_chars] + "...[truncated]"
-        truncated = True
+    finally:
+        slot.release()
 
     # Build response headers dict (redact later)
     resp_headers: Dict[str, Any] = dict(resp.headers)
@@ -1,9 +1,14 @@
 """
 Tool registry: execute tools with policy checks (allowed_tools, max_tool_calls, domain allowlist).
+
+Read-only calls (http_request GET, github_repo_read) are memoized per run and
+go through the shared tool result cache (see result_cache).
 """
 
 from __future__ import annotations
 
+import copy
+import json
 import logging
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
@@ -14,6 +19,7 @@ from app.preset_loader import Preset
 from .github_client import DefaultGithubClient
 from .github_tool import GithubRepoReadPolicy, execute_github_repo_read
 from .http_tool import HttpPolicy, ToolExecutionError, execute_http_request
+from .result_cache import cached_http_request, get_tool_result_cache
 
 logger = logging.getLogger("agent-gateway")
 
@@ -40,6 +46,29 @@ class RunContext:
     http_allowed_domains: List[str] = field(default_factory=list)
     # Per-tool policies (Part 5), e.g. http_request -> { http_timeout_seconds, http_max_response_chars }
     tool_policies: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # Results of read-only calls made in this run, keyed by tool name and args.
+    tool_memo: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # One GitHub client per run, so refs stay pinned to the commit they first resolved to.
+    # Created up front: concurrent tool calls of one step must not each build their own.
+    github_client: Optional[DefaultGithubClient] = None
+
+    def __post_init__(self) -> None:
+        if self.github_client is None:
+            self.github_client = DefaultGithubClient(token=self.github_access_token)
+
+
+def _memo_key(tool_name: str, args: Dict[str, Any]) -> Optional[str]:
+    """Memo key for a read-only call, else None (non-GET requests are never repeated from memo)."""
+    if tool_name == "http_request":
+        method = args.get("method", "GET") if isinstance(args, dict) else None
+        if not isinstance(method, str) or method.strip().upper() != "GET":
+            return None
+    elif tool_name != "github_repo_read":
+        return None
+    try:
+        return tool_name + ":" + json.dumps(args, sort_keys=True, default=str)
+    except (TypeError, ValueError):
+        return None
 
 
 class DefaultToolRegistry:
@@ -56,6 +85,15 @@ class DefaultToolRegistry:
         if run_context.tool_calls_used >= run_context.max_tool_calls:
             raise ToolExecutionError("max_tool_calls_exceeded")
 
+        memo_key = _memo_key(tool_name, args)
+        if memo_key is not None and memo_key in run_context.tool_memo:
+            return copy.deepcopy(run_context.tool_memo[memo_key])
+        result = self._execute(tool_name, args, run_context)
+        if memo_key is not None:
+            run_context.tool_memo[memo_key] = copy.deepcopy(result)
+        return result
+
+    def _execute(self, tool_name: str, args: Dict[str, Any], run_context: RunContext) -> Dict[str, Any]:
         if tool_name == "http_request":
             settings = get_settings()
             tool_policy = run_context.tool_policies.get("http_request") or {}
@@ -78,7 +116,10 @@ class DefaultToolRegistry:
                     or "127.0.0.1" in (run_context.http_allowed_domains or settings.http_allowed_domains_default)
                 ),
             )
-            return execute_http_request(args, policy)
+            cache = get_tool_result_cache()
+            if cache is None:
+                return execute_http_request(args, policy)
+            return cached_http_request(args, policy, cache)
 
         if tool_name == "github_repo_read":
             tool_policy = run_context.tool_policies.get("github_repo_read") or {}
@@ -113,8 +154,9 @@ class DefaultToolRegistry:
                 allowed_repos=allowed_repos,
                 include_hidden_files=include_hidden_files,
             )
-            github_client = DefaultGithubClient(token=run_context.github_access_token)
-            return execute_github_repo_read(args, policy, github_client)
+            return execute_github_repo_read(
+                args, policy, run_context.github_client, result_cache=get_tool_result_cache()
+            )
 
         raise ToolExecutionError(f"unknown tool: {tool_name}")
 
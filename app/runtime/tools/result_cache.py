@@ -0,0 +1,379 @@
+"""
+Tool result cache shared across runs (DefaultToolRegistry.execute).
+
+- http_request: GET responses (status 200) are stored according to their
+  Cache-Control / Expires headers. no-store, private, Set-Cookie and Vary: *
+  are never stored. Once an entry is stale, a request with an ETag or a
+  Last-Modified is revalidated with If-None-Match / If-Modified-Since, and a
+  304 answer serves the stored result.
+- github_repo_read: results are keyed by (owner, repo, resolved commit SHA,
+  mode, path, caps) and never expire, because content at a commit cannot
+  change. A cache key is only reachable after the caller's token resolved the
+  SHA, so private repo content is not served to callers without access.
+
+Tier 1 is an in-process LRU bounded by the size of the serialized results
+(TOOL_CACHE_MAX_BYTES). Tier 2 is an optional directory of JSON files
+(TOOL_CACHE_DIR) shared across workers and restarts, pruned to
+TOOL_CACHE_DISK_MAX_BYTES. Repeats within one run are served by the per-run
+memo on RunContext before this cache is consulted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import os
+import stat
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+from app.config import get_settings
+
+from .http_tool import HttpPolicy, _sanitize_headers, _url_allowed, _validate_args, execute_http_request
+
+logger = logging.getLogger("agent-gateway")
+
+# Request headers that make a call conditional or partial; such calls bypass the cache.
+_BYPASS_REQUEST_HEADERS = frozenset({"if-none-match", "if-modified-since", "if-match", "if-unmodified-since", "range"})
+
+_DISK_PRUNE_EVERY = 64
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    result_json: str
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def size(self) -> int:
+        return len(self.result_json) + len(self.etag or "") + len(self.last_modified or "")
+
+    def result(self) -> Dict[str, Any]:
+        # Fresh object per hit: the runner post-processes tool results.
+        return json.loads(self.result_json)
+
+
+def make_key(*parts: Any) -> str:
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ToolResultCache:
+    """Thread-safe LRU of serialized tool results, bounded by bytes, with an optional disk tier."""
+
+    def __init__(self, max_bytes: int, disk_dir: Optional[str] = None, disk_max_bytes: int = 0) -> None:
+        self.max_bytes = max(1, int(max_bytes))
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = max(0, int(disk_max_bytes))
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Entry for key, fresh or stale (callers decide about revalidation); memory first, then disk."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        entry = self._read_disk(key)
+        if entry is not None:
+            self._put_memory(key, entry)
+        return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        self._put_memory(key, entry)
+        self._write_disk(key, entry)
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Result for a non-expired entry (counted as hit or miss), else None."""
+        entry = self.get(key)
+        if entry is None or entry.expires_at <= time.time():
+            self.count("misses")
+            return None
+        self.count("hits")
+        return entry.result()
+
+    def store(self, key: str, result: Dict[str, Any], expires_at: float = math.inf) -> None:
+        self.put(key, CacheEntry(json.dumps(result, sort_keys=True, default=str), expires_at))
+
+    def count(self, outcome: str) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def _put_memory(self, key: str, entry: CacheEntry) -> None:
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+
+    def _disk_path(self, key: str) -> Path:
+        assert self.disk_dir is not None
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[CacheEntry]:
+        if self.disk_dir is None:
+            return None
+        try:
+            with open(self._disk_path(key), "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            return CacheEntry(
+                result_json=data["result_json"],
+                expires_at=float(data["expires_at"]),
+                etag=data.get("etag"),
+                last_modified=data.get("last_modified"),
+            )
+        except FileNotFoundError:
+            return None
+        except Exception as exc:
+            logger.warning("tool cache read failed: %s", exc)
+            return None
+
+    def _write_disk(self, key: str, entry: CacheEntry) -> None:
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        data = {
+            "result_json": entry.result_json,
+            # JSON has no infinity; entries pinned to a commit SHA never expire.
+            "expires_at": entry.expires_at if math.isfinite(entry.expires_at) else 1e18,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(data, fh)
+            os.replace(tmp, path)
+        except Exception as exc:
+            logger.warning("tool cache write failed: %s", exc)
+            return
+        with self._lock:
+            self._disk_writes += 1
+            prune = self._disk_writes % _DISK_PRUNE_EVERY == 0
+        if prune:
+            self.prune_disk()
+
+    def prune_disk(self) -> None:
+        if self.disk_dir is not None:
+            prune_directory(self.disk_dir, self.disk_max_bytes)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.revalidated = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+                "disk": str(self.disk_dir) if self.disk_dir else None,
+            }
+
+
+def prune_directory(root: Path, max_bytes: int) -> None:
+    """Delete the least recently written files under root until it fits max_bytes."""
+    if not root.is_dir():
+        return
+    files = []
+    total = 0
+    for path in root.rglob("*"):
+        if path.suffix == ".tmp":
+            continue
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        if not stat.S_ISREG(st.st_mode):
+            continue
+        files.append((st.st_mtime, st.st_size, path))
+        total += st.st_size
+    files.sort()
+    for _, size, path in files:
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+
+
+_cache: Optional[ToolResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_tool_result_cache() -> Optional[ToolResultCache]:
+    """Process-wide cache, or None when TOOL_CACHE_ENABLED is off. Rebuilt when the settings change (tests)."""
+    global _cache
+    settings = get_settings()
+    if not settings.tool_cache_enabled:
+        return None
+    cache = _cache
+    disk_dir = settings.tool_cache_dir or None
+    if (
+        cache is None
+        or cache.max_bytes != max(1, settings.tool_cache_max_bytes)
+        or (str(cache.disk_dir) if cache.disk_dir else None) != disk_dir
+    ):
+        with _cache_lock:
+            cache = ToolResultCache(settings.tool_cache_max_bytes, disk_dir, settings.tool_cache_disk_max_bytes)
+            _cache = cache
+    return cache
+
+
+def tool_result_cache_stats() -> Optional[Dict[str, Any]]:
+    cache = _cache
+    return cache.stats() if cache is not None else None
+
+
+def clear_tool_result_cache() -> None:
+    """Drop in-memory entries (the disk tier is pruned by size)."""
+    cache = _cache
+    if cache is not None:
+        cache.clear()
+
+
+# --- http_request ---
+
+
+def _directives(cache_control: str) -> Dict[str, Optional[str]]:
+    out: Dict[str, Optional[str]] = {}
+    for part in cache_control.split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            out[name.strip().lower()] = value.strip().strip('"') or None
+    return out
+
+
+def _seconds(value: Optional[str]) -> Optional[int]:
+    try:
+        return max(0, int(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def http_freshness(headers: Mapping[str, Any], now: float) -> Optional[float]:
+    """
+    Expiry timestamp for a response that a shared cache may store, else None.
+    A stored response that is already stale (no-cache, no lifetime) is still
+    useful when it carries a validator.
+    """
+    h = {str(k).lower(): str(v) for k, v in headers.items()}
+    cc = _directives(h.get("cache-control", ""))
+    if "no-store" in cc or "private" in cc or "set-cookie" in h or h.get("vary", "").strip() == "*":
+        return None
+    if "no-cache" in cc:
+        expires_at = now
+    elif _seconds(cc.get("s-maxage")) is not None:
+        expires_at = now + _seconds(cc.get("s-maxage")) - (_seconds(h.get("age")) or 0)
+    elif _seconds(cc.get("max-age")) is not None:
+        expires_at = now + _seconds(cc.get("max-age")) - (_seconds(h.get("age")) or 0)
+    elif "expires" in h:
+        try:
+            expires_at = parsedate_to_datetime(h["expires"]).timestamp()
+        except (TypeError, ValueError):
+            expires_at = now
+    else:
+        expires_at = now
+    if expires_at <= now and "etag" not in h and "last-modified" not in h:
+        return None
+    return expires_at
+
+
+def http_cache_key(args: Dict[str, Any], policy: HttpPolicy) -> Optional[str]:
+    """
+    Key for a cacheable http_request call (plain GET), else None.
+    Raises ToolExecutionError when the policy does not allow the URL, so a
+    cached response is never served to a run that could not fetch it.
+    """
+    try:
+        normalized = _validate_args(args)
+    except Exception:
+        return None
+    _url_allowed(normalized["url"], policy)
+    if normalized["method"] != "GET":
+        return None
+    headers = _sanitize_headers(normalized["headers"])
+    if any(k.lower() in _BYPASS_REQUEST_HEADERS for k in headers):
+        return None
+    return make_key(
+        "http_request",
+        normalized["url"],
+        sorted((normalized["query"] or {}).items()),
+        sorted((k.lower(), v) for k, v in headers.items()),
+        policy.max_response_chars,
+    )
+
+
+def cached_http_request(args: Dict[str, Any], policy: HttpPolicy, cache: ToolResultCache) -> Dict[str, Any]:
+    """execute_http_request with shared caching and conditional revalidation of GET responses."""
+    key = http_cache_key(args, policy)
+    if key is None:
+        return execute_http_request(args, policy)
+    now = time.time()
+    entry = cache.get(key)
+    if entry is not None and entry.expires_at > now:
+        cache.count("hits")
+        return entry.result()
+
+    request_args = args
+    if entry is not None and (entry.etag or entry.last_modified):
+        headers = dict(args.get("headers") or {})
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        request_args = {**args, "headers": headers}
+    result = execute_http_request(request_args, policy)
+
+    if entry is not None and result.get("status_code") == 304:
+        cache.count("revalidated")
+        expires_at = http_freshness(result.get("headers") or {}, now)
+        cache.put(key, CacheEntry(entry.result_json, expires_at if expires_at is not None else now, entry.etag, entry.last_modified))
+        return entry.result()
+
+    cache.count("misses")
+    if result.get("status_code") == 200:
+        headers = {str(k).lower(): v for k, v in (result.get("headers") or {}).items()}
+        expires_at = http_freshness(headers, now)
+        if expires_at is not None:
+            cache.put(
+                key,
+                CacheEntry(
+                    json.dumps(result, sort_keys=True, default=str),
+                    expires_at,
+                    etag=headers.get("etag"),
+                    last_modified=headers.get("last-modified"),
+                ),
+            )
+    return result
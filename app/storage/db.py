@@ -6,8 +6,13 @@ from __future__ import annotations
 
 import os
 import sqlite3
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
 
 from app.config import get_settings
 
@@ -18,6 +23,11 @@ except Exception:  # pragma: no cover - optional dependency for Postgres
     psycopg = None
     dict_row = None
 
+try:
+    from psycopg_pool import ConnectionPool
+except Exception:  # pragma: no cover - declared dependency; safety net: a connection per call
+    ConnectionPool = None
+
 
 @dataclass(frozen=True)
 class DbInfo:
@@ -42,20 +52,244 @@ def is_postgres() -> bool:
     return get_db_info().dialect == "postgres"
 
 
+# --- Pooled connections ---------------------------------------------------------------------
+#
+# connect() keeps the `with connect() as conn:` contract used by every store, but
+# hands out reused connections instead of opening one per call:
+# - Postgres: one psycopg_pool.ConnectionPool per DATABASE_URL (psycopg-pool>=3.2 is a
+#   dependency; if it cannot be imported, a direct connection per call as before).
+# - SQLite: one connection per (thread, db_path), PRAGMAs applied once at open. Nested
+#   connect() calls in the same thread share it; only the outermost block commits or
+#   rolls back.
+
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=3000",
+)
+# Per-thread cap on cached SQLite connections (tests use many temporary db paths).
+_SQLITE_MAX_PATHS_PER_THREAD = 8
+
+
+class _PooledSqliteConnection(sqlite3.Connection):
+    """sqlite3.Connection subclass so open connections can be tracked in a WeakSet."""
+
+
+class _SqliteSlot:
+    __slots__ = ("conn", "file_id", "depth", "generation")
+
+    def __init__(self, conn: sqlite3.Connection, file_id: Optional[Tuple[int, int]]) -> None:
+        self.conn = conn
+        self.file_id = file_id
+        self.depth = 0
+        self.generation = _sqlite_generation
+
+
+_sqlite_local = threading.local()
+# Bumped by close_pools(): slots of other threads then hold closed connections.
+_sqlite_generation = 0
+_stats_lock = threading.Lock()
+_sqlite_stats = {"opened": 0, "reused": 0, "reopened": 0, "closed": 0}
+_sqlite_all: "weakref.WeakSet[sqlite3.Connection]" = weakref.WeakSet()
+_pg_pools: Dict[str, Any] = {}
+_pg_pools_lock = threading.Lock()
+_pg_direct_connects = 0
+# Set by app.storage.migrations: called as hook(path, conn) for every newly opened SQLite
+# connection before it is handed out (re-migrates files replaced since they were migrated).
+_sqlite_open_hook: Optional[Callable[[str, sqlite3.Connection], None]] = None
+
+
+def set_sqlite_open_hook(hook: Optional[Callable[[str, sqlite3.Connection], None]]) -> None:
+    global _sqlite_open_hook
+    _sqlite_open_hook = hook
+
+
+def _bump(key: str) -> None:
+    with _stats_lock:
+        _sqlite_stats[key] += 1
+
+
+def _file_id(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+def _open_sqlite(path: str) -> sqlite3.Connection:
+    # check_same_thread=False only so close_pools() can close from the shutdown thread;
+    # each connection is still used by a single thread.
+    conn = sqlite3.connect(path, check_same_thread=False, factory=_PooledSqliteConnection)
+    conn.row_factory = sqlite3.Row
+    for pragma in _SQLITE_PRAGMAS:
+        try:
+            conn.execute(pragma)
+        except sqlite3.Error:
+            pass
+    _sqlite_all.add(conn)
+    return conn
+
+
+def _close_quietly(conn: Any) -> None:
+    try:
+        conn.close()
+    except Exception:
+        pass
+    _bump("closed")
+
+
+def _sqlite_slot(path: str) -> _SqliteSlot:
+    slots: "OrderedDict[str, _SqliteSlot]" = getattr(_sqlite_local, "slots", None)
+    if slots is None:
+        slots = OrderedDict()
+        _sqlite_local.slots = slots
+    slot = slots.get(path)
+    if slot is not None:
+        if slot.depth > 0:
+            return slot
+        if slot.generation != _sqlite_generation:
+            del slots[path]
+        # Health check: the file was deleted or replaced since we opened it.
+        elif slot.file_id is not None and _file_id(path) != slot.file_id:
+            _close_quietly(slot.conn)
+            del slots[path]
+            _bump("reopened")
+        else:
+            slots.move_to_end(path)
+            _bump("reused")
+            return slot
+    conn = _open_sqlite(path)
+    if _sqlite_open_hook is not None:
+        try:
+            _sqlite_open_hook(path, conn)
+        except BaseException:
+            _close_quietly(conn)
+            raise
+    slot = _SqliteSlot(conn, _file_id(path))
+    slots[path] = slot
+    _bump("opened")
+    while len(slots) > _SQLITE_MAX_PATHS_PER_THREAD:
+        oldest_path, oldest = next(iter(slots.items()))
+        if oldest.depth > 0:
+            break
+        del slots[oldest_path]
+        _close_quietly(oldest.conn)
+    return slot
+
+
+class _SqliteCheckout:
+    """Context manager over a thread-local SQLite connection (commit/rollback on outermost exit)."""
+
+    def __init__(self, slot: _SqliteSlot) -> None:
+        self._slot = slot
+
+    def __enter__(self) -> sqlite3.Connection:
+        self._slot.depth += 1
+        return self._slot.conn
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        slot = self._slot
+        slot.depth -= 1
+        if slot.depth > 0:
+            return
+        try:
+            if exc_type is None:
+                slot.conn.commit()
+            else:
+                slot.conn.rollback()
+        except sqlite3.Error:
+            pass
+
+
+def _pg_pool(database_url: str) -> Any:
+    pool = _pg_pools.get(database_url)
+    if pool is not None:
+        return pool
+    with _pg_pools_lock:
+        pool = _pg_pools.get(database_url)
+        if pool is None:
+            settings = get_settings()
+            pool = ConnectionPool(
+                database_url,
+                min_size=max(0, settings.db_pool_min_size),
+                max_size=max(1, settings.db_pool_max_size),
+                timeout=settings.db_pool_timeout_seconds,
+                kwargs={"row_factory": dict_row, "connect_timeout": 8},
+                # Health check on checkout: broken connections are replaced transparently.
+                check=ConnectionPool.check_connection,
+                name="agent-gateway",
+                open=True,
+            )
+            _pg_pools[database_url] = pool
+    return pool
+
+
+@contextmanager
+def _pg_pooled(database_url: str) -> Iterator[Any]:
+    try:
+        pool = _pg_pool(database_url)
+        checkout = pool.connection()
+        conn = checkout.__enter__()
+    except Exception as exc:
+        # Never leak DATABASE_URL credentials via exception text/tracebacks.
+        raise RuntimeError(f"Postgres connection failed ({type(exc).__name__})") from None
+    try:
+        yield conn
+    except BaseException:
+        checkout.__exit__(*sys.exc_info())
+        raise
+    else:
+        checkout.__exit__(None, None, None)
+
+
 def connect() -> Any:
     info = get_db_info()
     if info.dialect == "postgres":
         if psycopg is None:
             raise RuntimeError("psycopg is required for Postgres connections")
+        if ConnectionPool is not None:
+            return _pg_pooled(info.database_url)
+        global _pg_direct_connects
+        _pg_direct_connects += 1
         try:
             return psycopg.connect(info.database_url, row_factory=dict_row, connect_timeout=8)
         except Exception as exc:
             # Never leak DATABASE_URL credentials via exception text/tracebacks.
             # psycopg errors can include conninfo attempts with passwords.
             raise RuntimeError(f"Postgres connection failed ({type(exc).__name__})") from None
-    conn = sqlite3.connect(info.db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return _SqliteCheckout(_sqlite_slot(info.db_path))
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Connection reuse metrics for the active dialect (exposed on /metrics)."""
+    info = get_db_info()
+    if info.dialect == "postgres":
+        pool = _pg_pools.get(info.database_url or "")
+        if pool is None:
+            return {"dialect": "postgres", "pooled": ConnectionPool is not None, "direct_connects": _pg_direct_connects}
+        stats = dict(pool.get_stats())
+        return {"dialect": "postgres", "pooled": True, **stats}
+    with _stats_lock:
+        stats = dict(_sqlite_stats)
+    return {"dialect": "sqlite", "pooled": True, "open_connections": len(_sqlite_all), **stats}
+
+
+def close_pools() -> None:
+    """Close pooled connections (app shutdown / tests)."""
+    with _pg_pools_lock:
+        pools = list(_pg_pools.values())
+        _pg_pools.clear()
+    for pool in pools:
+        try:
+            pool.close()
+        except Exception:
+            pass
+    global _sqlite_generation
+    _sqlite_generation += 1
+    for conn in list(_sqlite_all):
+        _close_quietly(conn)
+    _sqlite_local.slots = OrderedDict()
 
 
 def sql(query: str) -> str:
@@ -13,19 +13,11 @@ from __future__ import annotations
 import json
 import time
 import uuid
-from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from app.storage.db import connect, is_postgres, sql
-
-
-def _ensure_sqlite_dir() -> None:
-    if is_postgres():
-        return
-    from app.config import get_settings
-
-    path = get_settings().db_path
-    Path(path).parent.mkdir(parents=True, exist_ok=True)
+from app.storage.db import connect, sql
+from app.storage.executor import async_variant
+from app.storage.migrations import ensure_schema
 
 
 def _ensure_eval_suites_table(conn: Any) -> None:
@@ -90,17 +82,15 @@ def _ensure_eval_case_results_table(conn: Any) -> None:
 
 
 def init_eval_db() -> None:
-    """Create eval_suites, eval_runs, eval_case_results tables. Call at app startup."""
-    _ensure_sqlite_dir()
-    with connect() as conn:
-        if not is_postgres():
-            conn.execute("PRAGMA journal_mode=WAL")
-            conn.execute("PRAGMA synchronous=NORMAL")
-            conn.execute("PRAGMA busy_timeout=3000")
-        _ensure_eval_suites_table(conn)
-        _ensure_eval_runs_table(conn)
-        _ensure_eval_case_results_table(conn)
-        conn.commit()
+    """Ensure the schema exists (app.storage.migrations); kept for scripts and tests."""
+    ensure_schema()
+
+
+def create_schema(conn: Any) -> None:
+    """eval_suites, eval_runs, eval_case_results DDL, applied by the baseline migration."""
+    _ensure_eval_suites_table(conn)
+    _ensure_eval_runs_table(conn)
+    _ensure_eval_case_results_table(conn)
 
 
 def create_eval_suite(
@@ -112,7 +102,7 @@ def create_eval_suite(
     description: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Create a new eval suite. Returns suite dict."""
-    init_eval_db()
+    ensure_schema()
     suite_id = str(uuid.uuid4())
     now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
     cases_text = json.dumps(cases, sort_keys=True, default=str)
@@ -142,7 +132,7 @@ def create_eval_suite(
 
 def get_eval_suite(eval_suite_id: str) -> Optional[Dict[str, Any]]:
     """Return eval suite dict or None."""
-    init_eval_db()
+    ensure_schema()
     with connect() as conn:
         row = conn.execute(
             sql("SELECT * FROM eval_suites WHERE id = ?"),
@@ -161,7 +151,7 @@ def get_eval_suite(eval_suite_id: str) -> Optional[Dict[str, Any]]:
 
 def list_eval_suites(agent_id: Optional[str] = None) -> List[Dict[str, Any]]:
     """List eval suites, optionally filtered by agent_id."""
-    init_eval_db()
+    ensure_schema()
     with connect() as conn:
         if agent_id:
             rows = conn.execute(
@@ -191,7 +181,7 @@ def create_eval_run(
     agent_version: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Create a new eval run with status=queued. Returns run dict."""
-    init_eval_db()
+    ensure_schema()
     run_id = str(uuid.uuid4())
     now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
     with connect() as conn:
@@ -227,7 +217,7 @@ def set_eval_run_status(
     error: Optional[str] = None,
 ) -> None:
     """Update eval run status and optional summary_json, error."""
-    init_eval_db()
+    ensure_schema()
     now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
     summary_text = json.dumps(summary_json, sort_keys=True, default=str) if summary_json is not None else None
     with connect() as conn:
@@ -262,7 +252,7 @@ def append_eval_case_result(
     run_id: Optional[str] = None,
 ) -> None:
     """Append a case result to an eval run."""
-    init_eval_db()
+    ensure_schema()
     result_id = str(uuid.uuid4())
     now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
     expected_text = json.dumps(expected_json, sort_keys=True, default=str) if expected_json is not None else None
@@ -296,7 +286,7 @@ def append_eval_case_result(
 
 def list_eval_case_results(eval_run_id: str) -> List[Dict[str, Any]]:
     """Return list of case result dicts for an eval run, ordered by case_index."""
-    init_eval_db()
+    ensure_schema()
     with connect() as conn:
         rows = conn.execute(
             sql("SELECT * FROM eval_case_results WHERE eval_run_id = ? ORDER BY case_index"),
@@ -321,7 +311,7 @@ def list_eval_case_results(eval_run_id: str) -> List[Dict[str, Any]]:
 
 def get_eval_run(eval_run_id: str) -> Optional[Dict[str, Any]]:
     """Return eval run dict or None."""
-    init_eval_db()
+    ensure_schema()
     with connect() as conn:
         row = conn.execute(
             sql("SELECT * FROM eval_runs WHERE id = ?"),
@@ -336,3 +326,13 @@ def get_eval_run(eval_run_id: str) -> Optional[Dict[str, Any]]:
             except (json.JSONDecodeError, TypeError):
                 pass
         return out
+
+
+# Async variants for async routers: same functions, run on the bounded DB executor.
+acreate_eval_suite = async_variant(create_eval_suite)
+aget_eval_suite = async_variant(get_eval_suite)
+alist_eval_suites = async_variant(list_eval_suites)
+acreate_eval_run = async_variant(create_eval_run)
+aset_eval_run_status = async_variant(set_eval_run_status)
+alist_eval_case_results = async_variant(list_eval_case_results)
+aget_eval_run = async_variant(get_eval_run)
@@ -0,0 +1,71 @@
+"""
+Bounded executor for store calls made from async code.
+
+The stores are synchronous (sqlite3 / psycopg over the pools in storage.db).
+Async routers await the a-prefixed variants (e.g. run_store.aget_run), which
+run the sync function on a dedicated thread pool instead of on the event loop,
+so one slow query no longer stalls every request on the worker. The pool is
+sized by DB_EXECUTOR_MAX_WORKERS; with SQLite each worker thread keeps its own
+pooled connection. The thread-based runner keeps calling the sync API.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from app.config import get_settings
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, get_settings().db_executor_max_workers),
+                    thread_name_prefix="db",
+                )
+    return _executor
+
+
+async def run_db(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking store call on the DB executor (context variables are propagated)."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(get_db_executor(), functools.partial(ctx.run, fn, *args, **kwargs))
+
+
+def async_variant(fn: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """
+    Async wrapper for a module-level store function.
+
+    The function is looked up by name on each call so tests that monkeypatch
+    the sync function also affect its async variant.
+    """
+    module = sys.modules[fn.__module__]
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        return await run_db(getattr(module, name), *args, **kwargs)
+
+    return wrapper
+
+
+def shutdown_db_executor() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False)
@@ -0,0 +1,222 @@
+"""
+Schema migrations for SQLite and Postgres.
+
+Migrations are numbered and applied in order; each applied version is recorded
+in schema_version (version, name, applied_at). ensure_schema() brings the
+current database up to date at most once per process: the lifespan in
+app.main calls it at startup, and store functions call it as a guard that is a
+set lookup by database URL or SQLite path once the database has been migrated
+(TestClient without `with`, scripts and the CLI never run the lifespan). Stores
+therefore issue no DDL at request time.
+
+A SQLite file that is deleted or replaced after it was migrated (tests) is
+migrated again when the connection pool opens it: the pool already reopens a
+file whose inode changed, and the open hook checks schema_version on each new
+connection (inode numbers are reused, so they cannot tell the files apart).
+On Postgres a transaction-scoped advisory lock serializes migrations across
+processes.
+
+Version 1 (baseline) is the schema the stores used to create lazily; its
+statements are idempotent so existing databases without schema_version adopt it
+in place. New schema changes are appended as new versions, never edited.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+from app.storage.db import DbInfo, _file_id, connect, get_db_info, set_sqlite_open_hook, sql
+
+logger = logging.getLogger("agent-gateway")
+
+# Arbitrary constant shared by every gateway process migrating the same database.
+_PG_MIGRATION_LOCK_ID = 92734013
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[Any], None]
+
+
+def _baseline(conn: Any) -> None:
+    # Imported here: the stores import ensure_schema from this module.
+    from app.storage import eval_store, registry_store, response_cache_store, run_store, session_store
+    from app.tool_ingestion import persistence
+
+    session_store.create_schema(conn)
+    registry_store.create_schema(conn)
+    run_store.create_schema(conn)
+    eval_store.create_schema(conn)
+    response_cache_store.create_schema(conn)
+    persistence.create_schema(conn)
+
+
+def _events_session_id_id_index(conn: Any) -> None:
+    # Serves get_session_memory(): WHERE session_id = ? [AND id < ?] ORDER BY id DESC LIMIT ?
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_session_id_id ON events (session_id, id)")
+
+
+def _run_steps_month_partitions(conn: Any) -> None:
+    # Postgres only: SQLite has no declarative partitioning; retention trims rows there.
+    if get_db_info().dialect != "postgres":
+        return
+    from app.storage import retention
+
+    retention.partition_run_steps(conn)
+
+
+def _agents_latest_projection(conn: Any) -> None:
+    from app.storage import registry_store
+
+    registry_store.create_listing_schema(conn)
+
+
+def _registry_state(conn: Any) -> None:
+    from app.storage import registry_store
+
+    registry_store.create_state_schema(conn)
+
+
+def _run_queue(conn: Any) -> None:
+    from app.storage import run_store
+
+    run_store.create_queue_schema(conn)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline", _baseline),
+    Migration(2, "events_session_id_id_index", _events_session_id_id_index),
+    Migration(3, "run_steps_month_partitions", _run_steps_month_partitions),
+    Migration(4, "agents_latest_projection", _agents_latest_projection),
+    Migration(5, "registry_state", _registry_state),
+    Migration(6, "run_queue", _run_queue),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+# Databases migrated in this process, by _guard_key().
+_applied: Set[Tuple[str, Optional[str]]] = set()
+# Reentrant: migrating opens a connection, which runs the pool's open hook.
+_lock = threading.RLock()
+
+
+def _schema_key(info: DbInfo) -> Tuple[Any, ...]:
+    """Identity of the configured database, including the SQLite file's inode."""
+    if info.dialect == "postgres":
+        return ("postgres", info.database_url)
+    path = os.path.abspath(info.db_path)
+    return ("sqlite", path, _file_id(path))
+
+
+def _guard_key(info: DbInfo) -> Tuple[str, Optional[str]]:
+    # Same path string the SQLite pool keys its connections by.
+    if info.dialect == "postgres":
+        return ("postgres", info.database_url)
+    return ("sqlite", info.db_path)
+
+
+def _create_version_table(conn: Any) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+        """
+    )
+
+
+def _current_version(conn: Any) -> int:
+    row = conn.execute("SELECT MAX(version) AS version FROM schema_version").fetchone()
+    if not row or row["version"] is None:
+        return 0
+    return int(row["version"])
+
+
+def _apply_pending(conn: Any) -> List[int]:
+    applied: List[int] = []
+    _create_version_table(conn)
+    current = _current_version(conn)
+    for migration in MIGRATIONS:
+        if migration.version <= current:
+            continue
+        migration.apply(conn)
+        conn.execute(
+            sql("INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)"),
+            (migration.version, migration.name, time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())),
+        )
+        applied.append(migration.version)
+    conn.commit()
+    return applied
+
+
+def _migrate(info: DbInfo) -> List[int]:
+    if info.dialect == "sqlite":
+        Path(info.db_path).parent.mkdir(parents=True, exist_ok=True)
+    with connect() as conn:
+        if info.dialect == "postgres":
+            conn.execute(f"SELECT pg_advisory_xact_lock({_PG_MIGRATION_LOCK_ID})")
+        return _apply_pending(conn)
+
+
+def ensure_schema() -> None:
+    """Apply pending migrations to the configured database (no-op once applied in this process)."""
+    info = get_db_info()
+    key = _guard_key(info)
+    if key in _applied:
+        return
+    with _lock:
+        if key in _applied:
+            return
+        applied = _migrate(info)
+        if applied:
+            logger.info("Applied schema migrations %s (%s)", applied, info.dialect)
+        _applied.add(key)
+
+
+def _remigrate_replaced_file(path: str, conn: Any) -> None:
+    """SQLite pool open hook: migrate a file that replaced the one migrated under this path."""
+    if ("sqlite", path) not in _applied:
+        return  # Not migrated in this process yet; ensure_schema() does it.
+    try:
+        if _current_version(conn) >= LATEST_VERSION:
+            return
+    except sqlite3.OperationalError:
+        pass  # No schema_version table: a new file.
+    with _lock:
+        applied = _apply_pending(conn)
+    if applied:
+        logger.info("Applied schema migrations %s to replaced SQLite file %s", applied, path)
+
+
+set_sqlite_open_hook(_remigrate_replaced_file)
+
+
+def get_schema_version() -> Optional[int]:
+    """Highest applied migration version, or None if schema_version does not exist yet."""
+    try:
+        with connect() as conn:
+            return _current_version(conn)
+    except Exception:
+        return None
+
+
+def is_schema_applied() -> bool:
+    """True once ensure_schema() has migrated the configured database in this process."""
+    return _guard_key(get_db_info()) in _applied
+
+
+def reset_schema_guard() -> None:
+    """Forget which databases were migrated in this process (tests)."""
+    with _lock:
+        _applied.clear()
@@ -8,29 +8,54 @@ One connection per request; DB_PATH from env (default ./data/gateway.db).
 from __future__ import annotations
 
 import asyncio
+import base64
 import json
 import logging
 import re
 import time
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import yaml
-from jsonschema import Draft7Validator, SchemaError
+from jsonschema import SchemaError
 
 from app.catalog.resolution import ResolutionError, resolve_spec_tools
 from app.models import StoredAgent
-from app.preset_loader import _coerce_memory_policy
+from app.preset_loader import _coerce_memory_policy, _coerce_response_cache
 from app.storage.db import connect, is_postgres, sql
+from app.storage.executor import async_variant
+from app.storage.migrations import ensure_schema
+from app.utils.validators import check_schema
 
 logger = logging.getLogger("agent-gateway")
 
 _registry_version = 0
 _registry_event = asyncio.Event()
+# Loop that waits on _registry_event; writes may run on DB executor threads.
+_registry_loop: Optional[asyncio.AbstractEventLoop] = None
+
+_registry_listeners: List[Callable[[], None]] = []
+
+
+def add_registry_listener(listener: Callable[[], None]) -> None:
+    """Call listener (synchronously, in the writing thread) after every registry write in this process."""
+    _registry_listeners.append(listener)
+
 
 def _touch_registry_version() -> None:
     global _registry_version
     _registry_version += 1
+    for listener in _registry_listeners:
+        listener()
+    loop = _registry_loop
+    if loop is not None and not loop.is_closed():
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not loop:
+            loop.call_soon_threadsafe(_registry_event.set)
+            return
     _registry_event.set()
 
 
@@ -42,8 +67,10 @@ async def wait_for_registry_change(last_seen: int, timeout: float = 15.0) -> int
     """
     Wait for a registry change or timeout; returns the latest version.
     """
+    global _registry_loop
     if _registry_version != last_seen:
         return _registry_version
+    _registry_loop = asyncio.get_running_loop()
     try:
         await asyncio.wait_for(_registry_event.wait(), timeout=timeout)
     except asyncio.TimeoutError:
@@ -80,111 +107,88 @@ class AgentVersionExists(RegistryError):
         self.version = version
 
 
-def _ensure_sqlite_dir() -> None:
-    if is_postgres():
-        return
-    from app.config import get_settings
-
-    path = get_settings().db_path
-    Path(path).parent.mkdir(parents=True, exist_ok=True)
+def init_registry_db() -> None:
+    """Ensure the schema exists (app.storage.migrations); kept for scripts and tests."""
+    ensure_schema()
 
 
-def init_registry_db() -> None:
-    """
-    Create agents table and indexes. Call at app startup.
-    """
-    _ensure_sqlite_dir()
-    with connect() as conn:
-        if not is_postgres():
-            conn.execute("PRAGMA journal_mode=WAL")
-            conn.execute("PRAGMA synchronous=NORMAL")
-            conn.execute("PRAGMA busy_timeout=3000")
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS agents (
-                    id TEXT NOT NULL,
-                    version TEXT NOT NULL,
-                    name TEXT NOT NULL,
-                    description TEXT NOT NULL,
-                    primitive TEXT NOT NULL,
-                    supports_memory INTEGER NOT NULL,
-                    owner_user_id TEXT,
-                    tags TEXT,
-                    spec_json TEXT NOT NULL,
-                    created_at INTEGER NOT NULL,
-                    archived INTEGER NOT NULL DEFAULT 0,
-                    PRIMARY KEY (id, version)
-                )
-                """
+def create_schema(conn: Any) -> None:
+    """agents table and indexes, applied by the baseline migration."""
+    if not is_postgres():
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS agents (
+                id TEXT NOT NULL,
+                version TEXT NOT NULL,
+                name TEXT NOT NULL,
+                description TEXT NOT NULL,
+                primitive TEXT NOT NULL,
+                supports_memory INTEGER NOT NULL,
+                owner_user_id TEXT,
+                tags TEXT,
+                spec_json TEXT NOT NULL,
+                created_at INTEGER NOT NULL,
+                archived INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (id, version)
             )
-            try:
-                conn.execute("ALTER TABLE agents ADD COLUMN owner_user_id TEXT")
-            except Exception:
-                # Column already exists.
-                pass
-            try:
-                conn.execute("ALTER TABLE agents ADD COLUMN archived INTEGER NOT NULL DEFAULT 0")
-            except Exception:
-                # Column already exists.
-                pass
-        else:
-            # Serialize schema migration across processes and reduce startup lock contention.
-            # If another process is migrating, we prefer to start without re-running ALTERs when not needed.
-            try:
-                conn.execute("SELECT pg_advisory_lock(92734012)")
-            except Exception:
-                pass
-            conn.execute(
+            """
+        )
+        try:
+            conn.execute("ALTER TABLE agents ADD COLUMN owner_user_id TEXT")
+        except Exception:
+            # Column already exists.
+            pass
+        try:
+            conn.execute("ALTER TABLE agents ADD COLUMN archived INTEGER NOT NULL DEFAULT 0")
+        except Exception:
+            # Column already exists.
+            pass
+    else:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS agents (
+                id TEXT NOT NULL,
+                version TEXT NOT NULL,
+                name TEXT NOT NULL,
+                description TEXT NOT NULL,
+                primitive TEXT NOT NULL,
+                supports_memory BOOLEAN NOT NULL,
+                owner_user_id TEXT,
+                tags TEXT,
+                spec_json TEXT NOT NULL,
+                created_at BIGINT NOT NULL,
+                archived BOOLEAN NOT NULL DEFAULT FALSE,
+                PRIMARY KEY (id, version)
+            )
+            """
+        )
+        # Only attempt ALTER TABLE when columns are missing; avoids blocking DDL when schema is already up to date.
+        try:
+            row = conn.execute(
                 """
-                CREATE TABLE IF NOT EXISTS agents (
-                    id TEXT NOT NULL,
-                    version TEXT NOT NULL,
-                    name TEXT NOT NULL,
-                    description TEXT NOT NULL,
-                    primitive TEXT NOT NULL,
-                    supports_memory BOOLEAN NOT NULL,
-                    owner_user_id TEXT,
-                    tags TEXT,
-                    spec_json TEXT NOT NULL,
-                    created_at BIGINT NOT NULL,
-                    archived BOOLEAN NOT NULL DEFAULT FALSE,
-                    PRIMARY KEY (id, version)
-                )
+                SELECT column_name
+                FROM information_schema.columns
+                WHERE table_schema = 'public' AND table_name = 'agents'
                 """
-            )
-            # Only attempt ALTER TABLE when columns are missing; avoids blocking DDL when schema is already up to date.
-            try:
-                row = conn.execute(
-                    """
-                    SELECT column_name
-                    FROM information_schema.columns
-                    WHERE table_schema = 'public' AND table_name = 'agents'
-                    """
-                ).fetchall()
-                existing = {r["column_name"] for r in row if isinstance(r, dict) and isinstance(r.get("column_name"), str)}
-            except Exception:
-                existing = set()
-            try:
-                if "owner_user_id" not in existing:
-                    conn.execute("ALTER TABLE agents ADD COLUMN owner_user_id TEXT")
-                if "archived" not in existing:
-                    conn.execute("ALTER TABLE agents ADD COLUMN archived BOOLEAN DEFAULT FALSE")
-            except Exception as exc:
-                # If another process is performing the migration and we time out waiting for locks,
-                # log it and proceed so the app can start if schema is already migrated.
-                logger.warning("Postgres agents ALTER TABLE failed: %s", exc)
-                # Re-raise only if we couldn't confirm the columns exist.
-                if "owner_user_id" not in existing or "archived" not in existing:
-                    raise
-            finally:
-                try:
-                    conn.execute("SELECT pg_advisory_unlock(92734012)")
-                except Exception:
-                    pass
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_agents_id ON agents (id)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_agents_primitive ON agents (primitive)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_agents_owner ON agents (owner_user_id)")
-        conn.commit()
+            ).fetchall()
+            existing = {r["column_name"] for r in row if isinstance(r, dict) and isinstance(r.get("column_name"), str)}
+        except Exception:
+            existing = set()
+        try:
+            if "owner_user_id" not in existing:
+                conn.execute("ALTER TABLE agents ADD COLUMN owner_user_id TEXT")
+            if "archived" not in existing:
+                conn.execute("ALTER TABLE agents ADD COLUMN archived BOOLEAN DEFAULT FALSE")
+        except Exception as exc:
+            # If another process is performing the migration and we time out waiting for locks,
+            # log it and proceed so the app can start if schema is already migrated.
+            logger.warning("Postgres agents ALTER TABLE failed: %s", exc)
+            # Re-raise only if we couldn't confirm the columns exist.
+            if "owner_user_id" not in existing or "archived" not in existing:
+                raise
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_agents_id ON agents (id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_agents_primitive ON agents (primitive)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_agents_owner ON agents (owner_user_id)")
 
 
 def _json_size_bytes(value: Any) -> int:
@@ -215,7 +219,7 @@ def _validate_schema(schema: Any, *, field_name: str) -> Dict[str, Any]:
     if depth > _MAX_SCHEMA_DEPTH:
         raise AgentSpecInvalid(f"{field_name} is too deep")
     try:
-        Draft7Validator.check_schema(schema)
+        check_schema(schema)
     except SchemaError as exc:
         raise AgentSpecInvalid(f"{field_name} is not a valid Draft7 JSON schema", details={"message": str(exc)}) from exc
     return schema
@@ -294,6 +298,11 @@ def _normalize_spec(raw_spec: Dict[str, Any]) -> Dict[str, Any]:
     }
     if memory_policy is not None:
         normalized["memory_policy"] = memory_policy
+    response_cache_raw = raw_spec.get("response_cache")
+    if response_cache_raw is not None:
+        if not isinstance(response_cache_raw, (bool, dict)):
+            raise AgentSpecInvalid("response_cache must be a boolean or an object when provided")
+        normalized["response_cache"] = _coerce_response_cache(response_cache_raw)
     if tags_list is not None:
         normalized["tags"] = tags_list
     if credits_obj is not None:
@@ -331,7 +340,7 @@ def register_agent(spec: Dict[str, Any], *, owner_user_id: Optional[str] = None)
     Validate and register an agent spec. Returns (id, version).
     Raises AgentSpecInvalid or AgentVersionExists.
     """
-    init_registry_db()
+    ensure_schema()
     normalized = _normalize_spec(spec)
     created_at = time.time_ns()
     tags_json = json.dumps(normalized.get("tags")) if normalized.get("tags") is not None else None
@@ -385,6 +394,8 @@ def register_agent(spec: Dict[str, Any], *, owner_user_id: Optional[str] = None)
                 0 if not is_postgres() else False,
             ),
         )
+        _refresh_listing(conn, normalized["id"])
+        _bump_registry_state(conn)
         conn.commit()
     _touch_registry_version()
     return normalized["id"], normalized["version"]
@@ -401,7 +412,7 @@ def preview_register_agent(spec: Dict[str, Any], *, owner_user_id: Optional[str]
         normalized: { agent_id, version, name } after _normalize_spec.
         existing: row metadata when would_conflict (else None).
     """
-    init_registry_db()
+    ensure_schema()
     normalized = _normalize_spec(spec)
     owner_mismatch = False
     existing_meta: Optional[Dict[str, Any]] = None
@@ -449,16 +460,365 @@ def preview_register_agent(spec: Dict[str, Any], *, owner_user_id: Optional[str]
     }
 
 
-def list_agents(
+# --- registry_state: cross-process change counter ---------------------------------------------
+#
+# Every registry write bumps registry_state.version in its transaction so other
+# workers can detect changes (app.registry_cache compares it periodically);
+# _touch_registry_version() covers the writing process immediately.
+
+
+def create_state_schema(conn: Any) -> None:
+    """registry_state table with its single row, applied by migration 5."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS registry_state (
+            id INTEGER PRIMARY KEY,
+            version BIGINT NOT NULL
+        )
+        """
+    )
+    if conn.execute("SELECT 1 AS found FROM registry_state WHERE id = 1").fetchone() is None:
+        conn.execute("INSERT INTO registry_state (id, version) VALUES (1, 0)")
+
+
+def _bump_registry_state(conn: Any) -> None:
+    conn.execute("UPDATE registry_state SET version = version + 1 WHERE id = 1")
+
+
+def get_registry_state_version() -> int:
+    """Registry change counter shared by all processes using this database."""
+    ensure_schema()
+    with connect() as conn:
+        row = conn.execute("SELECT version FROM registry_state WHERE id = 1").fetchone()
+    return int(row["version"]) if row is not None else 0
+
+
+# --- agents_latest: listing projection -------------------------------------------------------
+#
+# One row per agent id with its newest non-archived version: the list columns plus
+# credits extracted from spec_json. register/archive/unarchive refresh it in the
+# writing transaction (migration 4 creates and backfills it), so the default
+# listing (latest versions, archived hidden) reads it instead of ranking every
+# version of every agent. q is full-text search over id/name/description/tags:
+# FTS5 (external content, synced by triggers) on SQLite, a generated tsvector
+# with a GIN index on Postgres. Query words match as word prefixes ("summ"
+# finds "summarizer"). Results are ordered by id and paged by an opaque cursor.
+
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(RegistryError):
+    """Raised when a list cursor cannot be decoded."""
+
+
+def create_listing_schema(conn: Any) -> None:
+    """agents_latest projection and its full-text index, applied by migration 4."""
+    if is_postgres():
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS agents_latest (
+                id TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                name TEXT NOT NULL,
+                description TEXT NOT NULL,
+                primitive TEXT NOT NULL,
+                supports_memory BOOLEAN NOT NULL,
+                owner_user_id TEXT,
+                tags TEXT,
+                credits_json TEXT,
+                created_at BIGINT NOT NULL,
+                search_vector tsvector GENERATED ALWAYS AS (
+                    to_tsvector('simple', id || ' ' || name || ' ' || description || ' ' || COALESCE(tags, ''))
+                ) STORED
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_agents_latest_search ON agents_latest USING GIN (search_vector)")
+    else:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS agents_latest (
+                id TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                name TEXT NOT NULL,
+                description TEXT NOT NULL,
+                primitive TEXT NOT NULL,
+                supports_memory INTEGER NOT NULL,
+                owner_user_id TEXT,
+                tags TEXT,
+                credits_json TEXT,
+                created_at INTEGER NOT NULL
+            )
+            """
+        )
+        try:
+            conn.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS agents_latest_fts USING fts5(
+                    id, name, description, tags, content='agents_latest', content_rowid='rowid'
+                )
+                """
+            )
+        except Exception as exc:
+            # SQLite built without FTS5: list_agents falls back to LIKE on agents_latest.
+            logger.warning("FTS5 unavailable; registry search uses LIKE (%s)", exc)
+        else:
+            conn.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS agents_latest_fts_ai AFTER INSERT ON agents_latest BEGIN
+                    INSERT INTO agents_latest_fts (rowid, id, name, description, tags)
+                    VALUES (new.rowid, new.id, new.name, new.description, new.tags);
+                END
+                """
+            )
+            conn.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS agents_latest_fts_ad AFTER DELETE ON agents_latest BEGIN
+                    INSERT INTO agents_latest_fts (agents_latest_fts, rowid, id, name, description, tags)
+                    VALUES ('delete', old.rowid, old.id, old.name, old.description, old.tags);
+                END
+                """
+            )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_agents_latest_primitive ON agents_latest (primitive)")
+    rebuild_listing(conn)
+
+
+def _credits_from_spec(spec: Any) -> Optional[Dict[str, str]]:
+    if not isinstance(spec, dict):
+        return None
+    credits_val = spec.get("credits")
+    if not isinstance(credits_val, dict) or not credits_val.get("name"):
+        return None
+    credits = {"name": str(credits_val.get("name")).strip()}
+    url_val = credits_val.get("url")
+    if url_val:
+        credits["url"] = str(url_val).strip()
+    return credits
+
+
+def _refresh_listing(conn: Any, agent_id: str) -> None:
+    """Point agents_latest at the newest non-archived version of agent_id (or drop it)."""
+    row = conn.execute(
+        sql(
+            "SELECT * FROM agents WHERE id = ? AND archived = ? ORDER BY created_at DESC"
+            + (", rowid DESC" if not is_postgres() else "")
+            + " LIMIT 1"
+        ),
+        (agent_id, False if is_postgres() else 0),
+    ).fetchone()
+    conn.execute(sql("DELETE FROM agents_latest WHERE id = ?"), (agent_id,))
+    if row is None:
+        return
+    try:
+        credits = _credits_from_spec(json.loads(row["spec_json"]) if row["spec_json"] else {})
+    except Exception:
+        credits = None
+    conn.execute(
+        sql(
+            """
+            INSERT INTO agents_latest (
+                id, version, name, description, primitive,
+                supports_memory, owner_user_id, tags, credits_json, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """
+        ),
+        (
+            row["id"],
+            row["version"],
+            row["name"],
+            row["description"],
+            row["primitive"],
+            row["supports_memory"],
+            row["owner_user_id"],
+            row["tags"],
+            json.dumps(credits) if credits is not None else None,
+            row["created_at"],
+        ),
+    )
+
+
+def rebuild_listing(conn: Any) -> None:
+    """Refresh agents_latest for every agent id (backfill)."""
+    for row in conn.execute("SELECT DISTINCT id FROM agents").fetchall():
+        _refresh_listing(conn, row["id"])
+
+
+def _has_sqlite_fts(conn: Any) -> bool:
+    row = conn.execute("SELECT 1 AS found FROM sqlite_master WHERE name = 'agents_latest_fts'").fetchone()
+    return row is not None
+
+
+def _search_terms(q: str) -> List[str]:
+    return re.findall(r"[^\W_]+", q.lower())
+
+
+def _encode_cursor(values: Dict[str, Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise InvalidCursor("Invalid cursor") from None
+    if not isinstance(values, dict) or not isinstance(values.get("id"), str):
+        raise InvalidCursor("Invalid cursor")
+    return values
+
+
+def _listing_dict(row: Any, credits: Optional[Dict[str, str]], archived: bool) -> Dict[str, Any]:
+    tags = None
+    if row["tags"]:
+        try:
+            tags = json.loads(row["tags"])
+        except Exception:
+            tags = None
+    return {
+        "id": row["id"],
+        "version": row["version"],
+        "name": row["name"],
+        "description": row["description"],
+        "primitive": row["primitive"],
+        "supports_memory": bool(row["supports_memory"]),
+        "tags": tags,
+        "created_at": row["created_at"],
+        "archived": archived,
+        "credits": credits,
+    }
+
+
+def _agents_row_to_listing(row: Any) -> Dict[str, Any]:
+    try:
+        credits = _credits_from_spec(json.loads(row["spec_json"]) if row["spec_json"] else {})
+    except Exception:
+        credits = None
+    return _listing_dict(row, credits, bool(row["archived"]))
+
+
+def _list_from_projection(
+    conn: Any,
+    *,
+    q: Optional[str],
+    primitive: Optional[str],
+    supports_memory: Optional[bool],
+    after_id: Optional[str],
+    limit: Optional[int],
+) -> List[Dict[str, Any]]:
+    clauses: List[str] = []
+    params: List[Any] = []
+    terms = _search_terms(q) if q else []
+    if terms and is_postgres():
+        clauses.append("search_vector @@ to_tsquery('simple', ?)")
+        params.append(" & ".join(f"{t}:*" for t in terms))
+    elif terms and _has_sqlite_fts(conn):
+        clauses.append("rowid IN (SELECT rowid FROM agents_latest_fts WHERE agents_latest_fts MATCH ?)")
+        params.append(" ".join(f'"{t}"*' for t in terms))
+    elif q:
+        q_like = f"%{q.lower()}%"
+        clauses.append("(LOWER(name) LIKE ? OR LOWER(description) LIKE ? OR LOWER(id) LIKE ?)")
+        params.extend([q_like, q_like, q_like])
+    if primitive:
+        clauses.append("primitive = ?")
+        params.append(primitive)
+    if supports_memory is not None:
+        clauses.append("supports_memory = ?")
+        params.append(supports_memory if is_postgres() else (1 if supports_memory else 0))
+    if after_id is not None:
+        clauses.append("id > ?")
+        params.append(after_id)
+    where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    limit_sql = ""
+    if limit is not None:
+        limit_sql = "LIMIT ?"
+        params.append(limit)
+    rows = conn.execute(
+        sql(
+            f"""
+            SELECT id, version, name, description, primitive, supports_memory, tags, credits_json, created_at
+            FROM agents_latest
+            {where_sql}
+            ORDER BY id
+            {limit_sql}
+            """
+        ),
+        params,
+    ).fetchall()
+    out: List[Dict[str, Any]] = []
+    for row in rows:
+        try:
+            credits = json.loads(row["credits_json"]) if row["credits_json"] else None
+        except Exception:
+            credits = None
+        out.append(_listing_dict(row, credits, False))
+    return out
+
+
+def list_agents_page(
     *,
     q: Optional[str] = None,
     primitive: Optional[str] = None,
     supports_memory: Optional[bool] = None,
     latest_only: bool = True,
     include_archived: bool = False,
-) -> List[Dict[str, Any]]:
-    init_registry_db()
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    List agents ordered by id. Returns {"agents": [...], "next_cursor": str | None}.
 
+    With limit, at most limit agents (capped at MAX_PAGE_SIZE) are returned and
+    next_cursor, when set, fetches the following page with the same filters.
+    Raises InvalidCursor for a malformed cursor.
+    """
+    ensure_schema()
+    position = _decode_cursor(cursor) if cursor else None
+    page_size = max(1, min(int(limit), MAX_PAGE_SIZE)) if limit is not None else None
+    fetch = page_size + 1 if page_size is not None else None
+
+    if latest_only and not include_archived:
+        with connect() as conn:
+            agents = _list_from_projection(
+                conn,
+                q=q,
+                primitive=primitive,
+                supports_memory=supports_memory,
+                after_id=position["id"] if position else None,
+                limit=fetch,
+            )
+    else:
+        agents = _list_from_agents(
+            q=q,
+            primitive=primitive,
+            supports_memory=supports_memory,
+            latest_only=latest_only,
+            include_archived=include_archived,
+            position=position,
+            limit=fetch,
+        )
+
+    next_cursor = None
+    if page_size is not None and len(agents) > page_size:
+        agents = agents[:page_size]
+        last = agents[-1]
+        next_cursor = _encode_cursor(
+            {"id": last["id"]} if latest_only else {"id": last["id"], "created_at": last["created_at"]}
+        )
+    return {"agents": agents, "next_cursor": next_cursor}
+
+
+def _list_from_agents(
+    *,
+    q: Optional[str],
+    primitive: Optional[str],
+    supports_memory: Optional[bool],
+    latest_only: bool,
+    include_archived: bool,
+    position: Optional[Dict[str, Any]],
+    limit: Optional[int],
+) -> List[Dict[str, Any]]:
+    """Listings that include archived versions or every version, read from agents."""
     clauses: List[str] = []
     params: List[Any] = []
 
@@ -477,6 +837,20 @@ def list_agents(
         params.append(False if is_postgres() else 0)
 
     where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    outer: List[str] = []
+    if latest_only:
+        outer.append("rn = 1")
+        if position is not None:
+            outer.append("id > ?")
+            params.append(position["id"])
+    elif position is not None:
+        outer.append("(id > ? OR (id = ? AND created_at < ?))")
+        params.extend([position["id"], position["id"], int(position.get("created_at") or 0)])
+    outer_sql = f"WHERE {' AND '.join(outer)}" if outer else ""
+    limit_sql = ""
+    if limit is not None:
+        limit_sql = "LIMIT ?"
+        params.append(limit)
 
     if latest_only:
         order_by = "a.created_at DESC, a.rowid DESC" if not is_postgres() else "a.created_at DESC"
@@ -489,63 +863,47 @@ def list_agents(
                 ) AS rn
                 FROM agents a
                 {where_sql}
-            )
-            WHERE rn = 1
+            ) ranked
+            {outer_sql}
             ORDER BY id
+            {limit_sql}
         """
     else:
         order_by = "id, created_at DESC, rowid DESC" if not is_postgres() else "id, created_at DESC"
+        where_all = clauses + outer
         query = f"""
             SELECT *
             FROM agents
-            {where_sql}
+            {f"WHERE {' AND '.join(where_all)}" if where_all else ""}
             ORDER BY {order_by}
+            {limit_sql}
         """
 
     with connect() as conn:
         rows = conn.execute(sql(query), params).fetchall()
+    return [_agents_row_to_listing(row) for row in rows]
 
-    agents: List[Dict[str, Any]] = []
-    for row in rows:
-        tags = None
-        if row["tags"]:
-            try:
-                tags = json.loads(row["tags"])
-            except Exception:
-                tags = None
-        credits = None
-        try:
-            spec = json.loads(row["spec_json"]) if row["spec_json"] else {}
-            if isinstance(spec, dict):
-                credits_val = spec.get("credits")
-                if isinstance(credits_val, dict) and credits_val.get("name"):
-                    credits = {
-                        "name": str(credits_val.get("name")).strip(),
-                    }
-                    url_val = credits_val.get("url")
-                    if url_val:
-                        credits["url"] = str(url_val).strip()
-        except Exception:
-            credits = None
-        agents.append(
-            {
-                "id": row["id"],
-                "version": row["version"],
-                "name": row["name"],
-                "description": row["description"],
-                "primitive": row["primitive"],
-                "supports_memory": bool(row["supports_memory"]),
-                "tags": tags,
-                "created_at": row["created_at"],
-                "archived": bool(row["archived"]),
-                "credits": credits,
-            }
-        )
-    return agents
+
+def list_agents(
+    *,
+    q: Optional[str] = None,
+    primitive: Optional[str] = None,
+    supports_memory: Optional[bool] = None,
+    latest_only: bool = True,
+    include_archived: bool = False,
+) -> List[Dict[str, Any]]:
+    """All matching agents ordered by id (see list_agents_page)."""
+    return list_agents_page(
+        q=q,
+        primitive=primitive,
+        supports_memory=supports_memory,
+        latest_only=latest_only,
+        include_archived=include_archived,
+    )["agents"]
 
 
 def list_agents_by_owner(owner_user_id: str, *, include_archived: bool = False) -> List[Dict[str, Any]]:
-    init_registry_db()
+    ensure_schema()
     order_by = "id, created_at DESC, rowid DESC" if not is_postgres() else "id, created_at DESC"
     with connect() as conn:
         rows = conn.execute(
@@ -561,44 +919,7 @@ def list_agents_by_owner(owner_user_id: str, *, include_archived: bool = False)
             ),
             (owner_user_id,),
         ).fetchall()
-
-    agents: List[Dict[str, Any]] = []
-    for row in rows:
-        tags = None
-        if row["tags"]:
-            try:
-                tags = json.loads(row["tags"])
-            except Exception:
-                tags = None
-        credits = None
-        try:
-            spec = json.loads(row["spec_json"]) if row["spec_json"] else {}
-            if isinstance(spec, dict):
-                credits_val = spec.get("credits")
-                if isinstance(credits_val, dict) and credits_val.get("name"):
-                    credits = {
-                        "name": str(credits_val.get("name")).strip(),
-                    }
-                    url_val = credits_val.get("url")
-                    if url_val:
-                        credits["url"] = str(url_val).strip()
-        except Exception:
-            credits = None
-        agents.append(
-            {
-                "id": row["id"],
-                "version": row["version"],
-                "name": row["name"],
-                "description": row["description"],
-                "primitive": row["primitive"],
-                "supports_memory": bool(row["supports_memory"]),
-                "tags": tags,
-                "created_at": row["created_at"],
-                "archived": bool(row["archived"]),
-                "credits": credits,
-            }
-        )
-    return agents
+    return [_agents_row_to_listing(row) for row in rows]
 
 
 class AgentNotFound(RegistryError):
@@ -615,7 +936,7 @@ def archive_agent(
     version: Optional[str] = None,
     owner_user_id: Optional[str] = None,
 ) -> Tuple[str, Optional[str]]:
-    init_registry_db()
+    ensure_schema()
     with connect() as conn:
         if owner_user_id:
             if version:
@@ -641,6 +962,8 @@ def archive_agent(
                     sql("UPDATE agents SET archived = ? WHERE id = ?"),
                     (True if is_postgres() else 1, agent_id),
                 )
+        _refresh_listing(conn, agent_id)
+        _bump_registry_state(conn)
         conn.commit()
         if res.rowcount == 0:
             # Either not found, or not owned by caller.
@@ -657,7 +980,7 @@ def unarchive_agent(
     version: Optional[str] = None,
     owner_user_id: Optional[str] = None,
 ) -> Tuple[str, Optional[str]]:
-    init_registry_db()
+    ensure_schema()
     with connect() as conn:
         if owner_user_id:
             if version:
@@ -683,6 +1006,8 @@ def unarchive_agent(
                     sql("UPDATE agents SET archived = ? WHERE id = ?"),
                     (False if is_postgres() else 0, agent_id),
                 )
+        _refresh_listing(conn, agent_id)
+        _bump_registry_state(conn)
         conn.commit()
         if res.rowcount == 0:
             if owner_user_id:
@@ -693,7 +1018,7 @@ def unarchive_agent(
 
 
 def _get_row(agent_id: str, version: Optional[str]) -> Optional[Any]:
-    init_registry_db()
+    ensure_schema()
     with connect() as conn:
         if version:
             return conn.execute(
@@ -773,7 +1098,7 @@ def get_agent_schema(agent_id: str, version: Optional[str] = None) -> Optional[D
 
 
 def count_agents() -> int:
-    init_registry_db()
+    ensure_schema()
     with connect() as conn:
         row = conn.execute("SELECT COUNT(1) AS c FROM agents").fetchone()
         return int(row["c"]) if row and row["c"] is not None else 0
@@ -807,3 +1132,17 @@ def seed_from_presets(presets_dir: Path) -> int:
         except Exception as exc:
             logger.warning("Skipping preset %s: %s", preset_path.name, exc)
     return seeded
+
+
+# Async variants for async routers: same functions, run on the bounded DB executor.
+aregister_agent = async_variant(register_agent)
+apreview_register_agent = async_variant(preview_register_agent)
+alist_agents = async_variant(list_agents)
+alist_agents_page = async_variant(list_agents_page)
+alist_agents_by_owner = async_variant(list_agents_by_owner)
+aarchive_agent = async_variant(archive_agent)
+aunarchive_agent = async_variant(unarchive_agent)
+aget_agent = async_variant(get_agent)
+aget_agent_as_stored = async_variant(get_agent_as_stored)
+aget_agent_schema = async_variant(get_agent_schema)
+acount_agents = async_variant(count_agents)
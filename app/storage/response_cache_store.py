@@ -0,0 +1,114 @@
+"""
+Response cache store: optional SQLite- or Postgres-backed second tier for the
+LLM response cache (see app.response_cache).
+
+response_cache: (cache_key, agent_id, agent_version, result_json, raw_text, created_at, expires_at)
+expires_at is a unix timestamp (seconds). Uses same DB as session_store (db_path / DATABASE_URL).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from app.storage.db import connect, is_postgres, sql
+from app.storage.migrations import ensure_schema
+
+logger = logging.getLogger("agent-gateway")
+
+
+def init_response_cache_db() -> None:
+    """Ensure the schema exists (app.storage.migrations); kept for scripts and tests."""
+    ensure_schema()
+
+
+def create_schema(conn: Any) -> None:
+    """response_cache table, applied by the baseline migration."""
+    expires_type = "DOUBLE PRECISION" if is_postgres() else "REAL"
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS response_cache (
+            cache_key TEXT PRIMARY KEY,
+            agent_id TEXT NOT NULL,
+            agent_version TEXT NOT NULL,
+            result_json TEXT NOT NULL,
+            raw_text TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            expires_at {expires_type} NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_response_cache_expires_at ON response_cache (expires_at)"
+    )
+
+
+def get_entry(cache_key: str) -> Optional[Dict[str, Any]]:
+    """Return {result, raw_text, expires_at} for a non-expired entry, else None."""
+    ensure_schema()
+    with connect() as conn:
+        row = conn.execute(
+            sql("SELECT result_json, raw_text, expires_at FROM response_cache WHERE cache_key = ?"),
+            (cache_key,),
+        ).fetchone()
+    if not row:
+        return None
+    expires_at = float(row["expires_at"])
+    if expires_at <= time.time():
+        return None
+    try:
+        result = json.loads(row["result_json"])
+    except (TypeError, ValueError):
+        return None
+    return {"result": result, "raw_text": row["raw_text"], "expires_at": expires_at}
+
+
+def put_entry(
+    cache_key: str,
+    *,
+    agent_id: str,
+    agent_version: str,
+    result: Dict[str, Any],
+    raw_text: str,
+    expires_at: float,
+) -> None:
+    """Insert or replace a cache entry."""
+    ensure_schema()
+    now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    with connect() as conn:
+        conn.execute(
+            sql(
+                """
+                INSERT INTO response_cache (
+                    cache_key, agent_id, agent_version, result_json, raw_text, created_at, expires_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (cache_key) DO UPDATE SET
+                    result_json = excluded.result_json,
+                    raw_text = excluded.raw_text,
+                    created_at = excluded.created_at,
+                    expires_at = excluded.expires_at
+                """
+            ),
+            (
+                cache_key,
+                agent_id,
+                agent_version,
+                json.dumps(result, sort_keys=True, default=str),
+                raw_text,
+                now,
+                float(expires_at),
+            ),
+        )
+        conn.commit()
+
+
+def purge_expired(now: Optional[float] = None) -> int:
+    """Delete expired entries; returns number of rows removed."""
+    ensure_schema()
+    cutoff = time.time() if now is None else float(now)
+    with connect() as conn:
+        cur = conn.execute(sql("DELETE FROM response_cache WHERE expires_at <= ?"), (cutoff,))
+        conn.commit()
+        return int(getattr(cur, "rowcount", 0) or 0)
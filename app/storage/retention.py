@@ -0,0 +1,357 @@
+"""
+Retention and archival for events and run_steps.
+
+Both tables grow with every session turn and run step. run() archives rows
+older than each agent's retention period (Settings.retention_days, overridden
+per agent by RETENTION_DAYS_BY_AGENT) to gzip-compressed JSONL files and
+deletes them in batches:
+
+    <retention_archive_dir>/<table>/<YYYY-MM>/<agent_id>.jsonl.gz
+
+Files are appended to (one gzip member per batch), so repeated runs and
+interrupted runs never lose archived rows; a batch whose delete fails to
+commit may appear in the archive twice.
+
+On Postgres run_steps is range-partitioned by month on created_at (migration
+3; partitions are named run_steps_pYYYYMM plus run_steps_default).
+ensure_partitions() creates the upcoming months and runs at startup and with
+every retention run. A past partition whose rows are all expired for their
+agents is archived and dropped as a whole instead of deleted row by row, which
+is what keeps the table and its indexes from bloating. events keeps a global
+unique (session_id, idempotency_key) index, which Postgres cannot enforce on a
+partitioned table without the partition key, so it stays unpartitioned and is
+trimmed by row-level archival only.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.config import Settings, get_settings
+from app.storage.db import connect, is_postgres, sql
+from app.storage.migrations import ensure_schema
+
+logger = logging.getLogger("agent-gateway")
+
+DEFAULT_BATCH_SIZE = 1000
+# Partitions created ahead of the current month by ensure_partitions().
+PARTITION_MONTHS_AHEAD = 2
+
+_PARTITION_NAME = re.compile(r"^run_steps_p(\d{4})(\d{2})$")
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+@dataclass(frozen=True)
+class _RetainedTable:
+    name: str
+    time_column: str
+    owner_table: str
+    owner_column: str
+
+
+_TABLES = (
+    _RetainedTable("events", time_column="ts", owner_table="sessions", owner_column="session_id"),
+    _RetainedTable("run_steps", time_column="created_at", owner_table="runs", owner_column="run_id"),
+)
+
+
+def retention_days_for(agent_id: str, settings: Optional[Settings] = None) -> int:
+    """Days to keep events and run steps of agent_id (0 = keep forever)."""
+    settings = settings or get_settings()
+    return int(settings.retention_days_by_agent.get(agent_id, settings.retention_days))
+
+
+def _iso(epoch: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(epoch))
+
+
+def _add_months(year: int, month: int, n: int) -> Tuple[int, int]:
+    index = year * 12 + (month - 1) + n
+    return index // 12, index % 12 + 1
+
+
+def _month_key(year: int, month: int) -> str:
+    return f"{year:04d}-{month:02d}"
+
+
+# --- Postgres month partitions of run_steps ---------------------------------------------------
+
+
+def ensure_month_partitions(conn: Any, start: Tuple[int, int], end: Tuple[int, int]) -> List[str]:
+    """Create run_steps_pYYYYMM partitions for months start..end (inclusive) that are missing."""
+    created: List[str] = []
+    year, month = start
+    while (year, month) <= end:
+        next_year, next_month = _add_months(year, month, 1)
+        name = f"run_steps_p{year:04d}{month:02d}"
+        exists = conn.execute("SELECT to_regclass(%s) AS oid", (name,)).fetchone()["oid"]
+        if exists is None:
+            conn.execute(
+                f"CREATE TABLE {name} PARTITION OF run_steps "
+                f"FOR VALUES FROM ('{_month_key(year, month)}') TO ('{_month_key(next_year, next_month)}')"
+            )
+            created.append(name)
+        year, month = next_year, next_month
+    return created
+
+
+def _run_steps_is_partitioned(conn: Any) -> bool:
+    row = conn.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('run_steps')").fetchone()
+    return row is not None and row["relkind"] == "p"
+
+
+def partition_run_steps(conn: Any) -> None:
+    """
+    Convert run_steps into a table range-partitioned by month on created_at (migration 3).
+
+    Existing rows are copied into month partitions inside the migration
+    transaction. No-op if run_steps is already partitioned.
+    """
+    if _run_steps_is_partitioned(conn):
+        return
+    conn.execute("ALTER TABLE run_steps RENAME TO run_steps_unpartitioned")
+    conn.execute("ALTER TABLE run_steps_unpartitioned RENAME CONSTRAINT run_steps_pkey TO run_steps_unpartitioned_pkey")
+    conn.execute(
+        "ALTER INDEX IF EXISTS idx_run_steps_run_id_step_index RENAME TO idx_run_steps_unpartitioned_run_id_step_index"
+    )
+    # COLLATE "C": created_at is ISO-8601 text; bounds compare bytewise like the timestamps.
+    conn.execute(
+        """
+        CREATE TABLE run_steps (
+            LIKE run_steps_unpartitioned INCLUDING DEFAULTS,
+            PRIMARY KEY (id, created_at),
+            FOREIGN KEY (run_id) REFERENCES runs(id)
+        ) PARTITION BY RANGE (created_at COLLATE "C")
+        """
+    )
+    conn.execute("CREATE INDEX idx_run_steps_run_id_step_index ON run_steps (run_id, step_index)")
+    conn.execute("CREATE TABLE run_steps_default PARTITION OF run_steps DEFAULT")
+    now = time.gmtime()
+    current = (now.tm_year, now.tm_mon)
+    oldest = conn.execute("SELECT MIN(created_at) AS oldest FROM run_steps_unpartitioned").fetchone()["oldest"]
+    start = current
+    if oldest and re.match(r"^\d{4}-\d{2}", oldest):
+        start = min(start, (int(oldest[0:4]), int(oldest[5:7])))
+    ensure_month_partitions(conn, start, _add_months(*current, PARTITION_MONTHS_AHEAD))
+    conn.execute("INSERT INTO run_steps SELECT * FROM run_steps_unpartitioned")
+    conn.execute("DROP TABLE run_steps_unpartitioned")
+
+
+def ensure_partitions(months_ahead: int = PARTITION_MONTHS_AHEAD) -> List[str]:
+    """Create run_steps partitions for the current and next months_ahead months (Postgres only)."""
+    if not is_postgres():
+        return []
+    ensure_schema()
+    now = time.gmtime()
+    current = (now.tm_year, now.tm_mon)
+    with connect() as conn:
+        if not _run_steps_is_partitioned(conn):
+            return []
+        try:
+            created = ensure_month_partitions(conn, current, _add_months(*current, months_ahead))
+            conn.commit()
+        except Exception as exc:
+            # Rows for that month already sit in run_steps_default; retention still works.
+            logger.warning("Could not create run_steps partitions (%s)", type(exc).__name__)
+            conn.rollback()
+            return []
+    if created:
+        logger.info("Created run_steps partitions %s", created)
+    return created
+
+
+def _past_partitions(conn: Any, current: Tuple[int, int]) -> List[Tuple[str, str]]:
+    """(partition name, exclusive upper bound 'YYYY-MM') of run_steps partitions before the current month."""
+    rows = conn.execute(
+        """
+        SELECT c.relname AS name FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass('run_steps')
+        ORDER BY c.relname
+        """
+    ).fetchall()
+    out: List[Tuple[str, str]] = []
+    for row in rows:
+        match = _PARTITION_NAME.match(row["name"])
+        if not match:
+            continue
+        year, month = int(match.group(1)), int(match.group(2))
+        if (year, month) < current:
+            out.append((row["name"], _month_key(*_add_months(year, month, 1))))
+    return out
+
+
+# --- Archival ----------------------------------------------------------------------------------
+
+
+class _ArchiveWriter:
+    def __init__(self, archive_dir: str) -> None:
+        self.archive_dir = archive_dir
+        self.files: Set[str] = set()
+
+    def write(self, table: str, agent_id: str, time_column: str, rows: Iterable[Dict[str, Any]]) -> None:
+        by_month: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            stamp = str(row.get(time_column) or "")
+            by_month.setdefault(stamp[:7] if len(stamp) >= 7 else "unknown", []).append(row)
+        safe_agent = _UNSAFE_FILENAME_CHARS.sub("_", agent_id) or "_"
+        for month, month_rows in by_month.items():
+            directory = os.path.join(self.archive_dir, table, month)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{safe_agent}.jsonl.gz")
+            with gzip.open(path, "at", encoding="utf-8") as fh:
+                for row in month_rows:
+                    fh.write(json.dumps(row, sort_keys=True, default=str))
+                    fh.write("\n")
+                fh.flush()
+                os.fsync(fh.fileno())
+            self.files.add(path)
+
+
+def _agents(table: _RetainedTable) -> List[str]:
+    with connect() as conn:
+        rows = conn.execute(f"SELECT DISTINCT agent_id FROM {table.owner_table}").fetchall()
+    return sorted(str(row["agent_id"]) for row in rows)
+
+
+def _expired_select(table: _RetainedTable, source: str) -> str:
+    return (
+        f"SELECT t.* FROM {source} t JOIN {table.owner_table} o ON o.id = t.{table.owner_column} "
+        f"WHERE o.agent_id = ? AND t.{table.time_column} < ?"
+    )
+
+
+def _archive_agent_rows(
+    table: _RetainedTable,
+    agent_id: str,
+    cutoff: str,
+    writer: Optional[_ArchiveWriter],
+    batch_size: int,
+) -> int:
+    """Archive and delete rows of agent_id older than cutoff; returns the row count (dry run: counts only)."""
+    if writer is None:
+        with connect() as conn:
+            row = conn.execute(
+                sql(f"SELECT COUNT(*) AS n FROM ({_expired_select(table, table.name)}) expired"),
+                (agent_id, cutoff),
+            ).fetchone()
+        return int(row["n"])
+    query = sql(f"{_expired_select(table, table.name)} ORDER BY t.{table.time_column}, t.id LIMIT ?")
+    total = 0
+    while True:
+        with connect() as conn:
+            rows = [dict(r) for r in conn.execute(query, (agent_id, cutoff, batch_size)).fetchall()]
+            if not rows:
+                return total
+            writer.write(table.name, agent_id, table.time_column, rows)
+            ids = [r["id"] for r in rows]
+            placeholders = ", ".join("?" for _ in ids)
+            conn.execute(
+                sql(f"DELETE FROM {table.name} WHERE {table.time_column} < ? AND id IN ({placeholders})"),
+                (cutoff, *ids),
+            )
+            conn.commit()
+        total += len(rows)
+        if len(rows) < batch_size:
+            return total
+
+
+def _archive_partition_rows(name: str, agent_id: str, upper: str, writer: _ArchiveWriter, batch_size: int) -> None:
+    table = _TABLES[1]
+    base = _expired_select(table, name)
+    last: Optional[Tuple[str, str]] = None
+    while True:
+        with connect() as conn:
+            if last is None:
+                query, params = f"{base} ORDER BY t.created_at, t.id LIMIT ?", (agent_id, upper, batch_size)
+            else:
+                query = f"{base} AND (t.created_at, t.id) > (?, ?) ORDER BY t.created_at, t.id LIMIT ?"
+                params = (agent_id, upper, last[0], last[1], batch_size)
+            rows = [dict(r) for r in conn.execute(sql(query), params).fetchall()]
+        if not rows:
+            return
+        writer.write(table.name, agent_id, table.time_column, rows)
+        last = (rows[-1]["created_at"], rows[-1]["id"])
+
+
+def _drop_expired_partitions(
+    cutoffs: Dict[str, Optional[str]],
+    now: float,
+    writer: Optional[_ArchiveWriter],
+    batch_size: int,
+) -> List[str]:
+    """Archive and drop past run_steps partitions whose rows are all expired for their agents."""
+    today = time.gmtime(now)
+    dropped: List[str] = []
+    with connect() as conn:
+        if not _run_steps_is_partitioned(conn):
+            return []
+        partitions = _past_partitions(conn, (today.tm_year, today.tm_mon))
+    for name, upper in partitions:
+        with connect() as conn:
+            agents = [
+                str(r["agent_id"])
+                for r in conn.execute(
+                    f"SELECT DISTINCT o.agent_id FROM {name} t JOIN runs o ON o.id = t.run_id"
+                ).fetchall()
+            ]
+        # A cutoff at or past the partition's upper bound expires every row in it.
+        if not all(cutoffs.get(agent_id) is not None and cutoffs[agent_id] >= upper for agent_id in agents):
+            continue
+        if writer is not None:
+            for agent_id in agents:
+                _archive_partition_rows(name, agent_id, upper, writer, batch_size)
+            with connect() as conn:
+                conn.execute(f"ALTER TABLE run_steps DETACH PARTITION {name}")
+                conn.execute(f"DROP TABLE {name}")
+                conn.commit()
+        dropped.append(name)
+    return dropped
+
+
+def run(
+    *,
+    now: Optional[float] = None,
+    archive_dir: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """
+    Apply the retention policy once: archive and delete expired events and run steps.
+
+    Returns a report: archive_dir, per-table archived row counts per agent,
+    dropped (or, with dry_run, droppable) partitions and archive files written.
+    Rows without a timestamp are never expired.
+    """
+    ensure_schema()
+    settings = get_settings()
+    now = time.time() if now is None else now
+    archive_dir = archive_dir or settings.retention_archive_dir
+    writer = None if dry_run else _ArchiveWriter(archive_dir)
+    report: Dict[str, Any] = {"archive_dir": archive_dir, "dry_run": dry_run, "tables": {}, "partitions_dropped": []}
+    if is_postgres() and not dry_run:
+        ensure_partitions()
+    for table in _TABLES:
+        cutoffs: Dict[str, Optional[str]] = {}
+        for agent_id in _agents(table):
+            days = retention_days_for(agent_id, settings)
+            cutoffs[agent_id] = _iso(now - days * 86400) if days > 0 else None
+        if table.name == "run_steps" and is_postgres():
+            report["partitions_dropped"] = _drop_expired_partitions(cutoffs, now, writer, batch_size)
+        archived: Dict[str, int] = {}
+        for agent_id, cutoff in cutoffs.items():
+            if cutoff is None:
+                continue
+            count = _archive_agent_rows(table, agent_id, cutoff, writer, batch_size)
+            if count:
+                archived[agent_id] = count
+        report["tables"][table.name] = {"archived": sum(archived.values()), "by_agent": archived}
+    report["files"] = sorted(writer.files) if writer is not None else []
+    return report
@@ -0,0 +1,201 @@
+"""
+Change notifications for runs, used by GET /runs/{run_id}/events.
+
+The run store publishes the run id after every committed write to a run
+(steps, step_count, status). SSE generators subscribe to a run id and
+re-read the run only when woken, instead of polling on a fixed interval.
+
+- In process: publish() wakes every subscriber of the run on its own event
+  loop (call_soon_threadsafe; the runner writes from worker threads).
+- Postgres: the store also issues pg_notify('run_events', run_id) inside the
+  writing transaction, so it is delivered on commit. One listener thread per
+  process (started with the first subscriber) LISTENs on the channel and wakes
+  local subscribers, which fans out writes made by other workers.
+- Otherwise (SQLite, psycopg missing, listener down): subscribers also wake
+  every RUN_EVENTS_POLL_SECONDS to pick up writes from other processes.
+
+Notifications carry no data; the database stays the source of truth.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from app.config import get_settings
+from app.storage.db import get_db_info, is_postgres, psycopg
+
+logger = logging.getLogger("agent-gateway")
+
+CHANNEL = "run_events"
+# With a live LISTEN connection this only bounds the damage of a lost notification.
+_LISTENING_POLL_SECONDS = 30.0
+_LISTENER_RETRY_SECONDS = 1.0
+
+
+class RunSubscription:
+    """Wake-up handle for one subscriber of one run (bound to the subscribing event loop)."""
+
+    def __init__(self, run_id: str, loop: asyncio.AbstractEventLoop) -> None:
+        self.run_id = run_id
+        self._loop = loop
+        self._event = asyncio.Event()
+
+    def _notify(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            # Loop closed; the subscription is about to be removed.
+            pass
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait until the run changes or timeout elapses. Returns True if notified."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=max(0.0, timeout))
+        except asyncio.TimeoutError:
+            return False
+        # Cleared before the caller re-reads, so a write racing the read wakes the next wait().
+        self._event.clear()
+        return True
+
+
+class _PgListener(threading.Thread):
+    def __init__(self, bus: "RunEventBus", database_url: str) -> None:
+        super().__init__(name="run-events-listener", daemon=True)
+        self._bus = bus
+        self._database_url = database_url
+        self._stop = threading.Event()
+        self.listening = False
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    @staticmethod
+    def _notifies(conn: Any) -> Any:
+        try:
+            # psycopg >= 3.2: returns after the timeout so stop() is observed.
+            return conn.notifies(timeout=1.0)
+        except TypeError:
+            # psycopg 3.1: blocks until the connection closes (the thread is a daemon).
+            return conn.notifies()
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with psycopg.connect(self._database_url, autocommit=True, connect_timeout=8) as conn:
+                    conn.execute(f"LISTEN {CHANNEL}")
+                    self.listening = True
+                    # A LISTEN gap may have dropped notifications: wake everyone once.
+                    self._bus.publish_all()
+                    while not self._stop.is_set():
+                        for notify in self._notifies(conn):
+                            self._bus.publish(notify.payload)
+            except Exception as exc:
+                # Never log the exception text: psycopg errors can include the conninfo.
+                logger.warning("run_events listener disconnected (%s); polling fallback active", type(exc).__name__)
+            finally:
+                self.listening = False
+            self._stop.wait(_LISTENER_RETRY_SECONDS)
+
+
+class RunEventBus:
+    def __init__(self) -> None:
+        self._subs: Dict[str, Set[RunSubscription]] = {}
+        self._lock = threading.Lock()
+        self._listener: Optional[_PgListener] = None
+        self.published = 0
+
+    def publish(self, run_id: str) -> None:
+        """Wake subscribers of run_id in this process (thread-safe)."""
+        with self._lock:
+            subs = list(self._subs.get(run_id, ()))
+            self.published += 1
+        for sub in subs:
+            sub._notify()
+
+    def publish_all(self) -> None:
+        with self._lock:
+            subs = [sub for group in self._subs.values() for sub in group]
+        for sub in subs:
+            sub._notify()
+
+    def _ensure_listener(self) -> None:
+        if psycopg is None or not is_postgres():
+            return
+        database_url = get_db_info().database_url or ""
+        with self._lock:
+            listener = self._listener
+            if listener is not None and listener.is_alive() and listener._database_url == database_url:
+                return
+            if listener is not None:
+                listener.stop()
+            self._listener = _PgListener(self, database_url)
+            self._listener.start()
+
+    @property
+    def listening(self) -> bool:
+        listener = self._listener
+        return listener is not None and listener.listening
+
+    def poll_interval(self) -> float:
+        """Longest a subscriber should wait before re-reading the run without a notification."""
+        if self.listening and is_postgres():
+            return _LISTENING_POLL_SECONDS
+        return max(0.05, get_settings().run_events_poll_seconds)
+
+    @asynccontextmanager
+    async def subscribe(self, run_id: str) -> AsyncIterator[RunSubscription]:
+        sub = RunSubscription(run_id, asyncio.get_running_loop())
+        self._ensure_listener()
+        with self._lock:
+            self._subs.setdefault(run_id, set()).add(sub)
+        try:
+            yield sub
+        finally:
+            with self._lock:
+                group = self._subs.get(run_id)
+                if group is not None:
+                    group.discard(sub)
+                    if not group:
+                        del self._subs[run_id]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            subscribers = sum(len(group) for group in self._subs.values())
+            return {
+                "runs": len(self._subs),
+                "subscribers": subscribers,
+                "published": self.published,
+                "listening": self.listening,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.stop()
+
+
+_bus = RunEventBus()
+
+
+def get_run_event_bus() -> RunEventBus:
+    return _bus
+
+
+def notify_in_transaction(conn: Any, run_id: str) -> None:
+    """Queue a cross-process notification for run_id; Postgres delivers it on commit."""
+    if is_postgres():
+        conn.execute("SELECT pg_notify(%s, %s)", (CHANNEL, run_id))
+
+
+def publish(run_id: str) -> None:
+    """Wake local subscribers of run_id; call after the write is committed."""
+    _bus.publish(run_id)
+
+
+def close_run_events() -> None:
+    _bus.close()
@@ -1,7 +1,8 @@
 """
 Run store: SQLite- or Postgres-backed runs and run_steps.
 
-runs: (id, agent_id, agent_version, status, created_at, updated_at, session_id, input_json, output_json, error, step_count, usage_json)
+runs: (id, agent_id, agent_version, status, created_at, updated_at, session_id, input_json, output_json, error, step_count, usage_json,
+       parent_run_id, job_kind, job_json, tenant_id, claimed_by, heartbeat_at, attempts)
 run_steps: (id, run_id, step_index, step_type, model, action_json, tool_name, tool_args_json, tool_result_json, created_at, error)
 Uses same DB as session_store (db_path / DATABASE_URL).
 """
@@ -13,25 +14,15 @@ import logging
 import threading
 import time
 import uuid
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+from app.storage import run_events
 from app.storage.db import connect, is_postgres, sql
+from app.storage.executor import async_variant
+from app.storage.migrations import ensure_schema
 
 logger = logging.getLogger("agent-gateway")
 
-_run_db_initialized = False
-_run_db_init_lock = threading.Lock()
-
-
-def _ensure_sqlite_dir() -> None:
-    if is_postgres():
-        return
-    from app.config import get_settings
-
-    path = get_settings().db_path
-    Path(path).parent.mkdir(parents=True, exist_ok=True)
-
 
 def _ensure_runs_tables(conn: Any) -> None:
     if not is_postgres():
@@ -179,38 +170,43 @@ def _ensure_runs_columns(conn: Any) -> None:
 
 
 def init_run_db() -> None:
-    """
-    Create runs and run_steps tables and indexes. Call at app startup or before first use.
-    For Postgres, runs DDL only once per process to avoid deadlocks when concurrent
-    requests re-run ALTER TABLE in different lock orders. SQLite always runs init
-    (tests may use different db paths).
-    """
-    global _run_db_initialized
-    if is_postgres() and _run_db_initialized:
-        return
-    if is_postgres():
-        with _run_db_init_lock:
-            if _run_db_initialized:
-                return
-            _do_init_run_db()
-            _run_db_initialized = True
-    else:
-        _do_init_run_db()
+    """Ensure the schema exists (app.storage.migrations); kept for scripts and tests."""
+    ensure_schema()
 
 
-def _do_init_run_db() -> None:
-    """Actual DDL; called by init_run_db()."""
-    _ensure_sqlite_dir()
-    with connect() as conn:
-        if not is_postgres():
-            conn.execute("PRAGMA journal_mode=WAL")
-            conn.execute("PRAGMA synchronous=NORMAL")
-            conn.execute("PRAGMA busy_timeout=3000")
-        _ensure_runs_tables(conn)
-        _ensure_run_steps_tables(conn)
-        _ensure_runs_columns(conn)
-        _ensure_run_steps_columns(conn)
-        conn.commit()
+def create_schema(conn: Any) -> None:
+    """runs and run_steps tables, indexes and additive columns, applied by the baseline migration."""
+    _ensure_runs_tables(conn)
+    _ensure_run_steps_tables(conn)
+    _ensure_runs_columns(conn)
+    _ensure_run_steps_columns(conn)
+
+
+def create_queue_schema(conn: Any) -> None:
+    """Run queue columns on runs (app.runtime.scheduler), applied by the run_queue migration."""
+    columns = [
+        ("job_kind", "TEXT"),
+        ("job_json", "TEXT"),
+        ("tenant_id", "TEXT"),
+        ("claimed_by", "TEXT"),
+        ("heartbeat_at", "TEXT"),
+        ("attempts", "INTEGER NOT NULL DEFAULT 0"),
+    ]
+    if is_postgres():
+        for name, typ in columns:
+            conn.execute(f"ALTER TABLE runs ADD COLUMN IF NOT EXISTS {name} {typ}")
+    else:
+        cols = [row["name"] for row in conn.execute("PRAGMA table_info(runs)").fetchall()]
+        for name, typ in columns:
+            if name not in cols:
+                conn.execute(f"ALTER TABLE runs ADD COLUMN {name} {typ}")
+    # Only queue rows that are waiting or in flight: stays small however many runs are kept.
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_runs_queue ON runs (status, created_at)
+        WHERE job_kind IS NOT NULL AND status IN ('queued', 'running')
+        """
+    )
 
 
 def create_run(
@@ -219,20 +215,32 @@ def create_run(
     session_id: Optional[str],
     input_json: Dict[str, Any],
     parent_run_id: Optional[str] = None,
+    *,
+    run_id: Optional[str] = None,
+    job_kind: Optional[str] = None,
+    job_json: Optional[Dict[str, Any]] = None,
+    tenant_id: Optional[str] = None,
 ) -> Dict[str, Any]:
-    """Create a new run; returns run dict with status=queued, step_count=0. Optional parent_run_id for replay."""
-    init_run_db()
-    run_id = str(uuid.uuid4())
+    """
+    Create a new run; returns run dict with status=queued, step_count=0. Optional parent_run_id for replay.
+
+    job_kind makes the row a run queue entry (app.runtime.scheduler claims it); runs
+    executed inline by the request (wait=true) leave it None.
+    """
+    ensure_schema()
+    run_id = run_id or str(uuid.uuid4())
     now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
     input_text = json.dumps(input_json, sort_keys=True, default=str)
+    job_text = json.dumps(job_json, sort_keys=True, default=str) if job_json is not None else None
     with connect() as conn:
         conn.execute(
             sql(
                 """
                 INSERT INTO runs (
                     id, agent_id, agent_version, status, created_at, updated_at,
-                    session_id, input_json, output_json, error, step_count, usage_json, parent_run_id
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    session_id, input_json, output_json, error, step_count, usage_json, parent_run_id,
+                    job_kind, job_json, tenant_id
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """
             ),
             (
@@ -249,6 +257,9 @@ def create_run(
                 0,
                 None,
                 parent_run_id,
+                job_kind,
+                job_text,
+                tenant_id,
             ),
         )
         conn.commit()
@@ -266,50 +277,166 @@ def create_run(
         "step_count": 0,
         "usage_json": None,
         "parent_run_id": parent_run_id,
+        "job_kind": job_kind,
+        "job_json": job_json,
+        "tenant_id": tenant_id,
     }
 
 
+def _update_run_status(
+    conn: Any,
+    run_id: str,
+    status: str,
+    now: str,
+    output_json: Optional[Dict[str, Any]],
+    error: Optional[str],
+    usage_json: Optional[Dict[str, Any]],
+) -> None:
+    if output_json is not None or error is not None or usage_json is not None:
+        output_text = json.dumps(output_json, sort_keys=True, default=str) if output_json is not None else None
+        usage_text = json.dumps(usage_json, sort_keys=True, default=str) if usage_json is not None else None
+        conn.execute(
+            sql(
+                """
+                UPDATE runs SET status = ?, updated_at = ?, output_json = ?, error = ?, usage_json = ?
+                WHERE id = ?
+                """
+            ),
+            (status, now, output_text, error, usage_text, run_id),
+        )
+    else:
+        conn.execute(
+            sql("UPDATE runs SET status = ?, updated_at = ? WHERE id = ?"),
+            (status, now, run_id),
+        )
+
+
+class RunLeaseLost(Exception):
+    """A queued run's write was refused because the run no longer belongs to this worker's claim."""
+
+    def __init__(self, run_id: str) -> None:
+        super().__init__(f"run {run_id} is no longer claimed by this worker")
+        self.run_id = run_id
+
+
+# (claimed_by, attempts) of a claimed queue run; see run_lease().
+RunLease = Tuple[str, int]
+
+
+def run_lease(run: Dict[str, Any]) -> Optional[RunLease]:
+    """The claim a queue worker holds on run (None for runs not claimed from the queue)."""
+    if not run.get("claimed_by"):
+        return None
+    return (str(run["claimed_by"]), int(run.get("attempts") or 0))
+
+
+def _check_lease(conn: Any, run_id: str, lease: Optional[RunLease], now: str) -> None:
+    """
+    Fence a write on the worker's claim. recover_stale_runs() may have requeued the
+    run and another worker claimed it (attempts bumped); the stale worker must not
+    write steps or a status then. The UPDATE also locks the row until commit.
+    """
+    if lease is None:
+        return
+    worker_id, attempts = lease
+    cur = conn.execute(
+        sql(
+            "UPDATE runs SET updated_at = ? WHERE id = ? AND status = 'running'"
+            " AND claimed_by = ? AND attempts = ?"
+        ),
+        (now, run_id, worker_id, attempts),
+    )
+    if not cur.rowcount:
+        raise RunLeaseLost(run_id)
+
+
 def set_run_status(
     run_id: str,
     status: str,
     output_json: Optional[Dict[str, Any]] = None,
     error: Optional[str] = None,
     usage_json: Optional[Dict[str, Any]] = None,
+    *,
+    lease: Optional[RunLease] = None,
 ) -> None:
-    """Update run status and optional output_json, error, usage_json."""
-    init_run_db()
+    """
+    Update run status and optional output_json, error, usage_json.
+
+    With lease (see run_lease()), the update only applies while the run is still
+    running under that claim; otherwise nothing is written and RunLeaseLost is raised.
+    """
+    ensure_schema()
     now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-    output_text = json.dumps(output_json, sort_keys=True, default=str) if output_json is not None else None
-    usage_text = json.dumps(usage_json, sort_keys=True, default=str) if usage_json is not None else None
     with connect() as conn:
-        if output_json is not None or error is not None or usage_json is not None:
-            conn.execute(
-                sql(
-                    """
-                    UPDATE runs SET status = ?, updated_at = ?, output_json = ?, error = ?, usage_json = ?
-                    WHERE id = ?
-                    """
-                ),
-                (status, now, output_text, error, usage_text, run_id),
-            )
-        else:
-            conn.execute(
-                sql("UPDATE runs SET status = ?, updated_at = ? WHERE id = ?"),
-                (status, now, run_id),
-            )
+        _check_lease(conn, run_id, lease, now)
+        _update_run_status(conn, run_id, status, now, output_json, error, usage_json)
+        run_events.notify_in_transaction(conn, run_id)
         conn.commit()
+    run_events.publish(run_id)
 
 
 def increment_run_step_count(run_id: str) -> None:
     """Increment step_count by 1 for the run."""
-    init_run_db()
+    ensure_schema()
     now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
     with connect() as conn:
         conn.execute(
             sql("UPDATE runs SET step_count = step_count + 1, updated_at = ? WHERE id = ?"),
             (now, run_id),
         )
+        run_events.notify_in_transaction(conn, run_id)
         conn.commit()
+    run_events.publish(run_id)
+
+
+_STEP_INSERT_SQL = """
+    INSERT INTO run_steps (
+        id, run_id, step_index, step_type, model, action_json,
+        tool_name, tool_args_json, tool_result_json, created_at, error, tool_latency_ms,
+        event_time, latency_ms, tokens_prompt, tokens_completion, cost_microusd, error_code
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _step_row(
+    run_id: str,
+    step_index: int,
+    step_type: str,
+    action_json: Dict[str, Any],
+    tool_name: Optional[str] = None,
+    tool_args_json: Optional[Dict[str, Any]] = None,
+    tool_result_json: Optional[Dict[str, Any]] = None,
+    model: Optional[str] = None,
+    error: Optional[str] = None,
+    tool_latency_ms: Optional[int] = None,
+    event_time: Optional[str] = None,
+    latency_ms: Optional[int] = None,
+    tokens_prompt: Optional[int] = None,
+    tokens_completion: Optional[int] = None,
+    cost_microusd: Optional[int] = None,
+    error_code: Optional[str] = None,
+) -> Tuple[Any, ...]:
+    now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    return (
+        str(uuid.uuid4()),
+        run_id,
+        step_index,
+        step_type,
+        model,
+        json.dumps(action_json, sort_keys=True, default=str),
+        tool_name,
+        json.dumps(tool_args_json, sort_keys=True, default=str) if tool_args_json is not None else None,
+        json.dumps(tool_result_json, sort_keys=True, default=str) if tool_result_json is not None else None,
+        now,
+        error,
+        tool_latency_ms,
+        event_time if event_time is not None else now,
+        latency_ms,
+        tokens_prompt,
+        tokens_completion,
+        cost_microusd,
+        error_code,
+    )
 
 
 def append_run_step(
@@ -331,51 +458,272 @@ def append_run_step(
     error_code: Optional[str] = None,
 ) -> None:
     """Append a step. Observability: tool_latency_ms/latency_ms, event_time, tokens_*, cost_microusd, error_code."""
-    init_run_db()
-    step_id = str(uuid.uuid4())
+    ensure_schema()
+    row = _step_row(
+        run_id, step_index, step_type, action_json,
+        tool_name=tool_name,
+        tool_args_json=tool_args_json,
+        tool_result_json=tool_result_json,
+        model=model,
+        error=error,
+        tool_latency_ms=tool_latency_ms,
+        event_time=event_time,
+        latency_ms=latency_ms,
+        tokens_prompt=tokens_prompt,
+        tokens_completion=tokens_completion,
+        cost_microusd=cost_microusd,
+        error_code=error_code,
+    )
+    with connect() as conn:
+        conn.execute(sql(_STEP_INSERT_SQL), row)
+        run_events.notify_in_transaction(conn, run_id)
+        conn.commit()
+    run_events.publish(run_id)
+
+
+class RunStepJournal:
+    """
+    Write-behind buffer for one run's steps (used by the thread-based runner).
+
+    append_step() and count_step() only buffer. flush() writes the buffered
+    steps and the step_count increment in one transaction; the runner calls it
+    before every provider call or tool execution, and append_step() flushes by
+    itself once the oldest buffered step is older than flush_interval_seconds.
+    set_status() writes pending steps and the new status in the same
+    transaction, so a terminal status is never visible before its steps.
+
+    For queue runs pass lease (see run_lease()): every write is then fenced on the
+    claim, and once the run was requeued to another worker flush() and set_status()
+    drop the buffer, set lease_lost and raise RunLeaseLost.
+    """
+
+    def __init__(
+        self,
+        run_id: str,
+        *,
+        flush_interval_seconds: float = 0.25,
+        lease: Optional[RunLease] = None,
+    ) -> None:
+        self.run_id = run_id
+        self._flush_interval = flush_interval_seconds
+        self._lease = lease
+        self.lease_lost = False
+        self._rows: List[Tuple[Any, ...]] = []
+        self._counted = 0
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def append_step(self, step_index: int, step_type: str, action_json: Dict[str, Any], **fields: Any) -> None:
+        """Buffer a step; same fields as append_run_step()."""
+        row = _step_row(self.run_id, step_index, step_type, action_json, **fields)
+        with self._lock:
+            self._rows.append(row)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            overdue = time.monotonic() - self._oldest >= self._flush_interval
+        if overdue:
+            self.flush()
+
+    def count_step(self) -> None:
+        """Count one step towards runs.step_count (applied with the next flush)."""
+        with self._lock:
+            self._counted += 1
+
+    @property
+    def pending(self) -> int:
+        return len(self._rows)
+
+    def _write_pending(self, conn: Any, now: str) -> None:
+        if self._rows:
+            conn.cursor().executemany(sql(_STEP_INSERT_SQL), self._rows)
+        if self._counted:
+            conn.execute(
+                sql("UPDATE runs SET step_count = step_count + ?, updated_at = ? WHERE id = ?"),
+                (self._counted, now, self.run_id),
+            )
+
+    def _reset(self) -> None:
+        self._rows = []
+        self._counted = 0
+        self._oldest = None
+
+    def _lose_lease(self) -> None:
+        self._reset()
+        self.lease_lost = True
+
+    def flush(self) -> None:
+        """Persist buffered steps and step_count in one transaction."""
+        with self._lock:
+            if not self._rows and not self._counted:
+                return
+            ensure_schema()
+            now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            try:
+                with connect() as conn:
+                    _check_lease(conn, self.run_id, self._lease, now)
+                    self._write_pending(conn, now)
+                    run_events.notify_in_transaction(conn, self.run_id)
+                    conn.commit()
+            except RunLeaseLost:
+                self._lose_lease()
+                raise
+            self._reset()
+        run_events.publish(self.run_id)
+
+    def set_status(
+        self,
+        status: str,
+        output_json: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        usage_json: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Flush pending steps and update the run status atomically (see set_run_status)."""
+        with self._lock:
+            ensure_schema()
+            now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            try:
+                with connect() as conn:
+                    _check_lease(conn, self.run_id, self._lease, now)
+                    self._write_pending(conn, now)
+                    _update_run_status(conn, self.run_id, status, now, output_json, error, usage_json)
+                    run_events.notify_in_transaction(conn, self.run_id)
+                    conn.commit()
+            except RunLeaseLost:
+                self._lose_lease()
+                raise
+            self._reset()
+        run_events.publish(self.run_id)
+
+
+def _queue_placeholders(values: List[Any]) -> str:
+    return ", ".join("?" for _ in values)
+
+
+def claim_queued_runs(
+    worker_id: str,
+    job_kinds: List[str],
+    limit: int,
+    admit: Callable[[Dict[str, Any]], bool],
+) -> List[Dict[str, Any]]:
+    """
+    Claim up to limit queued runs of the given job kinds, oldest first, for worker_id.
+
+    admit(row) is asked for each candidate (row has id, agent_id, tenant_id) and may
+    refuse it, e.g. because the agent is at its concurrency cap; refused runs stay
+    queued. Claimed runs are set to running with claimed_by, heartbeat_at and attempts
+    bumped. On Postgres candidates are locked with FOR UPDATE SKIP LOCKED, so concurrent
+    workers never wait on or claim the same row; on SQLite the conditional UPDATE decides.
+    """
+    if limit <= 0 or not job_kinds:
+        return []
+    ensure_schema()
+    now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    # Look past runs that admit() may refuse, without scanning the whole backlog.
+    scan = max(limit * 4, 32)
+    select = (
+        "SELECT id, agent_id, tenant_id FROM runs"
+        f" WHERE status = 'queued' AND job_kind IN ({_queue_placeholders(job_kinds)})"
+        " ORDER BY created_at, id LIMIT ?"
+    )
+    if is_postgres():
+        select += " FOR UPDATE SKIP LOCKED"
+    claimed: List[str] = []
+    with connect() as conn:
+        rows = conn.execute(sql(select), (*job_kinds, scan)).fetchall()
+        for row in rows:
+            if len(claimed) >= limit:
+                break
+            candidate = dict(row)
+            if not admit(candidate):
+                continue
+            cur = conn.execute(
+                sql(
+                    """
+                    UPDATE runs SET status = 'running', claimed_by = ?, heartbeat_at = ?, updated_at = ?,
+                        attempts = attempts + 1
+                    WHERE id = ? AND status = 'queued'
+                    """
+                ),
+                (worker_id, now, now, candidate["id"]),
+            )
+            if cur.rowcount:
+                claimed.append(candidate["id"])
+                run_events.notify_in_transaction(conn, candidate["id"])
+        conn.commit()
+    for run_id in claimed:
+        run_events.publish(run_id)
+    return [run for run in (get_run(run_id) for run_id in claimed) if run is not None]
+
+
+def heartbeat_runs(worker_id: str, run_ids: List[str]) -> None:
+    """Refresh heartbeat_at on runs still claimed by worker_id (crash recovery keys off it)."""
+    if not run_ids:
+        return
+    ensure_schema()
     now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-    ts = event_time if event_time is not None else now
-    action_text = json.dumps(action_json, sort_keys=True, default=str)
-    tool_args_text = json.dumps(tool_args_json, sort_keys=True, default=str) if tool_args_json is not None else None
-    tool_result_text = json.dumps(tool_result_json, sort_keys=True, default=str) if tool_result_json is not None else None
     with connect() as conn:
         conn.execute(
             sql(
-                """
-                INSERT INTO run_steps (
-                    id, run_id, step_index, step_type, model, action_json,
-                    tool_name, tool_args_json, tool_result_json, created_at, error, tool_latency_ms,
-                    event_time, latency_ms, tokens_prompt, tokens_completion, cost_microusd, error_code
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """
-            ),
-            (
-                step_id,
-                run_id,
-                step_index,
-                step_type,
-                model,
-                action_text,
-                tool_name,
-                tool_args_text,
-                tool_result_text,
-                now,
-                error,
-                tool_latency_ms,
-                ts,
-                latency_ms,
-                tokens_prompt,
-                tokens_completion,
-                cost_microusd,
-                error_code,
+                "UPDATE runs SET heartbeat_at = ? WHERE claimed_by = ? AND status = 'running'"
+                f" AND id IN ({_queue_placeholders(run_ids)})"
             ),
+            (now, worker_id, *run_ids),
         )
         conn.commit()
 
 
+def recover_stale_runs(stale_before: str, max_attempts: int) -> Dict[str, List[str]]:
+    """
+    Recover queue runs left running by a worker that stopped heartbeating (crash, kill).
+
+    Runs with attempts left are requeued from scratch: their steps are deleted and
+    step_count reset, so the next attempt writes step 1 again. The others are failed.
+    Returns {"requeued": [...], "failed": [...]} run ids.
+    """
+    ensure_schema()
+    now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    select = (
+        "SELECT id, attempts FROM runs WHERE job_kind IS NOT NULL AND status = 'running'"
+        " AND (heartbeat_at IS NULL OR heartbeat_at < ?) ORDER BY created_at LIMIT 500"
+    )
+    if is_postgres():
+        select += " FOR UPDATE SKIP LOCKED"
+    out: Dict[str, List[str]] = {"requeued": [], "failed": []}
+    with connect() as conn:
+        rows = conn.execute(sql(select), (stale_before,)).fetchall()
+        for row in rows:
+            run_id = row["id"]
+            if int(row["attempts"] or 0) < max_attempts:
+                conn.execute(sql("DELETE FROM run_steps WHERE run_id = ?"), (run_id,))
+                cur = conn.execute(
+                    sql(
+                        """
+                        UPDATE runs SET status = 'queued', claimed_by = NULL, heartbeat_at = NULL,
+                            step_count = 0, updated_at = ?
+                        WHERE id = ? AND status = 'running'
+                        """
+                    ),
+                    (now, run_id),
+                )
+                bucket = "requeued"
+            else:
+                cur = conn.execute(
+                    sql("UPDATE runs SET status = 'failed', error = ?, updated_at = ? WHERE id = ? AND status = 'running'"),
+                    (f"Run abandoned: worker stopped after {row['attempts']} attempt(s)", now, run_id),
+                )
+                bucket = "failed"
+            if cur.rowcount:
+                out[bucket].append(run_id)
+                run_events.notify_in_transaction(conn, run_id)
+        conn.commit()
+    for run_id in out["requeued"] + out["failed"]:
+        run_events.publish(run_id)
+    return out
+
+
 def get_run(run_id: str) -> Optional[Dict[str, Any]]:
     """Return run dict or None."""
-    init_run_db()
+    ensure_schema()
     with connect() as conn:
         row = conn.execute(sql("SELECT * FROM runs WHERE id = ?"), (run_id,)).fetchone()
         if row is None:
@@ -396,12 +744,17 @@ def get_run(run_id: str) -> Optional[Dict[str, Any]]:
                 out["usage_json"] = json.loads(out["usage_json"])
             except (json.JSONDecodeError, TypeError):
                 pass
+        if out.get("job_json"):
+            try:
+                out["job_json"] = json.loads(out["job_json"])
+            except (json.JSONDecodeError, TypeError):
+                pass
         return out
 
 
 def list_run_steps(run_id: str, after_step_index: Optional[int] = None) -> List[Dict[str, Any]]:
     """Return list of step dicts ordered by step_index. If after_step_index is set, only steps with step_index > after_step_index."""
-    init_run_db()
+    ensure_schema()
     with connect() as conn:
         if after_step_index is not None:
             rows = conn.execute(
@@ -433,3 +786,10 @@ def list_run_steps(run_id: str, after_step_index: Optional[int] = None) -> List[
                     pass
             out.append(step)
         return out
+
+
+# Async variants for async routers: same functions, run on the bounded DB executor.
+acreate_run = async_variant(create_run)
+aset_run_status = async_variant(set_run_status)
+aget_run = async_variant(get_run)
+alist_run_steps = async_variant(list_run_steps)
@@ -12,10 +12,11 @@ import json
 import logging
 import time
 import uuid
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from app.storage.db import connect, is_postgres, sql
+from app.storage.executor import async_variant
+from app.storage.migrations import ensure_schema
 
 logger = logging.getLogger("agent-gateway")
 
@@ -29,85 +30,73 @@ def _infer_event_type(role: str, event_type: Optional[str]) -> str:
         return "assistant"
     return "system"
 
-def _ensure_sqlite_dir() -> None:
-    if is_postgres():
-        return
-    from app.config import get_settings
 
-    path = get_settings().db_path
-    Path(path).parent.mkdir(parents=True, exist_ok=True)
+def init_db() -> None:
+    """Ensure the schema exists (app.storage.migrations); kept for scripts and tests."""
+    ensure_schema()
 
 
-def init_db() -> None:
-    """
-    Create tables and set PRAGMAs.
-    Call at app startup (lifespan or startup event).
-    """
-    _ensure_sqlite_dir()
-    with connect() as conn:
-        if not is_postgres():
-            conn.execute("PRAGMA journal_mode=WAL")
-            conn.execute("PRAGMA synchronous=NORMAL")
-            conn.execute("PRAGMA busy_timeout=3000")
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS sessions (
-                    id TEXT PRIMARY KEY,
-                    agent_id TEXT NOT NULL,
-                    created_at TEXT NOT NULL
-                )
-                """
+def create_schema(conn: Any) -> None:
+    """sessions/events DDL, applied by the baseline migration."""
+    if not is_postgres():
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                agent_id TEXT NOT NULL,
+                created_at TEXT NOT NULL
             )
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS events (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT NOT NULL,
-                    role TEXT NOT NULL,
-                    content TEXT NOT NULL,
-                    event_type TEXT,
-                    run_id TEXT,
-                    step_index INTEGER,
-                    tool_name TEXT,
-                    idempotency_key TEXT,
-                    ts TEXT,
-                    meta TEXT,
-                    FOREIGN KEY (session_id) REFERENCES sessions(id)
-                )
-                """
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                event_type TEXT,
+                run_id TEXT,
+                step_index INTEGER,
+                tool_name TEXT,
+                idempotency_key TEXT,
+                ts TEXT,
+                meta TEXT,
+                FOREIGN KEY (session_id) REFERENCES sessions(id)
             )
-        else:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS sessions (
-                    id TEXT PRIMARY KEY,
-                    agent_id TEXT NOT NULL,
-                    created_at TEXT NOT NULL
-                )
-                """
+            """
+        )
+    else:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                agent_id TEXT NOT NULL,
+                created_at TEXT NOT NULL
             )
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS events (
-                    id BIGSERIAL PRIMARY KEY,
-                    session_id TEXT NOT NULL,
-                    role TEXT NOT NULL,
-                    content TEXT NOT NULL,
-                    event_type TEXT,
-                    run_id TEXT,
-                    step_index INTEGER,
-                    tool_name TEXT,
-                    idempotency_key TEXT,
-                    ts TEXT,
-                    meta TEXT,
-                    FOREIGN KEY (session_id) REFERENCES sessions(id)
-                )
-                """
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS events (
+                id BIGSERIAL PRIMARY KEY,
+                session_id TEXT NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                event_type TEXT,
+                run_id TEXT,
+                step_index INTEGER,
+                tool_name TEXT,
+                idempotency_key TEXT,
+                ts TEXT,
+                meta TEXT,
+                FOREIGN KEY (session_id) REFERENCES sessions(id)
             )
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_events_session_id ON events (session_id)")
-        _ensure_sessions_columns(conn)
-        _ensure_events_columns_and_indexes(conn)
-        conn.commit()
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_events_session_id ON events (session_id)")
+    _ensure_sessions_columns(conn)
+    _ensure_events_columns_and_indexes(conn)
 
 
 def _ensure_events_columns_and_indexes(conn: Any) -> None:
@@ -161,7 +150,7 @@ def _ensure_sessions_columns(conn: Any) -> None:
 
 def create_session(agent_id: str) -> str:
     """Create a new session; return session_id."""
-    init_db()  # Idempotent; ensures tables exist when TestClient doesn't run lifespan before first request
+    ensure_schema()
     session_id = str(uuid.uuid4())
     created_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
     with connect() as conn:
@@ -173,87 +162,120 @@ def create_session(agent_id: str) -> str:
     return session_id
 
 
+# Rows per multi-row INSERT: 10 bind parameters each, under SQLite's historical 999 limit.
+_INSERT_BATCH_ROWS = 90
+_EVENT_COLUMNS = "session_id, role, content, event_type, run_id, step_index, tool_name, idempotency_key, ts, meta"
+
+
+def _event_row(session_id: str, ev: Dict[str, Any]) -> Tuple[Any, ...]:
+    role = ev.get("role", "user")
+    return (
+        session_id,
+        role,
+        ev.get("content", ""),
+        _infer_event_type(role, ev.get("event_type")),
+        ev.get("run_id"),
+        ev.get("step_index"),
+        ev.get("tool_name"),
+        ev.get("idempotency_key"),
+        ev.get("ts") or time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        json.dumps(ev.get("meta")) if ev.get("meta") is not None else None,
+    )
+
+
+def _insert_event_rows(conn: Any, session_id: str, rows: List[Tuple[Any, ...]]) -> Optional[List[int]]:
+    """
+    Insert rows in one statement, skipping (session_id, idempotency_key) conflicts.
+    Returns the ids of inserted rows (ascending), or None when the session does not exist.
+    """
+    values = ", ".join("(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)" for _ in rows)
+    params = [v for row in rows for v in row]
+    if is_postgres():
+        # The events.session_id foreign key rejects unknown sessions.
+        try:
+            inserted = conn.execute(
+                sql(
+                    f"INSERT INTO events ({_EVENT_COLUMNS}) VALUES {values} "
+                    "ON CONFLICT (session_id, idempotency_key) DO NOTHING RETURNING id"
+                ),
+                params,
+            ).fetchall()
+        except Exception as exc:
+            if getattr(exc, "sqlstate", None) == "23503":  # foreign_key_violation
+                conn.rollback()
+                return None
+            raise
+        return sorted(int(r["id"]) for r in inserted)
+    # SQLite does not enforce foreign keys by default; the insert is guarded instead.
+    # ON CONFLICT (not INSERT OR IGNORE) so NOT NULL/CHECK violations still raise.
+    # RETURNING (SQLite >= 3.35): rows skipped by the conflict clause still use up
+    # AUTOINCREMENT ids, so the inserted ids are not a contiguous range.
+    inserted = conn.execute(
+        f"INSERT INTO events ({_EVENT_COLUMNS}) SELECT * FROM (VALUES {values}) "
+        "WHERE EXISTS (SELECT 1 FROM sessions WHERE id = ?) "
+        "ON CONFLICT (session_id, idempotency_key) DO NOTHING RETURNING id",
+        params + [session_id],
+    ).fetchall()
+    return sorted(int(r["id"]) for r in inserted)
+
+
 def append_events_detailed(session_id: str, events: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Append events to a session. Each event supports:
     { role, content, event_type?, run_id?, step_index?, tool_name?, idempotency_key?, ts?, meta? }.
     Returns detailed result with duplicate detection.
+
+    Events are written with multi-row inserts that skip idempotency-key conflicts;
+    duplicates are resolved with one lookup per batch. event_ids holds, per input
+    event, the inserted id or the id of the existing event with the same key.
     """
     if not events:
         return {"appended": 0, "duplicated": False, "event_ids": []}
-    init_db()  # Idempotent; ensures tables exist when TestClient doesn't run lifespan before first request
+    ensure_schema()
+    appended = 0
+    duplicated = False
+    event_ids: List[int] = []
+    claimed_keys: set = set()
     with connect() as conn:
-        cur = conn.execute(sql("SELECT id FROM sessions WHERE id = ?"), (session_id,))
-        if cur.fetchone() is None:
-            return {"appended": 0, "duplicated": False, "event_ids": []}
-        appended = 0
-        duplicated = False
-        event_ids: List[int] = []
-        for ev in events:
-            role = ev.get("role", "user")
-            content = ev.get("content", "")
-            event_type = _infer_event_type(role, ev.get("event_type"))
-            run_id = ev.get("run_id")
-            step_index = ev.get("step_index")
-            tool_name = ev.get("tool_name")
-            idempotency_key = ev.get("idempotency_key")
-            ts = ev.get("ts") or time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-            meta = json.dumps(ev.get("meta")) if ev.get("meta") is not None else None
-            insert_sql = sql(
-                """
-                INSERT INTO events (
-                    session_id, role, content, event_type, run_id, step_index, tool_name, idempotency_key, ts, meta
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """
-            )
-            conflict_sql = sql(
-                "SELECT id FROM events WHERE session_id = ? AND idempotency_key = ? ORDER BY id LIMIT 1"
-            )
-            try:
-                cur_insert = conn.execute(
-                    insert_sql,
-                    (
-                        session_id,
-                        role,
-                        content,
-                        event_type,
-                        run_id,
-                        step_index,
-                        tool_name,
-                        idempotency_key,
-                        ts,
-                        meta,
+        for offset in range(0, len(events), _INSERT_BATCH_ROWS):
+            rows = [_event_row(session_id, ev) for ev in events[offset : offset + _INSERT_BATCH_ROWS]]
+            inserted_ids = _insert_event_rows(conn, session_id, rows)
+            if inserted_ids is None:
+                return {"appended": 0, "duplicated": False, "event_ids": []}
+            keys = sorted({row[7] for row in rows if row[7] is not None})
+            first_id_by_key: Dict[str, int] = {}
+            if keys:
+                placeholders = ", ".join("?" for _ in keys)
+                for r in conn.execute(
+                    sql(
+                        f"SELECT id, idempotency_key FROM events WHERE session_id = ? "
+                        f"AND idempotency_key IN ({placeholders}) ORDER BY id"
                     ),
-                )
-                inserted_id = cur_insert.lastrowid
-                if inserted_id is None:
-                    existing = conn.execute(
-                        conflict_sql,
-                        (session_id, idempotency_key),
-                    ).fetchone()
-                    if existing is not None:
-                        inserted_id = existing["id"]
-                if inserted_id is not None:
-                    event_ids.append(int(inserted_id))
+                    [session_id, *keys],
+                ).fetchall():
+                    first_id_by_key.setdefault(r["idempotency_key"], int(r["id"]))
+            inserted = set(inserted_ids)
+            keyed_ids = set(first_id_by_key.values())
+            keyless_ids = iter([i for i in inserted_ids if i not in keyed_ids])
+            for row in rows:
+                key = row[7]
+                if key is None:
+                    new_id = next(keyless_ids, None)
+                    if new_id is None:
+                        # Nothing was inserted for a key-less event: the session does not exist.
+                        return {"appended": 0, "duplicated": False, "event_ids": []}
+                    event_ids.append(new_id)
+                    appended += 1
+                    continue
+                existing_id = first_id_by_key.get(key)
+                if existing_id is None:
+                    return {"appended": 0, "duplicated": False, "event_ids": []}
+                if existing_id in inserted and key not in claimed_keys:
+                    appended += 1
                 else:
-                    event_ids.append(-1)
-            except Exception as exc:
-                if idempotency_key is None:
-                    raise
-                err_text = str(exc).lower()
-                if "unique" not in err_text and "duplicate key" not in err_text:
-                    raise
-                existing = conn.execute(
-                    conflict_sql,
-                    (session_id, idempotency_key),
-                ).fetchone()
-                duplicated = True
-                if existing is not None:
-                    event_ids.append(int(existing["id"]))
-                else:
-                    event_ids.append(-1)
-                continue
-            appended += 1
+                    duplicated = True
+                event_ids.append(existing_id)
+                claimed_keys.add(key)
         conn.commit()
     return {"appended": appended, "duplicated": duplicated, "event_ids": event_ids}
 
@@ -266,7 +288,7 @@ def append_events(session_id: str, events: List[Dict[str, Any]]) -> int:
 
 def get_session_events(session_id: str) -> List[Dict[str, Any]]:
     """Return all events for a session including event typing/linkage fields."""
-    init_db()
+    ensure_schema()
     with connect() as conn:
         events_rows = conn.execute(
             sql(
@@ -306,12 +328,129 @@ def get_session_events(session_id: str) -> List[Dict[str, Any]]:
     return out
 
 
+_MEMORY_PAGE_SIZE = 100
+
+
+def _decode_meta(raw: Any) -> Any:
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+
+class _LazyMetaEvent(dict):
+    """Event row whose `meta` JSON is decoded on first access (memory windows rarely need it)."""
+
+    def __init__(self, data: Dict[str, Any], meta_raw: Any) -> None:
+        super().__init__(data)
+        self._meta_raw = meta_raw
+
+    def __missing__(self, key: str) -> Any:
+        if key != "meta":
+            raise KeyError(key)
+        value = _decode_meta(self._meta_raw)
+        self["meta"] = value
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "meta" and not dict.__contains__(self, "meta"):
+            value = self["meta"]
+            return default if value is None else value
+        return super().get(key, default)
+
+
+def get_session_memory(
+    session_id: str,
+    *,
+    limit: Optional[int],
+    max_chars: int = 0,
+    keep_recent: int = 0,
+    exclude_event_types: Sequence[str] = (),
+) -> Optional[Dict[str, Any]]:
+    """
+    Return {running_summary, events} with only the newest events memory can use,
+    or None when the session does not exist.
+
+    Rows are read newest-first (ORDER BY id DESC, paged by id) and reading stops
+    after `limit` events, or once more than `keep_recent` events are loaded and
+    their content exceeds `max_chars` (0 disables either bound). Events of
+    `exclude_event_types` are filtered in SQL. Events are returned oldest-first;
+    `meta` is decoded lazily.
+    """
+    ensure_schema()
+    events: List[Dict[str, Any]] = []
+    total_chars = 0
+    type_filter = ""
+    if exclude_event_types:
+        placeholders = ", ".join("?" for _ in exclude_event_types)
+        type_filter = f" AND (event_type IS NULL OR event_type NOT IN ({placeholders}))"
+    with connect() as conn:
+        row = conn.execute(
+            sql("SELECT running_summary FROM sessions WHERE id = ?"),
+            (session_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        running_summary = row["running_summary"] or ""
+        before_id: Optional[int] = None
+        done = False
+        while not done:
+            page_size = _MEMORY_PAGE_SIZE if limit is None else min(_MEMORY_PAGE_SIZE, limit - len(events))
+            params: List[Any] = [session_id, *exclude_event_types]
+            cursor_filter = ""
+            if before_id is not None:
+                cursor_filter = " AND id < ?"
+                params.append(before_id)
+            params.append(page_size)
+            rows = conn.execute(
+                sql(
+                    "SELECT id, session_id, role, content, event_type, run_id, step_index, tool_name, "
+                    "idempotency_key, ts, meta FROM events WHERE session_id = ?"
+                    + type_filter
+                    + cursor_filter
+                    + " ORDER BY id DESC LIMIT ?"
+                ),
+                tuple(params),
+            ).fetchall()
+            for e in rows:
+                role = e["role"]
+                content = e["content"]
+                total_chars += len(content or "")
+                if max_chars > 0 and len(events) >= keep_recent and total_chars > max_chars:
+                    done = True
+                    break
+                events.append(
+                    _LazyMetaEvent(
+                        {
+                            "id": e["id"],
+                            "session_id": e["session_id"],
+                            "role": role,
+                            "content": content,
+                            "event_type": _infer_event_type(role, e["event_type"]),
+                            "run_id": e["run_id"],
+                            "step_index": e["step_index"],
+                            "tool_name": e["tool_name"],
+                            "idempotency_key": e["idempotency_key"],
+                            "ts": e["ts"],
+                        },
+                        e["meta"],
+                    )
+                )
+                before_id = e["id"]
+            if len(rows) < page_size or (limit is not None and len(events) >= limit):
+                done = True
+    events.reverse()
+    return {"running_summary": running_summary, "events": events}
+
+
 def get_session(session_id: str) -> Optional[Dict[str, Any]]:
     """
     Return session dict with session_id, agent_id, created_at, events, running_summary
     or None when session not found. Do not raise.
     """
-    init_db()  # Idempotent; ensures tables exist when TestClient doesn't run lifespan before first request
+    ensure_schema()
     with connect() as conn:
         row = conn.execute(
             sql(
@@ -341,7 +480,7 @@ def get_session_summary(session_id: str) -> Dict[str, Any]:
     Lightweight accessor for running_summary and counters.
     Returns {running_summary, summary_updated_at, summary_message_count} with safe defaults.
     """
-    init_db()
+    ensure_schema()
     with connect() as conn:
         row = conn.execute(
             sql(
@@ -365,7 +504,7 @@ def update_session_summary(session_id: str, new_summary: str, summarized_count:
     Persist running_summary and summary_message_count for a session.
     Safe no-op when session does not exist.
     """
-    init_db()
+    ensure_schema()
     now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
     with connect() as conn:
         conn.execute(
@@ -377,3 +516,14 @@ def update_session_summary(session_id: str, new_summary: str, summarized_count:
             (new_summary, now, int(summarized_count), session_id),
         )
         conn.commit()
+
+
+# Async variants for async routers: same functions, run on the bounded DB executor.
+acreate_session = async_variant(create_session)
+aappend_events_detailed = async_variant(append_events_detailed)
+aappend_events = async_variant(append_events)
+aget_session_events = async_variant(get_session_events)
+aget_session = async_variant(get_session)
+aget_session_memory = async_variant(get_session_memory)
+aget_session_summary = async_variant(get_session_summary)
+aupdate_session_summary = async_variant(update_session_summary)
@@ -3,91 +3,77 @@ from __future__ import annotations
 import json
 import time
 import uuid
-from pathlib import Path
 from typing import Any, Dict, Iterable, List, Tuple
 
 from app.storage.db import connect, is_postgres, sql
+from app.storage.migrations import ensure_schema
 
 from .models import CAPABILITY_CATEGORIES, ToolCandidate
 
 
-def _ensure_sqlite_dir() -> None:
-    if is_postgres():
-        return
-    from app.config import get_settings
-
-    path = get_settings().db_path
-    Path(path).parent.mkdir(parents=True, exist_ok=True)
-
-
 def init_tool_ingestion_db() -> None:
-    """
-    Create tool_candidates and platform_tools tables and indexes (best-effort).
-    """
-    _ensure_sqlite_dir()
-    with connect() as conn:
-        if not is_postgres():
-            conn.execute("PRAGMA journal_mode=WAL")
-            conn.execute("PRAGMA synchronous=NORMAL")
-            conn.execute("PRAGMA busy_timeout=3000")
-
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS tool_candidates (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                normalized_name TEXT NOT NULL,
-                description TEXT,
-                source_repo TEXT NOT NULL,
-                source_path TEXT NOT NULL,
-                tool_type TEXT NOT NULL,
-                execution_kind TEXT NOT NULL,
-                capability_category TEXT NOT NULL,
-                args_schema_json TEXT NOT NULL,
-                risk_level TEXT NOT NULL,
-                tags_json TEXT,
-                confidence REAL NOT NULL,
-                promotion_reason TEXT,
-                raw_snippet TEXT,
-                created_at TEXT NOT NULL
-            )
-            """
-        )
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_tool_candidates_repo_name ON tool_candidates (source_repo, normalized_name)"
-        )
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_tool_candidates_category ON tool_candidates (capability_category)"
-        )
-
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS platform_tools (
-                tool_id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                normalized_name TEXT NOT NULL,
-                description TEXT,
-                tool_type TEXT NOT NULL,
-                execution_kind TEXT NOT NULL,
-                capability_category TEXT NOT NULL,
-                args_schema_json TEXT NOT NULL,
-                risk_level TEXT NOT NULL,
-                tags_json TEXT,
-                source_repo TEXT,
-                source_path TEXT,
-                confidence REAL NOT NULL,
-                promotion_reason TEXT,
-                created_at TEXT NOT NULL
-            )
-            """
+    """Ensure the schema exists (app.storage.migrations); kept for scripts and tests."""
+    ensure_schema()
+
+
+def create_schema(conn: Any) -> None:
+    """tool_candidates and platform_tools tables and indexes, applied by the baseline migration."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS tool_candidates (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            normalized_name TEXT NOT NULL,
+            description TEXT,
+            source_repo TEXT NOT NULL,
+            source_path TEXT NOT NULL,
+            tool_type TEXT NOT NULL,
+            execution_kind TEXT NOT NULL,
+            capability_category TEXT NOT NULL,
+            args_schema_json TEXT NOT NULL,
+            risk_level TEXT NOT NULL,
+            tags_json TEXT,
+            confidence REAL NOT NULL,
+            promotion_reason TEXT,
+            raw_snippet TEXT,
+            created_at TEXT NOT NULL
         )
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_platform_tools_normalized_name ON platform_tools (normalized_name)"
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tool_candidates_repo_name ON tool_candidates (source_repo, normalized_name)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tool_candidates_category ON tool_candidates (capability_category)"
+    )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS platform_tools (
+            tool_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            normalized_name TEXT NOT NULL,
+            description TEXT,
+            tool_type TEXT NOT NULL,
+            execution_kind TEXT NOT NULL,
+            capability_category TEXT NOT NULL,
+            args_schema_json TEXT NOT NULL,
+            risk_level TEXT NOT NULL,
+            tags_json TEXT,
+            source_repo TEXT,
+            source_path TEXT,
+            confidence REAL NOT NULL,
+            promotion_reason TEXT,
+            created_at TEXT NOT NULL
         )
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_platform_tools_category ON platform_tools (capability_category)"
-        )
-        conn.commit()
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_platform_tools_normalized_name ON platform_tools (normalized_name)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_platform_tools_category ON platform_tools (capability_category)"
+    )
 
 
 def _validate_candidate_for_insert(c: ToolCandidate) -> ToolCandidate:
@@ -102,7 +88,7 @@ def _now_iso() -> str:
 
 
 def insert_tool_candidates(candidates: Iterable[ToolCandidate]) -> int:
-    init_tool_ingestion_db()
+    ensure_schema()
     rows: List[Tuple[Any, ...]] = []
     now = _now_iso()
     for c in candidates:
@@ -157,7 +143,7 @@ def insert_platform_tools(candidates: Iterable[ToolCandidate]) -> int:
       {normalized_name}__{execution_kind}__{capability_category}
     If conflict, keep existing (V1 behavior).
     """
-    init_tool_ingestion_db()
+    ensure_schema()
     rows: List[Tuple[Any, ...]] = []
     now = _now_iso()
     for c in candidates:
@@ -211,7 +197,7 @@ def list_platform_tools() -> List[Dict[str, Any]]:
     Each row is a dict with tool_id, name, description, category, execution_kind,
     confidence, source_repo, source_path, promotion_reason.
     """
-    init_tool_ingestion_db()
+    ensure_schema()
     with connect() as conn:
         cur = conn.execute(
             """
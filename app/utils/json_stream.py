@@ -0,0 +1,100 @@
+"""
+Incremental parser for a JSON object arriving in text chunks (LLM token streams).
+
+feed() returns the top-level members whose values completed in that chunk, so
+callers can forward each field as soon as it is known instead of waiting for
+the whole completion. Leading text before the first '{' (e.g. a ```json
+fence) is ignored. Values that do not parse are skipped; the caller is
+expected to validate the full document at the end.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, List, Tuple
+
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalJSONObjectParser:
+    """Emit (key, value) for each completed top-level member of a streamed JSON object."""
+
+    def __init__(self) -> None:
+        self._state = "start"  # start -> key -> colon -> value -> key ... -> done
+        self._key_chars: List[str] = []
+        self._key = ""
+        self._value_chars: List[str] = []
+        self._value_depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        completed: List[Tuple[str, Any]] = []
+        for ch in chunk:
+            state = self._state
+            if state == "done":
+                break
+            if state == "start":
+                if ch == "{":
+                    self._state = "key"
+                continue
+            if state == "key":
+                if self._in_string:
+                    if self._escape:
+                        self._escape = False
+                    elif ch == "\\":
+                        self._escape = True
+                    elif ch == '"':
+                        self._in_string = False
+                        self._key = json.loads('"' + "".join(self._key_chars) + '"')
+                        self._key_chars = []
+                        self._state = "colon"
+                        continue
+                    self._key_chars.append(ch)
+                elif ch == '"':
+                    self._in_string = True
+                elif ch == "}":
+                    self._state = "done"
+                continue
+            if state == "colon":
+                if ch == ":":
+                    self._state = "value"
+                continue
+            # state == "value"
+            if self._in_string:
+                self._value_chars.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if self._value_depth == 0 and ch in ",}":
+                self._emit(completed)
+                self._state = "done" if ch == "}" else "key"
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._value_depth += 1
+            elif ch in "}]":
+                self._value_depth -= 1
+            if self._value_chars or ch not in _WHITESPACE:
+                self._value_chars.append(ch)
+        return completed
+
+    def _emit(self, completed: List[Tuple[str, Any]]) -> None:
+        text = "".join(self._value_chars).strip()
+        self._value_chars = []
+        self._value_depth = 0
+        if not text:
+            return
+        try:
+            completed.append((self._key, json.loads(text)))
+        except ValueError:
+            pass
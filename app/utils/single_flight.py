@@ -0,0 +1,49 @@
+"""
+Async single-flight: concurrent calls with the same key share one execution.
+
+The first caller (leader) starts the work as a task; callers arriving while it
+is in flight await the same task instead of starting their own. The key is
+released as soon as the task finishes, so later calls run fresh.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """Per-event-loop registry of in-flight tasks keyed by a string."""
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Tuple[int, str], "asyncio.Future[Any]"] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run fn() once per key among concurrent callers.
+
+        Returns (result, shared): shared is True for callers that joined an
+        in-flight execution. Exceptions propagate to every caller. The shared
+        task is shielded so one caller disconnecting does not cancel the others.
+        """
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+        task = self._inflight.get(slot)
+        shared = task is not None
+        if task is None:
+            task = loop.create_task(fn())
+            self._inflight[slot] = task
+
+            def _release(done: "asyncio.Future[Any]", slot: Tuple[int, str] = slot) -> None:
+                if self._inflight.get(slot) is done:
+                    del self._inflight[slot]
+                if done.cancelled():
+                    return
+                # Mark the exception retrieved when every caller went away.
+                done.exception()
+
+            task.add_done_callback(_release)
+        return await asyncio.shield(task), shared
+
+    def inflight(self) -> int:
+        return len(self._inflight)
@@ -0,0 +1,135 @@
+"""
+Shared Draft-07 validator registry.
+
+Compiling a jsonschema validator (and running check_schema on the schema) is
+repeated work when the same schema is used for every invoke or eval case.
+Validators are cached by a canonical hash of the schema with LRU eviction;
+hit/miss counters are exposed via validator_cache_stats().
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping
+
+from jsonschema import Draft7Validator
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+def schema_hash(schema: Mapping[str, Any]) -> str:
+    """Canonical hash of a JSON schema (key order and whitespace independent)."""
+    canonical = json.dumps(schema, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class _Entry:
+    validator: Draft7Validator
+    schema_checked: bool = False
+
+
+class ValidatorCache:
+    """Thread-safe LRU of compiled Draft7Validator instances keyed by schema_hash."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _entry(self, schema: Mapping[str, Any]) -> _Entry:
+        key = schema_hash(schema)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        entry = _Entry(validator=Draft7Validator(schema))
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                return existing
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def get(self, schema: Mapping[str, Any]) -> Draft7Validator:
+        """Return a compiled validator for schema (does not check the schema itself)."""
+        return self._entry(schema).validator
+
+    def check_schema(self, schema: Mapping[str, Any]) -> Draft7Validator:
+        """
+        Validate schema against the Draft-07 metaschema once, then return its validator.
+        Raises jsonschema.SchemaError when invalid (invalid schemas are not cached as checked).
+        """
+        entry = self._entry(schema)
+        if not entry.schema_checked:
+            Draft7Validator.check_schema(schema)
+            entry.schema_checked = True
+        return entry.validator
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_cache = ValidatorCache()
+
+
+def get_validator(schema: Mapping[str, Any]) -> Draft7Validator:
+    """Return the shared compiled validator for schema."""
+    return _cache.get(schema)
+
+
+def check_schema(schema: Mapping[str, Any]) -> Draft7Validator:
+    """Shared, cached Draft7Validator.check_schema; returns the compiled validator."""
+    return _cache.check_schema(schema)
+
+
+def validation_errors(instance: Any, schema: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Return [{path, message}, ...] for instance against schema; [] when valid.
+
+    Fast path: is_valid() stops at the first failure and allocates no error
+    objects, so the full iter_errors() collection only runs for invalid input.
+    """
+    return validator_errors(get_validator(schema), instance)
+
+
+def validator_errors(validator: Draft7Validator, instance: Any) -> List[Dict[str, Any]]:
+    """Same as validation_errors for an already-compiled validator."""
+    if validator.is_valid(instance):
+        return []
+    return [{"path": list(err.path), "message": err.message} for err in validator.iter_errors(instance)]
+
+
+def validator_cache_stats() -> Dict[str, int]:
+    return _cache.stats()
+
+
+def clear_validator_cache() -> None:
+    _cache.clear()
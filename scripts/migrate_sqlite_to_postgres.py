@@ -19,7 +19,8 @@ except Exception:  # pragma: no cover
     psycopg = None
 
 from app.storage.session_store import init_db
-from app.storage.registry_store import init_registry_db
+from app.storage.db import connect
+from app.storage.registry_store import init_registry_db, rebuild_listing
 
 
 def _require_psycopg() -> None:
@@ -139,6 +140,11 @@ def main() -> None:
 
         pg.commit()
 
+    # Copied rows bypass register_agent; refresh the agents_latest listing projection.
+    with connect() as conn:
+        rebuild_listing(conn)
+        conn.commit()
+
     sqlite_conn.close()
     print("Migration complete.")
 
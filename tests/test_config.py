@@ -0,0 +1,29 @@
+"""Tests for the cached Settings snapshot."""
+
+from app.config import get_settings, reload_settings, settings_version
+
+
+def test_settings_snapshot_is_cached_until_env_changes(monkeypatch):
+    monkeypatch.setenv("AGENT_MAX_STEPS", "7")
+    first = get_settings()
+    version = settings_version()
+    assert first.max_steps == 7
+    assert get_settings() is first
+    assert settings_version() == version
+
+    monkeypatch.setenv("AGENT_MAX_STEPS", "9")
+    changed = get_settings()
+    assert changed is not first
+    assert changed.max_steps == 9
+    assert settings_version() == version + 1
+
+    # Variables read only as fallbacks are tracked too.
+    monkeypatch.delenv("DB_PATH", raising=False)
+    monkeypatch.setenv("SESSION_DB_PATH", "/tmp/a.db")
+    assert get_settings().db_path == "/tmp/a.db"
+    monkeypatch.setenv("SESSION_DB_PATH", "/tmp/b.db")
+    assert get_settings().db_path == "/tmp/b.db"
+
+    forced = reload_settings()
+    assert forced.db_path == "/tmp/b.db"
+    assert get_settings() is forced
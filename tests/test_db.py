@@ -0,0 +1,97 @@
+"""Tests for pooled connections in app.storage.db."""
+
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+
+from app.storage.db import close_pools, connect, get_pool_stats
+
+
+def test_sqlite_connection_is_reused_per_thread(monkeypatch, tmp_path: Path):
+    monkeypatch.delenv("DB_PATH", raising=False)
+    monkeypatch.setenv("SESSION_DB_PATH", str(tmp_path / "pool.db"))
+    close_pools()
+
+    with connect() as first:
+        first.execute("CREATE TABLE t (v INTEGER)")
+        first.execute("INSERT INTO t VALUES (1)")
+    with connect() as second:
+        assert second is first
+        assert second.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert second.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+
+    other = []
+
+    def worker():
+        with connect() as conn:
+            other.append(conn)
+
+    t = threading.Thread(target=worker)
+    t.start()
+    t.join()
+    assert other[0] is not first
+    stats = get_pool_stats()
+    assert stats["dialect"] == "sqlite" and stats["reused"] >= 1
+    close_pools()
+
+
+def test_nested_connect_commits_once_and_rolls_back_on_error(monkeypatch, tmp_path: Path):
+    monkeypatch.delenv("DB_PATH", raising=False)
+    monkeypatch.setenv("SESSION_DB_PATH", str(tmp_path / "nested.db"))
+    close_pools()
+    with connect() as conn:
+        conn.execute("CREATE TABLE t (v INTEGER)")
+
+    try:
+        with connect() as outer:
+            outer.execute("INSERT INTO t VALUES (1)")
+            with connect() as inner:
+                inner.execute("INSERT INTO t VALUES (2)")
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    with connect() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    close_pools()
+
+
+def test_sqlite_connection_reopens_when_file_replaced(monkeypatch, tmp_path: Path):
+    db_file = tmp_path / "replaced.db"
+    monkeypatch.delenv("DB_PATH", raising=False)
+    monkeypatch.setenv("SESSION_DB_PATH", str(db_file))
+    close_pools()
+    with connect() as first:
+        first.execute("CREATE TABLE t (v INTEGER)")
+    os.remove(db_file)
+    with connect() as second:
+        assert second is not first
+        assert second.execute("SELECT name FROM sqlite_master WHERE name = 't'").fetchone() is None
+    assert get_pool_stats()["reopened"] >= 1
+    close_pools()
+
+
+def test_async_store_variants_run_off_the_event_loop(monkeypatch, tmp_path: Path):
+    import asyncio
+
+    from app.storage import session_store
+
+    monkeypatch.delenv("DB_PATH", raising=False)
+    monkeypatch.setenv("SESSION_DB_PATH", str(tmp_path / "async.db"))
+    close_pools()
+
+    async def main():
+        loop_thread = threading.get_ident()
+        session_id = await session_store.acreate_session("summarizer")
+        session = await session_store.aget_session(session_id)
+        seen = []
+        monkeypatch.setattr(session_store, "get_session", lambda sid: seen.append(threading.get_ident()) or {"id": sid})
+        patched = await session_store.aget_session("x")
+        return loop_thread, session_id, session, seen, patched
+
+    loop_thread, session_id, session, seen, patched = asyncio.run(main())
+    assert session and session["session_id"] == session_id
+    assert patched == {"id": "x"}
+    assert seen and seen[0] != loop_thread
+    close_pools()
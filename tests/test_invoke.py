@@ -408,6 +408,34 @@ def test_invoke_internal_error_from_provider_raises_500(app, client):
     _assert_error_envelope(data, expected_code="INTERNAL_ERROR")
 
 
+def test_invoke_awaits_native_async_provider(app, client):
+    """Providers with a native acomplete_json are awaited; the blocking sync path is not used."""
+    from app.providers import AsyncBaseProvider, ProviderResult
+
+    class AsyncOnlyProvider(AsyncBaseProvider):
+        def __init__(self):
+            self.async_calls = 0
+
+        def complete_json(self, prompt, *, schema):
+            raise AssertionError("sync complete_json must not be called from /invoke")
+
+        async def acomplete_json(self, prompt, *, schema):
+            self.async_calls += 1
+            return ProviderResult(parsed_json={"summary": "async", "bullets": ["a"]}, raw_text="{}")
+
+    provider = AsyncOnlyProvider()
+    with env_vars({"AUTH_TOKEN": "", "PROVIDER": "stub", "AGENT_PRESET": "summarizer"}):
+        get_provider = _override_provider(app, provider)
+        try:
+            resp = client.post("/invoke", json={"input": {"text": "async"}})
+        finally:
+            app.dependency_overrides.pop(get_provider, None)
+
+    assert resp.status_code == 200
+    assert resp.json()["output"]["summary"] == "async"
+    assert provider.async_calls == 1
+
+
 ### 6) Other endpoints: /, /schema, /health, /stream ###########################
 
 
@@ -490,15 +518,63 @@ def test_health_endpoint_ok(client):
     # Tighten contract: health.status should be "ok" in the happy path.
     assert data["status"] == "ok"
     assert isinstance(data["version"], str)
+    # Operational stats are not exposed to anonymous callers.
+    assert set(data) == {"status", "agent", "version"}
 
 
-def test_stream_endpoint_not_implemented_returns_501(client):
+def test_metrics_endpoint_requires_auth(client):
+    """
+    GET /metrics returns the operational stats only with valid credentials.
     """
-    POST /stream is not implemented yet.
+    with env_vars({"AUTH_TOKEN": "secret-token", "PROVIDER": "stub", "AGENT_PRESET": "summarizer"}):
+        anonymous = client.get("/metrics")
+        authorized = client.get("/metrics", headers={"Authorization": "Bearer secret-token"})
+
+    assert anonymous.status_code == 401
+    assert anonymous.json()["error"]["code"] == "UNAUTHORIZED"
+    assert authorized.status_code == 200
+    data = authorized.json()
+    for key in ["db_pool", "run_events", "run_scheduler", "tool_cache"]:
+        assert key in data
+
+
+def _parse_sse(text: str) -> List[Dict[str, Any]]:
+    import json
+
+    events = []
+    for frame in text.split("\n\n"):
+        lines = [line for line in frame.splitlines() if line and not line.startswith(":")]
+        if not lines:
+            continue
+        event = next((line[len("event: "):] for line in lines if line.startswith("event: ")), "message")
+        data = "".join(line[len("data: "):] for line in lines if line.startswith("data: "))
+        events.append({"event": event, "data": json.loads(data) if data else None})
+    return events
+
+
+class ChunkedStreamingProvider:
+    """Provider double that streams a JSON completion in small text chunks."""
 
-    NOTE: We standardize `error.code` here as "NOT_IMPLEMENTED" for 501,
-    keeping 500 reserved for "INTERNAL_ERROR" as per the main contract.
+    def __init__(self, text: str, chunk_size: int = 5):
+        self._text = text
+        self._chunk_size = chunk_size
+
+    def complete_json(self, prompt: str, *, schema: Any) -> Any:
+        import json
+
+        return json.loads(self._text)
+
+    async def astream_json(self, prompt: str, *, schema: Any):
+        for i in range(0, len(self._text), self._chunk_size):
+            yield self._text[i : i + self._chunk_size]
+
+
+def test_stream_endpoint_emits_fields_then_validated_final_envelope(app, client):
+    """
+    POST /stream returns SSE: start, one field event per completed top-level
+    output member, then `final` with the standard success envelope.
     """
+    provider = ChunkedStreamingProvider('{"summary": "streamed, with comma", "bullets": ["a", "b"]}')
     with env_vars(
         {
             "AUTH_TOKEN": "",
@@ -506,11 +582,87 @@ def test_stream_endpoint_not_implemented_returns_501(client):
             "AGENT_PRESET": "summarizer",
         }
     ):
-        resp = client.post("/stream", json={"input": {"text": "stream me"}})
+        get_provider = _override_provider(app, provider)
+        try:
+            resp = client.post("/stream", json={"input": {"text": "stream me"}})
+        finally:
+            app.dependency_overrides.pop(get_provider, None)
 
-    assert resp.status_code == 501
-    data = resp.json()
-    _assert_error_envelope(data, expected_code="NOT_IMPLEMENTED")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(resp.text)
+    assert [e["event"] for e in events] == ["start", "field", "field", "final"]
+    assert events[1]["data"] == {"path": ["summary"], "value": "streamed, with comma"}
+    assert events[2]["data"] == {"path": ["bullets"], "value": ["a", "b"]}
+    final = events[-1]["data"]
+    assert final["output"] == {"summary": "streamed, with comma", "bullets": ["a", "b"]}
+    assert final["meta"]["agent"] == "summarizer"
+    assert final["meta"]["request_id"] == events[0]["data"]["request_id"]
+
+
+def test_stream_endpoint_validation_errors_keep_http_status(client):
+    """Input validation runs before streaming starts, so errors use the normal JSON envelope."""
+    with env_vars(
+        {
+            "AUTH_TOKEN": "",
+            "PROVIDER": "stub",
+            "AGENT_PRESET": "summarizer",
+        }
+    ):
+        resp = client.post("/stream", json={"input": {"text": 123}})
+
+    assert resp.status_code == 422
+    _assert_error_envelope(resp.json(), expected_code="INPUT_VALIDATION_ERROR")
+
+
+def test_stream_endpoint_reports_output_validation_failure_as_error_event(app, client):
+    provider = RecordingProvider([{"summary": 1, "bullets": "x"}])
+    with env_vars(
+        {
+            "AUTH_TOKEN": "",
+            "PROVIDER": "stub",
+            "AGENT_PRESET": "summarizer",
+        }
+    ):
+        get_provider = _override_provider(app, provider)
+        try:
+            resp = client.post("/stream", json={"input": {"text": "bad output"}})
+        finally:
+            app.dependency_overrides.pop(get_provider, None)
+
+    events = _parse_sse(resp.text)
+    assert events[-1]["event"] == "error"
+    assert events[-1]["data"]["error"]["code"] == "OUTPUT_VALIDATION_ERROR"
+    assert provider.calls == 2
+
+
+class FailingRepairStreamingProvider(ChunkedStreamingProvider):
+    """Streams an invalid completion; the repair call then raises."""
+
+    def complete_json(self, prompt: str, *, schema: Any) -> Any:
+        raise RuntimeError("provider down during repair")
+
+
+def test_stream_endpoint_reports_repair_provider_failure_as_error_event(app, client):
+    """A provider exception in the repair call ends the stream with an INTERNAL_ERROR `error` event."""
+    provider = FailingRepairStreamingProvider('{"summary": 1, "bullets": "x"}')
+    with env_vars(
+        {
+            "AUTH_TOKEN": "",
+            "PROVIDER": "stub",
+            "AGENT_PRESET": "summarizer",
+        }
+    ):
+        get_provider = _override_provider(app, provider)
+        try:
+            resp = client.post("/stream", json={"input": {"text": "bad output"}})
+        finally:
+            app.dependency_overrides.pop(get_provider, None)
+
+    events = _parse_sse(resp.text)
+    assert events[0]["event"] == "start"
+    assert events[-1]["event"] == "error"
+    _assert_error_envelope(events[-1]["data"], expected_code="INTERNAL_ERROR")
 
 
 ### 7) Context + Session Memory (plan: context_and_session_memory) ##################
@@ -1093,3 +1245,186 @@ def test_registry_invoke_with_session_memory_behaves_like_preset_invoke(
         assert meta["memory_used_count"] >= 1
         # Prompt sent to provider must include stored event content.
         assert distinctive in cap.captured_prompt
+
+
+def test_registry_invoke_response_cache_serves_identical_request_without_provider_call(
+    client: TestClient,
+    app,
+    session_db_path: str,
+) -> None:
+    """Agents with response_cache enabled reuse the validated output for an identical prompt."""
+    from app.response_cache import clear_response_cache
+
+    agent_id = "invoke-cached-agent"
+    spec = _build_registry_spec(agent_id, "1.0.0", supports_memory=False)
+    spec["response_cache"] = {"enabled": True, "ttl_seconds": 60}
+    assert _register_registry_agent(client, spec=spec, db_path=session_db_path)["status_code"] == 200
+
+    clear_response_cache()
+    provider = RecordingProvider([{"summary": "cached once"}])
+    env = {
+        "DB_PATH": session_db_path,
+        "SESSION_DB_PATH": session_db_path,
+        "AUTH_TOKEN": "",
+        "PROVIDER": "stub",
+        "AGENT_PRESET": "summarizer",
+    }
+    with env_vars(env):
+        get_provider = _override_provider(app, provider)
+        try:
+            first = client.post(f"/agents/{agent_id}/invoke", json={"input": {"text": "same"}})
+            second = client.post(f"/agents/{agent_id}/invoke", json={"input": {"text": "same"}})
+            other = client.post(f"/agents/{agent_id}/invoke", json={"input": {"text": "different"}})
+        finally:
+            app.dependency_overrides.pop(get_provider, None)
+            clear_response_cache()
+
+    assert first.status_code == second.status_code == other.status_code == 200
+    assert first.json()["meta"]["cache_status"] == "miss"
+    assert second.json()["meta"]["cache_status"] == "hit"
+    assert second.json()["output"] == first.json()["output"] == {"summary": "cached once"}
+    assert other.json()["meta"]["cache_status"] == "miss"
+    assert provider.calls == 2
+
+
+def test_response_cache_db_tier_runs_off_the_event_loop(session_db_path: str) -> None:
+    """With RESPONSE_CACHE_PERSIST=true, alookup/astore do their DB I/O on the DB executor, not the loop thread."""
+    import asyncio
+    import threading
+    from unittest.mock import patch
+
+    from app import response_cache
+    from app.preset_loader import get_active_preset
+    from app.storage import response_cache_store
+
+    threads: List[int] = []
+    real_get, real_put = response_cache_store.get_entry, response_cache_store.put_entry
+
+    def get_entry(key):
+        threads.append(threading.get_ident())
+        return real_get(key)
+
+    def put_entry(key, **kwargs):
+        threads.append(threading.get_ident())
+        return real_put(key, **kwargs)
+
+    async def scenario() -> Any:
+        loop_thread = threading.get_ident()
+        preset = get_active_preset()
+        await response_cache.astore("k-off-loop", preset, {"summary": "x"}, "{}", 60)
+        response_cache.clear_response_cache()
+        hit = await response_cache.alookup("k-off-loop")
+        return loop_thread, hit
+
+    env = {"DB_PATH": session_db_path, "SESSION_DB_PATH": session_db_path, "RESPONSE_CACHE_PERSIST": "true"}
+    with env_vars(env), patch.object(response_cache_store, "get_entry", get_entry), patch.object(
+        response_cache_store, "put_entry", put_entry
+    ):
+        response_cache.clear_response_cache()
+        try:
+            loop_thread, hit = asyncio.run(scenario())
+        finally:
+            response_cache.clear_response_cache()
+
+    assert hit is not None and hit.parsed_json == {"summary": "x"}
+    assert len(threads) == 2 and loop_thread not in threads
+
+
+def test_registry_stream_returns_sse_with_final_envelope(
+    client: TestClient,
+    session_db_path: str,
+) -> None:
+    agent_id = "stream-registry-agent"
+    spec = _build_registry_spec(agent_id, "1.0.0", supports_memory=False)
+    assert _register_registry_agent(client, spec=spec, db_path=session_db_path)["status_code"] == 200
+
+    env = {
+        "DB_PATH": session_db_path,
+        "SESSION_DB_PATH": session_db_path,
+        "AUTH_TOKEN": "",
+        "PROVIDER": "stub",
+        "AGENT_PRESET": "summarizer",
+    }
+    with env_vars(env):
+        resp = client.post(f"/agents/{agent_id}/stream", json={"input": {"text": "hi"}})
+        missing = client.post("/agents/no-such-agent/stream", json={"input": {"text": "hi"}})
+
+    assert resp.status_code == 200
+    events = _parse_sse(resp.text)
+    assert events[0]["event"] == "start"
+    assert events[-1]["event"] == "final"
+    assert events[-1]["data"]["meta"]["agent"] == agent_id
+    assert missing.status_code == 404
+
+
+def test_registry_invoke_batch_returns_per_item_envelopes_in_order(
+    client: TestClient,
+    session_db_path: str,
+) -> None:
+    import json
+
+    agent_id = "batch-registry-agent"
+    spec = _build_registry_spec(agent_id, "1.0.0", supports_memory=False)
+    assert _register_registry_agent(client, spec=spec, db_path=session_db_path)["status_code"] == 200
+
+    env = {
+        "DB_PATH": session_db_path,
+        "SESSION_DB_PATH": session_db_path,
+        "AUTH_TOKEN": "",
+        "PROVIDER": "stub",
+        "AGENT_PRESET": "summarizer",
+        "BATCH_CONCURRENCY": "2",
+    }
+    items = [{"input": {"text": "one"}}, {"input": {"text": 2}}, {"input": {"text": "three"}}]
+    with env_vars(env):
+        resp = client.post(f"/agents/{agent_id}/invoke:batch", json={"items": items})
+        streamed = client.post(f"/agents/{agent_id}/invoke:batch?stream=ndjson", json={"items": items})
+        empty = client.post(f"/agents/{agent_id}/invoke:batch", json={"items": []})
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [r["index"] for r in data["results"]] == [0, 1, 2]
+    assert [r["status_code"] for r in data["results"]] == [200, 422, 200]
+    assert data["results"][1]["body"]["error"]["code"] == "INPUT_VALIDATION_ERROR"
+    assert data["results"][0]["body"]["meta"]["agent"] == agent_id
+    assert data["meta"]["succeeded"] == 2 and data["meta"]["failed"] == 1
+
+    assert streamed.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in streamed.text.splitlines() if line]
+    assert sorted(line["index"] for line in lines) == [0, 1, 2]
+
+    assert empty.status_code == 422
+
+
+def test_registry_invoke_batch_is_rate_limited_per_item(
+    app,
+    client: TestClient,
+    session_db_path: str,
+    monkeypatch,
+) -> None:
+    """A batch is charged one unit per item, so batches cannot bypass the invoke budget."""
+    from app.rate_limit import RateRule, SimpleRateLimiter
+    from app.storage import registry_store
+
+    agent_id = "batch-limited-agent"
+    limiter = SimpleRateLimiter(rules={"invoke_batch": RateRule(key="invoke_batch", limit=5, window_seconds=60)})
+    monkeypatch.setattr(app.state, "rate_limiter", limiter)
+    env = {
+        "DB_PATH": session_db_path,
+        "SESSION_DB_PATH": session_db_path,
+        "AUTH_TOKEN": "",
+        "PROVIDER": "stub",
+        "AGENT_PRESET": "summarizer",
+    }
+    three = [{"input": {"text": f"t{i}"}} for i in range(3)]
+    with env_vars(env):
+        # Registered directly: POST /agents/register has its own (shared) rate budget.
+        registry_store.register_agent(_build_registry_spec(agent_id, "1.0.0", supports_memory=False))
+        first = client.post(f"/agents/{agent_id}/invoke:batch", json={"items": three})
+        oversized = client.post(f"/agents/{agent_id}/invoke:batch", json={"items": three})
+        fits = client.post(f"/agents/{agent_id}/invoke:batch", json={"items": three[:2]})
+
+    assert first.status_code == 200
+    assert oversized.status_code == 429
+    assert oversized.json()["error"]["code"] == "RATE_LIMITED"
+    assert fits.status_code == 200 and fits.json()["meta"]["count"] == 2
@@ -0,0 +1,73 @@
+"""Tests for versioned schema migrations."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from app.storage import migrations, session_store
+from app.storage.db import close_pools, connect
+
+
+@pytest.fixture
+def fresh_db(monkeypatch, tmp_path: Path):
+    db_file = tmp_path / "sub" / "gateway.db"
+    monkeypatch.delenv("DB_PATH", raising=False)
+    monkeypatch.setenv("SESSION_DB_PATH", str(db_file))
+    close_pools()
+    yield db_file
+    close_pools()
+
+
+def test_ensure_schema_records_versions_and_runs_once(fresh_db, monkeypatch):
+    migrations.ensure_schema()
+    assert migrations.get_schema_version() == migrations.LATEST_VERSION
+    with connect() as conn:
+        rows = conn.execute("SELECT version, name FROM schema_version ORDER BY version").fetchall()
+    assert [r["version"] for r in rows] == [m.version for m in migrations.MIGRATIONS]
+
+    def _fail(info):
+        raise AssertionError("migrations re-ran for an up-to-date database")
+
+    monkeypatch.setattr(migrations, "_migrate", _fail)
+    migrations.ensure_schema()
+    session_id = session_store.create_session("summarizer")
+    assert session_store.get_session(session_id) is not None
+
+
+def test_ensure_schema_is_idempotent_and_remigrates_replaced_file(fresh_db):
+    migrations.ensure_schema()
+    migrations.reset_schema_guard()
+    migrations.ensure_schema()
+    with connect() as conn:
+        count = conn.execute("SELECT COUNT(*) AS n FROM schema_version").fetchone()["n"]
+    assert count == len(migrations.MIGRATIONS)
+
+    close_pools()
+    os.remove(fresh_db)
+    session_id = session_store.create_session("summarizer")
+    assert session_id
+    assert migrations.get_schema_version() == migrations.LATEST_VERSION
+
+
+def test_schema_guard_is_a_lookup_and_pool_remigrates_replaced_file(fresh_db, monkeypatch):
+    migrations.ensure_schema()
+
+    def _no_stat(*args, **kwargs):
+        raise AssertionError("schema guard touched the filesystem")
+
+    with monkeypatch.context() as m:
+        m.setattr(os, "stat", _no_stat)
+        migrations.ensure_schema()
+        assert migrations.is_schema_applied()
+
+    # Removed while this thread's pooled connection is open: the pool reopens and re-migrates it.
+    with connect():
+        pass
+    os.remove(fresh_db)
+    migrations.ensure_schema()
+    session_id = session_store.create_session("summarizer")
+    assert session_store.get_session(session_id) is not None
+    assert migrations.get_schema_version() == migrations.LATEST_VERSION
@@ -1,9 +1,12 @@
+import dataclasses
 import os
 from pathlib import Path
 
 import yaml
 from jsonschema import Draft7Validator
 
+from app.utils.validators import get_validator
+
 
 PRESET_IDS = [
     "summarizer",
@@ -147,3 +150,37 @@ def test_extractor_schema_shapes():
     for field in ["data", "confidence"]:
         assert field in out_props, f"extractor.output_schema must include '{field}'"
 
+
+
+def test_compiled_preset_cache_reuses_parse_and_invalidates_on_file_change(tmp_path, monkeypatch):
+    """get_compiled_preset parses once per file version and re-reads when the YAML changes."""
+    from app import preset_loader
+
+    source = Path(__file__).parent.parent / "app" / "presets" / "summarizer.yaml"
+    target = tmp_path / "summarizer.yaml"
+    target.write_text(source.read_text(encoding="utf-8"), encoding="utf-8")
+    monkeypatch.setattr(preset_loader, "PRESETS_DIR", tmp_path)
+    preset_loader.clear_preset_cache()
+
+    first = preset_loader.get_compiled_preset("summarizer")
+    second = preset_loader.get_compiled_preset("summarizer")
+    assert first is second
+    assert preset_loader.load_preset("summarizer") is first.preset
+    assert first.prompt_header.endswith(f"# Primitive: {first.preset.primitive}")
+    assert preset_loader.prompt_header_for(first.preset) == first.prompt_header
+    assert preset_loader.input_validator_for(first.preset) is first.input_validator
+    assert preset_loader.output_validator_for(first.preset) is first.output_validator
+    # A preset that is not the cached file preset (e.g. from the registry) gets the shared validator.
+    other = dataclasses.replace(first.preset)
+    assert preset_loader.output_validator_for(other) is get_validator(other.output_schema)
+
+    data = yaml.safe_load(target.read_text(encoding="utf-8"))
+    data["version"] = "9.9.9"
+    target.write_text(yaml.safe_dump(data), encoding="utf-8")
+    st = os.stat(target)
+    os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    third = preset_loader.get_compiled_preset("summarizer")
+    assert third is not first
+    assert third.preset.version == "9.9.9"
+    preset_loader.clear_preset_cache()
@@ -0,0 +1,42 @@
+"""Tests for incremental prompt assembly."""
+
+from app.preset_loader import load_preset
+from app.prompt_builder import RunPromptBuilder, render_tools_block
+
+
+def test_run_prompt_builder_appends_turns_without_rebuilding_prefix():
+    preset = load_preset("summarizer")
+    builder = RunPromptBuilder(
+        preset,
+        [{"role": "user", "content": "earlier"}],
+        {"text": "hello"},
+        allowed_tools=["http_request"],
+        max_tool_prompt_chars=20,
+        running_summary="user likes short answers",
+    )
+    first = builder.build()
+    assert first.startswith(preset.prompt.strip())
+    assert "# Memory (summary):\nuser likes short answers" in first
+    assert '"text": "hello"' in first
+    assert "- http_request:" in first
+    assert first.endswith("No other text or markdown.")
+
+    builder.add_turn({"type": "tool_call", "tool_name": "http_request", "args": {}}, "http_request", {"body": "x" * 100})
+    second = builder.build()
+    prefix = first[: -len("No other text or markdown.")]
+    assert second.startswith(prefix.rsplit("Respond ONLY", 1)[0])
+    assert "Tool (http_request): " in second
+    assert "...[truncated]" in second
+    assert second.endswith("Respond with next JSON action (final or tool_call).\n\n")
+    assert builder.turn_count == 1
+
+    builder.add_turn({"type": "tool_call", "tool_name": "http_request", "args": {"n": 2}}, "http_request", {"ok": True})
+    assert builder.build().startswith(second)
+
+
+def test_tools_block_is_cached_per_allowed_tools():
+    render_tools_block.cache_clear()
+    render_tools_block(("http_request", "github_repo_read"))
+    render_tools_block(("http_request", "github_repo_read"))
+    info = render_tools_block.cache_info()
+    assert info.hits == 1 and info.misses == 1
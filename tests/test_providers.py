@@ -0,0 +1,54 @@
+"""Tests for the shared provider registry used by get_provider."""
+
+import asyncio
+
+from app.providers import (
+    OpenRouterProvider,
+    StubProvider,
+    aclose_provider_clients,
+    clear_provider_registry,
+    get_provider_async_client,
+    get_shared_provider,
+)
+
+
+def test_shared_provider_is_reused_and_rebuilt_on_config_change(monkeypatch):
+    clear_provider_registry()
+    monkeypatch.setenv("PROVIDER", "openrouter")
+    monkeypatch.setenv("OPENROUTER_API_KEY", "key-one")
+    monkeypatch.delenv("OPENROUTER_MODEL", raising=False)
+
+    first = get_shared_provider()
+    assert isinstance(first, OpenRouterProvider)
+    assert get_shared_provider() is first
+
+    monkeypatch.setenv("OPENROUTER_API_KEY", "key-two")
+    rotated = get_shared_provider()
+    assert rotated is not first
+    assert rotated.api_key == "key-two"
+
+    monkeypatch.setenv("OPENROUTER_MODEL", "anthropic/claude-3.5-sonnet")
+    assert get_shared_provider().model == "anthropic/claude-3.5-sonnet"
+
+    monkeypatch.setenv("PROVIDER", "stub")
+    assert isinstance(get_shared_provider(), StubProvider)
+    clear_provider_registry()
+
+
+def test_async_client_is_per_loop_and_closed_when_the_loop_ends():
+    async def use_client():
+        client = get_provider_async_client()
+        assert get_provider_async_client() is client
+        return client
+
+    first = asyncio.run(use_client())
+    second = asyncio.run(use_client())
+    assert first is not second
+    assert first.is_closed and second.is_closed
+
+    async def shutdown():
+        client = get_provider_async_client()
+        await aclose_provider_clients()
+        return client
+
+    assert asyncio.run(shutdown()).is_closed
@@ -370,6 +370,90 @@ def test_get_agents_filters_q_primitive_supports_memory(
     assert all(a["supports_memory"] is True for a in agents_m)
 
 
+def test_get_agents_pages_latest_listing_and_tracks_archive(
+    client: TestClient, gateway_db_path: str
+) -> None:
+    """GET /agents pages by cursor; q is full-text (word prefix); archiving a version updates the listing."""
+    from app.storage import registry_store
+
+    first = _make_valid_spec("alpha", "1.0.0")
+    first["description"] = "Summarizes long documents"
+    second = _make_valid_spec("alpha", "2.0.0")
+    second["description"] = "Summarizes long documents, v2"
+    base_env = {
+        "DB_PATH": gateway_db_path,
+        "SESSION_DB_PATH": gateway_db_path,
+        "AUTH_TOKEN": "",
+        "PROVIDER": "stub",
+        "AGENT_PRESET": "summarizer",
+    }
+    with env_vars(base_env):
+        # Registered through the store: POST /agents/register is rate limited per client.
+        for spec in (first, second, _make_valid_spec("beta", "1.0.0"), _make_valid_spec("gamma", "1.0.0")):
+            registry_store.register_agent(spec)
+        page1 = client.get("/agents", params={"limit": 2}).json()
+        page2 = client.get("/agents", params={"limit": 2, "cursor": page1["next_cursor"]}).json()
+        search = client.get("/agents", params={"q": "summ"}).json()
+        bad = client.get("/agents", params={"cursor": "not-a-cursor"})
+        registry_store.archive_agent("alpha", version="2.0.0")
+        after_archive = client.get("/agents").json()
+        all_versions = client.get("/agents", params={"latest_only": "false", "limit": 1}).json()
+
+    assert [(a["id"], a["version"]) for a in page1["agents"]] == [("alpha", "2.0.0"), ("beta", "1.0.0")]
+    assert [a["id"] for a in page2["agents"]] == ["gamma"]
+    assert page2["next_cursor"] is None
+    assert [a["id"] for a in search["agents"]] == ["alpha"]
+    assert bad.status_code == 400
+    _assert_error_envelope(bad.json(), "INVALID_CURSOR")
+    alpha = next(a for a in after_archive["agents"] if a["id"] == "alpha")
+    assert alpha["version"] == "1.0.0" and alpha["archived"] is False
+    assert [(a["id"], a["version"]) for a in all_versions["agents"]] == [("alpha", "1.0.0")]
+    assert all_versions["next_cursor"]
+
+
+def test_registry_preset_cache_reads_through_and_invalidates(
+    gateway_db_path: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Presets are cached per (id, version); local writes and the DB registry version invalidate them."""
+    from app import registry_cache
+    from app.storage import registry_store
+    from app.storage.db import connect
+
+    env = {"DB_PATH": gateway_db_path, "SESSION_DB_PATH": gateway_db_path, "REGISTRY_CACHE_CHECK_SECONDS": "3600"}
+    with env_vars(env):
+        registry_store.register_agent(_make_valid_spec("cached", "1.0.0"))
+        first = registry_cache.get_registry_preset("cached")
+        assert first is not None and first.version == "1.0.0"
+
+        calls = []
+        real_get_agent = registry_store.get_agent
+        monkeypatch.setattr(
+            registry_store, "get_agent", lambda *a, **kw: calls.append(a) or real_get_agent(*a, **kw)
+        )
+        assert registry_cache.get_registry_preset("cached") is first
+        assert registry_cache.get_registry_preset("cached", "1.0.0") is first
+        assert calls == []
+
+        # A write in this process clears the cache immediately.
+        registry_store.register_agent(_make_valid_spec("cached", "2.0.0"))
+        assert registry_cache.get_registry_preset("cached").version == "2.0.0"
+        assert len(calls) == 1
+
+        # A write by another worker is seen once the registry version is re-checked.
+        stale = registry_cache.get_registry_preset("cached", "1.0.0")
+        changed = _make_valid_spec("cached", "1.0.0")
+        changed["prompt"] = "Changed elsewhere."
+        with connect() as conn:
+            conn.execute(
+                "UPDATE agents SET spec_json = ? WHERE id = 'cached' AND version = '1.0.0'", (json.dumps(changed),)
+            )
+            conn.execute("UPDATE registry_state SET version = version + 1")
+        assert registry_cache.get_registry_preset("cached", "1.0.0") is stale
+        registry_cache.get_registry_cache().revalidate()
+        assert registry_cache.get_registry_preset("cached", "1.0.0").prompt == "Changed elsewhere."
+        assert registry_cache.get_registry_preset("missing") is None
+
+
 # --- T7: GET /agents/{id} returns latest ---------------------------------------
 
 
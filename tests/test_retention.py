@@ -0,0 +1,79 @@
+"""Tests for events / run_steps retention and archival."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from app.storage import retention, run_store, session_store
+from app.storage.db import close_pools, connect, sql
+
+
+@pytest.fixture
+def retention_db(monkeypatch, tmp_path: Path):
+    monkeypatch.delenv("DB_PATH", raising=False)
+    monkeypatch.setenv("SESSION_DB_PATH", str(tmp_path / "gateway.db"))
+    monkeypatch.setenv("RETENTION_DAYS", "0")
+    monkeypatch.setenv("RETENTION_DAYS_BY_AGENT", "summarizer=30")
+    close_pools()
+    yield tmp_path
+    close_pools()
+
+
+def _seed(agent_id: str, old_ts: str, new_ts: str) -> tuple[str, str]:
+    session_id = session_store.create_session(agent_id)
+    session_store.append_events(
+        session_id,
+        [
+            {"role": "user", "content": "old", "ts": old_ts},
+            {"role": "user", "content": "new", "ts": new_ts},
+        ],
+    )
+    run = run_store.create_run(agent_id, "1.0", session_id, {"text": "x"})
+    run_store.append_run_step(run["id"], 1, "llm_action", {"type": "final"})
+    run_store.append_run_step(run["id"], 2, "final", {"type": "final"})
+    with connect() as conn:
+        conn.execute(sql("UPDATE run_steps SET created_at = ? WHERE run_id = ? AND step_index = 1"), (old_ts, run["id"]))
+        conn.execute(sql("UPDATE run_steps SET created_at = ? WHERE run_id = ? AND step_index = 2"), (new_ts, run["id"]))
+    return session_id, run["id"]
+
+
+def test_retention_archives_and_deletes_expired_rows_per_agent(retention_db):
+    now = time.time()
+    old_ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now - 90 * 86400))
+    new_ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now - 86400))
+    kept_session, kept_run = _seed("classify", old_ts, new_ts)
+    session_id, run_id = _seed("summarizer", old_ts, new_ts)
+
+    dry = retention.run(now=now, dry_run=True)
+    assert dry["tables"]["events"]["by_agent"] == {"summarizer": 1}
+    assert dry["files"] == []
+    assert len(session_store.get_session_events(session_id)) == 2
+
+    archive_dir = retention_db / "archive"
+    report = retention.run(now=now, archive_dir=str(archive_dir), batch_size=1)
+    assert report["tables"]["events"]["archived"] == 1
+    assert report["tables"]["run_steps"]["by_agent"] == {"summarizer": 1}
+
+    assert [e["content"] for e in session_store.get_session_events(session_id)] == ["new"]
+    assert [s["step_index"] for s in run_store.list_run_steps(run_id)] == [2]
+    assert len(session_store.get_session_events(kept_session)) == 2
+    assert len(run_store.list_run_steps(kept_run)) == 2
+
+    archived = archive_dir / "run_steps" / old_ts[:7] / "summarizer.jsonl.gz"
+    with gzip.open(archived, "rt", encoding="utf-8") as fh:
+        rows = [json.loads(line) for line in fh]
+    assert [(r["run_id"], r["step_index"]) for r in rows] == [(run_id, 1)]
+    assert str(archive_dir / "events" / old_ts[:7] / "summarizer.jsonl.gz") in report["files"]
+
+    again = retention.run(now=now, archive_dir=str(archive_dir))
+    assert again["tables"]["events"]["archived"] == 0 and again["files"] == []
+
+
+def test_retention_days_for_uses_per_agent_override(retention_db):
+    assert retention.retention_days_for("summarizer") == 30
+    assert retention.retention_days_for("other") == 0
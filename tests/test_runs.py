@@ -384,3 +384,260 @@ def test_run_steps_include_observability_fields(app, client, db_path):
             assert "latency_ms" in s
             assert "error_code" in s
             assert "event_time" in s or "created_at" in s
+
+
+def test_run_step_journal_buffers_until_flush_and_status(db_path):
+    """Steps and step_count become visible together; terminal status never precedes its steps."""
+    from app.storage import run_store
+
+    with env_vars({"SESSION_DB_PATH": db_path}):
+        run = run_store.create_run("summarizer", "1.0", None, {"text": "x"})
+        journal = run_store.RunStepJournal(run["id"], flush_interval_seconds=60)
+        journal.append_step(1, "llm_action", {"type": "tool_call"}, latency_ms=5)
+        journal.count_step()
+        journal.append_step(2, "tool_call", {"type": "tool_call"}, tool_name="http_request", tool_args_json={})
+        assert run_store.list_run_steps(run["id"]) == []
+        assert run_store.get_run(run["id"])["step_count"] == 0
+
+        journal.flush()
+        assert [s["step_type"] for s in run_store.list_run_steps(run["id"])] == ["llm_action", "tool_call"]
+        assert run_store.get_run(run["id"])["step_count"] == 1
+
+        journal.append_step(3, "final", {"type": "final", "output": {"ok": True}})
+        journal.count_step()
+        journal.set_status("succeeded", output_json={"ok": True})
+        assert journal.pending == 0
+        got = run_store.get_run(run["id"])
+        assert got["status"] == "succeeded" and got["step_count"] == 2
+        assert len(run_store.list_run_steps(run["id"])) == 3
+
+
+def test_run_event_bus_wakes_subscribers_on_committed_writes(db_path):
+    """A journal flush from a worker thread wakes SSE subscribers of that run only."""
+    import asyncio
+    import threading
+
+    from app.storage import run_store
+    from app.storage.run_events import get_run_event_bus
+
+    with env_vars({"SESSION_DB_PATH": db_path}):
+        run = run_store.create_run("summarizer", "1.0", None, {"text": "x"})
+        other = run_store.create_run("summarizer", "1.0", None, {"text": "y"})
+        bus = get_run_event_bus()
+
+        async def main():
+            async with bus.subscribe(run["id"]) as sub:
+                assert await sub.wait(0.05) is False
+                run_store.set_run_status(other["id"], "running")
+                assert await sub.wait(0.05) is False
+
+                journal = run_store.RunStepJournal(run["id"], flush_interval_seconds=60)
+                journal.append_step(1, "llm_action", {"type": "final"})
+                journal.count_step()
+                worker = threading.Thread(target=journal.flush)
+                started = time.monotonic()
+                worker.start()
+                assert await sub.wait(5) is True
+                assert time.monotonic() - started < 1
+                worker.join()
+            return bus.stats()["subscribers"]
+
+        assert asyncio.run(main()) == 0
+        assert len(run_store.list_run_steps(run["id"])) == 1
+
+
+def test_run_queue_claims_respect_caps_and_recover_stale_runs(db_path):
+    """Queued runs are claimed as admit() allows; stale claims are requeued, then failed."""
+    from app.storage import run_store
+    from app.storage.db import connect, sql
+
+    with env_vars({"SESSION_DB_PATH": db_path}):
+        # A job kind no scheduler handles, so only this test claims these rows.
+        first = run_store.create_run("a", "1.0", None, {"n": 1}, job_kind="test_kind", tenant_id="t1")
+        second = run_store.create_run("a", "1.0", None, {"n": 2}, job_kind="test_kind", tenant_id="t1")
+        other = run_store.create_run("b", "1.0", None, {"n": 3}, job_kind="test_kind", tenant_id="t2")
+        inline = run_store.create_run("b", "1.0", None, {"n": 4})
+
+        seen_agents: list = []
+
+        def one_per_agent(row):
+            if row["agent_id"] in seen_agents:
+                return False
+            seen_agents.append(row["agent_id"])
+            return True
+
+        claimed = run_store.claim_queued_runs("w1", ["test_kind"], 10, one_per_agent)
+        assert sorted(r["agent_id"] for r in claimed) == ["a", "b"]
+        assert all(r["status"] == "running" and r["claimed_by"] == "w1" for r in claimed)
+        # Runs created within the same second have no defined order between them.
+        if second["id"] in {r["id"] for r in claimed}:
+            first, second = second, first
+        assert run_store.get_run(second["id"])["status"] == "queued"
+        assert run_store.get_run(inline["id"])["status"] == "queued"
+
+        run_store.append_run_step(first["id"], 1, "llm_action", {"type": "final"})
+        run_store.heartbeat_runs("w1", [other["id"]])
+        with connect() as conn:
+            conn.execute(sql("UPDATE runs SET heartbeat_at = ? WHERE id = ?"), ("2000-01-01T00:00:00Z", first["id"]))
+        assert run_store.recover_stale_runs("2001-01-01T00:00:00Z", max_attempts=2) == {
+            "requeued": [first["id"]],
+            "failed": [],
+        }
+        requeued = run_store.get_run(first["id"])
+        assert (requeued["status"], requeued["claimed_by"], requeued["step_count"]) == ("queued", None, 0)
+        assert run_store.list_run_steps(first["id"]) == []
+        assert run_store.get_run(other["id"])["status"] == "running"
+
+        again = run_store.claim_queued_runs("w2", ["test_kind"], 1, lambda row: row["id"] == first["id"])
+        assert [r["id"] for r in again] == [first["id"]] and again[0]["attempts"] == 2
+        with connect() as conn:
+            conn.execute(sql("UPDATE runs SET heartbeat_at = ? WHERE id = ?"), ("2000-01-01T00:00:00Z", first["id"]))
+        assert run_store.recover_stale_runs("2001-01-01T00:00:00Z", max_attempts=2)["failed"] == [first["id"]]
+        assert run_store.get_run(first["id"])["status"] == "failed"
+
+
+def test_run_step_journal_is_fenced_on_the_workers_claim(db_path):
+    """After a stale run is requeued and reclaimed, the old worker can write neither steps nor status."""
+    from app.storage import run_store
+    from app.storage.db import connect, sql
+
+    with env_vars({"SESSION_DB_PATH": db_path}):
+        run = run_store.create_run("a", "1.0", None, {"n": 1}, job_kind="test_kind")
+        mine = lambda row: row["id"] == run["id"]  # noqa: E731
+        (stale,) = run_store.claim_queued_runs("w1", ["test_kind"], 1, mine)
+        old = run_store.RunStepJournal(run["id"], flush_interval_seconds=60, lease=run_store.run_lease(stale))
+        old.append_step(1, "llm_action", {"type": "tool_call"})
+        old.count_step()
+        old.flush()
+        assert run_store.get_run(run["id"])["step_count"] == 1
+
+        with connect() as conn:
+            conn.execute(sql("UPDATE runs SET heartbeat_at = ? WHERE id = ?"), ("2000-01-01T00:00:00Z", run["id"]))
+        assert run_store.recover_stale_runs("2001-01-01T00:00:00Z", max_attempts=3)["requeued"] == [run["id"]]
+        # Same worker id on the next claim: the attempts counter still tells the claims apart.
+        (fresh,) = run_store.claim_queued_runs("w1", ["test_kind"], 1, mine)
+        new = run_store.RunStepJournal(run["id"], flush_interval_seconds=60, lease=run_store.run_lease(fresh))
+        new.append_step(1, "llm_action", {"type": "final"})
+        new.count_step()
+        new.flush()
+
+        old.append_step(2, "tool_call", {"type": "tool_call"})
+        old.count_step()
+        with pytest.raises(run_store.RunLeaseLost):
+            old.flush()
+        assert old.lease_lost and old.pending == 0
+        with pytest.raises(run_store.RunLeaseLost):
+            old.set_status("succeeded", output_json={"stale": True})
+        with pytest.raises(run_store.RunLeaseLost):
+            run_store.set_run_status(run["id"], "failed", error="stale", lease=run_store.run_lease(stale))
+        got = run_store.get_run(run["id"])
+        assert (got["status"], got["step_count"], got["output_json"]) == ("running", 1, None)
+        assert [s["step_type"] for s in run_store.list_run_steps(run["id"])] == ["llm_action"]
+
+        new.set_status("succeeded", output_json={"ok": True})
+        assert run_store.get_run(run["id"])["status"] == "succeeded"
+
+
+def test_run_scheduler_pool_applies_per_agent_cap():
+    """Jobs of one agent over RUN_MAX_PER_AGENT wait for a slot; other agents are not blocked."""
+    import threading
+
+    from app.runtime.scheduler import RunScheduler
+
+    with env_vars({"RUN_WORKERS": "4", "RUN_MAX_PER_AGENT": "1", "RUN_QUEUE_POLL_SECONDS": "0.05"}):
+        scheduler = RunScheduler()
+        release = threading.Event()
+        started: list = []
+        done = threading.Semaphore(0)
+
+        def job(name):
+            def fn():
+                started.append(name)
+                if name == "a1":
+                    release.wait(5)
+                done.release()
+            return fn
+
+        try:
+            scheduler.submit(job("a1"), agent_id="a")
+            scheduler.submit(job("a2"), agent_id="a")
+            scheduler.submit(job("b1"), agent_id="b")
+            assert done.acquire(timeout=5)
+            time.sleep(0.2)
+            assert sorted(started) == ["a1", "b1"]
+            release.set()
+            assert done.acquire(timeout=5) and done.acquire(timeout=5)
+            assert started[-1] == "a2"
+        finally:
+            release.set()
+            scheduler.stop()
+
+
+class SequenceProvider:
+    """Provider returning the given actions in order, recording each prompt."""
+
+    def __init__(self, actions):
+        self.actions = list(actions)
+        self.prompts = []
+
+    def complete_json(self, prompt: str, *, schema: Any) -> Any:
+        self.prompts.append(prompt)
+        return self.actions.pop(0)
+
+
+class SlowEchoToolRegistry:
+    """Sync registry whose calls each take 0.3s."""
+
+    def execute(self, tool_name, args, run_context):
+        time.sleep(0.3)
+        return {"tool": tool_name, "n": args.get("n")}
+
+
+def test_arun_runner_executes_tool_calls_batch_concurrently(db_path):
+    """A tool_calls action runs its calls concurrently and feeds every result back in order."""
+    import asyncio
+
+    from app.registry_cache import get_registry_preset
+    from app.runtime.runner import arun_runner
+    from app.storage import run_store
+
+    batch = {
+        "type": "tool_calls",
+        "tool_calls": [{"tool_name": "http_request", "args": {"n": n}} for n in (1, 2, 3)],
+    }
+    with env_vars({"DB_PATH": db_path, "AGENT_MAX_TOOL_CALLS": "3", "DATABASE_URL": "", "SUPABASE_DATABASE_URL": ""}):
+        _init_and_seed_temp_db()
+        preset = get_registry_preset("summarizer")
+        provider = SequenceProvider([batch, {"type": "final", "output": {"done": True}}])
+        run = run_store.create_run("summarizer", preset.version, None, {"text": "x"})
+
+        started = time.monotonic()
+        asyncio.run(arun_runner(
+            preset=preset,
+            provider=provider,
+            input_payload={"text": "x"},
+            run_id=run["id"],
+            tool_registry=SlowEchoToolRegistry(),
+        ))
+        assert time.monotonic() - started < 0.8
+
+        assert run_store.get_run(run["id"])["status"] == "succeeded"
+        steps = run_store.list_run_steps(run["id"])
+        results = [s["tool_result_json"]["n"] for s in steps if s["step_type"] == "tool_result"]
+        assert sorted(results) == [1, 2, 3]
+        assert [s["step_type"] for s in steps].count("tool_call") == 3
+        last_prompt = provider.prompts[-1]
+        assert last_prompt.index('"n": 1') < last_prompt.index('"n": 2') < last_prompt.index('"n": 3')
+
+        over_budget = run_store.create_run("summarizer", preset.version, None, {"text": "x"})
+        batch["tool_calls"].append({"tool_name": "http_request", "args": {"n": 4}})
+        asyncio.run(arun_runner(
+            preset=preset,
+            provider=SequenceProvider([batch]),
+            input_payload={"text": "x"},
+            run_id=over_budget["id"],
+            tool_registry=SlowEchoToolRegistry(),
+        ))
+        failed = run_store.get_run(over_budget["id"])
+        assert failed["status"] == "failed"
+        assert failed["error"] == "tool_execution_failed: max_tool_calls_exceeded"
@@ -197,3 +197,113 @@ def test_event_type_is_inferred_when_null(client_with_session_db):
     events = session.json()["events"]
     assert events[0]["event_type"] == "assistant"
     assert events[1]["event_type"] == "system"
+
+
+def test_memory_window_matches_full_history_merge(client_with_session_db):
+    """
+    get_session_memory() loads only the tail the memory policy can keep; merging it
+    gives the same result as merging the full event history.
+    """
+    from app.engine import _merge_and_truncate_memory, _stored_memory_events, memory_window
+    from app.models import MemoryPolicy
+    from app.storage import session_store
+
+    session_id = session_store.create_session("summarizer")
+    events = []
+    for i in range(250):
+        if i % 7 == 0:
+            events.append({"role": "assistant", "event_type": "tool_result", "tool_name": "http_request", "content": f"tool {i}"})
+        else:
+            events.append({"role": "user" if i % 2 else "assistant", "content": f"message {i} " + "x" * (i % 40)})
+    session_store.append_events(session_id, events)
+    full = _stored_memory_events(session_store.get_session_events(session_id))
+
+    policies = [
+        MemoryPolicy(max_messages=10, max_chars=8000),
+        MemoryPolicy(max_messages=50, max_chars=300),
+        MemoryPolicy(max_messages=0, max_chars=500),
+        MemoryPolicy(max_messages=20, max_chars=0, memory_include_tool_results=True, memory_tool_result_mode="full"),
+        MemoryPolicy(max_messages=20, max_chars=400, memory_include_tool_results=True, memory_tool_result_mode="summary"),
+    ]
+    for policy in policies:
+        window = session_store.get_session_memory(session_id, **memory_window(policy))
+        assert len(window["events"]) <= 250
+        expected = _merge_and_truncate_memory(full, [{"role": "user", "content": "ctx"}], policy)
+        got = _merge_and_truncate_memory(_stored_memory_events(window["events"]), [{"role": "user", "content": "ctx"}], policy)
+        assert got == expected
+
+    bounded = session_store.get_session_memory(session_id, **memory_window(policies[0]))
+    assert len(bounded["events"]) == 10
+    assert bounded["events"][-1]["content"] == full[-1]["content"]
+    assert session_store.get_session_memory("missing", limit=5) is None
+
+
+def test_append_events_detailed_bulk_semantics(client_with_session_db):
+    """Bulk insert keeps appended/duplicated/event_ids semantics across batches and retries."""
+    from app.storage import session_store
+
+    session_id = session_store.create_session("summarizer")
+    first = session_store.append_events_detailed(
+        session_id,
+        [
+            {"role": "user", "content": "a", "idempotency_key": "k1"},
+            {"role": "assistant", "content": "b"},
+            {"role": "user", "content": "a again", "idempotency_key": "k1"},
+        ],
+    )
+    assert first["appended"] == 2 and first["duplicated"] is True
+    assert first["event_ids"][0] == first["event_ids"][2]
+    assert first["event_ids"][1] > first["event_ids"][0]
+
+    many = [{"role": "user", "content": f"m{i}", "idempotency_key": f"m{i}" if i % 2 else None} for i in range(200)]
+    many.append({"role": "user", "content": "retry", "idempotency_key": "k1"})
+    second = session_store.append_events_detailed(session_id, many)
+    assert second["appended"] == 200 and second["duplicated"] is True
+    assert second["event_ids"][-1] == first["event_ids"][0]
+    assert second["event_ids"][:200] == sorted(second["event_ids"][:200])
+    stored = session_store.get_session_events(session_id)
+    assert [e["content"] for e in stored[2:]] == [f"m{i}" for i in range(200)]
+    assert [e["id"] for e in stored[2:]] == second["event_ids"][:200]
+
+    missing = session_store.append_events_detailed("no-such-session", [{"role": "user", "content": "x"}])
+    assert missing == {"appended": 0, "duplicated": False, "event_ids": []}
+
+
+def test_append_events_detailed_mixed_batch_returns_stored_ids(client_with_session_db):
+    """New, duplicate and key-less rows in one batch map to the ids actually stored."""
+    from app.storage import session_store
+
+    session_id = session_store.create_session("summarizer")
+    (x_id,) = session_store.append_events_detailed(
+        session_id, [{"role": "user", "content": "x", "idempotency_key": "x"}]
+    )["event_ids"]
+    result = session_store.append_events_detailed(
+        session_id,
+        [
+            {"role": "user", "content": "y", "idempotency_key": "y"},
+            {"role": "user", "content": "x again", "idempotency_key": "x"},
+            {"role": "user", "content": "no key"},
+            {"role": "user", "content": "z", "idempotency_key": "z"},
+        ],
+    )
+    stored = {e["content"]: e["id"] for e in session_store.get_session_events(session_id)}
+    assert result["appended"] == 3 and result["duplicated"] is True
+    assert result["event_ids"] == [stored["y"], x_id, stored["no key"], stored["z"]]
+    assert "x again" not in stored
+
+def test_append_events_detailed_raises_on_constraint_violations(client_with_session_db):
+    """Only idempotency-key conflicts are skipped; other constraint violations raise and write nothing."""
+    import sqlite3
+
+    from app.storage import session_store
+
+    session_id = session_store.create_session("summarizer")
+    with pytest.raises(sqlite3.IntegrityError):
+        session_store.append_events_detailed(
+            session_id,
+            [
+                {"role": "user", "content": "kept?", "idempotency_key": "k1"},
+                {"role": "user", "content": None},
+            ],
+        )
+    assert session_store.get_session_events(session_id) == []
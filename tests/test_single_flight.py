@@ -0,0 +1,70 @@
+"""Tests for single-flight coalescing of identical concurrent invocations."""
+
+import asyncio
+import json
+
+from app.engine import process_invoke_for_preset
+from app.preset_loader import load_preset
+from app.providers import AsyncBaseProvider, ProviderResult
+from app.utils.single_flight import SingleFlight
+
+
+class _BodyRequest:
+    def __init__(self, payload):
+        self._body = json.dumps(payload).encode("utf-8")
+
+    async def body(self):
+        return self._body
+
+
+class _SlowProvider(AsyncBaseProvider):
+    def __init__(self):
+        self.calls = 0
+
+    async def acomplete_json(self, prompt, *, schema):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return ProviderResult(parsed_json={"summary": "shared", "bullets": ["x"]}, raw_text="{}")
+
+
+def test_single_flight_shares_one_execution_between_concurrent_callers():
+    flights = SingleFlight()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def main():
+        return await asyncio.gather(*(flights.do("k", work) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len(runs) == 1
+    assert [r for r, _ in results] == ["done"] * 5
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert flights.inflight() == 0
+
+
+def test_identical_concurrent_invokes_are_coalesced():
+    preset = load_preset("summarizer")
+    provider = _SlowProvider()
+
+    async def main():
+        same = [
+            process_invoke_for_preset(request=_BodyRequest({"input": {"text": "burst"}}), provider=provider, preset=preset)
+            for _ in range(4)
+        ]
+        different = process_invoke_for_preset(
+            request=_BodyRequest({"input": {"text": "other"}}), provider=provider, preset=preset
+        )
+        return await asyncio.gather(*same, different)
+
+    results = asyncio.run(main())
+    assert all(r["status_code"] == 200 for r in results)
+    assert provider.calls == 2
+    coalesced = [bool(r["body"]["meta"].get("coalesced")) for r in results[:4]]
+    assert coalesced.count(True) == 3
+    assert "coalesced" not in results[4]["body"]["meta"]
+    request_ids = {r["body"]["meta"]["request_id"] for r in results}
+    assert len(request_ids) == 5
@@ -224,6 +224,116 @@ def test_derive_hints_nextjs():
     assert "Next.js" in hints["frameworks"]
 
 
+def test_github_repo_read_result_cache_is_keyed_by_commit_sha(tmp_path):
+    """With a result cache the ref is pinned to its commit SHA; a new SHA misses, the disk tier survives restarts."""
+    from app.runtime.tools.result_cache import ToolResultCache
+
+    client = _make_mock_client(file_content=("print('hi')", "utf-8"))
+    client.get_commit_sha.return_value = "a" * 40
+    policy = GithubRepoReadPolicy()
+    args = {"owner": "o", "repo": "r", "mode": "file", "path": "main.py"}
+    cache = ToolResultCache(1 << 20, str(tmp_path))
+
+    first = execute_github_repo_read(args, policy, client, result_cache=cache)
+    second = execute_github_repo_read(args, policy, client, result_cache=cache)
+    assert first == second and first["content"] == "print('hi')"
+    assert client.get_file.call_count == 1
+    assert client.get_file.call_args[1]["ref"] == "a" * 40
+    client.get_commit_sha.assert_called_with("o", "r", "main")
+
+    restarted = ToolResultCache(1 << 20, str(tmp_path))
+    assert execute_github_repo_read(args, policy, client, result_cache=restarted) == first
+    assert client.get_file.call_count == 1
+
+    client.get_commit_sha.return_value = "b" * 40
+    execute_github_repo_read(args, policy, client, result_cache=cache)
+    assert client.get_file.call_count == 2
+    assert cache.stats()["hits"] == 1 and restarted.stats()["hits"] == 1
+
+
+def test_github_client_pins_ref_revalidates_and_serves_objects_from_disk(monkeypatch, tmp_path):
+    """Ref lookups use If-None-Match (304s), trees and blobs come from the SHA-addressed disk cache."""
+    import httpx
+
+    from app.runtime.tools import github_client as gh
+
+    commit, root, src, readme, main_py = "a" * 40, "1" * 40, "2" * 40, "3" * 40, "4" * 40
+    routes = {
+        "/repos/o/r": ('{"name": "r", "default_branch": "main"}', '"repo-v1"'),
+        "/repos/o/r/commits/main": (commit, '"main-v1"'),
+        f"/repos/o/r/git/commits/{commit}": ('{"tree": {"sha": "%s"}}' % root, None),
+        f"/repos/o/r/git/trees/{root}": (
+            '{"tree": [{"path": "src", "type": "tree", "sha": "%s"},'
+            ' {"path": "README.md", "type": "blob", "sha": "%s", "size": 2}]}' % (src, readme),
+            None,
+        ),
+        f"/repos/o/r/git/trees/{src}": ('{"tree": [{"path": "main.py", "type": "blob", "sha": "%s", "size": 7}]}' % main_py, None),
+        f"/repos/o/r/git/blobs/{main_py}": ("print()", None),
+    }
+    sent: List[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        body, etag = routes[request.url.path]
+        if etag is not None and request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, text=body, headers={"ETag": etag} if etag else {})
+
+    mock = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(gh, "get_github_http_client", lambda: mock)
+    monkeypatch.setenv("GITHUB_CACHE_DIR", str(tmp_path))
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    gh._etags.clear()
+    gh._objects.clear()
+
+    run_client = gh.DefaultGithubClient()
+    assert run_client.get_file("o", "r", "src/main.py") == ("print()", "utf-8")
+    assert len(sent) == 6
+    assert run_client.get_tree("o", "r", "main", path="src") == [{"path": "src/main.py", "type": "file", "size": 7}]
+    assert len(sent) == 6
+    with pytest.raises(gh.GithubClientError, match="directory"):
+        run_client.get_file("o", "r", "src", ref="main")
+    assert (tmp_path / "blobs" / main_py[:2] / main_py).read_bytes() == b"print()"
+
+    # Next run, in-memory objects dropped: only the two ref lookups go out (304s); the rest is read from disk.
+    gh._objects.clear()
+    sent.clear()
+    assert gh.DefaultGithubClient().get_file("o", "r", "src/main.py") == ("print()", "utf-8")
+    assert [r.url.path for r in sent] == ["/repos/o/r", "/repos/o/r/commits/main"]
+    assert [r.headers["If-None-Match"] for r in sent] == ['"repo-v1"', '"main-v1"']
+    mock.close()
+
+
+def test_run_context_github_client_pins_ref_once_under_concurrent_calls(monkeypatch):
+    """Concurrent tool calls of one step share the run's client and see the same pinned SHA."""
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.preset_loader import load_preset
+    from app.runtime.tools import github_client as gh
+    from app.runtime.tools.registry import build_run_context
+
+    run_context = build_run_context(run_id="r1", preset=load_preset("summarizer"))
+    assert isinstance(run_context.github_client, gh.DefaultGithubClient)
+
+    # Both lookups resolve before either pins, and the ref moves in between.
+    barrier = threading.Barrier(2)
+    resolved = iter(["a" * 40, "b" * 40])
+    lock = threading.Lock()
+
+    def fake_get_commit_sha(owner, repo, ref, timeout=None, token=None):
+        with lock:
+            sha = next(resolved)
+        barrier.wait(timeout=5)
+        return sha
+
+    monkeypatch.setattr(gh, "get_commit_sha", fake_get_commit_sha)
+    client = run_context.github_client
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        shas = list(pool.map(lambda _: client.get_commit_sha("o", "r", "main"), range(2)))
+    assert shas[0] == shas[1] == client.get_commit_sha("o", "r", "main")
+
+
 # --- Runner and catalog tests (mocked, SQLite-compatible) ---
 
 
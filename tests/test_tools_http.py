@@ -12,9 +12,10 @@ import os
 import tempfile
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict
-from unittest.mock import MagicMock, patch
+from typing import Any, Callable, Dict, List
+from unittest.mock import patch
 
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 
@@ -52,6 +53,21 @@ def env_vars(env: Dict[str, str]):
                 os.environ[k] = old_v
 
 
+@contextmanager
+def mock_http(handler: Callable[[httpx.Request], httpx.Response]):
+    """Route the http_request tool's pooled client through httpx.MockTransport (no real HTTP)."""
+    mock_client = httpx.Client(transport=httpx.MockTransport(handler))
+    try:
+        with patch("app.runtime.tools.http_tool.get_http_tool_client", lambda timeout_seconds: mock_client):
+            yield
+    finally:
+        mock_client.close()
+
+
+def _respond(text: str, headers: Dict[str, str] | None = None, status_code: int = 200):
+    return lambda request: httpx.Response(status_code, text=text, headers=headers or {})
+
+
 def _init_and_seed_temp_db():
     from app.preset_loader import PRESETS_DIR
     from app.storage import registry_store
@@ -91,10 +107,7 @@ def test_http_tool_happy_path_tool_call_then_final(app, client, db_path):
     Model returns tool_call(http_request) then final. Run succeeds; steps include
     tool_call, tool_result, final. Mock httpx so no real HTTP.
     """
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.text = '{"data": "ok"}'
-    mock_response.headers = {"Content-Type": "application/json"}
+    handler = _respond('{"data": "ok"}', {"Content-Type": "application/json"})
 
     actions = [
         {"type": "tool_call", "tool_name": "http_request", "args": {"method": "GET", "url": "https://example.com/data"}},
@@ -119,8 +132,7 @@ def test_http_tool_happy_path_tool_call_then_final(app, client, db_path):
         if not spec:
             pytest.skip("tool_agent preset not seeded")
         get_provider = _override_provider(app, provider)
-        with patch("app.runtime.tools.http_tool.httpx.Client") as mock_client:
-            mock_client.return_value.__enter__.return_value.request.return_value = mock_response
+        with mock_http(handler):
             try:
                 resp = client.post(
                     "/agents/tool_agent/runs",
@@ -193,10 +205,11 @@ def test_http_tool_header_stripping(app, client, db_path):
     tool_call includes Authorization header; request must be sent without it;
     stored tool_args should be redacted/dropped for sensitive keys.
     """
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.text = "ok"
-    mock_response.headers = {}
+    sent: List[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        return httpx.Response(200, text="ok")
 
     actions = [
         {"type": "tool_call", "tool_name": "http_request", "args": {
@@ -222,8 +235,7 @@ def test_http_tool_header_stripping(app, client, db_path):
         if registry_store.get_agent("tool_agent") is None:
             pytest.skip("tool_agent preset not seeded")
         get_provider = _override_provider(app, provider)
-        with patch("app.runtime.tools.http_tool.httpx.Client") as mock_client:
-            mock_client.return_value.__enter__.return_value.request.return_value = mock_response
+        with mock_http(handler):
             try:
                 resp = client.post(
                     "/agents/tool_agent/runs",
@@ -233,21 +245,18 @@ def test_http_tool_header_stripping(app, client, db_path):
                 app.dependency_overrides.pop(get_provider, None)
 
         assert resp.status_code == 200 and resp.json().get("status") == "succeeded"
-        # Check that request was called without Authorization
-        call_kw = mock_client.return_value.__enter__.return_value.request.call_args[1]
-        headers = call_kw.get("headers") or {}
+        # Check that request was sent without Authorization
+        headers = sent[-1].headers
         assert headers.get("Authorization") is None
-        assert "Bearer" not in str(headers)
+        assert "Bearer" not in str(dict(headers))
+        assert headers.get("X-Custom") == "fine"
 
 
 def test_http_tool_max_tool_calls_exceeded(app, client, db_path):
     """
     Model repeatedly returns tool_call; after max_tool_calls run fails with max_tool_calls_exceeded.
     """
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.text = "ok"
-    mock_response.headers = {}
+    handler = _respond("ok")
 
     # Return tool_call every time (no final)
     actions = [
@@ -276,8 +285,7 @@ def test_http_tool_max_tool_calls_exceeded(app, client, db_path):
         if registry_store.get_agent("tool_agent") is None:
             pytest.skip("tool_agent preset not seeded")
         get_provider = _override_provider(app, provider)
-        with patch("app.runtime.tools.http_tool.httpx.Client") as mock_client:
-            mock_client.return_value.__enter__.return_value.request.return_value = mock_response
+        with mock_http(handler):
             try:
                 resp = client.post(
                     "/agents/tool_agent/runs",
@@ -296,8 +304,6 @@ def test_http_tool_timeout_fails_run(app, client, db_path):
     """
     Mock httpx to raise TimeoutException; run fails with tool_execution_failed and error step.
     """
-    import httpx
-
     actions = [
         {"type": "tool_call", "tool_name": "http_request", "args": {"url": "https://example.com/slow"}},
     ]
@@ -318,8 +324,10 @@ def test_http_tool_timeout_fails_run(app, client, db_path):
         if registry_store.get_agent("tool_agent") is None:
             pytest.skip("tool_agent preset not seeded")
         get_provider = _override_provider(app, provider)
-        with patch("app.runtime.tools.http_tool.httpx.Client") as mock_client:
-            mock_client.return_value.__enter__.return_value.request.side_effect = httpx.TimeoutException("timeout")
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise httpx.TimeoutException("timeout", request=request)
+
+        with mock_http(handler):
             try:
                 resp = client.post(
                     "/agents/tool_agent/runs",
@@ -344,10 +352,7 @@ def test_tool_result_has_latency_ms(app, client, db_path):
     """
     Part 3: tool_result step has latency_ms set (mock returns quickly).
     """
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.text = "ok"
-    mock_response.headers = {}
+    handler = _respond("ok")
 
     actions = [
         {"type": "tool_call", "tool_name": "http_request", "args": {"url": "https://example.com/"}},
@@ -369,8 +374,7 @@ def test_tool_result_has_latency_ms(app, client, db_path):
             pytest.skip("tool_agent preset not seeded")
         get_provider = _override_provider(app, provider)
         try:
-            with patch("app.runtime.tools.http_tool.httpx.Client") as mock_client:
-                mock_client.return_value.__enter__.return_value.request.return_value = mock_response
+            with mock_http(handler):
                 resp = client.post(
                     "/agents/tool_agent/runs",
                     json={"input": {"query": "x"}, "wait": True},
@@ -391,10 +395,7 @@ def test_prompt_tool_cap_large_response_succeeds(app, client, db_path):
     injected content is capped so the model receives limited chars.
     """
     large_body = "x" * 20_000
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.text = large_body
-    mock_response.headers = {"Content-Type": "text/plain"}
+    handler = _respond(large_body, {"Content-Type": "text/plain"})
 
     actions = [
         {"type": "tool_call", "tool_name": "http_request", "args": {"url": "https://example.com/big"}},
@@ -417,8 +418,7 @@ def test_prompt_tool_cap_large_response_succeeds(app, client, db_path):
             pytest.skip("tool_agent preset not seeded")
         get_provider = _override_provider(app, provider)
         try:
-            with patch("app.runtime.tools.http_tool.httpx.Client") as mock_client:
-                mock_client.return_value.__enter__.return_value.request.return_value = mock_response
+            with mock_http(handler):
                 resp = client.post(
                     "/agents/tool_agent/runs",
                     json={"input": {"query": "big"}, "wait": True},
@@ -440,3 +440,91 @@ def test_prompt_tool_cap_large_response_succeeds(app, client, db_path):
             assert len(body) > 500
         finally:
             app.dependency_overrides.pop(get_provider, None)
+
+
+def test_http_request_stops_reading_at_cap_and_decodes_charset():
+    """The body is streamed and decoded with the response charset; reading stops once the cap is exceeded."""
+    from app.runtime.tools.http_tool import HttpPolicy, execute_http_request
+
+    pulled: List[int] = []
+
+    class Body(httpx.SyncByteStream):
+        def __iter__(self):
+            for i in range(1_000):
+                pulled.append(i)
+                yield "é".encode("latin-1") * 100
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"Content-Type": "text/plain; charset=latin-1"}, stream=Body())
+
+    policy = HttpPolicy(timeout_seconds=5, max_response_chars=250, allowed_domains=["example.com"])
+    with mock_http(handler):
+        result = execute_http_request({"url": "https://example.com/big"}, policy)
+
+    assert result["truncated"] is True
+    assert result["text"] == "é" * 250 + "...[truncated]"
+    assert len(pulled) == 3
+
+
+def test_http_request_cache_revalidates_with_etag_and_memoizes_per_run():
+    """GET responses are cached per Cache-Control, revalidated with If-None-Match, and memoized within a run."""
+    from app.runtime.tools.http_tool import HttpPolicy
+    from app.runtime.tools.registry import DefaultToolRegistry, RunContext
+    from app.runtime.tools.result_cache import ToolResultCache, cached_http_request
+
+    sent: List[httpx.Request] = []
+    replies = [
+        httpx.Response(200, text="v1", headers={"ETag": '"v1"', "Cache-Control": "no-cache"}),
+        httpx.Response(304, headers={"ETag": '"v1"', "Cache-Control": "max-age=60"}),
+        httpx.Response(200, text="posted"),
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        return replies[len(sent) - 1]
+
+    policy = HttpPolicy(timeout_seconds=5, max_response_chars=1000, allowed_domains=["example.com"])
+    cache = ToolResultCache(1 << 20)
+    args = {"url": "https://example.com/doc"}
+    with mock_http(handler):
+        first = cached_http_request(args, policy, cache)
+        revalidated = cached_http_request(args, policy, cache)
+        fresh = cached_http_request(args, policy, cache)
+        assert cached_http_request({"method": "POST", "url": "https://example.com/doc"}, policy, cache)["text"] == "posted"
+
+    assert first["text"] == revalidated["text"] == fresh["text"] == "v1"
+    assert "If-None-Match" not in sent[0].headers
+    assert sent[1].headers["If-None-Match"] == '"v1"'
+    assert len(sent) == 3 and sent[2].method == "POST"
+    assert cache.stats()["revalidated"] == 1 and cache.stats()["hits"] == 1
+
+    sent.clear()
+    replies[:] = [httpx.Response(200, text="memo", headers={"Cache-Control": "no-store"})]
+    run_context = RunContext(
+        run_id="run-memo",
+        preset=None,  # type: ignore[arg-type]
+        tools_enabled=True,
+        max_tool_calls=5,
+        allowed_tools=["http_request"],
+        http_allowed_domains=["example.com"],
+    )
+    with mock_http(handler):
+        results = [DefaultToolRegistry().execute("http_request", {"url": "https://example.com/memo"}, run_context) for _ in range(2)]
+    assert [r["text"] for r in results] == ["memo", "memo"]
+    assert len(sent) == 1
+
+
+def test_http_request_cache_hit_still_enforces_domain_policy():
+    """A response cached under one run's allowlist is not served to a run that may not fetch the URL."""
+    from app.runtime.tools.http_tool import HttpPolicy, ToolExecutionError
+    from app.runtime.tools.result_cache import ToolResultCache, cached_http_request
+
+    cache = ToolResultCache(1 << 20)
+    allowed = HttpPolicy(timeout_seconds=5, max_response_chars=1000, allowed_domains=["api.example.com"])
+    with mock_http(_respond("cached", {"Cache-Control": "max-age=60"})):
+        assert cached_http_request({"url": "https://api.example.com/x"}, allowed, cache)["text"] == "cached"
+
+    denied = HttpPolicy(timeout_seconds=5, max_response_chars=1000, allowed_domains=["other.com"])
+    with pytest.raises(ToolExecutionError, match="domain not allowed"):
+        cached_http_request({"url": "https://api.example.com/x"}, denied, cache)
+    assert cache.stats()["hits"] == 0
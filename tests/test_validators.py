@@ -0,0 +1,67 @@
+"""Shared validator registry (app.utils.validators): caching, LRU eviction, error shape."""
+
+from __future__ import annotations
+
+import pytest
+from jsonschema import SchemaError
+
+from app.utils.validators import (
+    ValidatorCache,
+    check_schema,
+    schema_hash,
+    validation_errors,
+    validator_cache_stats,
+)
+
+SCHEMA = {
+    "type": "object",
+    "required": ["summary"],
+    "properties": {"summary": {"type": "string"}},
+}
+
+
+def test_schema_hash_is_key_order_independent() -> None:
+    reordered = {"properties": {"summary": {"type": "string"}}, "required": ["summary"], "type": "object"}
+    assert schema_hash(SCHEMA) == schema_hash(reordered)
+
+
+def test_validator_compiled_once_per_schema() -> None:
+    cache = ValidatorCache(max_entries=4)
+    first = cache.get(SCHEMA)
+    second = cache.get(dict(SCHEMA))
+    assert first is second
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+
+def test_lru_eviction() -> None:
+    cache = ValidatorCache(max_entries=2)
+    a = {"type": "string"}
+    b = {"type": "integer"}
+    c = {"type": "boolean"}
+    va = cache.get(a)
+    cache.get(b)
+    cache.get(a)  # a becomes most recently used
+    cache.get(c)  # evicts b
+    assert cache.stats()["evictions"] == 1
+    assert cache.get(a) is va
+    misses_before = cache.stats()["misses"]
+    cache.get(b)
+    assert cache.stats()["misses"] == misses_before + 1
+
+
+def test_validation_errors_fast_path_and_error_shape() -> None:
+    before = validator_cache_stats()
+    assert validation_errors({"summary": "ok"}, SCHEMA) == []
+    errors = validation_errors({"summary": 3}, SCHEMA)
+    assert errors == [{"path": ["summary"], "message": "3 is not of type 'string'"}]
+    after = validator_cache_stats()
+    assert after["hits"] + after["misses"] >= before["hits"] + before["misses"] + 2
+
+
+def test_check_schema_rejects_invalid_schema() -> None:
+    with pytest.raises(SchemaError):
+        check_schema({"type": "not-a-type"})
+    with pytest.raises(SchemaError):
+        check_schema({"type": "not-a-type"})